@@ -0,0 +1,93 @@
+"""Measures cold and warm start-up time of `python -m smart_contracts build`.
+
+Cold runs delete the contract manifest and bytecode caches first, warm runs reuse them.
+Without a contract name every contract is built, so contract discovery goes through
+the manifest; naming one resolves its folder directly and skips discovery.
+Run from the project root:
+
+    poetry run python benchmarks/cli_startup.py --runs 10 --output startup.json
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+contracts_root = project_root / "smart_contracts"
+manifest_path = contracts_root / "artifacts" / ".contracts_manifest.json"
+
+
+def _clear_caches() -> None:
+    manifest_path.unlink(missing_ok=True)
+    for pycache in contracts_root.rglob("__pycache__"):
+        shutil.rmtree(pycache, ignore_errors=True)
+
+
+def _time_run(contract_name: str | None) -> float:
+    command = [sys.executable, "-m", "smart_contracts", "build"]
+    if contract_name is not None:
+        command.append(contract_name)
+    start = time.perf_counter()
+    result = subprocess.run(
+        command,
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise Exception(f"Build failed:\n{result.stdout}\n{result.stderr}")
+    return elapsed
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "min_ms": min(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("contract_name", nargs="?", help="defaults to all contracts")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--output", type=Path, help="write results as JSON to this file"
+    )
+    args = parser.parse_args()
+
+    # Populate the build cache so every timed run measures CLI overhead, not compilation.
+    _time_run(args.contract_name)
+
+    cold: list[float] = []
+    warm: list[float] = []
+    for _ in range(args.runs):
+        _clear_caches()
+        cold.append(_time_run(args.contract_name))
+        warm.append(_time_run(args.contract_name))
+
+    results = {
+        "contract": args.contract_name or "all",
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "cold": _summary(cold),
+        "warm": _summary(warm),
+    }
+    for label in ("cold", "warm"):
+        stats = results[label]
+        print(
+            f"{label:>5}: min {stats['min_ms']:.1f} ms, "
+            f"median {stats['median_ms']:.1f} ms, max {stats['max_ms']:.1f} ms"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
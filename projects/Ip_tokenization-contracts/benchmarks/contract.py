@@ -0,0 +1,404 @@
+"""Benchmarks every IPTokenizationPlatform ABI method in the algopy testing emulator.
+
+Each method runs against fixtures of 10, 1k and 100k KYC'd accounts, recording calls
+per second, distinct box reads and writes and inner transactions per call. Methods that
+consume the state they act on get a fresh app for every call. No network or localnet
+is needed. Throughput depends on the machine, so it is only reported; the baseline
+committed next to this script holds the deterministic per-call counts, which gate:
+
+    cd benchmarks
+    poetry run python contract.py --calls 2000 --baseline contract_baseline.json
+    poetry run python contract.py --baseline contract_baseline.json --update-baseline
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import secrets
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algopy import Account, Asset, Bytes, Global, UInt64, arc4  # noqa: E402
+from algopy_testing import AlgopyTestContext, algopy_testing_context  # noqa: E402
+from algosdk import encoding  # noqa: E402
+
+from smart_contracts.ip_tokens.contract import (  # noqa: E402
+    IPTokenizationPlatform,
+    SwapLeg,
+)
+from smart_contracts.ip_tokens.kyc_batcher import ACCOUNTS_PER_CALL  # noqa: E402
+from smart_contracts.ip_tokens.kyc_merkle import KycMerkleTree  # noqa: E402
+from smart_contracts.ip_tokens.metadata_store import (  # noqa: E402
+    CHUNK_SIZE as METADATA_CHUNK_SIZE,
+)
+
+ACCOUNT_COUNTS = (10, 1_000, 100_000)
+ROYALTY_PERCENT = 5
+# atomic_swap_netted runs as a chain of legs between this many distinct accounts.
+NETTED_ACCOUNTS = 4
+# Deterministic per call, so they may not grow at all; calls per second is not gated.
+GATED_METRICS = ("box_reads", "box_writes", "inner_txns")
+# These only succeed once per app (the asset opt-in, the asset close-out and the app
+# itself are gone afterwards), so every call runs against a fresh fixture.
+ONE_SHOT_METHODS = ("tokenize_asset", "migrate_to", "delete_application")
+
+
+class BoxCounter:
+    """Counts the distinct box keys a call reads and writes in the emulator's ledger."""
+
+    def __init__(self, context: AlgopyTestContext) -> None:
+        self.reads: set[bytes] = set()
+        self.writes: set[bytes] = set()
+        ledger = context.ledger
+        for name, touched in (
+            ("get_box", self.reads),
+            ("box_exists", self.reads),
+            ("set_box", self.writes),
+            ("delete_box", self.writes),
+        ):
+            setattr(ledger, name, self._wrap(getattr(ledger, name), touched))
+
+    @staticmethod
+    def _wrap(method: Callable[..., Any], touched: set[bytes]) -> Callable[..., Any]:
+        def counted(app: Any, key: Any, *args: Any, **kwargs: Any) -> Any:
+            touched.add(key if isinstance(key, bytes) else bytes(key.value))
+            return method(app, key, *args, **kwargs)
+
+        return counted
+
+    def reset(self) -> None:
+        self.reads.clear()
+        self.writes.clear()
+
+
+@dataclasses.dataclass
+class Fixture:
+    context: AlgopyTestContext
+    contract: IPTokenizationPlatform
+    creator: Account
+    asset: Asset
+    accounts: list[Account]
+    public_keys: list[bytes]
+    tree: KycMerkleTree
+
+    def account(self, i: int) -> Account:
+        return self.accounts[i % len(self.accounts)]
+
+    def proof(self, i: int) -> Bytes:
+        return Bytes(self.tree.proof(self.public_keys[i % len(self.public_keys)]))
+
+    def pay(self, sender: Account, amount: int) -> Any:
+        return self.context.any.txn.payment(
+            sender=sender,
+            receiver=self.context.ledger.get_app(self.contract).address,
+            amount=UInt64(amount),
+        )
+
+
+def build_fixture(context: AlgopyTestContext, account_count: int) -> Fixture:
+    creator = context.default_sender
+    asset = context.any.asset(creator=creator, total=UInt64(10**12))
+    contract = IPTokenizationPlatform()
+    with context.txn.create_group(active_txn_overrides={"sender": creator}):
+        contract.create_application(asset, UInt64(ROYALTY_PERCENT))
+
+    # Random keys stand in for accounts; the emulator never checks signatures.
+    public_keys = [secrets.token_bytes(32) for _ in range(account_count)]
+    accounts = [
+        context.any.account(address=encoding.encode_address(key)) for key in public_keys
+    ]
+    for account in accounts:
+        contract.kyc_verified[account] = True
+    tree = KycMerkleTree.build(public_keys)
+    contract.kyc_merkle_root = Bytes(tree.root)
+    return Fixture(context, contract, creator, asset, accounts, public_keys, tree)
+
+
+Call = tuple[Account | None, Callable[[int], Any]]
+
+
+def method_calls(fx: Fixture) -> dict[str, Call]:
+    """One call per ABI method, as (sender, call(i)); i picks the accounts involved.
+
+    A sender of None means the call comes from the KYC'd account it involves.
+    """
+    c = fx.contract
+    target = fx.context.any.application()
+    mbr = int(Global.min_balance + Global.asset_opt_in_min_balance)
+
+    def batch(i: int) -> arc4.DynamicArray[arc4.Address]:
+        return arc4.DynamicArray(
+            *(arc4.Address(fx.account(i + k)) for k in range(ACCOUNTS_PER_CALL))
+        )
+
+    def netted(i: int) -> Any:
+        accounts = arc4.DynamicArray(
+            *(arc4.Address(fx.account(i + k)) for k in range(NETTED_ACCOUNTS))
+        )
+        legs = arc4.DynamicArray(
+            *(
+                SwapLeg(arc4.UInt8(k + 1), arc4.UInt8(k), arc4.UInt64(1))
+                for k in range(NETTED_ACCOUNTS - 1)
+            )
+        )
+        return c.atomic_swap_netted(accounts, legs)
+
+    def metadata_root(i: int) -> bytes:
+        return hashlib.sha256(i.to_bytes(8, "big")).digest()
+
+    def write_index(i: int) -> Any:
+        root = metadata_root(i)
+        return c.write_metadata_index(
+            Bytes(root), UInt64(4), UInt64(0), Bytes(root * 4)
+        )
+
+    def publish(i: int) -> Any:
+        write_index(i)
+        return c.set_metadata_root(Bytes(metadata_root(i)), UInt64(METADATA_CHUNK_SIZE))
+
+    def update(i: int) -> Any:
+        fx.context.set_template_var("UPDATABLE", True)
+        return c.update_application()
+
+    def claim(i: int) -> Any:
+        c.royalty_accrued = UInt64(1_000)
+        return c.claim_royalties()
+
+    def distribute(accumulate: bool) -> Callable[[int], Any]:
+        def call(i: int) -> Any:
+            c.accumulate_royalties = accumulate
+            return c.distribute_royalty(fx.pay(fx.account(i), 10_000))
+
+        return call
+
+    return {
+        "create_application": (
+            fx.creator,
+            lambda i: IPTokenizationPlatform().create_application(
+                fx.asset, UInt64(ROYALTY_PERCENT)
+            ),
+        ),
+        "tokenize_asset": (
+            fx.creator,
+            lambda i: c.tokenize_asset(fx.pay(fx.creator, mbr)),
+        ),
+        "buy_ip_fraction": (
+            None,
+            lambda i: c.buy_ip_fraction(fx.pay(fx.account(i), 1_000), UInt64(1)),
+        ),
+        "buy_ip_fraction_with_proof": (
+            None,
+            lambda i: c.buy_ip_fraction_with_proof(
+                fx.pay(fx.account(i), 1_000), UInt64(1), fx.proof(i)
+            ),
+        ),
+        "atomic_swap": (
+            fx.creator,
+            lambda i: c.atomic_swap(fx.account(i), fx.account(i + 1), UInt64(1)),
+        ),
+        "atomic_swap_with_proof": (
+            fx.creator,
+            lambda i: c.atomic_swap_with_proof(
+                fx.account(i),
+                fx.account(i + 1),
+                UInt64(1),
+                fx.proof(i),
+                fx.proof(i + 1),
+            ),
+        ),
+        "atomic_swap_netted": (fx.creator, netted),
+        "verify_kyc": (fx.creator, lambda i: c.verify_kyc(fx.account(i), True)),
+        "revoke_kyc": (fx.creator, lambda i: c.revoke_kyc(fx.account(i))),
+        "verify_kyc_batch": (fx.creator, lambda i: c.verify_kyc_batch(batch(i), True)),
+        "revoke_kyc_batch": (fx.creator, lambda i: c.revoke_kyc_batch(batch(i))),
+        "set_kyc_merkle_root": (
+            fx.creator,
+            lambda i: c.set_kyc_merkle_root(Bytes(fx.tree.root)),
+        ),
+        "distribute_royalty": (None, distribute(False)),
+        "distribute_royalty[accrue]": (None, distribute(True)),
+        "set_royalty_mode": (fx.creator, lambda i: c.set_royalty_mode(bool(i % 2))),
+        "claim_royalties": (fx.creator, claim),
+        "connect_wallet": (None, lambda i: c.connect_wallet()),
+        "put_metadata_chunk": (
+            fx.creator,
+            lambda i: c.put_metadata_chunk(
+                Bytes(i.to_bytes(8, "big") * (METADATA_CHUNK_SIZE // 8))
+            ),
+        ),
+        "write_metadata_index": (fx.creator, write_index),
+        "set_metadata_root": (fx.creator, publish),
+        "migrate_to": (fx.creator, lambda i: c.migrate_to(target)),
+        "update_application": (fx.creator, update),
+        "delete_application": (fx.creator, lambda i: c.delete_application()),
+    }
+
+
+@dataclasses.dataclass
+class MethodResult:
+    calls_per_second: float
+    box_reads: float
+    box_writes: float
+    inner_txns: float
+
+
+class Totals:
+    """Accumulates per-call measurements into a MethodResult."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.elapsed = 0.0
+        self.reads = self.writes = self.inner = 0
+
+    def time_call(
+        self,
+        fx: Fixture,
+        counter: BoxCounter,
+        sender: Account | None,
+        call: Callable[[int], Any],
+        i: int,
+    ) -> None:
+        counter.reset()
+        start = time.perf_counter()
+        with fx.context.txn.create_group(
+            active_txn_overrides={
+                "sender": sender if sender is not None else fx.account(i)
+            }
+        ):
+            call(i)
+        self.elapsed += time.perf_counter() - start
+        self.calls += 1
+        self.reads += len(counter.reads)
+        self.writes += len(counter.writes)
+        self.inner += sum(len(group) for group in fx.context.txn.last_group.itxn_groups)
+
+    def result(self) -> MethodResult:
+        calls = self.calls
+        return MethodResult(
+            calls / self.elapsed,
+            self.reads / calls,
+            self.writes / calls,
+            self.inner / calls,
+        )
+
+
+def run_method(
+    fx: Fixture,
+    counter: BoxCounter,
+    sender: Account | None,
+    call: Callable[[int], Any],
+    calls: int,
+) -> MethodResult:
+    totals = Totals()
+    for i in range(calls):
+        totals.time_call(fx, counter, sender, call, i)
+    return totals.result()
+
+
+def run_one_shot(name: str, calls: int) -> MethodResult:
+    """Times a method that consumes its app, building a fresh fixture for each call.
+
+    The method never touches the KYC allowlist, so a small fixture stands in for every
+    account count; only the call itself is timed.
+    """
+    totals = Totals()
+    for i in range(calls):
+        with algopy_testing_context() as context:
+            fx = build_fixture(context, NETTED_ACCOUNTS)
+            counter = BoxCounter(context)
+            sender, call = method_calls(fx)[name]
+            totals.time_call(fx, counter, sender, call, i)
+    return totals.result()
+
+
+def _report(name: str, result: MethodResult) -> None:
+    print(
+        f"  {name:<30}{result.calls_per_second:>10,.0f} calls/s"
+        f"{result.box_reads:>6.1f} box reads"
+        f"{result.box_writes:>6.1f} writes"
+        f"{result.inner_txns:>6.1f} inner txns"
+    )
+
+
+def run(calls: int, account_counts: tuple[int, ...]) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for account_count in account_counts:
+        by_method = results.setdefault(str(account_count), {})
+        with algopy_testing_context() as context:
+            start = time.perf_counter()
+            fx = build_fixture(context, account_count)
+            elapsed = time.perf_counter() - start
+            print(f"{account_count} KYC'd accounts ready in {elapsed:.1f}s")
+            counter = BoxCounter(context)
+            for name, (sender, call) in method_calls(fx).items():
+                if name in ONE_SHOT_METHODS:
+                    continue
+                result = run_method(fx, counter, sender, call, calls)
+                by_method[name] = dataclasses.asdict(result)
+                _report(name, result)
+        # Testing contexts cannot nest, so fresh fixtures wait for this one to close.
+        for name in ONE_SHOT_METHODS:
+            result = run_one_shot(name, calls)
+            by_method[name] = dataclasses.asdict(result)
+            _report(name, result)
+    return results
+
+
+def to_baseline(results: dict[str, Any]) -> dict[str, Any]:
+    """Keeps only the gated counts, which do not depend on the machine."""
+    return {
+        accounts: {
+            name: {metric: result[metric] for metric in GATED_METRICS}
+            for name, result in methods.items()
+        }
+        for accounts, methods in results.items()
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    regressions = []
+    for accounts, methods in baseline.items():
+        for name, old in methods.items():
+            new = results.get(accounts, {}).get(name)
+            if new is None:
+                continue
+            for metric in GATED_METRICS:
+                if new[metric] > old[metric]:
+                    regressions.append(
+                        f"{name} @ {accounts}: {metric} {old[metric]} -> {new[metric]}"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000)
+    parser.add_argument("--accounts", type=int, nargs="+", default=ACCOUNT_COUNTS)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run(args.calls, tuple(args.accounts))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline and args.update_baseline:
+        args.baseline.write_text(json.dumps(to_baseline(results), indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline and args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,662 @@
+"""Drives marketplace calls at a target rate and reports submit-to-confirm latency.
+
+Deploys a fresh IPTokenizationPlatform, creates N funded, opted-in and KYC'd accounts,
+then sends a weighted mix of buy_ip_fraction, atomic_swap, distribute_royalty and
+verify_kyc calls at a fixed arrival rate. Reports throughput, p50/p95/p99 latency per
+method, rejection reasons and fees spent. Runs against LocalNet, or an in-memory
+stand-in with --fake (see smart_contracts/_helpers/fake_algod.py):
+
+    poetry run python benchmarks/marketplace_load.py --accounts 200 --rate 50
+    poetry run python benchmarks/marketplace_load.py --fake --rate 1000 --duration 10
+    poetry run python benchmarks/marketplace_load.py --mix buy=6,royalty=3,kyc=1
+
+marketplace_load_baseline.fake.json next to this script was recorded against the fake,
+so check for regressions with the same settings:
+
+    cd benchmarks
+    poetry run python marketplace_load.py --fake --rate 200 --duration 10 \\
+        --baseline marketplace_load_baseline.fake.json
+
+With --precheck, buys and swaps are first checked against kyc_cache.MarketplaceCache,
+so calls that would fail are counted as PrecheckFailed without spending fees.
+
+atomic_swap moves fractions with an inner transfer sent from the seller, which only
+succeeds once the seller is rekeyed to the app, so on LocalNet swaps from plain
+accounts show up under rejections. The fake does not execute TEAL and accepts them.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algosdk import account, constants, encoding, kmd, logic, transaction  # noqa: E402
+from algosdk.atomic_transaction_composer import (  # noqa: E402
+    AccountTransactionSigner,
+    TransactionWithSigner,
+)
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient  # noqa: E402
+from smart_contracts._helpers.async_client import (  # noqa: E402
+    MAX_GROUP_SIZE,
+    AsyncAppClient,
+    CallOptions,
+    MethodSpec,
+    resign,
+    sign_group,
+)
+from smart_contracts._helpers.deploy_pipeline import (  # noqa: E402
+    PROGRAM_CACHE_DIR_NAME,
+    DeployPipeline,
+    PooledAlgodClient,
+    ProgramCache,
+    load_programs,
+)
+from smart_contracts._helpers.submitter import (
+    Submission,
+    TransactionSubmitter,
+)  # noqa: E402
+from smart_contracts.deploy import (  # noqa: E402
+    ALGOD_ADDRESS,
+    ALGOD_TOKEN,
+    ARTIFACTS_PATH,
+    CONTRACT_NAME,
+    CREATE_APPLICATION,
+    GLOBAL_SCHEMA,
+    KMD_ADDRESS,
+    KMD_TOKEN,
+    LOCAL_SCHEMA,
+    sandbox_account,
+)
+from smart_contracts.ip_tokens.kyc_batcher import (  # noqa: E402
+    ACCOUNTS_PER_CALL,
+    KYC_BOX_PREFIX,
+    kyc_box_name,
+)
+from smart_contracts.ip_tokens.kyc_cache import MarketplaceCache  # noqa: E402
+
+MIN_FEE = constants.MIN_TXN_FEE
+ASSET_TOTAL = 10**12
+ROYALTY_PERCENT = 5
+ACCOUNT_FUNDING = 1_000_000
+FRACTION_PRICE = 1_000
+USAGE_PAYMENT = 10_000
+# Protocol minimum balance for the app account plus its opt-in to the IP asset.
+TOKENIZE_MBR = 200_000
+# Box MBR: 2500 per box plus 400 per byte of name and value (a one byte bool).
+KYC_BOX_MBR = 2_500 + 400 * (len(KYC_BOX_PREFIX) + 32 + 1)
+DEFAULT_MIX = "buy=5,swap=2,royalty=2,kyc=1"
+PERCENTILES = (50, 95, 99)
+# Seconds the generator may fall behind its schedule before the run is flagged.
+MAX_SEND_LAG = 0.1
+# Throughput may drop, and p95 latency grow, by this much before it counts as a
+# regression against a baseline.
+TOLERANCE = 0.2
+
+TOKENIZE = MethodSpec.from_signature("tokenize_asset(pay)void")
+BUY = MethodSpec.from_signature("buy_ip_fraction(pay,uint64)void")
+SWAP = MethodSpec.from_signature("atomic_swap(account,account,uint64)void")
+DISTRIBUTE = MethodSpec.from_signature("distribute_royalty(pay)void")
+VERIFY_KYC = MethodSpec.from_signature("verify_kyc(account,bool)void")
+VERIFY_KYC_BATCH = MethodSpec.from_signature("verify_kyc_batch(address[],bool)void")
+
+
+@dataclasses.dataclass
+class Platform:
+    algod: AsyncAlgodClient
+    submitter: TransactionSubmitter
+    client: AsyncAppClient
+    app_id: int
+    asset_id: int
+    creator: str
+    accounts: list[tuple[str, AccountTransactionSigner]]
+    setup_fees: int = 0
+    # With --precheck, buys and swaps that would fail are refused before sending.
+    cache: MarketplaceCache | None = None
+
+    @property
+    def app_address(self) -> str:
+        return logic.get_application_address(self.app_id)
+
+    async def send(self, txns: list[TransactionWithSigner]) -> Submission:
+        self.setup_fees += sum(t.txn.fee for t in txns)
+        return await self.submitter.submit(sign_group(txns), resign(txns))
+
+    async def payment(
+        self, sender: str, signer: AccountTransactionSigner, amount: int, nonce: int
+    ) -> TransactionWithSigner:
+        sp = await self.algod.suggested_params()
+        note = f"load-{nonce}".encode()
+        return TransactionWithSigner(
+            transaction.PaymentTxn(sender, sp, self.app_address, amount, note=note),
+            signer,
+        )
+
+
+# -------------------------- Setup -------------------------- #
+
+
+async def setup(
+    algod: AsyncAlgodClient,
+    algod_client: PooledAlgodClient,
+    funder: str,
+    funder_key: str,
+    account_count: int,
+    creator_funding: int,
+) -> Platform:
+    """Mints the IP asset, deploys an app and onboards account_count KYC'd accounts."""
+    funder_signer = AccountTransactionSigner(funder_key)
+    submitter = TransactionSubmitter(algod, max_in_flight=1_024)
+    sp = await algod.suggested_params()
+
+    create_asset = TransactionWithSigner(
+        transaction.AssetCreateTxn(
+            funder,
+            sp,
+            ASSET_TOTAL,
+            0,
+            False,
+            unit_name="IPF",
+            asset_name="IP Fraction",
+        ),
+        funder_signer,
+    )
+    submission = await submitter.submit(sign_group([create_asset]))
+    info = await algod.pending_transaction_info(submission.tx_ids[0])
+    asset_id = int(info["asset-index"])
+
+    approval, clear = load_programs(ARTIFACTS_PATH / "ip_tokens", CONTRACT_NAME)
+    pipeline = DeployPipeline(
+        algod_client, ProgramCache(ARTIFACTS_PATH / PROGRAM_CACHE_DIR_NAME)
+    )
+    deployed = await asyncio.to_thread(
+        pipeline.deploy,
+        funder=funder,
+        funder_signer=funder_signer,
+        approval_teal=approval,
+        clear_teal=clear,
+        global_schema=GLOBAL_SCHEMA,
+        local_schema=LOCAL_SCHEMA,
+        funding_amount=creator_funding,
+        create_method=CREATE_APPLICATION,
+        method_args=[asset_id, ROYALTY_PERCENT],
+    )
+    creator_signer = AccountTransactionSigner(deployed.deployer_private_key)
+    client = AsyncAppClient(
+        algod,
+        deployed.app_id,
+        deployed.deployer_address,
+        creator_signer,
+        max_in_flight=256,
+        submitter=submitter,
+    )
+    accounts = []
+    for _ in range(account_count):
+        private_key, address = account.generate_account()
+        accounts.append((address, AccountTransactionSigner(private_key)))
+    platform = Platform(
+        algod,
+        submitter,
+        client,
+        deployed.app_id,
+        asset_id,
+        deployed.deployer_address,
+        accounts,
+        # The asset create, and the deploy group's funding payment and create.
+        setup_fees=3 * MIN_FEE,
+    )
+
+    # tokenize_asset's payment covers the app's own MBR; this covers its KYC boxes.
+    fund_app = await platform.payment(
+        funder, funder_signer, KYC_BOX_MBR * account_count, 0
+    )
+    await platform.send([fund_app])
+    mbr_payment = await platform.payment(
+        platform.creator, creator_signer, TOKENIZE_MBR, 0
+    )
+    platform.setup_fees += 2 * MIN_FEE
+    await client.call(
+        TOKENIZE,
+        [mbr_payment],
+        CallOptions(foreign_assets=[asset_id], inner_txns=1),
+    )
+    supply = TransactionWithSigner(
+        transaction.AssetTransferTxn(
+            funder, sp, platform.app_address, ASSET_TOTAL, asset_id
+        ),
+        funder_signer,
+    )
+    await platform.send([supply])
+
+    await _onboard(platform, funder, funder_signer)
+    return platform
+
+
+async def _onboard(
+    platform: Platform, funder: str, funder_signer: AccountTransactionSigner
+) -> None:
+    """Funds, opts in and KYCs every account, a full group or call at a time."""
+    sp = await platform.algod.suggested_params()
+    chunks = [
+        platform.accounts[i : i + MAX_GROUP_SIZE]
+        for i in range(0, len(platform.accounts), MAX_GROUP_SIZE)
+    ]
+    await asyncio.gather(
+        *(
+            platform.send(
+                [
+                    TransactionWithSigner(
+                        transaction.PaymentTxn(funder, sp, address, ACCOUNT_FUNDING),
+                        funder_signer,
+                    )
+                    for address, _ in chunk
+                ]
+            )
+            for chunk in chunks
+        )
+    )
+    await asyncio.gather(
+        *(
+            platform.send(
+                [
+                    TransactionWithSigner(
+                        transaction.AssetOptInTxn(address, sp, platform.asset_id),
+                        signer,
+                    )
+                    for address, signer in chunk
+                ]
+            )
+            for chunk in chunks
+        )
+    )
+    addresses = [address for address, _ in platform.accounts]
+    batches = [
+        addresses[i : i + ACCOUNTS_PER_CALL]
+        for i in range(0, len(addresses), ACCOUNTS_PER_CALL)
+    ]
+    platform.setup_fees += MIN_FEE * len(batches)
+    await asyncio.gather(
+        *(
+            platform.client.call(
+                VERIFY_KYC_BATCH,
+                [batch, True],
+                CallOptions(boxes=[(0, kyc_box_name(a)) for a in batch]),
+            )
+            for batch in batches
+        )
+    )
+
+
+def fake_platform_handler(network: Any) -> Callable[[Any, dict[str, Any]], None]:
+    """Emulates the ledger effects the run reads back: the app's opt-in to the asset
+    in tokenize_asset, and the kyc_verified boxes the KYC methods write."""
+    from smart_contracts._helpers.fake_algod import FakeAccount
+
+    def handler(app: Any, txn: dict[str, Any]) -> None:
+        app_args = txn.get("apaa") or []
+        selector = app_args[0] if app_args else b""
+        if selector == TOKENIZE.selector:
+            holder = network.accounts.setdefault(
+                encoding.decode_address(app.address), FakeAccount()
+            )
+            holder.assets.setdefault(txn["apas"][0], 0)
+        elif selector == VERIFY_KYC_BATCH.selector:
+            users = app_args[1][2:]
+            for offset in range(0, len(users), 32):
+                key = KYC_BOX_PREFIX + users[offset : offset + 32]
+                app.boxes[key] = bytes([app_args[2][0] >> 7])
+        elif selector == VERIFY_KYC.selector:
+            index = app_args[1][0]
+            user = txn["snd"] if index == 0 else txn["apat"][index - 1]
+            app.boxes[KYC_BOX_PREFIX + user] = bytes([app_args[2][0] >> 7])
+
+    return handler
+
+
+# -------------------------- Operations -------------------------- #
+
+# Each operation sends one call for (account index, nonce) and returns the fees paid.
+Operation = Callable[[Platform, int, int], Awaitable[int]]
+
+
+async def buy(platform: Platform, index: int, nonce: int) -> int:
+    address, signer = platform.accounts[index]
+    if platform.cache is not None:
+        await platform.cache.check_buy(address, 1)
+    payment = await platform.payment(address, signer, FRACTION_PRICE, nonce)
+    await platform.client.call(
+        BUY,
+        [payment, 1],
+        CallOptions(
+            sender=address,
+            signer=signer,
+            boxes=[(0, kyc_box_name(address))],
+            foreign_assets=[platform.asset_id],
+            inner_txns=1,
+            note=f"load-{nonce}".encode(),
+        ),
+    )
+    return 3 * MIN_FEE
+
+
+async def swap(platform: Platform, index: int, nonce: int) -> int:
+    buyer = platform.accounts[index][0]
+    seller = platform.accounts[(index + 1) % len(platform.accounts)][0]
+    if platform.cache is not None:
+        await platform.cache.check_swap(buyer, seller, 1)
+    await platform.client.call(
+        SWAP,
+        [buyer, seller, 1],
+        CallOptions(
+            boxes=[(0, kyc_box_name(buyer)), (0, kyc_box_name(seller))],
+            foreign_assets=[platform.asset_id],
+            inner_txns=1,
+            note=f"load-{nonce}".encode(),
+        ),
+    )
+    return 2 * MIN_FEE
+
+
+async def royalty(platform: Platform, index: int, nonce: int) -> int:
+    address, signer = platform.accounts[index]
+    payment = await platform.payment(address, signer, USAGE_PAYMENT, nonce)
+    await platform.client.call(
+        DISTRIBUTE,
+        [payment],
+        CallOptions(
+            sender=address,
+            signer=signer,
+            accounts=[platform.creator],
+            inner_txns=1,
+            note=f"load-{nonce}".encode(),
+        ),
+    )
+    return 3 * MIN_FEE
+
+
+async def kyc(platform: Platform, index: int, nonce: int) -> int:
+    address = platform.accounts[index][0]
+    await platform.client.call(
+        VERIFY_KYC,
+        [address, True],
+        CallOptions(boxes=[(0, kyc_box_name(address))], note=f"load-{nonce}".encode()),
+    )
+    return MIN_FEE
+
+
+OPERATIONS: dict[str, Operation] = {
+    "buy": buy,
+    "swap": swap,
+    "royalty": royalty,
+    "kyc": kyc,
+}
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parses "buy=5,swap=2" into operation weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; use {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# -------------------------- Load -------------------------- #
+
+
+@dataclasses.dataclass
+class LoadResult:
+    rate: float
+    sent: int = 0
+    elapsed: float = 0.0
+    send_lag: float = 0.0
+    fees: int = 0
+    latencies: dict[str, list[float]] = dataclasses.field(default_factory=dict)
+    rejections: Counter[str] = dataclasses.field(default_factory=Counter)
+
+    @property
+    def confirmed(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    def summary(self) -> dict[str, Any]:
+        everything = [v for values in self.latencies.values() for v in values]
+        by_method = {"all": everything, **self.latencies}
+        return {
+            "offered_rate": self.rate,
+            "sent": self.sent,
+            "confirmed": self.confirmed,
+            "rejected": sum(self.rejections.values()),
+            "throughput": self.confirmed / self.elapsed if self.elapsed else 0.0,
+            "fees": self.fees,
+            "calls": {name: len(values) for name, values in self.latencies.items()},
+            "latency_ms": {
+                name: {
+                    f"p{q}": round(percentile(values, q) * 1_000, 1)
+                    for q in PERCENTILES
+                }
+                for name, values in by_method.items()
+                if values
+            },
+            "rejections": dict(self.rejections.most_common()),
+        }
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(int(-(-q * len(ordered) // 100)), 1)
+    return ordered[rank - 1]
+
+
+def rejection_reason(exception: BaseException) -> str:
+    """Groups errors by message, with ids and addresses masked out."""
+    # "TransactionPool.Remember: transaction <id>: logic eval error: ..."
+    message = re.sub(r"^.*?transaction [A-Z2-7]{52}: ", "", str(exception))
+    message = re.sub(r"\b[A-Z2-7]{52}\b|\b[A-Z2-7]{58}\b", "<id>", message)
+    return f"{type(exception).__name__}: {message[:160]}"
+
+
+async def drive(
+    platform: Platform,
+    mix: dict[str, float],
+    rate: float,
+    duration: float,
+    seed: int,
+) -> LoadResult:
+    """Starts calls at a fixed rate whether or not earlier ones have confirmed."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    result = LoadResult(rate=rate)
+    tasks: set[asyncio.Task[None]] = set()
+
+    async def timed(name: str, index: int, nonce: int) -> None:
+        started = time.monotonic()
+        try:
+            fees = await OPERATIONS[name](platform, index, nonce)
+        except Exception as e:
+            result.rejections[f"{name}: {rejection_reason(e)}"] += 1
+            return
+        result.latencies.setdefault(name, []).append(time.monotonic() - started)
+        result.fees += fees
+
+    start = time.monotonic()
+    for nonce in range(int(rate * duration)):
+        delay = start + nonce / rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            result.send_lag = max(result.send_lag, -delay)
+        name = rng.choices(names, weights)[0]
+        index = rng.randrange(len(platform.accounts))
+        task = asyncio.ensure_future(timed(name, index, nonce))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        result.sent += 1
+    while tasks:
+        await asyncio.wait(set(tasks))
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def format_summary(summary: dict[str, Any], setup_fees: int) -> str:
+    out = [
+        f"offered {summary['offered_rate']:,.0f} calls/s: {summary['sent']} sent, "
+        f"{summary['confirmed']} confirmed, {summary['rejected']} rejected",
+        f"throughput {summary['throughput']:,.1f} confirmed calls/s",
+        "",
+        f"{'method':<12}{'calls':>8}"
+        + "".join(f"{f'p{q} ms':>10}" for q in PERCENTILES),
+    ]
+    for name, latency in summary["latency_ms"].items():
+        calls = summary["calls"].get(name, summary["confirmed"])
+        out.append(
+            f"{name:<12}{calls:>8}"
+            + "".join(f"{latency[f'p{q}']:>10,.1f}" for q in PERCENTILES)
+        )
+    out += [
+        "",
+        f"fees spent: {summary['fees'] / 1e6:,.3f} ALGO under load, "
+        f"{setup_fees / 1e6:,.3f} ALGO in setup",
+    ]
+    if summary["rejections"]:
+        out += ["", "rejections:"]
+        out += [
+            f"{count:>8}  {reason}" for reason, count in summary["rejections"].items()
+        ]
+    return "\n".join(out)
+
+
+def compare(summary: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    if summary["offered_rate"] != baseline["offered_rate"]:
+        # Throughput tracks the offered rate, so only like-for-like runs compare.
+        return [
+            f"baseline was recorded at {baseline['offered_rate']:,.0f} calls/s; "
+            f"rerun with --rate {baseline['offered_rate']:g}"
+        ]
+    regressions = []
+    floor = baseline["throughput"] * (1 - TOLERANCE)
+    if summary["throughput"] < floor:
+        regressions.append(
+            f"throughput {baseline['throughput']:,.1f} -> "
+            f"{summary['throughput']:,.1f} calls/s"
+        )
+    old = baseline["latency_ms"].get("all", {}).get("p95")
+    new = summary["latency_ms"].get("all", {}).get("p95")
+    if old and new and new > old * (1 + TOLERANCE):
+        regressions.append(f"p95 latency {old:,.1f} -> {new:,.1f} ms")
+    return regressions
+
+
+# -------------------------- Main -------------------------- #
+
+
+async def run(args: argparse.Namespace, algod_address: str, kmd_address: str) -> None:
+    kmd_client = kmd.KMDClient(args.kmd_token, kmd_address)
+    funder, funder_key = sandbox_account(kmd_client)
+    algod = AsyncAlgodClient(args.algod_token, algod_address, max_connections=64)
+    algod_client = PooledAlgodClient(args.algod_token, algod_address)
+    calls = int(args.rate * args.duration)
+    try:
+        start = time.perf_counter()
+        platform = await setup(
+            algod,
+            algod_client,
+            funder,
+            funder_key,
+            args.accounts,
+            # Swaps and KYC calls are paid by the app creator.
+            ACCOUNT_FUNDING + 2 * MIN_FEE * (calls + args.accounts),
+        )
+        print(
+            f"app {platform.app_id}: {args.accounts} funded, KYC'd accounts ready in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+        if args.precheck:
+            platform.cache = MarketplaceCache(algod, platform.app_id, platform.asset_id)
+            await platform.cache.prefetch(
+                [address for address, _ in platform.accounts], holdings=True
+            )
+        result = await drive(
+            platform, parse_mix(args.mix), args.rate, args.duration, args.seed
+        )
+    finally:
+        await algod.aclose()
+        algod_client.close()
+
+    summary = result.summary()
+    print(format_summary(summary, platform.setup_fees))
+    if result.send_lag > MAX_SEND_LAG:
+        print(
+            f"warning: the generator fell up to {result.send_lag:.2f}s behind the "
+            "offered rate; results understate what the network could take"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2))
+    if args.baseline and args.update_baseline:
+        args.baseline.write_text(json.dumps(summary, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline and args.baseline.exists():
+        regressions = compare(summary, json.loads(args.baseline.read_text()))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=50, help="calls per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--algod-address", default=ALGOD_ADDRESS)
+    parser.add_argument("--algod-token", default=ALGOD_TOKEN)
+    parser.add_argument("--kmd-address", default=KMD_ADDRESS)
+    parser.add_argument("--kmd-token", default=KMD_TOKEN)
+    parser.add_argument(
+        "--precheck",
+        action="store_true",
+        help="refuse buys and swaps the KYC and holdings cache shows would fail",
+    )
+    parser.add_argument(
+        "--fake", action="store_true", help="run against an in-memory algod"
+    )
+    parser.add_argument(
+        "--fake-block-time", type=float, default=0.25, help="seconds, with --fake"
+    )
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    if not args.fake:
+        asyncio.run(run(args, args.algod_address, args.kmd_address))
+        return
+
+    from smart_contracts._helpers.fake_algod import FakeAlgod, FakeAlgodServer
+
+    network = FakeAlgod(block_time=args.fake_block_time)
+    network.app_call_handler = fake_platform_handler(network)
+    network.register_programs(ARTIFACTS_PATH)
+    with FakeAlgodServer(network, algod_port=0, kmd_port=0) as server:
+        asyncio.run(run(args, server.algod_address, server.kmd_address))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measures order-book matching throughput with a deep book of resting orders.
+
+    poetry run python benchmarks/order_book.py --resting 100000 --incoming 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from smart_contracts.ip_tokens.order_book import MatchingEngine, Side  # noqa: E402
+
+ASSET_ID = 1
+MID_PRICE = 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resting", type=int, default=100_000)
+    parser.add_argument("--incoming", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine = MatchingEngine()
+    accounts = [f"account-{i}" for i in range(1_000)]
+
+    # Resting orders sit on both sides of the spread without crossing.
+    start = time.perf_counter()
+    for i in range(args.resting):
+        side: Side = "buy" if i % 2 else "sell"
+        offset = rng.randint(1, 5_000)
+        price = MID_PRICE - offset if side == "buy" else MID_PRICE + offset
+        engine.place(ASSET_ID, rng.choice(accounts), side, price, rng.randint(1, 100))
+    seed_time = time.perf_counter() - start
+
+    # Incoming orders cross the spread; a slice of resting orders is cancelled as we go.
+    matches = 0
+    cancels = 0
+    start = time.perf_counter()
+    for i in range(args.incoming):
+        side = "buy" if i % 2 else "sell"
+        offset = rng.randint(0, 2_000)
+        price = MID_PRICE + offset if side == "buy" else MID_PRICE - offset
+        order_id, fills = engine.place(
+            ASSET_ID, rng.choice(accounts), side, price, rng.randint(1, 100)
+        )
+        matches += len(fills)
+        if i % 10 == 0 and engine.cancel(ASSET_ID, rng.randint(1, order_id)):
+            cancels += 1
+    match_time = time.perf_counter() - start
+
+    book = engine.book(ASSET_ID)
+    print(f"seeded {args.resting} resting orders in {seed_time:.2f}s")
+    print(
+        f"{args.incoming} incoming orders, {matches} fills, {cancels} cancels "
+        f"in {match_time:.2f}s"
+    )
+    print(
+        f"{matches / match_time:,.0f} matches/s, {args.incoming / match_time:,.0f} orders/s"
+    )
+    print(f"{len(book)} orders resting at the end")
+
+
+if __name__ == "__main__":
+    main()
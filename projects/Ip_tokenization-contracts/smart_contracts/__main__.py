@@ -1,27 +1,26 @@
 import dataclasses
+import functools
 import importlib
+import inspect
 import logging
-import subprocess
+import os
 import sys
 from collections.abc import Callable
 from pathlib import Path
-from shutil import rmtree
 
-from algokit_utils.config import config
-from dotenv import load_dotenv
-
-# Set trace_all to True to capture all transactions, defaults to capturing traces only on failure
-# Learn more about using AlgoKit AVM Debugger to debug your TEAL source codes and inspect various kinds of
-# Algorand transactions in atomic groups -> https://github.com/algorandfoundation/algokit-avm-vscode-debugger
-config.configure(debug=True, trace_all=False)
+from smart_contracts._helpers import compiler_worker
+from smart_contracts._helpers.build import build_contracts
+from smart_contracts._helpers.discovery import (
+    MANIFEST_FILE_NAME,
+    discover_contract_names,
+)
 
-# Set up logging and load environment variables.
+# Set up logging. Environment variables and AlgoKit config are only loaded for actions
+# that deploy, see configure_deploy_environment below.
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s %(levelname)-10s: %(message)s"
 )
 logger = logging.getLogger(__name__)
-logger.info("Loading .env")
-load_dotenv()
 
 # Determine the root path based on this file's location.
 root_path = Path(__file__).parent
@@ -33,7 +32,16 @@ root_path = Path(__file__).parent
 class SmartContract:
     path: Path
     name: str
-    deploy: Callable[[], None] | None = None
+
+    @functools.cached_property
+    def deploy(self) -> Callable[..., None] | None:
+        """Imports the deploy function on first use, so build-only runs never load it."""
+        return import_deploy_if_exists(self.path.parent)
+
+    @functools.cached_property
+    def migrate(self) -> Callable[[], None] | None:
+        """The deploy_config's migrate function, for contracts that take over others."""
+        return import_migrate_if_exists(self.path.parent)
 
 
 def import_contract(folder: Path) -> Path:
@@ -45,7 +53,7 @@ def import_contract(folder: Path) -> Path:
         raise Exception(f"Contract not found in {folder}")
 
 
-def import_deploy_if_exists(folder: Path) -> Callable[[], None] | None:
+def import_deploy_if_exists(folder: Path) -> Callable[..., None] | None:
     """Imports the deploy function from a folder if it exists."""
     try:
         module_name = f"{folder.parent.name}.{folder.name}.deploy_config"
@@ -55,54 +63,142 @@ def import_deploy_if_exists(folder: Path) -> Callable[[], None] | None:
         return None
 
 
+def import_migrate_if_exists(folder: Path) -> Callable[[], None] | None:
+    """Imports the migrate function from a folder's deploy_config if it has one."""
+    try:
+        module_name = f"{folder.parent.name}.{folder.name}.deploy_config"
+        deploy_module = importlib.import_module(module_name)
+    except ImportError:
+        return None
+    return getattr(deploy_module, "migrate", None)
+
+
 def has_contract_file(directory: Path) -> bool:
     """Checks whether the directory contains a contract.py file."""
     return (directory / "contract.py").exists()
 
 
-# Use the current directory (root_path) as the base for contract folders and exclude
-# folders that start with '_' (internal helpers).
-contracts: list[SmartContract] = [
-    SmartContract(
-        path=import_contract(folder),
-        name=folder.name,
-        deploy=import_deploy_if_exists(folder),
-    )
-    for folder in root_path.iterdir()
-    if folder.is_dir() and has_contract_file(folder) and not folder.name.startswith("_")
-]
+def discover_contracts(contract_name: str | None = None) -> list[SmartContract]:
+    """Finds contract folders under root_path, excluding folders that start with '_'.
 
-# -------------------------- Build Logic -------------------------- #
+    A single named contract is resolved directly; otherwise the folder listing comes
+    from a small manifest in the artifacts folder that is only rebuilt when it is stale.
+    """
+    if contract_name is not None:
+        folder = root_path / contract_name
+        if contract_name.startswith("_") or not has_contract_file(folder):
+            return []
+        names = [contract_name]
+    else:
+        names = discover_contract_names(
+            root_path, root_path / "artifacts" / MANIFEST_FILE_NAME
+        )
+    return [
+        SmartContract(path=import_contract(root_path / name), name=name)
+        for name in names
+    ]
 
-deployment_extension = "py"
 
+@functools.cache
+def configure_deploy_environment() -> None:
+    """Loads .env and configures AlgoKit; only needed before deploying."""
+    from algokit_utils.config import config
+    from dotenv import load_dotenv
 
-def _get_output_path(output_dir: Path, deployment_extension: str) -> Path:
-    """Constructs the output path for the generated client file."""
-    return output_dir / Path(
-        "{contract_name}"
-        + ("_client" if deployment_extension == "py" else "Client")
-        + f".{deployment_extension}"
+    logger.info("Loading .env")
+    load_dotenv()
+
+    # Traces are captured only on failure unless AVM_TRACE_ALL=1, which traces every
+    # call (e.g. during a load run) for `profile-traces` to aggregate.
+    # Learn more about using AlgoKit AVM Debugger to debug your TEAL source codes and inspect various kinds of
+    # Algorand transactions in atomic groups -> https://github.com/algorandfoundation/algokit-avm-vscode-debugger
+    config.configure(
+        debug=True, trace_all=os.environ.get("AVM_TRACE_ALL", "") not in ("", "0")
     )
 
 
-def build(artifact_path: Path, contract_path: Path) -> None:
-    """Build a contract and generate its artifacts."""
-    print(f"Building app at {contract_path}")
-    print(f"Exporting {contract_path} to {artifact_path}")
-    
-    # Build the contract
-    build_result = subprocess.run(
-        ["python", "-m", "algopy", "build", str(contract_path)],
-        capture_output=True,
-        text=True,
+def profile_contracts(
+    artifact_path: Path,
+    contracts: list[SmartContract],
+    update_baseline: bool = False,
+    show_reports: bool = True,
+) -> None:
+    """Reports static opcode costs and fails on regressions against the baselines."""
+    from smart_contracts._helpers import teal_profiler
+
+    regressions = []
+    for contract in contracts:
+        for report, regressed in teal_profiler.profile_contract(
+            artifact_path / contract.name, contract.path.parent, update_baseline
+        ):
+            if show_reports:
+                logger.info(
+                    f"Static costs for {contract.name}\n"
+                    + teal_profiler.format_report(report)
+                )
+            regressions += regressed
+    if update_baseline:
+        logger.info("Cost baselines updated")
+    if regressions:
+        raise Exception("Opcode cost regressions:\n  " + "\n  ".join(regressions))
+
+
+def check_cost_baselines(artifact_path: Path, contracts: list[SmartContract]) -> None:
+    """Fails a build that regresses a contract with a committed cost baseline.
+
+    Baselines recorded by another compiler version are skipped with a warning.
+    """
+    profile_contracts(
+        artifact_path,
+        [c for c in contracts if any(c.path.parent.glob("*.costs.json"))],
+        show_reports=False,
     )
-    
-    if build_result.returncode != 0:
-        raise Exception(f"Could not build contract:\n{build_result.stdout}")
-    
-    # Skip client generation for now
-    print("Skipping client generation")
+
+
+def profile_traces(
+    artifact_path: Path, contracts: list[SmartContract], follow: bool = False
+) -> None:
+    """Aggregates AlgoKit debug traces into a hot-spot report and folded stacks."""
+    from smart_contracts._helpers import trace_profiler
+
+    trace_path = root_path.parent / trace_profiler.TRACE_DIR_NAME
+    if not trace_path.is_dir():
+        raise Exception(f"No traces in {trace_path}; run with AVM_TRACE_ALL=1 first")
+    indexes = [
+        index
+        for contract in contracts
+        for index in trace_profiler.SourceMapIndex.from_artifacts(
+            artifact_path / contract.name
+        )
+    ]
+    if follow:
+        logger.info(f"Aggregating traces from {trace_path}, Ctrl+C to stop")
+    aggregator = trace_profiler.aggregate_traces(trace_path, indexes, follow)
+    folded_path = trace_path / trace_profiler.FOLDED_FILE_NAME
+    folded_path.write_text("\n".join(aggregator.folded()) + "\n")
+    logger.info(f"AVM hot spots\n{aggregator.report()}")
+    logger.info(f"Wrote flamegraph stacks to {folded_path}")
+
+
+def watch_contracts(artifact_path: Path, contracts: list[SmartContract]) -> None:
+    """Rebuilds each contract when its source changes and hot-redeploys it."""
+    from smart_contracts._helpers.watch import ContractWatcher, WatchedContract
+
+    by_name = {contract.name: contract for contract in contracts}
+    watched = []
+    for contract in contracts:
+        deploy = contract.deploy
+        if deploy is not None:
+            if "updatable" in inspect.signature(deploy).parameters:
+                deploy = functools.partial(deploy, updatable=True)
+            else:
+                logger.warning(f"{contract.name} cannot update in place; appending")
+        watched.append(WatchedContract(contract.name, contract.path, deploy))
+    ContractWatcher(
+        artifact_path,
+        watched,
+        check=lambda name: check_cost_baselines(artifact_path, [by_name[name]]),
+    ).run()
 
 
 # --------------------------- Main Logic --------------------------- #
@@ -112,18 +208,17 @@ def main(action: str, contract_name: str | None = None) -> None:
     """Main entry point to build and/or deploy smart contracts."""
     artifact_path = root_path / "artifacts"
     # Filter contracts based on an optional specific contract name.
-    filtered_contracts = [
-        contract
-        for contract in contracts
-        if contract_name is None or contract.name == contract_name
-    ]
+    filtered_contracts = discover_contracts(contract_name)
 
     match action:
         case "build":
-            for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                build(artifact_path / contract.name, contract.path)
+            build_contracts(
+                artifact_path,
+                [(contract.name, contract.path) for contract in filtered_contracts],
+            )
+            check_cost_baselines(artifact_path, filtered_contracts)
         case "deploy":
+            configure_deploy_environment()
             for contract in filtered_contracts:
                 output_dir = artifact_path / contract.name
                 app_spec_file_name = next(
@@ -140,12 +235,41 @@ def main(action: str, contract_name: str | None = None) -> None:
                     logger.info(f"Deploying app {contract.name}")
                     contract.deploy()
         case "all":
+            build_contracts(
+                artifact_path,
+                [(contract.name, contract.path) for contract in filtered_contracts],
+            )
+            check_cost_baselines(artifact_path, filtered_contracts)
+            configure_deploy_environment()
             for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                build(artifact_path / contract.name, contract.path)
                 if contract.deploy:
                     logger.info(f"Deploying {contract.name}")
                     contract.deploy()
+        case "migrate":
+            configure_deploy_environment()
+            if not any(contract.migrate for contract in filtered_contracts):
+                logger.error("No contract defines a migrate function")
+            for contract in filtered_contracts:
+                if contract.migrate:
+                    logger.info(f"Migrating apps into {contract.name}")
+                    contract.migrate()
+        case "profile":
+            profile_contracts(artifact_path, filtered_contracts)
+        case "profile-baseline":
+            profile_contracts(artifact_path, filtered_contracts, update_baseline=True)
+        case "profile-traces":
+            profile_traces(artifact_path, filtered_contracts)
+        case "watch-traces":
+            profile_traces(artifact_path, filtered_contracts, follow=True)
+        case "watch":
+            configure_deploy_environment()
+            watch_contracts(artifact_path, filtered_contracts)
+        case "worker":
+            # Long-lived compiler process; build/all send their jobs to it while it runs.
+            compiler_worker.serve()
+        case "stop-worker":
+            if not compiler_worker.shutdown():
+                logger.info("No compiler worker running")
         case _:
             logger.error(f"Unknown action: {action}")
 
@@ -0,0 +1,25 @@
+import base64
+
+from algosdk.v2client import algod
+
+
+def decode_global_state(entries: list[dict]) -> dict[str, int | bytes]:
+    """Decodes algod's global-state key/value list into a plain dict."""
+    state: dict[str, int | bytes] = {}
+    for entry in entries:
+        key = base64.b64decode(entry["key"]).decode(errors="replace")
+        value = entry["value"]
+        # type 1 is a byte slice, type 2 is a uint64.
+        if value["type"] == 1:
+            state[key] = base64.b64decode(value.get("bytes", ""))
+        else:
+            state[key] = int(value.get("uint", 0))
+    return state
+
+
+def read_global_state(
+    algod_client: algod.AlgodClient, app_id: int
+) -> dict[str, int | bytes]:
+    """Fetches and decodes an application's global state."""
+    info: dict = algod_client.application_info(app_id)  # type: ignore[assignment]
+    return decode_global_state(info["params"].get("global-state", []))
@@ -0,0 +1,203 @@
+import asyncio
+import base64
+import copy
+import time
+from collections.abc import Sequence
+from typing import Any
+
+import httpx
+from algosdk import encoding, error, transaction
+
+from smart_contracts._helpers.app_state import decode_global_state
+from smart_contracts._helpers.deploy_pipeline import SUGGESTED_PARAMS_MAX_AGE
+
+# Rounds a transaction stays valid for, algod's maximum.
+VALIDITY_ROUNDS = 1_000
+
+
+class AsyncAlgodClient:
+    """The handful of algod endpoints an app client needs, over one pooled AsyncClient.
+
+    Suggested params are cached for params_max_age seconds, but refetched sooner once
+    the chain, as far as this client has seen it, is halfway through their validity
+    window; otherwise a fast chain (LocalNet dev mode commits a block per group) soon
+    outruns them. Callers waiting on the same round share one status-after-block
+    request.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: dict[str, str] | None = None,
+        max_connections: int = 32,
+        params_max_age: float = SUGGESTED_PARAMS_MAX_AGE,
+        session: httpx.AsyncClient | None = None,
+        validity_rounds: int = VALIDITY_ROUNDS,
+    ) -> None:
+        self.session = session or httpx.AsyncClient(
+            base_url=algod_address.rstrip("/") + "/v2",
+            headers={"X-Algo-API-Token": algod_token, **(headers or {})},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=30,
+        )
+        self.params_max_age = params_max_age
+        self.validity_rounds = validity_rounds
+        self._params: transaction.SuggestedParams | None = None
+        self._params_fetched_at = 0.0
+        self._params_lock = asyncio.Lock()
+        self._last_round = 0
+        self._round_waiters: dict[int, asyncio.Future[int]] = {}
+
+    async def _request(
+        self, method: str, path: str, content: bytes | None = None, **params: Any
+    ) -> dict[str, Any]:
+        response = await self.session.request(
+            method,
+            path,
+            content=content,
+            params=params or None,
+            headers={"Content-Type": "application/x-binary"} if content else None,
+        )
+        if response.is_error:
+            body: dict[str, Any] = {}
+            message: Any = response.text
+            try:
+                body = response.json()
+                message = body["message"]
+            except (ValueError, KeyError):
+                pass
+            raise error.AlgodHTTPError(message, response.status_code, body.get("data"))
+        if not response.content:
+            return {}
+        return response.json()  # type: ignore[no-any-return]
+
+    async def suggested_params(
+        self, refresh: bool = False
+    ) -> transaction.SuggestedParams:
+        """Cached suggested params; refresh=True always fetches new ones."""
+        async with self._params_lock:
+            now = time.monotonic()
+            age = now - self._params_fetched_at
+            if (
+                refresh
+                or self._params is None
+                or age > self.params_max_age
+                or self._last_round >= self._params.first + self.validity_rounds // 2
+            ):
+                result = await self._request("GET", "/transactions/params")
+                self._seen(result["last-round"])
+                self._params = transaction.SuggestedParams(
+                    fee=result["fee"],
+                    first=result["last-round"],
+                    last=result["last-round"] + self.validity_rounds,
+                    gh=result["genesis-hash"],
+                    gen=result["genesis-id"],
+                    flat_fee=False,
+                    consensus_version=result["consensus-version"],
+                    min_fee=result["min-fee"],
+                )
+                self._params_fetched_at = now
+            return copy.copy(self._params)
+
+    async def send_group(
+        self, signed: Sequence[transaction.GenericSignedTransaction]
+    ) -> str:
+        """Submits signed transactions as one raw POST and returns the first tx id."""
+        payload = b"".join(
+            base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in signed
+        )
+        result = await self._request("POST", "/transactions", content=payload)
+        return result["txId"]  # type: ignore[no-any-return]
+
+    def _seen(self, round_: int) -> None:
+        self._last_round = max(self._last_round, int(round_))
+
+    async def pending_transaction_info(self, tx_id: str) -> dict[str, Any]:
+        info = await self._request("GET", f"/transactions/pending/{tx_id}")
+        self._seen(info.get("confirmed-round", 0))
+        return info
+
+    async def status(self) -> dict[str, Any]:
+        result = await self._request("GET", "/status")
+        self._seen(result["last-round"])
+        return result
+
+    async def account_info(self, address: str) -> dict[str, Any]:
+        return await self._request("GET", f"/accounts/{address}")
+
+    async def application_global_state(self, app_id: int) -> dict[str, int | bytes]:
+        result = await self._request("GET", f"/applications/{app_id}")
+        return decode_global_state(result["params"].get("global-state", []))
+
+    async def application_box(self, app_id: int, name: bytes) -> bytes | None:
+        """A box's value, or None if the app has no such box."""
+        try:
+            result = await self._request(
+                "GET",
+                f"/applications/{app_id}/box",
+                name=f"b64:{base64.b64encode(name).decode()}",
+            )
+        except error.AlgodHTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        return base64.b64decode(result["value"])
+
+    async def asset_holding(self, address: str, asset_id: int) -> int | None:
+        """An account's balance of an asset, or None if it is not opted in."""
+        try:
+            result = await self._request(
+                "GET", f"/accounts/{address}/assets/{asset_id}"
+            )
+        except error.AlgodHTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        return int(result["asset-holding"]["amount"])
+
+    async def block_txids(self, round_: int) -> list[str]:
+        """Ids of the top-level transactions committed in a round."""
+        result = await self._request("GET", f"/blocks/{round_}/txids")
+        return result.get("blockTxids") or []
+
+    async def wait_for_round_after(self, round_: int) -> int:
+        """Waits for the round after round_ to be committed and returns the last round.
+
+        Every caller waiting on the same round shares one request.
+        """
+        waiter = self._round_waiters.get(round_)
+        if waiter is None:
+            waiter = asyncio.ensure_future(self._status_after_block(round_))
+            self._round_waiters[round_] = waiter
+            waiter.add_done_callback(lambda _: self._round_waiters.pop(round_, None))
+        return await asyncio.shield(waiter)
+
+    async def _status_after_block(self, round_: int) -> int:
+        result = await self._request("GET", f"/status/wait-for-block-after/{round_}")
+        self._seen(result["last-round"])
+        return int(result["last-round"])
+
+    async def wait_for_confirmation(
+        self, tx_id: str, wait_rounds: int = 4
+    ) -> dict[str, Any]:
+        """Returns the pending info once tx_id is confirmed; raises if it is dropped."""
+        current = int((await self.status())["last-round"])
+        deadline = current + wait_rounds
+        while True:
+            info = await self.pending_transaction_info(tx_id)
+            if info.get("confirmed-round", 0) > 0:
+                return info
+            if info.get("pool-error"):
+                raise Exception(f"Transaction {tx_id} rejected: {info['pool-error']}")
+            if current >= deadline:
+                raise error.ConfirmationTimeoutError(
+                    f"Transaction {tx_id} not confirmed after {wait_rounds} rounds"
+                )
+            current = await self.wait_for_round_after(current)
+
+    async def aclose(self) -> None:
+        await self.session.aclose()
@@ -0,0 +1,359 @@
+import asyncio
+import base64
+import copy
+import dataclasses
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+from algosdk import abi, error, transaction
+from algosdk.atomic_transaction_composer import (
+    TransactionSigner,
+    TransactionWithSigner,
+)
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts._helpers.submitter import Rebuild, TransactionSubmitter
+
+logger = logging.getLogger(__name__)
+
+MAX_GROUP_SIZE = 16
+# ARC-4: at most 15 app args follow the selector; the rest are packed into a tuple.
+MAX_APP_ARGS = 15
+RETURN_PREFIX = bytes.fromhex("151f7c75")
+
+_REFERENCE_TYPES = {
+    abi.ABIReferenceType.ACCOUNT,
+    abi.ABIReferenceType.ASSET,
+    abi.ABIReferenceType.APPLICATION,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class MethodSpec:
+    """An ABI method with its selector and argument types resolved once, up front."""
+
+    name: str
+    selector: bytes
+    arg_types: tuple[abi.ABIType | str, ...]
+    returns: abi.ABIType | None
+    on_complete: transaction.OnComplete = transaction.OnComplete.NoOpOC
+
+    @classmethod
+    def from_signature(
+        cls,
+        signature: str,
+        selector: bytes | None = None,
+        on_complete: transaction.OnComplete = transaction.OnComplete.NoOpOC,
+    ) -> "MethodSpec":
+        method = abi.Method.from_signature(signature)
+        returns = method.returns.type
+        return cls(
+            name=method.name,
+            selector=selector or method.get_selector(),
+            arg_types=tuple(arg.type for arg in method.args),
+            # A void return has no ABI type, only the "void" string.
+            returns=returns if isinstance(returns, abi.ABIType) else None,
+            on_complete=on_complete,
+        )
+
+    @property
+    def txn_arg_count(self) -> int:
+        return sum(
+            1
+            for arg_type in self.arg_types
+            if isinstance(arg_type, str) and arg_type not in _REFERENCE_TYPES
+        )
+
+
+@dataclasses.dataclass
+class CallOptions:
+    """Per-call transaction fields; inner_txns raises the fee to cover inner fees."""
+
+    sender: str | None = None
+    signer: TransactionSigner | None = None
+    boxes: Sequence[tuple[int, bytes]] = ()
+    accounts: Sequence[str] = ()
+    foreign_assets: Sequence[int] = ()
+    foreign_apps: Sequence[int] = ()
+    inner_txns: int = 0
+    note: bytes | None = None
+
+
+@dataclasses.dataclass
+class _PendingCall:
+    spec: MethodSpec
+    args: Sequence[Any]
+    options: CallOptions
+    future: asyncio.Future[Any]
+
+    @property
+    def size(self) -> int:
+        return 1 + self.spec.txn_arg_count
+
+
+def encode_app_call(
+    spec: MethodSpec,
+    args: Sequence[Any],
+    app_id: int,
+    sender: str,
+    sp: transaction.SuggestedParams,
+    options: CallOptions,
+) -> tuple[list[TransactionWithSigner], transaction.ApplicationCallTxn]:
+    """Encodes a call; returns its transaction arguments and the app call itself."""
+    if len(args) != len(spec.arg_types):
+        raise TypeError(f"{spec.name} takes {len(spec.arg_types)} arguments")
+    txn_args: list[TransactionWithSigner] = []
+    accounts = list(options.accounts)
+    assets = list(options.foreign_assets)
+    apps = list(options.foreign_apps)
+    abi_types: list[abi.ABIType] = []
+    abi_values: list[Any] = []
+
+    def index_of(items: list[Any], value: Any, offset: int) -> int:
+        if value not in items:
+            items.append(value)
+        return items.index(value) + offset
+
+    for arg_type, value in zip(spec.arg_types, args, strict=True):
+        if arg_type == abi.ABIReferenceType.ACCOUNT:
+            index = 0 if value == sender else index_of(accounts, value, 1)
+            abi_types.append(abi.UintType(8))
+            abi_values.append(index)
+        elif arg_type == abi.ABIReferenceType.ASSET:
+            abi_types.append(abi.UintType(8))
+            abi_values.append(index_of(assets, value, 0))
+        elif arg_type == abi.ABIReferenceType.APPLICATION:
+            index = 0 if value == app_id else index_of(apps, value, 1)
+            abi_types.append(abi.UintType(8))
+            abi_values.append(index)
+        elif isinstance(arg_type, str):
+            if not isinstance(value, TransactionWithSigner):
+                raise TypeError(f"{spec.name} expects a TransactionWithSigner")
+            txn_args.append(value)
+        else:
+            abi_types.append(arg_type)
+            abi_values.append(value)
+
+    app_args = [spec.selector]
+    if len(abi_types) > MAX_APP_ARGS:
+        head = MAX_APP_ARGS - 1
+        app_args += [t.encode(v) for t, v in zip(abi_types[:head], abi_values[:head])]
+        app_args.append(abi.TupleType(abi_types[head:]).encode(abi_values[head:]))
+    else:
+        app_args += [t.encode(v) for t, v in zip(abi_types, abi_values)]
+
+    if options.inner_txns:
+        sp = copy.copy(sp)
+        sp.flat_fee = True
+        sp.fee = max(sp.min_fee or 1_000, 1_000) * (1 + options.inner_txns)
+    call = transaction.ApplicationCallTxn(
+        sender=sender,
+        sp=sp,
+        index=app_id,
+        on_complete=spec.on_complete,
+        app_args=app_args,
+        accounts=accounts or None,
+        foreign_assets=assets or None,
+        foreign_apps=apps or None,
+        boxes=list(options.boxes) or None,
+        note=options.note,
+    )
+    return txn_args, call
+
+
+def decode_return(spec: MethodSpec, info: dict[str, Any]) -> Any:
+    if spec.returns is None:
+        return None
+    logs = info.get("logs") or []
+    raw = base64.b64decode(logs[-1]) if logs else b""
+    if not raw.startswith(RETURN_PREFIX):
+        raise Exception(f"{spec.name} did not log a return value")
+    return spec.returns.decode(raw[len(RETURN_PREFIX) :])
+
+
+class AsyncAppClient:
+    """Pipelines ABI calls to one app, packing concurrent calls into atomic groups.
+
+    Calls made in the same event loop tick (or within linger seconds) are packed into
+    groups of up to 16 transactions, each submitted with one POST; up to max_in_flight
+    groups are outstanding at once. If a packed group is rejected, its calls are retried
+    one group each, so a failing call only fails itself. Groups are confirmed by a
+    TransactionSubmitter, which can be shared between clients.
+    """
+
+    def __init__(
+        self,
+        algod: AsyncAlgodClient,
+        app_id: int,
+        sender: str,
+        signer: TransactionSigner,
+        linger: float = 0.0,
+        max_in_flight: int = 32,
+        submitter: TransactionSubmitter | None = None,
+    ) -> None:
+        self.algod = algod
+        self.app_id = app_id
+        self.sender = sender
+        self.signer = signer
+        self.linger = linger
+        self.submitter = submitter or TransactionSubmitter(algod)
+        self._queue: list[_PendingCall] = []
+        self._flush_scheduled = False
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def call(
+        self, spec: MethodSpec, args: Sequence[Any], options: CallOptions | None = None
+    ) -> Any:
+        """Queues a call and resolves with its decoded return value once confirmed."""
+        loop = asyncio.get_running_loop()
+        pending = _PendingCall(
+            spec, args, options or CallOptions(), loop.create_future()
+        )
+        if pending.size > MAX_GROUP_SIZE:
+            raise ValueError(f"{spec.name} needs over {MAX_GROUP_SIZE} transactions")
+        self._queue.append(pending)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            if self.linger:
+                loop.call_later(self.linger, self._flush)
+            else:
+                loop.call_soon(self._flush)
+        return await pending.future
+
+    async def call_group(
+        self, calls: Sequence[tuple[MethodSpec, Sequence[Any], CallOptions]]
+    ) -> list[Any]:
+        """Sends calls as exactly one atomic group, e.g. one from resource_planner.
+
+        Unlike call, nothing is repacked or retried singly: calls sharing each other's
+        references only succeed together.
+        """
+        loop = asyncio.get_running_loop()
+        group = [
+            _PendingCall(spec, args, options, loop.create_future())
+            for spec, args, options in calls
+        ]
+        if sum(pending.size for pending in group) > MAX_GROUP_SIZE:
+            raise ValueError(f"Group needs over {MAX_GROUP_SIZE} transactions")
+        async with self._in_flight:
+            return await self._submit(group)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        queue, self._queue = self._queue, []
+        group: list[_PendingCall] = []
+        size = 0
+        for pending in queue:
+            if size + pending.size > MAX_GROUP_SIZE:
+                self._spawn(group)
+                group, size = [], 0
+            group.append(pending)
+            size += pending.size
+        if group:
+            self._spawn(group)
+
+    def _spawn(self, group: list[_PendingCall]) -> None:
+        task = asyncio.ensure_future(self._run_group(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_group(self, group: list[_PendingCall]) -> None:
+        try:
+            async with self._in_flight:
+                results = await self._submit(group)
+        except error.AlgodHTTPError as e:
+            # algod rejected the group before it reached the pool, so nothing committed.
+            if len(group) > 1:
+                logger.debug(f"Group of {len(group)} rejected ({e}), retrying singly")
+                await asyncio.gather(*(self._run_group([pending]) for pending in group))
+                return
+            self._fail(group, e)
+            return
+        except Exception as e:
+            self._fail(group, e)
+            return
+        for pending, result in zip(group, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    @staticmethod
+    def _fail(group: list[_PendingCall], exception: Exception) -> None:
+        for pending in group:
+            if not pending.future.done():
+                pending.future.set_exception(exception)
+
+    async def _submit(self, group: list[_PendingCall]) -> list[Any]:
+        sp = await self.algod.suggested_params()
+        txns: list[TransactionWithSigner] = []
+        call_positions: list[int] = []
+        for pending in group:
+            sender = pending.options.sender or self.sender
+            txn_args, call = encode_app_call(
+                pending.spec, pending.args, self.app_id, sender, sp, pending.options
+            )
+            txns.extend(txn_args)
+            call_positions.append(len(txns))
+            txns.append(
+                TransactionWithSigner(call, pending.options.signer or self.signer)
+            )
+
+        submission = await self.submitter.submit(sign_group(txns), resign(txns))
+        tx_ids = submission.tx_ids
+
+        # Void calls resolve straight away; only calls with returns need their logs.
+        async def result(pending: _PendingCall, position: int) -> Any:
+            if pending.spec.returns is None:
+                return None
+            info = await self.algod.pending_transaction_info(tx_ids[position])
+            return decode_return(pending.spec, info)
+
+        return list(
+            await asyncio.gather(
+                *(result(p, i) for p, i in zip(group, call_positions, strict=True))
+            )
+        )
+
+    async def drain(self) -> None:
+        """Waits for every queued and in-flight call to settle."""
+        while self._queue or self._tasks:
+            if self._queue and not self._flush_scheduled:
+                self._flush()
+            await asyncio.sleep(0)
+            if self._tasks:
+                await asyncio.wait(set(self._tasks))
+
+
+def resign(txns: Sequence[TransactionWithSigner]) -> Rebuild:
+    """Rebuilds a group with a fresh validity window, for resubmitting after expiry."""
+
+    def rebuild(
+        sp: transaction.SuggestedParams,
+    ) -> list[transaction.GenericSignedTransaction]:
+        for t in txns:
+            t.txn.first_valid_round = sp.first
+            t.txn.last_valid_round = sp.last
+        return sign_group(txns)
+
+    return rebuild
+
+
+def sign_group(
+    txns: Sequence[TransactionWithSigner],
+) -> list[transaction.GenericSignedTransaction]:
+    """Assigns a group id and signs, calling each distinct signer once."""
+    unsigned = [t.txn for t in txns]
+    # Group ids hash the txids with the group field empty; a retried call may carry one.
+    for txn in unsigned:
+        txn.group = None
+    if len(unsigned) > 1:
+        unsigned = transaction.assign_group_id(unsigned)
+    by_signer: dict[int, tuple[TransactionSigner, list[int]]] = {}
+    for i, t in enumerate(txns):
+        by_signer.setdefault(id(t.signer), (t.signer, []))[1].append(i)
+    signed: list[Any] = [None] * len(unsigned)
+    for signer, indexes in by_signer.values():
+        for i, stxn in zip(indexes, signer.sign_transactions(unsigned, indexes)):
+            signed[i] = stxn
+    return signed
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from smart_contracts._helpers import compiler_worker
+
+logger = logging.getLogger(__name__)
+
+# Compiler invocation shared by every build; any change here invalidates the cache.
+COMPILER_MODULE = "puyapy"
+COMPILER_PACKAGE = "puyapy"
+BUILD_OPTIONS: tuple[str, ...] = (
+    "--output-arc56",
+    "--no-output-arc32",
+    "--output-source-map",
+)
+
+# Files produced by the build that are reused on a cache hit.
+ARTIFACT_PATTERNS = ("*.teal", "*.arc56.json", "*.puya.map", "*_client.py")
+
+CACHE_FILE_NAME = ".build_cache.json"
+
+
+# -------------------------- Build Cache -------------------------- #
+
+
+def compiler_version() -> str:
+    """Returns the installed compiler version, failing if the compiler is missing."""
+    # Imported here to keep CLI startup cheap; metadata lookups pull in a lot of stdlib.
+    import importlib.metadata
+
+    try:
+        return f"{COMPILER_PACKAGE}=={importlib.metadata.version(COMPILER_PACKAGE)}"
+    except importlib.metadata.PackageNotFoundError:
+        raise Exception(
+            f"{COMPILER_PACKAGE} is not installed; run `poetry install` to get the "
+            "pinned compiler"
+        ) from None
+
+
+def package_sources(contract_path: Path) -> list[Path]:
+    """Python files in the contract's package, any of which the contract may import."""
+    package = contract_path.parent
+    return sorted(
+        file
+        for file in package.rglob("*.py")
+        if "__pycache__" not in file.relative_to(package).parts
+    )
+
+
+def cache_key(contract_path: Path, options: tuple[str, ...], version: str) -> str:
+    """Hashes the contract's package sources, compiler version and build options."""
+    digest = hashlib.sha256()
+    package = contract_path.parent
+    for file in package_sources(contract_path):
+        digest.update(file.relative_to(package).as_posix().encode() + b"\0")
+        digest.update(file.read_bytes())
+    digest.update(b"\0" + version.encode())
+    for option in options:
+        digest.update(b"\0" + option.encode())
+    return digest.hexdigest()
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def collect_artifacts(artifact_path: Path) -> dict[str, str]:
+    """Returns the compiler outputs in an artifact folder mapped to their content hash."""
+    if not artifact_path.is_dir():
+        return {}
+    return {
+        file.name: _hash_file(file)
+        for pattern in ARTIFACT_PATTERNS
+        for file in sorted(artifact_path.glob(pattern))
+        if file.is_file()
+    }
+
+
+def load_cache(artifacts_root: Path) -> dict[str, dict]:
+    """Loads the build cache manifest, returning an empty cache if it is missing or corrupt."""
+    try:
+        return json.loads((artifacts_root / CACHE_FILE_NAME).read_text())  # type: ignore[no-any-return]
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(artifacts_root: Path, cache: dict[str, dict]) -> None:
+    """Atomically writes the build cache manifest."""
+    artifacts_root.mkdir(parents=True, exist_ok=True)
+    cache_path = artifacts_root / CACHE_FILE_NAME
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    os.replace(tmp_path, cache_path)
+
+
+def is_cache_hit(entry: dict | None, key: str, artifact_path: Path) -> bool:
+    """Checks that the cached key matches and every recorded artifact is still intact."""
+    if not entry or entry.get("key") != key or not entry.get("outputs"):
+        return False
+    outputs: dict[str, str] = entry["outputs"]
+    for name, digest in outputs.items():
+        file = artifact_path / name
+        if not file.is_file() or _hash_file(file) != digest:
+            return False
+    return True
+
+
+# -------------------------- Build Logic -------------------------- #
+
+
+def _compiler_argv(artifact_path: Path, contract_path: Path) -> list[str]:
+    # puyapy resolves a relative --out-dir against the contract folder.
+    out_dir = str(artifact_path.resolve())
+    return [*BUILD_OPTIONS, str(contract_path), "--out-dir", out_dir]
+
+
+def _print_diagnostic(stream: str, line: str) -> None:
+    print(line, file=sys.stderr if stream == "stderr" else sys.stdout, flush=True)
+
+
+def build(artifact_path: Path, contract_path: Path) -> None:
+    """Build a contract and generate its artifacts."""
+    print(f"Building app at {contract_path}")
+    print(f"Exporting {contract_path} to {artifact_path}")
+
+    argv = _compiler_argv(artifact_path, contract_path)
+    output: list[str] = []
+
+    def on_diagnostic(stream: str, line: str) -> None:
+        output.append(line)
+        _print_diagnostic(stream, line)
+
+    # Prefer a running compiler worker (python -m smart_contracts worker); it has the
+    # compiler already imported, so we skip interpreter startup entirely.
+    returncode = compiler_worker.submit_build(argv, on_diagnostic)
+    if returncode is None:
+        with subprocess.Popen(
+            [sys.executable, "-m", COMPILER_MODULE, *argv],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        ) as process:
+            assert process.stdout is not None
+            for line in process.stdout:
+                on_diagnostic("stdout", line.rstrip("\n"))
+        returncode = process.returncode
+
+    if returncode != 0:
+        joined = "\n".join(output)
+        raise Exception(f"Could not build contract:\n{joined}")
+
+    # Imported here so cache hits never pay for loading algosdk.
+    from smart_contracts._helpers.client_generator import generate_clients
+
+    for client_path in generate_clients(artifact_path):
+        print(f"Generated client {client_path}")
+
+
+def build_contracts(
+    artifacts_root: Path,
+    contracts: list[tuple[str, Path]],
+    max_workers: int | None = None,
+) -> list[str]:
+    """Builds (name, contract_path) pairs, reusing cached artifacts and compiling misses in parallel.
+
+    Returns the names of the contracts that were actually compiled.
+    """
+    cache = load_cache(artifacts_root)
+    version = compiler_version()
+    keys: dict[str, str] = {}
+    misses: list[tuple[str, Path]] = []
+
+    for name, contract_path in contracts:
+        keys[name] = cache_key(contract_path, BUILD_OPTIONS, version)
+        if is_cache_hit(cache.get(name), keys[name], artifacts_root / name):
+            logger.info(f"Build cache hit for {name}, reusing {artifacts_root / name}")
+        else:
+            misses.append((name, contract_path))
+
+    if not misses:
+        return []
+
+    errors: list[str] = []
+    if len(misses) == 1 or compiler_worker.worker_available():
+        # The worker compiles one job at a time, so a pool would only queue on it.
+        for name, contract_path in misses:
+            try:
+                build(artifacts_root / name, contract_path)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+                keys.pop(name)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(len(misses), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                name: pool.submit(build, artifacts_root / name, contract_path)
+                for name, contract_path in misses
+            }
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    keys.pop(name)
+
+    # Record whatever compiled successfully, even if some contracts failed.
+    for name, _ in misses:
+        if name in keys:
+            cache[name] = {
+                "key": keys[name],
+                "outputs": collect_artifacts(artifacts_root / name),
+            }
+    save_cache(artifacts_root, cache)
+
+    if errors:
+        raise Exception("Could not build contracts:\n" + "\n".join(errors))
+    return [name for name, _ in misses]
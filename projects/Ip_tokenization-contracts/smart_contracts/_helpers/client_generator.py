@@ -0,0 +1,172 @@
+import json
+import keyword
+import re
+from pathlib import Path
+from typing import Any
+
+from algosdk import abi
+
+CLIENT_SUFFIX = "_client"
+
+# ARC-56 call actions mapped to the OnComplete member the generated spec uses.
+_ON_COMPLETE = {
+    "NoOp": "NoOpOC",
+    "OptIn": "OptInOC",
+    "CloseOut": "CloseOutOC",
+    "UpdateApplication": "UpdateApplicationOC",
+    "DeleteApplication": "DeleteApplicationOC",
+}
+
+_TRANSACTION_TYPES = {"txn", "pay", "keyreg", "acfg", "axfer", "afrz", "appl"}
+# Black's default, so generated clients pass the repo's formatting check.
+_LINE_LENGTH = 88
+_RESERVED_NAMES = {"call", "drain", "algod", "app_id", "sender", "signer", "options"}
+
+
+def python_type(abi_type: str) -> str:
+    """Maps an ARC-4 type string to the annotation used in generated clients."""
+    if abi_type in _TRANSACTION_TYPES:
+        return "TransactionWithSigner"
+    if abi_type in ("account", "address", "string"):
+        return "str"
+    if abi_type in ("asset", "application"):
+        return "int"
+    if abi_type == "void":
+        return "None"
+    if abi_type == "bool":
+        return "bool"
+    if re.fullmatch(r"byte(\[\d*\])?", abi_type) and abi_type != "byte":
+        return "bytes"
+    if re.fullmatch(r"(uint|ufixed)\d+(x\d+)?|byte", abi_type):
+        return "int"
+    array = re.fullmatch(r"(.+)\[\d*\]", abi_type)
+    if array:
+        return f"list[{python_type(array.group(1))}]"
+    if abi_type.startswith("(") and abi_type.endswith(")"):
+        members = abi.TupleType._parse_tuple(abi_type[1:-1])
+        return f"tuple[{', '.join(python_type(m) for m in members)}]"
+    return "Any"
+
+
+def _identifier(name: str) -> str:
+    name = re.sub(r"\W", "_", name)
+    return f"{name}_" if keyword.iskeyword(name) or name in _RESERVED_NAMES else name
+
+
+def _call_statement(prefix: str, method_name: str, arg_names: list[str]) -> str:
+    """Renders a self.call statement, split over lines the way black splits it."""
+    indent, inner = " " * 8, " " * 12
+    call_args = [f'METHODS["{method_name}"]', f"[{', '.join(arg_names)}]", "options"]
+    line = f"{indent}{prefix}self.call({', '.join(call_args)})"
+    if len(line) <= _LINE_LENGTH:
+        return line + "\n"
+    joined = f"{inner}{', '.join(call_args)}"
+    if len(joined) <= _LINE_LENGTH:
+        return f"{indent}{prefix}self.call(\n{joined}\n{indent})\n"
+    if len(f"{inner}{call_args[1]},") > _LINE_LENGTH:
+        call_args[1] = (
+            "[\n" + "".join(f"{inner}    {name},\n" for name in arg_names) + f"{inner}]"
+        )
+    exploded = "".join(f"{inner}{arg},\n" for arg in call_args)
+    return f"{indent}{prefix}self.call(\n{exploded}{indent})\n"
+
+
+def render_client(spec: dict[str, Any], source_name: str) -> str:
+    """Renders a typed asyncio client module for an ARC-56 app spec."""
+    app_name = spec["name"]
+    class_name = _identifier(app_name) + "Client"
+    specs: list[str] = []
+    methods: list[str] = []
+    for method in spec["methods"]:
+        calls = method["actions"]["call"]
+        if not calls:
+            # Create-only methods are sent by the deploy pipeline, not an app client.
+            continue
+        arg_types = [arg["type"] for arg in method["args"]]
+        returns = method["returns"]["type"]
+        signature = f"{method['name']}({','.join(arg_types)}){returns}"
+        selector = abi.Method.from_signature(signature).get_selector().hex()
+        on_complete = _ON_COMPLETE[calls[0]]
+        specs.append(
+            f'    "{method["name"]}": MethodSpec.from_signature(\n'
+            f'        "{signature}",\n'
+            f'        selector=bytes.fromhex("{selector}"),\n'
+            + (
+                f"        on_complete=transaction.OnComplete.{on_complete},\n"
+                if on_complete != "NoOpOC"
+                else ""
+            )
+            + "    ),"
+        )
+
+        arg_names = [_identifier(arg["name"]) for arg in method["args"]]
+        params = "".join(
+            f"        {name}: {python_type(arg_type)},\n"
+            for name, arg_type in zip(arg_names, arg_types, strict=True)
+        )
+        return_type = python_type(returns)
+        desc = method.get("desc")
+        if return_type == "None":
+            call_body = _call_statement("await ", method["name"], arg_names)
+        else:
+            call_body = _call_statement(
+                f"result: {return_type} = await ", method["name"], arg_names
+            )
+            call_body += "        return result\n"
+        methods.append(
+            f"    async def {_identifier(method['name'])}(\n"
+            f"        self,\n{params}"
+            f"        *,\n"
+            f"        options: CallOptions | None = None,\n"
+            f"    ) -> {return_type}:\n"
+            + (f'        """{desc}"""\n' if desc else "")
+            + call_body
+        )
+
+    body = "\n".join(methods)
+    imports = []
+    if re.search(r"\bAny\b", body):
+        imports.append("from typing import Any\n\n")
+    if any("on_complete=" in entry for entry in specs):
+        imports.append("from algosdk import transaction\n")
+    if "TransactionWithSigner" in body:
+        imports.append(
+            "from algosdk.atomic_transaction_composer import TransactionWithSigner\n"
+        )
+    return (
+        "# Generated by smart_contracts/_helpers/client_generator.py from "
+        f"{source_name}.\n"
+        "# Do not edit by hand; rebuild the contract to regenerate it.\n"
+        + "".join(imports)
+        + ("\n" if imports else "")
+        + "from smart_contracts._helpers.async_client import (\n"
+        "    AsyncAppClient,\n"
+        "    CallOptions,\n"
+        "    MethodSpec,\n"
+        ")\n\n"
+        f'APP_NAME = "{app_name}"\n\n'
+        "# Selectors are precomputed; each signature is parsed once, on import.\n"
+        "METHODS = {\n" + "\n".join(specs) + "\n}\n\n\n"
+        f"class {class_name}(AsyncAppClient):\n"
+        f'    """Typed asyncio client for {app_name}; calls are pipelined."""\n\n'
+        + body
+    )
+
+
+def client_path(app_spec_path: Path) -> Path:
+    app_name = app_spec_path.name.removesuffix(".arc56.json")
+    return app_spec_path.with_name(f"{app_name}{CLIENT_SUFFIX}.py")
+
+
+def generate_clients(artifact_path: Path) -> list[Path]:
+    """Writes a client next to each ARC-56 spec in a folder, skipping unchanged ones."""
+    written = []
+    for app_spec_path in sorted(artifact_path.glob("*.arc56.json")):
+        output = client_path(app_spec_path)
+        source = render_client(
+            json.loads(app_spec_path.read_text()), app_spec_path.name
+        )
+        if not output.exists() or output.read_text() != source:
+            output.write_text(source)
+            written.append(output)
+    return written
@@ -0,0 +1,259 @@
+import contextlib
+import importlib
+import logging
+import os
+import runpy
+import secrets
+import selectors
+import subprocess
+import sys
+from collections.abc import Callable
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Set COMPILER_WORKER_ADDRESS to override where the worker listens and where builds look for it.
+ADDRESS_ENV_VAR = "COMPILER_WORKER_ADDRESS"
+ARTIFACTS_PATH = Path(__file__).parent.parent / "artifacts"
+
+
+def default_address() -> str:
+    """Returns the local socket (or named pipe on Windows) used by the compiler worker."""
+    if address := os.getenv(ADDRESS_ENV_VAR):
+        return address
+    if sys.platform == "win32":
+        return r"\\.\pipe\smart_contracts_compiler_worker"
+    return str(ARTIFACTS_PATH / ".compiler_worker.sock")
+
+
+def authkey_path(address: str) -> Path:
+    """Returns the file holding the worker's connection secret, next to its socket."""
+    if sys.platform == "win32":
+        return ARTIFACTS_PATH / ".compiler_worker.key"
+    return Path(address).with_suffix(".key")
+
+
+def _write_authkey(address: str) -> bytes:
+    """Generates a fresh secret and stores it readable by the current user only."""
+    authkey = secrets.token_bytes(32)
+    path = authkey_path(address)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as file:
+        file.write(authkey)
+    return authkey
+
+
+def _read_authkey(address: str) -> bytes | None:
+    try:
+        return authkey_path(address).read_bytes()
+    except OSError:
+        return None
+
+
+# -------------------------- Worker Side -------------------------- #
+
+
+def _run_module(module: str) -> int:
+    """Runs a module as __main__ and returns its exit code."""
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+
+
+def _forward_output(conn: Connection, pipes: dict[int, str]) -> None:
+    """Sends each line read from the pipes as a diagnostic until all of them close."""
+    pending = dict.fromkeys(pipes, b"")
+    with selectors.DefaultSelector() as selector:
+        for fd in pipes:
+            selector.register(fd, selectors.EVENT_READ)
+        while pending:
+            for key, _ in selector.select():
+                fd = int(key.fd)
+                chunk = os.read(fd, 65536)
+                if chunk:
+                    *lines, pending[fd] = (pending[fd] + chunk).split(b"\n")
+                else:
+                    selector.unregister(fd)
+                    rest = pending.pop(fd)
+                    lines = [rest] if rest else []
+                for line in lines:
+                    text = line.decode("utf-8", errors="replace").rstrip("\r")
+                    conn.send(("diagnostic", pipes[fd], text))
+
+
+def _run_compiler(conn: Connection, module: str, argv: list[str]) -> int:
+    """Compiles in a fork of this process, streaming its output back over conn.
+
+    The fork starts with the compiler already imported but with fresh global state
+    (puyapy configures logging once per process), and writes to real pipes.
+    """
+    if not hasattr(os, "fork"):
+        return _run_compiler_subprocess(conn, module, argv)
+
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        returncode = 1
+        try:
+            os.dup2(stdout_w, 1)
+            os.dup2(stderr_w, 2)
+            for fd in (stdout_r, stdout_w, stderr_r, stderr_w):
+                os.close(fd)
+            sys.stdout = open(1, "w", encoding="utf-8", buffering=1, closefd=False)
+            sys.stderr = open(2, "w", encoding="utf-8", buffering=1, closefd=False)
+            sys.argv = [module, *argv]
+            returncode = _run_module(module)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # Skip interpreter cleanup; it would close the parent's listener too.
+            os._exit(returncode)
+
+    os.close(stdout_w)
+    os.close(stderr_w)
+    try:
+        _forward_output(conn, {stdout_r: "stdout", stderr_r: "stderr"})
+    finally:
+        os.close(stdout_r)
+        os.close(stderr_r)
+        _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def _run_compiler_subprocess(conn: Connection, module: str, argv: list[str]) -> int:
+    """Compiles in a fresh interpreter where fork is unavailable (Windows)."""
+    with subprocess.Popen(
+        [sys.executable, "-m", module, *argv],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    ) as process:
+        assert process.stdout is not None
+        for line in process.stdout:
+            text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+            conn.send(("diagnostic", "stdout", text))
+    return process.returncode
+
+
+def serve(address: str | None = None, module: str | None = None) -> None:
+    """Loads the compiler once and serves build jobs until asked to shut down."""
+    from smart_contracts._helpers.build import COMPILER_MODULE
+
+    address = address or default_address()
+    module = module or COMPILER_MODULE
+    logger.info(f"Preloading compiler module {module}")
+    importlib.import_module(module)
+
+    if sys.platform != "win32" and Path(address).exists():
+        Path(address).unlink()
+
+    # A new secret per run, so only this user's builds can hand the worker jobs.
+    authkey = _write_authkey(address)
+    # The listener removes its socket file when it closes.
+    with Listener(address, authkey=authkey) as listener:
+        logger.info(f"Compiler worker listening on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError) as e:
+                logger.warning(f"Rejected connection: {e}")
+                continue
+            with conn:
+                try:
+                    request: dict[str, Any] = conn.recv()
+                    if request.get("command") == "shutdown":
+                        conn.send(("done", 0))
+                        break
+                    if request.get("command") == "ping":
+                        conn.send(("done", 0))
+                        continue
+                    returncode = _run_compiler(conn, module, list(request["argv"]))
+                    conn.send(("done", returncode))
+                except (EOFError, OSError) as e:
+                    # The client went away mid-job; keep serving the next one.
+                    logger.warning(f"Dropped compiler job: {e}")
+    with contextlib.suppress(FileNotFoundError):
+        authkey_path(address).unlink()
+    logger.info("Compiler worker stopped")
+
+
+# -------------------------- Client Side -------------------------- #
+
+
+def _connect(address: str) -> Connection | None:
+    if sys.platform != "win32" and not os.path.exists(address):
+        return None
+    authkey = _read_authkey(address)
+    if authkey is None:
+        return None
+    try:
+        return Client(address, authkey=authkey)
+    except ConnectionRefusedError:
+        # Nothing is listening: a worker that was killed left its files behind.
+        if sys.platform != "win32":
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(address)
+            with contextlib.suppress(FileNotFoundError):
+                authkey_path(address).unlink()
+        return None
+    except (OSError, AuthenticationError):
+        return None
+
+
+def worker_available(address: str | None = None) -> bool:
+    """Checks whether a compiler worker answers a ping at the given address."""
+    conn = _connect(address or default_address())
+    if conn is None:
+        return False
+    with conn:
+        try:
+            conn.send({"command": "ping"})
+            return bool(conn.recv() == ("done", 0))
+        except (EOFError, OSError):
+            return False
+
+
+def submit_build(
+    argv: list[str],
+    on_diagnostic: Callable[[str, str], None],
+    address: str | None = None,
+) -> int | None:
+    """Sends a compile job to the worker and streams diagnostics as they arrive.
+
+    Returns the compiler's exit code, or None if no worker is reachable.
+    """
+    conn = _connect(address or default_address())
+    if conn is None:
+        return None
+    with conn:
+        conn.send({"argv": argv})
+        while True:
+            message = conn.recv()
+            if message[0] == "diagnostic":
+                on_diagnostic(message[1], message[2])
+            else:
+                return int(message[1])
+
+
+def shutdown(address: str | None = None) -> bool:
+    """Asks a running worker to exit. Returns False if none was running."""
+    conn = _connect(address or default_address())
+    if conn is None:
+        return False
+    with conn:
+        conn.send({"command": "shutdown"})
+        conn.recv()
+    return True
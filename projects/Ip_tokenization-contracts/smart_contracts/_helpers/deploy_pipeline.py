@@ -0,0 +1,349 @@
+import base64
+import copy
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+from urllib import parse
+
+import httpx
+from algosdk import abi, account, constants, error, logic, transaction
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.v2client import algod
+
+logger = logging.getLogger(__name__)
+
+PROGRAM_CACHE_DIR_NAME = ".program_cache"
+
+# Values for the contracts' TemplateVars when TEAL is compiled through algod instead of
+# algokit. A non-updatable app is what algokit deploys by default too.
+DEFAULT_TEMPLATE_VALUES: Mapping[str, int | bytes] = {"UPDATABLE": 0}
+_TEMPLATE_VAR = re.compile(r"\bTMPL_(\w+)")
+
+# Suggested params stay valid for 1000 rounds; a minute is well inside that even on a
+# dev-mode localnet, and keeps fee changes from going stale for long.
+SUGGESTED_PARAMS_MAX_AGE = 60.0
+
+# Approval and clear programs share one 2KB page plus up to MAX_EXTRA_PROGRAM_PAGES
+# more, which the create transaction has to ask for.
+PROGRAM_PAGE_SIZE = 2_048
+MAX_EXTRA_PROGRAM_PAGES = 3
+
+
+# -------------------------- Pooled HTTP -------------------------- #
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    """AlgodClient that sends every request over one keep-alive httpx session.
+
+    The stock client opens a fresh urllib connection per call; reusing the session saves
+    a TCP (and TLS) handshake on each request, which dominates short deploy scripts.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: dict[str, str] | None = None,
+        session: httpx.Client | None = None,
+    ) -> None:
+        super().__init__(algod_token, algod_address, headers)
+        self.session = session or httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Any = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        response_format: str | None = "json",
+        timeout: int | None = 30,
+    ) -> Any:
+        # Mirrors AlgodClient.algod_request, swapping urllib for the pooled session.
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        response = self.session.request(
+            method,
+            self.algod_address + requrl,
+            content=data,
+            headers=header,
+            timeout=timeout,
+        )
+        if response.is_error:
+            body: dict[str, Any] = {}
+            message: Any = response.text
+            try:
+                body = response.json()
+                message = body["message"]
+            except (ValueError, KeyError):
+                pass
+            raise error.AlgodHTTPError(message, response.status_code, body.get("data"))
+        if response_format != "json":
+            return response.content
+        if not response.content:
+            return {}
+        try:
+            return response.json()
+        except ValueError as e:
+            raise error.AlgodResponseError(
+                "Failed to parse JSON response from algod"
+            ) from e
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# -------------------------- Caches -------------------------- #
+
+
+class ProgramCache:
+    """Compiled TEAL bytecode on disk, keyed by the sha256 of the source."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._memory: dict[str, bytes] = {}
+
+    @staticmethod
+    def key(teal: str) -> str:
+        return hashlib.sha256(teal.encode()).hexdigest()
+
+    def compile(self, algod_client: algod.AlgodClient, teal: str) -> bytes:
+        """Returns the bytecode for teal, compiling through algod only on a miss."""
+        key = self.key(teal)
+        program = self._memory.get(key)
+        if program is not None:
+            return program
+        path = self.directory / f"{key}.bin"
+        if path.exists():
+            program = path.read_bytes()
+        else:
+            result: dict = algod_client.compile(teal)
+            program = base64.b64decode(result["result"])
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(program)
+            os.replace(tmp_path, path)
+            logger.info(f"Compiled and cached program {key[:12]}")
+        self._memory[key] = program
+        return program
+
+
+class SuggestedParamsCache:
+    """Reuses one suggested params fetch until it is max_age seconds old."""
+
+    def __init__(
+        self, algod_client: algod.AlgodClient, max_age: float = SUGGESTED_PARAMS_MAX_AGE
+    ) -> None:
+        self.algod_client = algod_client
+        self.max_age = max_age
+        self._params: transaction.SuggestedParams | None = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> transaction.SuggestedParams:
+        with self._lock:
+            now = time.monotonic()
+            if self._params is None or now - self._fetched_at > self.max_age:
+                self._params = self.algod_client.suggested_params()
+                self._fetched_at = now
+            # Callers tweak fees on the copy they get, never on the cached instance.
+            return copy.copy(self._params)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._params = None
+
+
+# -------------------------- Deployment -------------------------- #
+
+
+@dataclasses.dataclass
+class DeployResult:
+    app_id: int
+    app_address: str
+    deployer_address: str
+    deployer_private_key: str
+    confirmed_round: int
+    tx_ids: list[str]
+
+
+class DeployPipeline:
+    """Deploys fresh app instances, each in a single atomic group.
+
+    The group funds a newly generated deployer account and creates the app from it, so
+    an instance costs one confirmation round. Compiled programs and suggested params
+    are cached across deployments.
+    """
+
+    def __init__(
+        self,
+        algod_client: algod.AlgodClient,
+        program_cache: ProgramCache,
+        params_cache: SuggestedParamsCache | None = None,
+    ) -> None:
+        self.algod_client = algod_client
+        self.program_cache = program_cache
+        self.params_cache = params_cache or SuggestedParamsCache(algod_client)
+
+    def deploy(
+        self,
+        funder: str,
+        funder_signer: TransactionSigner,
+        approval_teal: str,
+        clear_teal: str,
+        global_schema: transaction.StateSchema,
+        local_schema: transaction.StateSchema,
+        funding_amount: int,
+        create_method: abi.Method | None = None,
+        method_args: Sequence[Any] = (),
+        wait_rounds: int = 4,
+    ) -> DeployResult:
+        """Creates one app instance; pass create_method for ABI create methods."""
+        approval_program = self.program_cache.compile(self.algod_client, approval_teal)
+        clear_program = self.program_cache.compile(self.algod_client, clear_teal)
+        pages = extra_pages(approval_program, clear_program)
+        sp = self.params_cache.get()
+
+        private_key, address = account.generate_account()
+        signer = AccountTransactionSigner(private_key)
+
+        atc = AtomicTransactionComposer()
+        # Funding lands first in the group, so the new account can pay for the create.
+        atc.add_transaction(
+            TransactionWithSigner(
+                transaction.PaymentTxn(funder, sp, address, funding_amount),
+                funder_signer,
+            )
+        )
+        create_args: dict[str, Any] = {
+            "app_id": 0,
+            "sender": address,
+            "sp": sp,
+            "signer": signer,
+            "approval_program": approval_program,
+            "clear_program": clear_program,
+            "global_schema": global_schema,
+            "local_schema": local_schema,
+            "extra_pages": pages,
+        }
+        if create_method is not None:
+            atc.add_method_call(
+                method=create_method, method_args=list(method_args), **create_args
+            )
+        else:
+            atc.add_transaction(
+                TransactionWithSigner(
+                    transaction.ApplicationCreateTxn(
+                        address,
+                        sp,
+                        transaction.OnComplete.NoOpOC,
+                        approval_program,
+                        clear_program,
+                        global_schema,
+                        local_schema,
+                        extra_pages=pages,
+                    ),
+                    signer,
+                )
+            )
+
+        response = atc.execute(self.algod_client, wait_rounds)
+        create_tx_id = response.tx_ids[-1]
+        info: dict = self.algod_client.pending_transaction_info(  # type: ignore[assignment]
+            create_tx_id
+        )
+        app_id = int(info["application-index"])
+        logger.info(f"Created app {app_id} in round {response.confirmed_round}")
+        return DeployResult(
+            app_id=app_id,
+            app_address=logic.get_application_address(app_id),
+            deployer_address=address,
+            deployer_private_key=private_key,
+            confirmed_round=response.confirmed_round,
+            tx_ids=list(response.tx_ids),
+        )
+
+
+def extra_pages(approval_program: bytes, clear_program: bytes) -> int:
+    """Pages an app create must request beyond the first to fit both programs."""
+    pages = (len(approval_program) + len(clear_program) - 1) // PROGRAM_PAGE_SIZE
+    if pages > MAX_EXTRA_PROGRAM_PAGES:
+        raise Exception(
+            f"Programs take {len(approval_program) + len(clear_program)} bytes, more "
+            f"than {1 + MAX_EXTRA_PROGRAM_PAGES} pages"
+        )
+    return pages
+
+
+def substitute_template_vars(teal: str, values: Mapping[str, int | bytes]) -> str:
+    """Replaces every TMPL_<NAME> token in teal, which algod cannot compile."""
+
+    def value_of(match: re.Match[str]) -> str:
+        name = match.group(1)
+        if name not in values:
+            raise Exception(f"No value given for template variable {name}")
+        value = values[name]
+        return "0x" + value.hex() if isinstance(value, bytes) else str(int(value))
+
+    return _TEMPLATE_VAR.sub(value_of, teal)
+
+
+def load_programs(
+    artifact_path: Path,
+    contract_name: str,
+    template_values: Mapping[str, int | bytes] = DEFAULT_TEMPLATE_VALUES,
+) -> tuple[str, str]:
+    """Reads the approval and clear TEAL written by the build for a contract, with its
+    template variables filled in.
+
+    Substituting before compiling also makes the values part of the ProgramCache key,
+    which hashes the TEAL it is given.
+    """
+    approval = (artifact_path / f"{contract_name}.approval.teal").read_text()
+    clear = (artifact_path / f"{contract_name}.clear.teal").read_text()
+    return (
+        substitute_template_vars(approval, template_values),
+        substitute_template_vars(clear, template_values),
+    )
+
+
+def load_state_schema(
+    app_spec_path: Path,
+) -> tuple[transaction.StateSchema, transaction.StateSchema]:
+    """Reads the global and local state schema declared in an ARC-56 app spec."""
+    schema = json.loads(app_spec_path.read_text())["state"]["schema"]
+    return (
+        transaction.StateSchema(
+            num_uints=schema["global"]["ints"],
+            num_byte_slices=schema["global"]["bytes"],
+        ),
+        transaction.StateSchema(
+            num_uints=schema["local"]["ints"],
+            num_byte_slices=schema["local"]["bytes"],
+        ),
+    )
@@ -0,0 +1,72 @@
+import json
+import os
+from pathlib import Path
+
+MANIFEST_FILE_NAME = ".contracts_manifest.json"
+
+# Build outputs change on every build, so their folder is never a contract candidate.
+ARTIFACTS_FOLDER_NAME = "artifacts"
+
+
+def _is_candidate(entry: os.DirEntry[str]) -> bool:
+    # Folders that start with '_' are internal helpers, never contracts.
+    return (
+        entry.is_dir()
+        and not entry.name.startswith(("_", "."))
+        and entry.name != ARTIFACTS_FOLDER_NAME
+    )
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan(root_path: Path) -> dict:
+    folders = {
+        entry.name: entry.stat().st_mtime_ns
+        for entry in os.scandir(root_path)
+        if _is_candidate(entry)
+    }
+    return {
+        "root_mtime_ns": _mtime_ns(root_path),
+        "folders": folders,
+        "contracts": sorted(
+            name for name in folders if (root_path / name / "contract.py").exists()
+        ),
+    }
+
+
+def _is_fresh(manifest: dict, root_path: Path) -> bool:
+    """A manifest is fresh while neither the root nor any scanned folder has changed.
+
+    Adding or removing a folder touches the root; adding or removing a contract.py
+    touches its folder, so a handful of stat calls replaces a full scan.
+    """
+    if manifest.get("root_mtime_ns") != _mtime_ns(root_path):
+        return False
+    folders: dict[str, int] = manifest.get("folders", {})
+    return all(_mtime_ns(root_path / name) == mtime for name, mtime in folders.items())
+
+
+def discover_contract_names(root_path: Path, manifest_path: Path) -> list[str]:
+    """Returns the contract folder names under root_path, using the on-disk manifest when fresh."""
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        if _is_fresh(manifest, root_path):
+            return list(manifest["contracts"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    manifest = _scan(root_path)
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        # A read-only checkout still works, it just rescans every time.
+        pass
+    return list(manifest["contracts"])
@@ -0,0 +1,910 @@
+import argparse
+import asyncio
+import base64
+import copy
+import dataclasses
+import hashlib
+import http.server
+import json
+import logging
+import re
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import httpx
+import msgpack  # type: ignore[import-untyped]
+from algosdk import encoding, logic, transaction
+from nacl.signing import SigningKey
+
+from smart_contracts._helpers.deploy_pipeline import (
+    DEFAULT_TEMPLATE_VALUES,
+    substitute_template_vars,
+)
+
+logger = logging.getLogger(__name__)
+
+# LocalNet's genesis id, so AlgoKit treats the fake as LocalNet (KMD dispenser etc).
+GENESIS_ID = "dockernet-v1"
+DEFAULT_WALLET_NAME = "unencrypted-default-wallet"
+DEFAULT_ALGOD_PORT = 4001
+DEFAULT_KMD_PORT = 4002
+MIN_FEE = 1_000
+MIN_BALANCE = 100_000
+FIRST_INDEX = 1_001
+PROGRAM_PAGE_SIZE = 2_048
+MAX_EXTRA_PAGES = 3
+
+# Called for every app call as (app, raw txn dict); returns the logs to record, or
+# raises to reject the group. Programs never execute, so this is how tests emulate them.
+AppCallHandler = Callable[["FakeApp", dict[str, Any]], Sequence[bytes] | None]
+
+
+class TxnRejected(Exception):
+    """A group algod would refuse with a 400."""
+
+
+@dataclasses.dataclass
+class FakeAccount:
+    amount: int = 0
+    assets: dict[int, int] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class FakeApp:
+    id: int
+    creator: bytes
+    approval: bytes
+    clear: bytes
+    global_schema: dict[str, int]
+    local_schema: dict[str, int]
+    global_state: dict[bytes, int | bytes] = dataclasses.field(default_factory=dict)
+    boxes: dict[bytes, bytes] = dataclasses.field(default_factory=dict)
+    extra_pages: int = 0
+
+    @property
+    def address(self) -> str:
+        return logic.get_application_address(self.id)
+
+
+@dataclasses.dataclass
+class _Block:
+    round: int
+    timestamp: int
+    txns: list[dict[str, Any]]
+    tx_ids: list[str]
+
+
+def _check_program_size(approval: bytes, clear: bytes, extra_pages: int) -> None:
+    limit = (1 + extra_pages) * PROGRAM_PAGE_SIZE
+    if len(approval) + len(clear) > limit:
+        raise TxnRejected(
+            f"app programs too long. max total len {limit} bytes, "
+            f"have {len(approval) + len(clear)}"
+        )
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def _with_go_strings(stxn: dict[str, Any]) -> dict[str, Any]:
+    # algod packs logs as msgpack str holding raw bytes, since go-algorand declares
+    # them as Go strings; surrogateescape lets msgpack emit the bytes unchanged.
+    delta = stxn.get("dt")
+    if not delta or "lg" not in delta:
+        return stxn
+    logs = [log.decode("utf-8", "surrogateescape") for log in delta["lg"]]
+    return {**stxn, "dt": {**delta, "lg": logs}}
+
+
+def _tx_id(txn: dict[str, Any]) -> str:
+    # Clients send canonical msgpack, which re-packs byte for byte after unpacking.
+    digest = encoding.checksum(b"TX" + msgpack.packb(txn, use_bin_type=True))
+    return base64.b32encode(digest).decode().rstrip("=")
+
+
+def _unpack_stream(body: bytes) -> list[dict[str, Any]]:
+    unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+    unpacker.feed(body)
+    return list(unpacker)
+
+
+class FakeAlgod:
+    """An in-process algod and KMD over an in-memory ledger, for tests and load runs.
+
+    Payments, asset transfers and app/asset creation update balances and holdings, and
+    groups are accepted or rejected atomically. Programs are not executed: app calls
+    succeed unless app_call_handler raises, and only the logs it returns are recorded.
+
+    With block_time=0 every accepted group is committed in its own block straight away
+    (like LocalNet dev mode, so bursts quickly outrun a 1000-round validity window); a
+    positive block_time commits the pool on a timer, and None leaves it to
+    produce_block(). Effects apply on acceptance; blocks only assign confirmed rounds.
+
+    Serve it over HTTP with FakeAlgodServer, or hand algod_transport() or
+    async_algod_transport() to an httpx client to skip sockets.
+    """
+
+    def __init__(
+        self,
+        block_time: float | None = 0.0,
+        accounts: int = 3,
+        balance: int = 10**14,
+        wait_timeout: float = 1.0,
+        app_call_handler: AppCallHandler | None = None,
+    ) -> None:
+        self.block_time = block_time
+        self.wait_timeout = wait_timeout
+        self.app_call_handler = app_call_handler
+        self.genesis_hash = hashlib.sha256(GENESIS_ID.encode()).digest()
+        self.round = 1
+        self.accounts: dict[bytes, FakeAccount] = {}
+        self.apps: dict[int, FakeApp] = {}
+        self.assets: dict[int, dict[str, Any]] = {}
+        self.blocks: dict[int, _Block] = {1: _Block(1, int(time.time()), [], [])}
+        self.programs: dict[str, bytes] = {}
+        self._next_index = FIRST_INDEX
+        self._pool: list[tuple[list[dict[str, Any]], list[str]]] = []
+        self._info: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+
+        # Deterministic funded keys, exposed through the default KMD wallet.
+        self.keys: list[str] = []
+        for i in range(accounts):
+            seed = hashlib.sha256(f"fake-algod-{i}".encode()).digest()
+            signing_key = SigningKey(seed)
+            public_key = bytes(signing_key.verify_key)
+            self.accounts[public_key] = FakeAccount(amount=balance)
+            self.keys.append(base64.b64encode(bytes(signing_key) + public_key).decode())
+        self._wallet_handles: set[str] = set()
+
+        self._producer: threading.Thread | None = None
+        if block_time:
+            self._producer = threading.Thread(target=self._produce_blocks, daemon=True)
+            self._producer.start()
+
+    @property
+    def addresses(self) -> list[str]:
+        return [encoding.encode_address(base64.b64decode(k)[32:]) for k in self.keys]
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            self._lock.notify_all()
+
+    # -------------------------- Ledger -------------------------- #
+
+    def _account(
+        self, address: bytes, undo: dict[bytes, FakeAccount | None]
+    ) -> FakeAccount:
+        if address not in undo:
+            existing = self.accounts.get(address)
+            undo[address] = copy.deepcopy(existing) if existing else None
+        return self.accounts.setdefault(address, FakeAccount())
+
+    def submit(self, body: bytes) -> str:
+        """Validates and applies a signed group; returns its first transaction id."""
+        stxns = _unpack_stream(body)
+        if not stxns:
+            raise TxnRejected("empty transaction group")
+        with self._lock:
+            tx_ids = [_tx_id(stxn["txn"]) for stxn in stxns]
+            self._validate(stxns, tx_ids)
+            undo: dict[bytes, FakeAccount | None] = {}
+            next_index = self._next_index
+            created_apps: list[int] = []
+            deleted_apps: list[FakeApp] = []
+            infos = []
+            try:
+                for stxn in stxns:
+                    info = self._apply(stxn["txn"], undo, created_apps, deleted_apps)
+                    info["txn"] = _jsonable(stxn)
+                    infos.append(info)
+            except TxnRejected:
+                for address, account in undo.items():
+                    if account is None:
+                        self.accounts.pop(address, None)
+                    else:
+                        self.accounts[address] = account
+                for app_id in created_apps:
+                    self.apps.pop(app_id, None)
+                    self.assets.pop(app_id, None)
+                for app in deleted_apps:
+                    self.apps[app.id] = app
+                self._next_index = next_index
+                raise
+            for tx_id, info in zip(tx_ids, infos, strict=True):
+                self._info[tx_id] = {"confirmed-round": 0, "pool-error": "", **info}
+            self._pool.append((stxns, tx_ids))
+            if self.block_time == 0:
+                self._commit()
+            return tx_ids[0]
+
+    def _validate(self, stxns: list[dict[str, Any]], tx_ids: list[str]) -> None:
+        next_round = self.round + 1
+        groups = {stxn["txn"].get("grp") for stxn in stxns}
+        if len(stxns) > 1 and (len(groups) != 1 or None in groups):
+            raise TxnRejected("transactions in a group must share a group id")
+        if sum(stxn["txn"].get("fee", 0) for stxn in stxns) < MIN_FEE * len(stxns):
+            raise TxnRejected(f"txgroup had insufficient fees, need {MIN_FEE} per txn")
+        for stxn, tx_id in zip(stxns, tx_ids, strict=True):
+            txn = stxn["txn"]
+            if tx_id in self._info:
+                raise TxnRejected(f"transaction already in ledger: {tx_id}")
+            if txn.get("gh") != self.genesis_hash:
+                raise TxnRejected(f"{tx_id}: genesis hash mismatch")
+            if not txn.get("fv", 0) <= next_round <= txn.get("lv", 0):
+                raise TxnRejected(
+                    f"{tx_id}: txn dead: round {next_round} outside of "
+                    f"{txn.get('fv', 0)}--{txn.get('lv', 0)}"
+                )
+            if not ("sig" in stxn or "msig" in stxn or "lsig" in stxn):
+                raise TxnRejected(f"{tx_id}: transaction is not signed")
+
+    def _apply(
+        self,
+        txn: dict[str, Any],
+        undo: dict[bytes, FakeAccount | None],
+        created: list[int],
+        deleted: list[FakeApp],
+    ) -> dict[str, Any]:
+        info: dict[str, Any] = {}
+        sender = self._account(txn["snd"], undo)
+        sender.amount -= txn.get("fee", 0)
+        kind = txn["type"]
+        if kind == "pay":
+            sender.amount -= txn.get("amt", 0)
+            self._account(txn.get("rcv", bytes(32)), undo).amount += txn.get("amt", 0)
+            if "close" in txn:
+                self._account(txn["close"], undo).amount += sender.amount
+                sender.amount = 0
+        elif kind == "axfer":
+            closed = self._asset_transfer(txn, sender, undo)
+            if closed is not None:
+                info["asset-closing-amount"] = closed
+        elif kind == "acfg" and not txn.get("caid"):
+            params = txn.get("apar", {})
+            asset_id = self._new_index(created)
+            self.assets[asset_id] = {"creator": txn["snd"], **params}
+            sender.assets[asset_id] = params.get("t", 0)
+            info["asset-index"] = asset_id
+        elif kind == "appl":
+            info.update(self._app_call(txn, created, deleted))
+        if sender.amount < 0:
+            raise TxnRejected(
+                f"overspend (account {encoding.encode_address(txn['snd'])}, "
+                f"short {-sender.amount} microalgos)"
+            )
+        return info
+
+    def _asset_transfer(
+        self,
+        txn: dict[str, Any],
+        sender: FakeAccount,
+        undo: dict[bytes, FakeAccount | None],
+    ) -> int | None:
+        """Moves an asset; returns the amount closed out, if the sender closed out."""
+        asset_id = txn.get("xaid", 0)
+        if asset_id not in self.assets:
+            raise TxnRejected(f"asset {asset_id} does not exist")
+        receiver_address = txn.get("arcv", bytes(32))
+        amount = txn.get("aamt", 0)
+        opt_in = receiver_address == txn["snd"] and not amount
+        if opt_in and asset_id not in sender.assets:
+            sender.assets[asset_id] = 0
+            return None
+        # A clawback moves the asset out of asnd rather than the sender.
+        source = self._account(txn["asnd"], undo) if "asnd" in txn else sender
+        receiver = self._account(receiver_address, undo)
+        if asset_id not in source.assets or asset_id not in receiver.assets:
+            raise TxnRejected(f"asset {asset_id} missing from the sender or receiver")
+        if source.assets[asset_id] < amount:
+            raise TxnRejected(f"underflow on asset {asset_id}")
+        source.assets[asset_id] -= amount
+        receiver.assets[asset_id] += amount
+        if "aclose" in txn:
+            close_to = self._account(txn["aclose"], undo)
+            if asset_id not in close_to.assets:
+                raise TxnRejected(f"close-to account is not opted in to {asset_id}")
+            closed = source.assets.pop(asset_id)
+            close_to.assets[asset_id] += closed
+            return closed
+        return None
+
+    def _app_call(
+        self, txn: dict[str, Any], created: list[int], deleted: list[FakeApp]
+    ) -> dict[str, Any]:
+        info: dict[str, Any] = {}
+        app_id = txn.get("apid", 0)
+        if not app_id:
+            extra_pages = txn.get("apep", 0)
+            if extra_pages > MAX_EXTRA_PAGES:
+                raise TxnRejected(
+                    "tx.ExtraProgramPages exceeds MaxExtraAppProgramPages"
+                )
+            _check_program_size(txn.get("apap", b""), txn.get("apsu", b""), extra_pages)
+            app_id = self._new_index(created)
+            self.apps[app_id] = FakeApp(
+                app_id,
+                txn["snd"],
+                txn.get("apap", b""),
+                txn.get("apsu", b""),
+                _schema(txn.get("apgs", {})),
+                _schema(txn.get("apls", {})),
+                extra_pages=extra_pages,
+            )
+            info["application-index"] = app_id
+        app = self.apps.get(app_id)
+        if app is None:
+            raise TxnRejected(f"application {app_id} does not exist")
+        logs: Sequence[bytes] = ()
+        if self.app_call_handler is not None:
+            try:
+                logs = self.app_call_handler(app, txn) or ()
+            except TxnRejected:
+                raise
+            except Exception as e:
+                raise TxnRejected(f"logic eval error: {e}") from e
+        if logs:
+            info["logs"] = [base64.b64encode(log).decode() for log in logs]
+        on_complete = txn.get("apan", 0)
+        if on_complete == transaction.OnComplete.UpdateApplicationOC:
+            _check_program_size(
+                txn.get("apap", app.approval),
+                txn.get("apsu", app.clear),
+                app.extra_pages,
+            )
+            app.approval = txn.get("apap", app.approval)
+            app.clear = txn.get("apsu", app.clear)
+        elif on_complete == transaction.OnComplete.DeleteApplicationOC:
+            deleted.append(self.apps.pop(app_id))
+        return info
+
+    def _new_index(self, created: list[int]) -> int:
+        index = self._next_index
+        self._next_index += 1
+        created.append(index)
+        return index
+
+    # -------------------------- Blocks -------------------------- #
+
+    def produce_block(self) -> int:
+        """Commits everything in the pool (possibly nothing) as the next round."""
+        with self._lock:
+            self._commit()
+            return self.round
+
+    def _commit(self) -> None:
+        self.round += 1
+        txns: list[dict[str, Any]] = []
+        tx_ids: list[str] = []
+        for stxns, group_ids in self._pool:
+            for stxn, tx_id in zip(stxns, group_ids, strict=True):
+                info = self._info[tx_id]
+                info["confirmed-round"] = self.round
+                applied = dict(stxn)
+                applied["hgi"] = True
+                # Created ids are part of the block's apply data, as algod records them.
+                if "application-index" in info:
+                    applied["apid"] = info["application-index"]
+                if "asset-index" in info:
+                    applied["caid"] = info["asset-index"]
+                if "asset-closing-amount" in info:
+                    applied["aca"] = info["asset-closing-amount"]
+                if "logs" in info:
+                    applied["dt"] = {"lg": [base64.b64decode(x) for x in info["logs"]]}
+                txns.append(applied)
+                tx_ids.append(tx_id)
+        self._pool = []
+        self.blocks[self.round] = _Block(self.round, int(time.time()), txns, tx_ids)
+        self._lock.notify_all()
+
+    def _produce_blocks(self) -> None:
+        assert self.block_time
+        while not self._stop.wait(self.block_time):
+            self.produce_block()
+
+    def wait_for_round_after(self, round_: int) -> int:
+        """Blocks until round_ + 1 is committed or wait_timeout passes, like algod."""
+        with self._lock:
+            self._lock.wait_for(
+                lambda: self.round > round_ or self._stop.is_set(), self.wait_timeout
+            )
+            return self.round
+
+    # -------------------------- Programs -------------------------- #
+
+    def register_programs(
+        self,
+        artifact_path: Path,
+        template_values: Mapping[str, int | bytes] = DEFAULT_TEMPLATE_VALUES,
+    ) -> None:
+        """Serves the real bytecode for TEAL built into an artifacts folder.
+
+        Deploy scripts fill in template variables before compiling, so the bytecode is
+        served for the TEAL with template_values substituted as well as for the raw
+        source. Values only change a few immediates, so the program size still holds.
+        """
+        for app_spec_path in artifact_path.rglob("*.arc56.json"):
+            spec = json.loads(app_spec_path.read_text())
+            for key in ("approval", "clear"):
+                source = (spec.get("source") or {}).get(key)
+                program = (spec.get("byteCode") or {}).get(key)
+                if not (source and program):
+                    continue
+                teal = base64.b64decode(source).decode()
+                for variant in {teal, substitute_template_vars(teal, template_values)}:
+                    digest = hashlib.sha256(variant.encode()).hexdigest()
+                    self.programs[digest] = base64.b64decode(program)
+
+    def compile(self, teal: bytes) -> bytes:
+        """Registered bytecode, else a stand-in program unique to the source."""
+        program = self.programs.get(hashlib.sha256(teal).hexdigest())
+        if program is not None:
+            return program
+        version = re.search(rb"#pragma version (\d+)", teal)
+        checksum: bytes = encoding.checksum(teal)
+        return bytes([int(version.group(1)) if version else 10]) + checksum
+
+    # -------------------------- HTTP API -------------------------- #
+
+    def handle(
+        self, method: str, path: str, query: dict[str, str], body: bytes, kmd: bool
+    ) -> tuple[int, str, bytes]:
+        """Serves one request; returns (status, content type, body)."""
+        routes = _KMD_ROUTES if kmd else _ALGOD_ROUTES
+        for route_method, pattern, handler in routes:
+            match = pattern.fullmatch(path)
+            if match and route_method == method:
+                try:
+                    result = handler(self, query, body, *match.groups())
+                except TxnRejected as e:
+                    return _json_response(400, {"message": str(e)})
+                except KeyError as e:
+                    return _json_response(404, {"message": f"{e.args[0]} not found"})
+                if isinstance(result, bytes):
+                    return 200, "application/msgpack", result
+                return _json_response(200, result)
+        return _json_response(404, {"message": f"{method} {path} is not implemented"})
+
+    def algod_transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(lambda request: self._serve(request, kmd=False))
+
+    def async_algod_transport(self) -> httpx.MockTransport:
+        async def serve(request: httpx.Request) -> httpx.Response:
+            # Waiting for a block must not stall the event loop.
+            return await asyncio.to_thread(self._serve, request, False)
+
+        return httpx.MockTransport(serve)
+
+    def _serve(self, request: httpx.Request, kmd: bool) -> httpx.Response:
+        status, content_type, body = self.handle(
+            request.method,
+            request.url.path,
+            dict(request.url.params),
+            request.read(),
+            kmd,
+        )
+        return httpx.Response(
+            status, content=body, headers={"Content-Type": content_type}
+        )
+
+    # --- algod v2 --- #
+
+    def _status(self, *_: Any) -> dict[str, Any]:
+        return {
+            "last-round": self.round,
+            "last-version": "future",
+            "next-version": "future",
+            "next-version-round": self.round + 1,
+            "next-version-supported": True,
+            "time-since-last-round": 0,
+            "catchup-time": 0,
+            "stopped-at-unsupported-round": False,
+        }
+
+    def _params(self, *_: Any) -> dict[str, Any]:
+        return {
+            "consensus-version": "future",
+            "fee": 0,
+            "min-fee": MIN_FEE,
+            "genesis-hash": base64.b64encode(self.genesis_hash).decode(),
+            "genesis-id": GENESIS_ID,
+            "last-round": self.round,
+        }
+
+    def _versions(self, *_: Any) -> dict[str, Any]:
+        return {
+            "genesis_id": GENESIS_ID,
+            "genesis_hash_b64": base64.b64encode(self.genesis_hash).decode(),
+            "versions": ["v2"],
+            "build": {"major": 3, "minor": 0, "build_number": 0, "branch": "fake"},
+        }
+
+    def _send(self, query: dict[str, str], body: bytes) -> dict[str, Any]:
+        return {"txId": self.submit(body)}
+
+    def _pending(self, query: dict[str, str], body: bytes, tx_id: str) -> Any:
+        with self._lock:
+            info = self._info[tx_id]
+        if query.get("format") == "msgpack":
+            return msgpack.packb(info, use_bin_type=True)
+        return info
+
+    def _wait(self, query: dict[str, str], body: bytes, round_: str) -> dict[str, Any]:
+        self.wait_for_round_after(int(round_))
+        return self._status()
+
+    def _block(self, query: dict[str, str], body: bytes, round_: str) -> Any:
+        block = self.blocks[int(round_)]
+        header = {
+            "rnd": block.round,
+            "ts": block.timestamp,
+            "gen": GENESIS_ID,
+            "gh": self.genesis_hash,
+            "txns": block.txns,
+        }
+        if query.get("format") == "msgpack":
+            header["txns"] = [_with_go_strings(stxn) for stxn in block.txns]
+            return msgpack.packb(
+                {"block": header}, use_bin_type=True, unicode_errors="surrogateescape"
+            )
+        return {"block": _jsonable(header)}
+
+    def _block_txids(self, query: dict[str, str], body: bytes, round_: str) -> Any:
+        return {"blockTxids": self.blocks[int(round_)].tx_ids}
+
+    def _account_info(self, query: dict[str, str], body: bytes, address: str) -> Any:
+        public_key = encoding.decode_address(address)
+        with self._lock:
+            account = self.accounts.get(public_key, FakeAccount())
+            created = [a for a in self.apps.values() if a.creator == public_key]
+            created_assets = [
+                {"index": asset_id, "params": _asset_params(asset)}
+                for asset_id, asset in self.assets.items()
+                if asset["creator"] == public_key
+            ]
+        return {
+            "address": address,
+            "amount": account.amount,
+            "amount-without-pending-rewards": account.amount,
+            "min-balance": MIN_BALANCE * (1 + len(account.assets) + len(created)),
+            "assets": [
+                {"asset-id": asset_id, "amount": amount, "is-frozen": False}
+                for asset_id, amount in account.assets.items()
+            ],
+            "created-apps": [
+                {"id": app.id, "params": _app_params(app)} for app in created
+            ],
+            "created-assets": created_assets,
+            "total-assets-opted-in": len(account.assets),
+            "total-created-apps": len(created),
+            "total-created-assets": len(created_assets),
+            "pending-rewards": 0,
+            "rewards": 0,
+            "round": self.round,
+            "status": "Offline",
+        }
+
+    def _account_asset(
+        self, query: dict[str, str], body: bytes, address: str, asset_id: str
+    ) -> Any:
+        account = self.accounts.get(encoding.decode_address(address), FakeAccount())
+        amount = account.assets.get(int(asset_id))
+        if amount is None:
+            raise KeyError("account asset")
+        return {
+            "round": self.round,
+            "asset-holding": {
+                "asset-id": int(asset_id),
+                "amount": amount,
+                "is-frozen": False,
+            },
+        }
+
+    def _asset_info(self, query: dict[str, str], body: bytes, asset_id: str) -> Any:
+        params = dict(self.assets[int(asset_id)])
+        return {
+            "index": int(asset_id),
+            "params": {
+                "creator": encoding.encode_address(params.pop("creator")),
+                "total": params.get("t", 0),
+                "decimals": params.get("dc", 0),
+                "default-frozen": params.get("df", False),
+                "unit-name": params.get("un", ""),
+                "name": params.get("an", ""),
+                "url": params.get("au", ""),
+            },
+        }
+
+    def _app_info(self, query: dict[str, str], body: bytes, app_id: str) -> Any:
+        app = self.apps[int(app_id)]
+        return {"id": app.id, "params": _app_params(app)}
+
+    def _boxes(self, query: dict[str, str], body: bytes, app_id: str) -> Any:
+        names = list(self.apps[int(app_id)].boxes)
+        return {"boxes": [{"name": base64.b64encode(name).decode()} for name in names]}
+
+    def _box(self, query: dict[str, str], body: bytes, app_id: str) -> Any:
+        encoded = query.get("name", "")
+        name = (
+            base64.b64decode(encoded[4:])
+            if encoded.startswith("b64:")
+            else encoded.removeprefix("str:").encode()
+        )
+        boxes = self.apps[int(app_id)].boxes
+        if name not in boxes:
+            raise KeyError("box")
+        return {
+            "name": base64.b64encode(name).decode(),
+            "round": self.round,
+            "value": base64.b64encode(boxes[name]).decode(),
+        }
+
+    def _compile(self, query: dict[str, str], body: bytes) -> Any:
+        program = self.compile(body)
+        return {
+            "hash": logic.address(program),
+            "result": base64.b64encode(program).decode(),
+        }
+
+    # --- KMD v1 --- #
+
+    def _kmd_versions(self, *_: Any) -> dict[str, Any]:
+        return {"versions": ["v1"]}
+
+    def _wallets(self, *_: Any) -> dict[str, Any]:
+        return {
+            "wallets": [
+                {
+                    "id": "1",
+                    "name": DEFAULT_WALLET_NAME,
+                    "driver_name": "sqlite",
+                    "driver_version": 1,
+                    "mnemonic_ux": False,
+                    "supported_txs": ["pay", "keyreg"],
+                }
+            ]
+        }
+
+    def _wallet_init(self, query: dict[str, str], body: bytes) -> dict[str, Any]:
+        handle = base64.b16encode(hashlib.sha256(body + bytes(8)).digest()).decode()
+        self._wallet_handles.add(handle)
+        return {"wallet_handle_token": handle}
+
+    def _wallet_release(self, *_: Any) -> dict[str, Any]:
+        return {}
+
+    def _key_list(self, *_: Any) -> dict[str, Any]:
+        return {"addresses": self.addresses}
+
+    def _key_export(self, query: dict[str, str], body: bytes) -> dict[str, Any]:
+        address = json.loads(body)["address"]
+        return {"private_key": self.keys[self.addresses.index(address)]}
+
+    def _sign(self, query: dict[str, str], body: bytes) -> dict[str, Any]:
+        txn = encoding.msgpack_decode(json.loads(body)["transaction"])
+        key = self.keys[self.addresses.index(txn.sender)]
+        return {"signed_transaction": encoding.msgpack_encode(txn.sign(key))}
+
+
+def _schema(schema: dict[str, int]) -> dict[str, int]:
+    return {"num-uint": schema.get("nui", 0), "num-byte-slice": schema.get("nbs", 0)}
+
+
+def _app_params(app: FakeApp) -> dict[str, Any]:
+    return {
+        "creator": encoding.encode_address(app.creator),
+        "approval-program": base64.b64encode(app.approval).decode(),
+        "clear-state-program": base64.b64encode(app.clear).decode(),
+        "global-state-schema": app.global_schema,
+        "local-state-schema": app.local_schema,
+        "global-state": [
+            {
+                "key": base64.b64encode(key).decode(),
+                "value": (
+                    {"type": 2, "uint": value, "bytes": ""}
+                    if isinstance(value, int)
+                    else {"type": 1, "uint": 0, "bytes": _jsonable(value)}
+                ),
+            }
+            for key, value in app.global_state.items()
+        ],
+    }
+
+
+# Asset params as msgpack field names, and the names algod's JSON uses for them.
+_ASSET_PARAM_NAMES = {
+    "t": "total",
+    "dc": "decimals",
+    "df": "default-frozen",
+    "un": "unit-name",
+    "an": "name",
+    "au": "url",
+    "am": "metadata-hash",
+    "m": "manager",
+    "r": "reserve",
+    "f": "freeze",
+    "c": "clawback",
+}
+
+
+def _asset_params(asset: dict[str, Any]) -> dict[str, Any]:
+    params: dict[str, Any] = {"creator": encoding.encode_address(asset["creator"])}
+    for field, name in _ASSET_PARAM_NAMES.items():
+        if field not in asset:
+            continue
+        value = asset[field]
+        if field in ("m", "r", "f", "c"):
+            params[name] = encoding.encode_address(value)
+        else:
+            params[name] = _jsonable(value)
+    params.setdefault("total", 0)
+    params.setdefault("decimals", 0)
+    return params
+
+
+def _json_response(status: int, payload: Any) -> tuple[int, str, bytes]:
+    return status, "application/json", json.dumps(payload).encode()
+
+
+_Route = tuple[str, re.Pattern[str], Callable[..., Any]]
+_ALGOD_ROUTES: list[_Route] = [
+    (m, re.compile(p), h)
+    for m, p, h in (
+        ("GET", r"/health", FakeAlgod._kmd_versions),
+        ("GET", r"/versions", FakeAlgod._versions),
+        ("GET", r"/v2/status", FakeAlgod._status),
+        ("GET", r"/v2/status/wait-for-block-after/(\d+)", FakeAlgod._wait),
+        ("GET", r"/v2/transactions/params", FakeAlgod._params),
+        ("POST", r"/v2/transactions", FakeAlgod._send),
+        ("GET", r"/v2/transactions/pending/(\w+)", FakeAlgod._pending),
+        ("GET", r"/v2/blocks/(\d+)", FakeAlgod._block),
+        ("GET", r"/v2/blocks/(\d+)/txids", FakeAlgod._block_txids),
+        ("GET", r"/v2/accounts/(\w+)", FakeAlgod._account_info),
+        ("GET", r"/v2/accounts/(\w+)/assets/(\d+)", FakeAlgod._account_asset),
+        ("GET", r"/v2/assets/(\d+)", FakeAlgod._asset_info),
+        ("GET", r"/v2/applications/(\d+)", FakeAlgod._app_info),
+        ("GET", r"/v2/applications/(\d+)/boxes", FakeAlgod._boxes),
+        ("GET", r"/v2/applications/(\d+)/box", FakeAlgod._box),
+        ("POST", r"/v2/teal/compile", FakeAlgod._compile),
+    )
+]
+_KMD_ROUTES: list[_Route] = [
+    (m, re.compile(p), h)
+    for m, p, h in (
+        ("GET", r"/versions", FakeAlgod._kmd_versions),
+        ("GET", r"/v1/wallets", FakeAlgod._wallets),
+        ("POST", r"/v1/wallet/init", FakeAlgod._wallet_init),
+        ("POST", r"/v1/wallet/release", FakeAlgod._wallet_release),
+        ("POST", r"/v1/key/list", FakeAlgod._key_list),
+        ("POST", r"/v1/key/export", FakeAlgod._key_export),
+        ("POST", r"/v1/transaction/sign", FakeAlgod._sign),
+    )
+]
+
+
+# -------------------------- HTTP Server -------------------------- #
+
+
+class FakeAlgodServer:
+    """Serves a FakeAlgod's algod and KMD APIs on local ports, 4001/4002 by default.
+
+    Any client, including the scripts' hardcoded LocalNet addresses, works unchanged.
+    Pass port 0 for a free port and read it back from algod_address/kmd_address.
+    """
+
+    def __init__(
+        self,
+        network: FakeAlgod,
+        host: str = "127.0.0.1",
+        algod_port: int = DEFAULT_ALGOD_PORT,
+        kmd_port: int = DEFAULT_KMD_PORT,
+    ) -> None:
+        self.network = network
+        self._servers = [
+            http.server.ThreadingHTTPServer((host, port), self._handler(kmd))
+            for port, kmd in ((algod_port, False), (kmd_port, True))
+        ]
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def algod_address(self) -> str:
+        host, port = self._servers[0].server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def kmd_address(self) -> str:
+        host, port = self._servers[1].server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def _handler(self, kmd: bool) -> type[http.server.BaseHTTPRequestHandler]:
+        network = self.network
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle hold the body.
+            disable_nagle_algorithm = True
+
+            def _respond(self) -> None:
+                url = urllib.parse.urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                status, content_type, body = network.handle(
+                    self.command,
+                    url.path.rstrip("/"),
+                    dict(urllib.parse.parse_qsl(url.query)),
+                    self.rfile.read(length) if length else b"",
+                    kmd,
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = _respond
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self) -> "FakeAlgodServer":
+        for server in self._servers:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        self.network.close()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self) -> "FakeAlgodServer":
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake LocalNet algod and KMD")
+    parser.add_argument("--algod-port", type=int, default=DEFAULT_ALGOD_PORT)
+    parser.add_argument("--kmd-port", type=int, default=DEFAULT_KMD_PORT)
+    parser.add_argument(
+        "--block-time", type=float, default=0.0, help="seconds; 0 commits instantly"
+    )
+    parser.add_argument(
+        "--artifacts", type=Path, default=Path("smart_contracts/artifacts")
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    network = FakeAlgod(block_time=args.block_time)
+    if args.artifacts.is_dir():
+        network.register_programs(args.artifacts)
+    server = FakeAlgodServer(network, "127.0.0.1", args.algod_port, args.kmd_port)
+    with server:
+        logger.info(f"algod on {server.algod_address}, KMD on {server.kmd_address}")
+        logger.info(f"Funded accounts: {', '.join(network.addresses)}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import asyncio
+import base64
+import dataclasses
+import logging
+import os
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from algosdk import abi, constants
+
+from smart_contracts._helpers.async_client import (
+    AsyncAppClient,
+    CallOptions,
+    MethodSpec,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per app call transaction (consensus MaxAppTxnAccounts / MaxAppTotalTxnReferences).
+MAX_ACCOUNTS = 4
+MAX_REFERENCES = 8
+MAX_GROUP_SIZE = constants.TX_GROUP_LIMIT
+
+# Key sources in a ResourceRule: the call's sender, a method argument by name, or a
+# global state value passed to the planner as "global.<key>".
+SENDER = "sender"
+GLOBAL_PREFIX = "global."
+
+
+@dataclasses.dataclass(frozen=True)
+class ResourceRule:
+    """The resources a method touches beyond its reference-typed arguments.
+
+    boxes name (box map, key source) pairs; an array argument as the key source means
+    one box per element. accounts only need to be available somewhere in the group,
+    while assets are placed on the call's own transaction so the holdings of its
+    accounts are available too.
+    """
+
+    boxes: tuple[tuple[str, str], ...] = ()
+    accounts: tuple[str, ...] = ()
+    assets: tuple[str, ...] = ()
+    inner_txns: int = 0
+
+
+@dataclasses.dataclass
+class PlannedCall:
+    spec: MethodSpec
+    args: list[Any]
+    options: CallOptions
+
+
+@dataclasses.dataclass
+class _Slot:
+    """One app call transaction and the references placed on it."""
+
+    call: PlannedCall
+    accounts: list[str]
+    assets: list[int]
+    apps: list[int]
+    boxes: list[bytes]
+
+    @property
+    def references(self) -> int:
+        return len(self.accounts) + len(self.assets) + len(self.apps) + len(self.boxes)
+
+
+@dataclasses.dataclass
+class _Needs:
+    call: PlannedCall
+    size: int
+    own_accounts: list[str]
+    own_assets: list[int]
+    own_apps: list[int]
+    shared_accounts: list[str]
+    boxes: list[bytes]
+
+
+class ResourcePlanner:
+    """Derives resource references for ABI calls and packs them into atomic groups.
+
+    Reference-typed arguments are encoded as indexes into the call's own arrays, so
+    they stay on that call, as do rule assets. Boxes and other accounts only need to be
+    available to the group (AVM v9 resource sharing), so each is referenced once and
+    spread over whichever calls have spare slots; filler calls are added to carry them
+    when the group's own calls run out.
+    """
+
+    def __init__(
+        self,
+        app_spec: Mapping[str, Any],
+        app_id: int,
+        sender: str,
+        rules: Mapping[str, ResourceRule],
+        global_values: Mapping[str, Any] | None = None,
+        filler: str | None = None,
+    ) -> None:
+        self.app_id = app_id
+        self.sender = sender
+        self.global_values = dict(global_values or {})
+        self.specs: dict[str, MethodSpec] = {}
+        self.arg_names: dict[str, list[str]] = {}
+        for method in app_spec["methods"]:
+            if not method["actions"]["call"]:
+                continue
+            arg_types = [arg["type"] for arg in method["args"]]
+            returns = method["returns"]["type"]
+            signature = f"{method['name']}({','.join(arg_types)}){returns}"
+            self.specs[method["name"]] = MethodSpec.from_signature(signature)
+            self.arg_names[method["name"]] = [arg["name"] for arg in method["args"]]
+        self.box_maps: dict[str, tuple[bytes, str]] = {
+            name: (base64.b64decode(box_map.get("prefix") or ""), box_map["keyType"])
+            for name, box_map in app_spec["state"]["maps"]["box"].items()
+        }
+        # Rules for methods this spec lacks (say, an older build) go unused; say so,
+        # since calls to them would otherwise be sent without their references.
+        missing = sorted(m for m in rules if m not in self.specs)
+        if missing:
+            logger.warning(
+                f"App spec has no {', '.join(missing)}; is the build out of date?"
+            )
+        rules = {m: rule for m, rule in rules.items() if m in self.specs}
+        for method, rule in rules.items():
+            for map_name, source in rule.boxes:
+                if map_name not in self.box_maps:
+                    raise Exception(f"{method}: no box map named {map_name}")
+                self._check_source(method, source)
+            for source in rule.accounts + rule.assets:
+                self._check_source(method, source)
+        self.rules = rules
+        if filler is not None and filler not in self.specs:
+            raise Exception(f"Filler method {filler} is not callable")
+        self.filler = filler
+
+    def _check_source(self, method: str, source: str) -> None:
+        if source == SENDER or source.startswith(GLOBAL_PREFIX):
+            return
+        if source not in self.arg_names[method]:
+            raise Exception(f"{method} has no argument named {source}")
+
+    def box_name(self, map_name: str, key: Any) -> bytes:
+        prefix, key_type = self.box_maps[map_name]
+        if key_type == "AVMBytes":
+            return prefix + bytes(key)
+        if key_type == "AVMString":
+            return prefix + str(key).encode()
+        if key_type == "AVMUint64":
+            return prefix + int(key).to_bytes(8, "big")
+        return prefix + abi.ABIType.from_string(key_type).encode(key)
+
+    def _resolve(
+        self, method: str, source: str, args: Sequence[Any], sender: str
+    ) -> list[Any]:
+        if source == SENDER:
+            return [sender]
+        if source.startswith(GLOBAL_PREFIX):
+            return [self.global_values[source.removeprefix(GLOBAL_PREFIX)]]
+        value = args[self.arg_names[method].index(source)]
+        return list(value) if isinstance(value, list | tuple) else [value]
+
+    def _needs(self, method: str, args: Sequence[Any], options: CallOptions) -> _Needs:
+        spec = self.specs[method]
+        sender = options.sender or self.sender
+        rule = self.rules.get(method, ResourceRule())
+        planned = PlannedCall(
+            spec,
+            list(args),
+            dataclasses.replace(
+                options, inner_txns=max(options.inner_txns, rule.inner_txns)
+            ),
+        )
+        needs = _Needs(planned, 1 + spec.txn_arg_count, [], [], [], [], [])
+
+        def add(items: list[Any], value: Any) -> None:
+            if value not in items:
+                items.append(value)
+
+        for arg_type, value in zip(spec.arg_types, args, strict=True):
+            if arg_type == abi.ABIReferenceType.ACCOUNT and value != sender:
+                add(needs.own_accounts, value)
+            elif arg_type == abi.ABIReferenceType.ASSET:
+                add(needs.own_assets, value)
+            elif arg_type == abi.ABIReferenceType.APPLICATION and value != self.app_id:
+                add(needs.own_apps, value)
+        for value in options.foreign_assets:
+            add(needs.own_assets, value)
+        for value in options.foreign_apps:
+            add(needs.own_apps, value)
+        for source in rule.assets:
+            for value in self._resolve(method, source, args, sender):
+                add(needs.own_assets, value)
+        accounts = list(options.accounts)
+        for source in rule.accounts:
+            accounts += self._resolve(method, source, args, sender)
+        for value in accounts:
+            if value != sender and value not in needs.own_accounts:
+                add(needs.shared_accounts, value)
+        for map_name, source in rule.boxes:
+            for key in self._resolve(method, source, args, sender):
+                add(needs.boxes, self.box_name(map_name, key))
+        for _, name in options.boxes:
+            add(needs.boxes, name)
+        if len(needs.own_accounts) > MAX_ACCOUNTS:
+            raise Exception(f"{method} references more than {MAX_ACCOUNTS} accounts")
+        return needs
+
+    def plan(
+        self, calls: Sequence[tuple[str, Sequence[Any], CallOptions | None]]
+    ) -> list[list[PlannedCall]]:
+        """Packs (method, args, options) calls, in order, into as few groups as fit."""
+        groups: list[list[_Slot]] = []
+        current: list[_Slot] = []
+        for method, args, options in calls:
+            needs = self._needs(method, args, options or CallOptions())
+            packed = self._pack(current, needs)
+            if packed is None:
+                if not current:
+                    raise Exception(f"{method} does not fit in a group on its own")
+                groups.append(current)
+                packed = self._pack([], needs)
+                if packed is None:
+                    raise Exception(f"{method} does not fit in a group on its own")
+            current = packed
+        if current:
+            groups.append(current)
+        return [[self._finish(slot) for slot in group] for group in groups]
+
+    def _pack(self, group: list[_Slot], needs: _Needs) -> list[_Slot] | None:
+        """The group with the call added, or None if it cannot fit."""
+        slots = [
+            dataclasses.replace(
+                s,
+                accounts=list(s.accounts),
+                assets=list(s.assets),
+                apps=list(s.apps),
+                boxes=list(s.boxes),
+            )
+            for s in group
+        ]
+        size = sum(1 + s.call.spec.txn_arg_count for s in slots) + needs.size
+        if size > MAX_GROUP_SIZE:
+            return None
+        slot = _Slot(
+            needs.call,
+            list(needs.own_accounts),
+            list(needs.own_assets),
+            list(needs.own_apps),
+            [],
+        )
+        if slot.references > MAX_REFERENCES:
+            return None
+        slots.append(slot)
+
+        available = {s.call.options.sender or self.sender for s in slots}
+        available.update(a for s in slots for a in s.accounts)
+        placed = {b for s in slots for b in s.boxes}
+        accounts = [a for a in needs.shared_accounts if a not in available]
+        boxes = [b for b in needs.boxes if b not in placed]
+        while True:
+            accounts, boxes = self._place(slots, accounts, boxes)
+            if not accounts and not boxes:
+                return slots
+            if self.filler is None or size >= MAX_GROUP_SIZE:
+                return None
+            # A random note keeps identical filler calls from sharing a tx id.
+            filler = PlannedCall(
+                self.specs[self.filler], [], CallOptions(note=os.urandom(8))
+            )
+            slots.insert(0, _Slot(filler, [], [], [], []))
+            size += 1
+
+    @staticmethod
+    def _place(
+        slots: list[_Slot], accounts: list[str], boxes: list[bytes]
+    ) -> tuple[list[str], list[bytes]]:
+        """Fills spare reference slots, returning whatever did not fit."""
+        unplaced_accounts = []
+        for account in accounts:
+            for slot in slots:
+                full = slot.references >= MAX_REFERENCES
+                if len(slot.accounts) < MAX_ACCOUNTS and not full:
+                    slot.accounts.append(account)
+                    break
+            else:
+                unplaced_accounts.append(account)
+        unplaced_boxes = []
+        for box in boxes:
+            for slot in slots:
+                if slot.references < MAX_REFERENCES:
+                    slot.boxes.append(box)
+                    break
+            else:
+                unplaced_boxes.append(box)
+        return unplaced_accounts, unplaced_boxes
+
+    @staticmethod
+    def _finish(slot: _Slot) -> PlannedCall:
+        call = slot.call
+        # Boxes use app index 0, the called app, which every slot shares.
+        call.options = dataclasses.replace(
+            call.options,
+            accounts=slot.accounts,
+            foreign_assets=slot.assets,
+            foreign_apps=slot.apps,
+            boxes=[(0, name) for name in slot.boxes],
+        )
+        return call
+
+
+async def send_planned(
+    client: AsyncAppClient, groups: Sequence[Sequence[PlannedCall]]
+) -> list[list[Any]]:
+    """Sends each planned group as one atomic group, concurrently; returns results."""
+    return list(
+        await asyncio.gather(
+            *(
+                client.call_group([(c.spec, c.args, c.options) for c in group])
+                for group in groups
+            )
+        )
+    )
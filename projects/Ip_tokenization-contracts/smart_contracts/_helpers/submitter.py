@@ -0,0 +1,184 @@
+import asyncio
+import dataclasses
+import logging
+import time
+from collections.abc import Callable, Sequence
+
+from algosdk import error, transaction
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+
+logger = logging.getLogger(__name__)
+
+# Re-signs a group against fresh params once its validity window has passed unconfirmed.
+Rebuild = Callable[
+    [transaction.SuggestedParams], Sequence[transaction.GenericSignedTransaction]
+]
+
+
+@dataclasses.dataclass
+class Submission:
+    """A submitted group; latency is from its first send to the block committing it."""
+
+    tx_ids: list[str]
+    last_valid: int
+    submitted_at: float
+    attempts: int = 1
+    confirmed_round: int | None = None
+    confirmed_at: float | None = None
+
+    @property
+    def latency(self) -> float | None:
+        if self.confirmed_at is None:
+            return None
+        return self.confirmed_at - self.submitted_at
+
+
+@dataclasses.dataclass
+class _Tracked:
+    submission: Submission
+    future: asyncio.Future[Submission]
+    rebuild: Rebuild | None
+
+
+class TransactionSubmitter:
+    """Sends signed groups concurrently and confirms them all from one block follower.
+
+    Instead of polling each transaction, a single loop waits for every new round and
+    fetches that block's transaction ids, resolving whichever submissions it contains.
+    A submission whose last valid round passes unconfirmed is re-signed with rebuild,
+    if one was given, up to max_resubmits times; otherwise it fails.
+    """
+
+    def __init__(
+        self,
+        algod: AsyncAlgodClient,
+        max_in_flight: int = 256,
+        max_resubmits: int = 1,
+    ) -> None:
+        self.algod = algod
+        self.max_resubmits = max_resubmits
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._tracked: dict[str, _Tracked] = {}
+        self._follower: asyncio.Task[None] | None = None
+        self._started: asyncio.Future[None] | None = None
+
+    async def submit(
+        self,
+        signed: Sequence[transaction.GenericSignedTransaction],
+        rebuild: Rebuild | None = None,
+    ) -> Submission:
+        """Sends a group and waits for the block that commits it.
+
+        Raises AlgodHTTPError only if algod rejects the group outright, in which case
+        nothing from it was committed.
+        """
+        async with self._in_flight:
+            await self._ensure_following()
+            submission = Submission(
+                tx_ids=[stxn.get_txid() for stxn in signed],
+                last_valid=_last_valid(signed),
+                submitted_at=time.monotonic(),
+            )
+            tracked = _Tracked(
+                submission, asyncio.get_running_loop().create_future(), rebuild
+            )
+            # Tracked before sending, so the follower cannot scan past its block first.
+            key = submission.tx_ids[-1]
+            if key in self._tracked:
+                raise Exception(f"Transaction {key} is already in flight")
+            self._tracked[key] = tracked
+            try:
+                await self.algod.send_group(signed)
+            except Exception:
+                self._tracked.pop(key, None)
+                raise
+            return await tracked.future
+
+    async def submit_many(
+        self, groups: Sequence[Sequence[transaction.GenericSignedTransaction]]
+    ) -> list[Submission | BaseException]:
+        """Submits every group concurrently; failures are returned, not raised."""
+        return list(
+            await asyncio.gather(
+                *(self.submit(group) for group in groups), return_exceptions=True
+            )
+        )
+
+    async def _ensure_following(self) -> None:
+        if self._follower is None or self._follower.done():
+            self._started = asyncio.get_running_loop().create_future()
+            self._follower = asyncio.ensure_future(self._follow(self._started))
+        assert self._started is not None
+        await self._started
+
+    async def _follow(self, started: asyncio.Future[None]) -> None:
+        try:
+            scanned = int((await self.algod.status())["last-round"])
+        except Exception as e:
+            started.set_exception(e)
+            return
+        started.set_result(None)
+        try:
+            # Stops once nothing is tracked; the next submit starts a new follower.
+            while True:
+                latest = await self.algod.wait_for_round_after(scanned)
+                for round_ in range(scanned + 1, latest + 1):
+                    await self._scan(round_)
+                scanned = latest
+                if not self._tracked:
+                    return
+        except Exception as e:
+            logger.warning(f"Block follower stopped at round {scanned}: {e}")
+            tracked, self._tracked = self._tracked, {}
+            for key, entry in tracked.items():
+                if not entry.future.done():
+                    # The group may still commit; never let this look like a rejection.
+                    lost = Exception(f"Lost track of {key} after round {scanned}: {e}")
+                    lost.__cause__ = e
+                    entry.future.set_exception(lost)
+
+    async def _scan(self, round_: int) -> None:
+        now = time.monotonic()
+        for tx_id in await self.algod.block_txids(round_):
+            entry = self._tracked.pop(tx_id, None)
+            if entry is not None and not entry.future.done():
+                entry.submission.confirmed_round = round_
+                entry.submission.confirmed_at = now
+                entry.future.set_result(entry.submission)
+        expired = [
+            (key, entry)
+            for key, entry in self._tracked.items()
+            if entry.submission.last_valid <= round_
+        ]
+        for key, entry in expired:
+            del self._tracked[key]
+            await self._resubmit_or_fail(entry)
+
+    async def _resubmit_or_fail(self, entry: _Tracked) -> None:
+        submission = entry.submission
+        if entry.rebuild is None or submission.attempts > self.max_resubmits:
+            entry.future.set_exception(
+                error.ConfirmationTimeoutError(
+                    f"Transaction {submission.tx_ids[-1]} expired unconfirmed after "
+                    f"round {submission.last_valid}"
+                )
+            )
+            return
+        try:
+            # The cached params may carry the very window that just expired.
+            signed = entry.rebuild(await self.algod.suggested_params(refresh=True))
+            submission.tx_ids = [stxn.get_txid() for stxn in signed]
+            submission.last_valid = _last_valid(signed)
+            submission.attempts += 1
+            self._tracked[submission.tx_ids[-1]] = entry
+            await self.algod.send_group(signed)
+            logger.debug(f"Resubmitted expired group as {submission.tx_ids[-1]}")
+        except Exception as e:
+            self._tracked.pop(submission.tx_ids[-1], None)
+            entry.future.set_exception(e)
+
+
+def _last_valid(signed: Sequence[transaction.GenericSignedTransaction]) -> int:
+    last_valid: int = min(stxn.transaction.last_valid_round for stxn in signed)
+    return last_valid
@@ -0,0 +1,615 @@
+import ast
+import base64
+import dataclasses
+import functools
+import json
+import logging
+import re
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Opcode budget for a single app call; groups pool 700 per app call they contain.
+APP_CALL_BUDGET = 700
+DEFAULT_LOOP_BOUND = 8
+
+# AVM v10 costs for every opcode that is not 1. Curve-dependent ops are keyed
+# "op Curve"; ops whose cost grows with their input are charged their base cost and
+# listed in DYNAMIC_OPCODES so the report can flag them.
+OPCODE_COSTS: dict[str, int] = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "sha3_256": 130,
+    "ed25519verify": 1900,
+    "ed25519verify_bare": 1900,
+    "ecdsa_verify Secp256k1": 1700,
+    "ecdsa_verify Secp256r1": 2500,
+    "ecdsa_pk_decompress Secp256k1": 650,
+    "ecdsa_pk_decompress Secp256r1": 2400,
+    "ecdsa_pk_recover Secp256k1": 2000,
+    "vrf_verify": 5700,
+    "falcon_verify": 1700,
+    "divmodw": 20,
+    "expw": 10,
+    "sqrt": 4,
+    "bsqrt": 40,
+    "b+": 10,
+    "b-": 10,
+    "b*": 20,
+    "b/": 20,
+    "b%": 20,
+    "b|": 6,
+    "b&": 6,
+    "b^": 6,
+    "b~": 4,
+    "ec_add BN254g1": 125,
+    "ec_add BN254g2": 170,
+    "ec_add BLS12_381g1": 205,
+    "ec_add BLS12_381g2": 290,
+    "ec_scalar_mul BN254g1": 1810,
+    "ec_scalar_mul BN254g2": 3430,
+    "ec_scalar_mul BLS12_381g1": 2950,
+    "ec_scalar_mul BLS12_381g2": 6530,
+    "ec_pairing_check BN254g1": 8000,
+    "ec_pairing_check BLS12_381g1": 13000,
+    "base64_decode": 1,
+    "json_ref": 25,
+    "mimc BN254Mp110": 10,
+    "mimc BLS12_381Mp111": 10,
+}
+DYNAMIC_OPCODES = {
+    "base64_decode",
+    "json_ref",
+    "mimc",
+    "ec_pairing_check",
+    "ec_multi_scalar_mul",
+    "ec_subgroup_check",
+    "ec_map_to",
+    "sumhash512",
+}
+
+_BRANCHES = {"b", "bz", "bnz"}
+_MULTI_BRANCHES = {"match", "switch"}
+_TERMINATORS = {"return", "err", "retsub", "b"}
+_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|\S+')
+_LABEL = re.compile(r"^(\S+):$")
+
+
+def opcode_cost(op: str, args: Sequence[str] = ()) -> int:
+    if args and f"{op} {args[0]}" in OPCODE_COSTS:
+        return OPCODE_COSTS[f"{op} {args[0]}"]
+    return OPCODE_COSTS.get(op, 1)
+
+
+@dataclasses.dataclass(slots=True)
+class Instruction:
+    op: str
+    args: list[str]
+    teal_line: int
+    pc: int = 0
+    size: int = 0
+    source_line: int | None = None
+
+    @property
+    def cost(self) -> int:
+        return opcode_cost(self.op, self.args)
+
+
+@dataclasses.dataclass
+class Block:
+    label: str
+    instructions: list[Instruction] = dataclasses.field(default_factory=list)
+    successors: list[str] = dataclasses.field(default_factory=list)
+    calls: list[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def cost(self) -> int:
+        return sum(instruction.cost for instruction in self.instructions)
+
+
+# -------------------------- Parsing -------------------------- #
+
+
+def parse_teal(text: str) -> list[Block]:
+    """Splits a TEAL program into basic blocks with their successor labels."""
+    blocks: list[Block] = []
+    current: Block | None = None
+
+    def start(label: str) -> Block:
+        block = Block(label)
+        if current is not None and not _ends_flow(current):
+            current.successors.append(label)
+        blocks.append(block)
+        return block
+
+    for number, raw in enumerate(text.splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith("//") or line.startswith("#pragma"):
+            continue
+        label = _LABEL.match(line)
+        if label:
+            current = start(label.group(1))
+            continue
+        tokens = []
+        for token in _TOKEN.findall(line):
+            if token.startswith("//"):
+                break
+            tokens.append(token)
+        if current is None or (current.instructions and _ends_block(current)):
+            current = start(f"{current.label if current else 'entry'}+{number}")
+        instruction = Instruction(tokens[0], tokens[1:], number)
+        current.instructions.append(instruction)
+        if instruction.op in _BRANCHES or instruction.op in _MULTI_BRANCHES:
+            current.successors.extend(instruction.args)
+        elif instruction.op == "callsub":
+            current.calls.append(instruction.args[0])
+    return blocks
+
+
+def _ends_block(block: Block) -> bool:
+    op = block.instructions[-1].op
+    return op in _BRANCHES or op in _MULTI_BRANCHES or op in _TERMINATORS
+
+
+def _ends_flow(block: Block) -> bool:
+    return bool(block.instructions) and block.instructions[-1].op in _TERMINATORS
+
+
+def mapped_pc_shift(source_map: dict[str, Any], program_size: int) -> int:
+    """Bytes of program before the first op a puya.map covers.
+
+    Newer puya leaves the leading constant blocks (op_pc_offset ops) out of the map and
+    counts pcs from the first op after them. The mappings hold one segment per mapped
+    byte either way, so the shift is whatever they do not cover.
+    """
+    return program_size - len(source_map["mappings"].split(";"))
+
+
+def decode_source_lines(mappings: str, shift: int = 0) -> dict[int, int]:
+    """Decodes a v3 sourcemap into {pc + shift: 1-based source line}; one segment per pc."""
+    alphabet = {
+        c: i
+        for i, c in enumerate(
+            "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+        )
+    }
+    lines: dict[int, int] = {}
+    source_line = 0
+    for pc, segment in enumerate(mappings.split(";")):
+        if not segment:
+            continue
+        values, value, bit_shift = [], 0, 0
+        for char in segment.split(",")[0]:
+            digit = alphabet[char]
+            value += (digit & 31) << bit_shift
+            if digit & 32:
+                bit_shift += 5
+                continue
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            value, bit_shift = 0, 0
+        if len(values) >= 3:
+            source_line += values[2]
+            lines[pc + shift] = source_line + 1
+    return lines
+
+
+def _varuint_size(value: int) -> int:
+    return max(1, (value.bit_length() + 6) // 7)
+
+
+def _byte_constant(arg: str) -> bytes:
+    if arg.startswith("0x"):
+        return bytes.fromhex(arg[2:])
+    if arg.startswith('"'):
+        return ast.literal_eval(f"b{arg}")  # type: ignore[no-any-return]
+    return b""  # A template variable, assembled as an empty placeholder.
+
+
+def _constant_block_size(instruction: Instruction) -> int:
+    """Encoded size of an intcblock or bytecblock."""
+    if instruction.op == "intcblock":
+        sizes = [
+            _varuint_size(0 if arg.startswith("TMPL_") else int(arg, 0))
+            for arg in instruction.args
+        ]
+    else:
+        constants = [_byte_constant(arg) for arg in instruction.args]
+        sizes = [_varuint_size(len(c)) + len(c) for c in constants]
+    return 1 + _varuint_size(len(instruction.args)) + sum(sizes)
+
+
+def attach_source_map(
+    blocks: list[Block], source_map: dict[str, Any], program_size: int
+) -> None:
+    """Sets pc, encoded size and source line on every instruction from a puya.map."""
+    shift = mapped_pc_shift(source_map, program_size)
+    pcs = sorted(int(pc) + shift for pc in source_map["pc_events"])
+    instructions = [i for block in blocks for i in block.instructions]
+    skipped = int(source_map.get("op_pc_offset", 0))
+    unmapped, mapped = instructions[:skipped], instructions[skipped:]
+    if len(pcs) != len(mapped):
+        raise Exception(
+            f"Source map has {len(pcs)} ops but the TEAL has {len(mapped)}; "
+            "rebuild the contract"
+        )
+    # The constant blocks the map leaves out follow the one-byte version.
+    pc = 1
+    for instruction in unmapped:
+        instruction.pc = pc
+        instruction.size = _constant_block_size(instruction)
+        pc += instruction.size
+    lines = decode_source_lines(source_map["mappings"], shift)
+    for index, (instruction, pc) in enumerate(zip(mapped, pcs, strict=True)):
+        end = pcs[index + 1] if index + 1 < len(pcs) else program_size
+        instruction.pc = pc
+        instruction.size = end - pc
+        instruction.source_line = lines.get(pc)
+
+
+# -------------------------- Cost Analysis -------------------------- #
+
+
+@dataclasses.dataclass
+class PathCost:
+    """Worst-case cost of a route or subroutine; loops are charged loop_bound times.
+
+    loop_bodies also lists the loops of every subroutine the path calls, whose cost is
+    already part of the call. ensures_budget marks paths that raise their own opcode
+    budget with op-up inner calls (ensure_budget), so one call's 700 is no limit there.
+    """
+
+    cost: int
+    loop_bodies: list[int] = dataclasses.field(default_factory=list)
+    ensures_budget: bool = False
+
+
+class CostModel:
+    """Worst-case opcode cost over a program's control-flow graph.
+
+    Each subroutine's graph is made acyclic by dropping back edges; a loop's body costs
+    the longest path from its header to the back edge and is charged loop_bound times.
+    Nested loops are therefore counted additively, which under-charges them. Op-up
+    loops, which read OpcodeBudget and run only until an inner call has topped it up,
+    are charged once.
+    """
+
+    def __init__(
+        self, blocks: list[Block], loop_bound: int = DEFAULT_LOOP_BOUND
+    ) -> None:
+        self.blocks = {block.label: block for block in blocks}
+        self.entry = blocks[0].label
+        self.loop_bound = loop_bound
+        self._back_edges: dict[str, set[tuple[str, str]]] = {}
+        self._subroutine_paths: dict[str, PathCost] = {}
+        self._in_progress: set[str] = set()
+
+    @property
+    def subroutines(self) -> list[str]:
+        called = {target for block in self.blocks.values() for target in block.calls}
+        return sorted(called)
+
+    def block_cost(self, label: str) -> int:
+        block = self.blocks[label]
+        return block.cost + sum(self.subroutine_cost(target) for target in block.calls)
+
+    def subroutine_cost(self, label: str) -> int:
+        return self.subroutine_path(label).cost
+
+    def subroutine_path(self, label: str) -> PathCost:
+        if label not in self._subroutine_paths:
+            if label in self._in_progress:
+                raise Exception(f"Recursive subroutine {label} has no static bound")
+            self._in_progress.add(label)
+            self._subroutine_paths[label] = self.path_cost(label, label)
+            self._in_progress.discard(label)
+        return self._subroutine_paths[label]
+
+    def _is_op_up_loop(self, header: str) -> bool:
+        return any(
+            instruction.op == "global" and instruction.args == ["OpcodeBudget"]
+            for instruction in self.blocks[header].instructions
+        )
+
+    def _find_back_edges(self, root: str) -> set[tuple[str, str]]:
+        if root not in self._back_edges:
+            back: set[tuple[str, str]] = set()
+            on_stack: set[str] = set()
+            done: set[str] = set()
+
+            def visit(label: str) -> None:
+                on_stack.add(label)
+                for successor in self.blocks[label].successors:
+                    if successor in on_stack:
+                        back.add((label, successor))
+                    elif successor not in done:
+                        visit(successor)
+                on_stack.discard(label)
+                done.add(label)
+
+            visit(root)
+            self._back_edges[root] = back
+        return self._back_edges[root]
+
+    def _reachable(self, start: str) -> set[str]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for successor in self.blocks[stack.pop()].successors:
+                if successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+        return seen
+
+    def _longest(self, root: str, start: str, end: str | None) -> int | None:
+        """Longest acyclic path cost from start to end, or to an exit if end is None."""
+        back = self._find_back_edges(root)
+
+        @functools.cache
+        def longest(label: str) -> int | None:
+            own = self.block_cost(label)
+            if label == end:
+                return own
+            successors = [
+                s for s in self.blocks[label].successors if (label, s) not in back
+            ]
+            tails = [t for t in (longest(s) for s in successors) if t is not None]
+            if tails:
+                return own + max(tails)
+            return own if end is None else None
+
+        return longest(start)
+
+    def path_cost(self, root: str, start: str, through: str | None = None) -> PathCost:
+        """Worst case from start to an exit, optionally forced through a block."""
+        if through is None:
+            base = self._longest(root, start, None) or 0
+        else:
+            head = self._longest(root, start, through)
+            tail = self._longest(root, through, None)
+            if head is None or tail is None:
+                raise Exception(f"{through} is not reachable from {start}")
+            base = head + tail - self.block_cost(through)
+        reachable = self._reachable(through or start)
+        bodies: list[int] = []
+        op_ups: list[int] = []
+        for source, header in sorted(self._find_back_edges(root)):
+            if header in reachable:
+                body = self._longest(root, header, source) or 0
+                (op_ups if self._is_op_up_loop(header) else bodies).append(body)
+        cost = base + self.loop_bound * sum(bodies) + sum(op_ups)
+        ensures_budget = bool(op_ups)
+        # Called subroutines' loops are in their call's cost; list them, don't charge.
+        called_bodies = []
+        for label in sorted(reachable):
+            for target in self.blocks[label].calls:
+                called = self.subroutine_path(target)
+                called_bodies += called.loop_bodies
+                ensures_budget |= called.ensures_budget
+        return PathCost(cost, bodies + called_bodies, ensures_budget)
+
+
+# -------------------------- Reports -------------------------- #
+
+
+@dataclasses.dataclass
+class LineCost:
+    line: int
+    text: str
+    cost: int
+    size: int
+    dynamic: bool
+
+
+@dataclasses.dataclass
+class CostReport:
+    app_name: str
+    program_size: int
+    loop_bound: int
+    routes: dict[str, PathCost]
+    subroutines: dict[str, int]
+    lines: list[LineCost]
+    compiler: str = ""
+
+    def to_baseline(self) -> dict[str, Any]:
+        return {
+            "app": self.app_name,
+            "compiler": self.compiler,
+            "loop_bound": self.loop_bound,
+            "program_size": self.program_size,
+            "routes": {name: route.cost for name, route in sorted(self.routes.items())},
+            "subroutines": dict(sorted(self.subroutines.items())),
+        }
+
+
+def _route_names(blocks: list[Block], app_spec: dict[str, Any]) -> dict[str, str]:
+    """Maps router labels to method signatures using the match after pushbytess."""
+    from algosdk import abi
+
+    by_selector = {}
+    for method in app_spec["methods"]:
+        args = ",".join(arg["type"] for arg in method["args"])
+        signature = f"{method['name']}({args}){method['returns']['type']}"
+        selector = abi.Method.from_signature(signature).get_selector()
+        by_selector[selector] = signature
+    routes: dict[str, str] = {}
+    for block in blocks:
+        selectors: list[bytes] = []
+        previous: Instruction | None = None
+        for instruction in block.instructions:
+            if instruction.op == "pushbytess":
+                selectors = [bytes.fromhex(arg[2:]) for arg in instruction.args]
+            elif instruction.op == "match" and selectors:
+                for selector, label in zip(selectors, instruction.args):
+                    routes[label] = by_selector.get(selector, selector.hex())
+            elif (
+                instruction.op == "bz"
+                and previous is not None
+                and previous.args == ["NumAppArgs"]
+            ):
+                routes[instruction.args[0]] = "<bare>"
+            previous = instruction
+    return routes
+
+
+def compiler_name(app_spec: dict[str, Any]) -> str:
+    """The compiler and version an ARC-56 spec was built with, e.g. "puya 4.7.0"."""
+    info = app_spec.get("compilerInfo")
+    if not info:
+        return ""
+    version = info.get("compilerVersion") or {}
+    numbers = (version.get(part, 0) for part in ("major", "minor", "patch"))
+    return f"{info['compiler']} {'.'.join(str(number) for number in numbers)}"
+
+
+def analyze(
+    teal: str,
+    source_map: dict[str, Any],
+    app_spec: dict[str, Any],
+    source_text: str = "",
+    loop_bound: int = DEFAULT_LOOP_BOUND,
+) -> CostReport:
+    program_size = len(base64.b64decode(app_spec["byteCode"]["approval"]))
+    blocks = parse_teal(teal)
+    attach_source_map(blocks, source_map, program_size)
+    model = CostModel(blocks, loop_bound)
+
+    routes = {
+        name: model.path_cost(model.entry, model.entry, through=label)
+        for label, name in _route_names(blocks, app_spec).items()
+    }
+    subroutines = {label: model.subroutine_cost(label) for label in model.subroutines}
+
+    source_lines = source_text.splitlines()
+    by_line: dict[int, LineCost] = {}
+    for block in blocks:
+        for instruction in block.instructions:
+            line = instruction.source_line or 0
+            entry = by_line.get(line)
+            if entry is None:
+                known = 0 < line <= len(source_lines)
+                text = source_lines[line - 1].strip() if known else ""
+                entry = by_line[line] = LineCost(line, text, 0, 0, False)
+            entry.cost += instruction.cost
+            entry.size += instruction.size
+            entry.dynamic |= instruction.op in DYNAMIC_OPCODES
+    return CostReport(
+        app_name=app_spec["name"],
+        program_size=program_size,
+        loop_bound=loop_bound,
+        routes=routes,
+        subroutines=subroutines,
+        lines=sorted(by_line.values(), key=lambda entry: -entry.cost),
+        compiler=compiler_name(app_spec),
+    )
+
+
+def profile_artifacts(
+    artifact_path: Path, app_name: str, loop_bound: int = DEFAULT_LOOP_BOUND
+) -> CostReport:
+    """Profiles a built contract from its TEAL, puya.map and ARC-56 spec."""
+    map_path = artifact_path / f"{app_name}.approval.puya.map"
+    source_map = json.loads(map_path.read_text())
+    source_path = (map_path.parent / source_map["sources"][0]).resolve()
+    return analyze(
+        (artifact_path / f"{app_name}.approval.teal").read_text(),
+        source_map,
+        json.loads((artifact_path / f"{app_name}.arc56.json").read_text()),
+        source_path.read_text() if source_path.exists() else "",
+        loop_bound,
+    )
+
+
+def format_report(report: CostReport, top_lines: int = 15) -> str:
+    out = [
+        f"{report.app_name}: {report.program_size} bytes, "
+        f"loops charged {report.loop_bound} iterations"
+        + (f", built by {report.compiler}" if report.compiler else ""),
+        "",
+        f"{'route':<56}{'worst case':>12}{'loops':>8}",
+    ]
+    for name, route in sorted(report.routes.items(), key=lambda item: -item[1].cost):
+        if route.ensures_budget:
+            flag = "  ensures budget"
+        elif route.cost > APP_CALL_BUDGET:
+            flag = "  over budget"
+        else:
+            flag = ""
+        out.append(f"{name:<56}{route.cost:>12}{len(route.loop_bodies):>8}{flag}")
+    out += ["", f"{'subroutine':<56}{'worst case':>12}"]
+    for name, cost in sorted(report.subroutines.items(), key=lambda item: -item[1]):
+        out.append(f"{name:<56}{cost:>12}")
+    out += ["", f"{'line':>6}{'cost':>8}{'bytes':>8}  source"]
+    for entry in report.lines[:top_lines]:
+        where = f"{entry.line:>6}" if entry.line else f"{'-':>6}"
+        text = entry.text if entry.line else "(compiler generated)"
+        dynamic = " [input-dependent]" if entry.dynamic else ""
+        out.append(f"{where}{entry.cost:>8}{entry.size:>8}  {text}{dynamic}")
+    return "\n".join(out)
+
+
+def compare_to_baseline(
+    report: CostReport, baseline: dict[str, Any], tolerance: float = 0.0
+) -> list[str]:
+    """Lists every route, subroutine or size figure that grew beyond the tolerance."""
+    current = report.to_baseline()
+    regressions = []
+
+    def check(kind: str, name: str, old: int, new: int) -> None:
+        if new > old * (1 + tolerance):
+            regressions.append(f"{kind} {name}: {old} -> {new}")
+
+    check(
+        "program size", report.app_name, baseline["program_size"], report.program_size
+    )
+    for kind in ("routes", "subroutines"):
+        for name, old in baseline.get(kind, {}).items():
+            if name in current[kind]:
+                check(kind[:-1], name, old, current[kind][name])
+    return regressions
+
+
+# -------------------------- Baselines -------------------------- #
+
+BASELINE_SUFFIX = ".costs.json"
+
+
+def profile_contract(
+    artifact_path: Path, contract_folder: Path, update_baseline: bool = False
+) -> list[tuple[CostReport, list[str]]]:
+    """Profiles every app built from a contract folder against its committed baseline.
+
+    Baselines live next to contract.py as <App>.costs.json and keep their loop bound
+    and the compiler that built the app; costs from another compiler version are not
+    comparable, so that check is skipped with a warning until the baseline is
+    re-recorded. Returns each report with its regressions; update_baseline rewrites
+    them instead.
+    """
+    results = []
+    for teal_path in sorted(artifact_path.glob("*.approval.teal")):
+        app_name = teal_path.name.removesuffix(".approval.teal")
+        baseline_path = contract_folder / f"{app_name}{BASELINE_SUFFIX}"
+        baseline = (
+            json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+        )
+        report = profile_artifacts(
+            artifact_path,
+            app_name,
+            baseline["loop_bound"] if baseline else DEFAULT_LOOP_BOUND,
+        )
+        regressions: list[str] = []
+        if update_baseline:
+            baseline_path.write_text(json.dumps(report.to_baseline(), indent=2) + "\n")
+        elif baseline is not None and baseline.get("compiler") != report.compiler:
+            logger.warning(
+                f"Skipping the cost check for {app_name}: {baseline_path.name} was "
+                f"recorded with {baseline.get('compiler') or 'an unknown compiler'}, "
+                f"this build used {report.compiler or 'an unknown compiler'}; re-run "
+                "profile-baseline to record it again"
+            )
+        elif baseline is not None:
+            regressions = compare_to_baseline(report, baseline)
+        results.append((report, regressions))
+    return results
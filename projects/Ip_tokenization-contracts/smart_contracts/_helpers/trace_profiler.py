@@ -0,0 +1,255 @@
+import base64
+import bisect
+import dataclasses
+import json
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from algosdk import encoding
+
+from smart_contracts._helpers.teal_profiler import (
+    decode_source_lines,
+    mapped_pc_shift,
+    opcode_cost,
+)
+
+logger = logging.getLogger(__name__)
+
+# AlgoKit writes a simulate response per traced send into <project root>/debug_traces.
+TRACE_DIR_NAME = "debug_traces"
+TRACE_SUFFIX = ".trace.avm.json"
+FOLDED_FILE_NAME = "avm.folded"
+
+_PROGRAM_TRACES = (
+    ("approval-program-trace", "approval-program-hash"),
+    ("clear-state-program-trace", "clear-state-program-hash"),
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class PcInfo:
+    pc: int
+    op: str
+    cost: int
+    line: int | None
+    subroutine: str
+    block: str
+
+
+def program_hashes(program: bytes) -> set[str]:
+    """Base64 hashes a simulate trace may name this program by."""
+    return {
+        base64.b64encode(encoding.checksum(prefix + program)).decode()
+        for prefix in (b"", b"Program")
+    }
+
+
+class SourceMapIndex:
+    """A puya.map decoded once into sorted PC arrays; lookups are a bisect.
+
+    Each op keeps its cost, source line and the subroutine and block it belongs to,
+    so no sourcemap decoding happens per trace step.
+    """
+
+    def __init__(
+        self, name: str, source_map: dict[str, Any], program: bytes, source: str = ""
+    ) -> None:
+        self.name = name
+        self.hashes = program_hashes(program)
+        self.source_lines = source.splitlines()
+        # Trace pcs count from the start of the program, the map's from its first op.
+        shift = mapped_pc_shift(source_map, len(program))
+        lines = decode_source_lines(source_map["mappings"], shift)
+        self.pcs: list[int] = []
+        self.infos: list[PcInfo] = []
+        subroutine = block = ""
+        for mapped_pc in sorted(int(pc) for pc in source_map["pc_events"]):
+            event = source_map["pc_events"][str(mapped_pc)]
+            subroutine = event.get("subroutine", subroutine).rsplit(".", 1)[-1]
+            block = event.get("block", block)
+            tokens = event["op"].split("//", 1)[0].split()
+            pc = mapped_pc + shift
+            self.pcs.append(pc)
+            self.infos.append(
+                PcInfo(
+                    pc,
+                    event["op"],
+                    opcode_cost(tokens[0], tokens[1:]),
+                    lines.get(pc),
+                    subroutine,
+                    block,
+                )
+            )
+
+    def lookup(self, pc: int) -> PcInfo:
+        return self.infos[max(bisect.bisect_right(self.pcs, pc) - 1, 0)]
+
+    def source_text(self, line: int | None) -> str:
+        if line is None or not 0 < line <= len(self.source_lines):
+            return ""
+        return self.source_lines[line - 1].strip()
+
+    @classmethod
+    def from_artifacts(cls, artifact_path: Path) -> list["SourceMapIndex"]:
+        """Indexes the approval and clear programs of each app in an artifact folder."""
+        indexes = []
+        for app_spec_path in sorted(artifact_path.glob("*.arc56.json")):
+            app_name = app_spec_path.name.removesuffix(".arc56.json")
+            byte_code = json.loads(app_spec_path.read_text()).get("byteCode") or {}
+            for kind, key in (("approval", "approval"), ("clear", "clear")):
+                map_path = artifact_path / f"{app_name}.{kind}.puya.map"
+                if key not in byte_code or not map_path.exists():
+                    continue
+                source_map = json.loads(map_path.read_text())
+                source = ""
+                if source_map["sources"]:
+                    source_path = map_path.parent / source_map["sources"][0]
+                    if source_path.exists():
+                        source = source_path.read_text()
+                indexes.append(
+                    cls(
+                        f"{app_name}.{kind}",
+                        source_map,
+                        base64.b64decode(byte_code[key]),
+                        source,
+                    )
+                )
+        return indexes
+
+
+class TraceAggregator:
+    """Folds AVM execution traces into per-PC, per-line and call-stack cost totals.
+
+    Traces are consumed one at a time and only counters are kept, so a whole load run
+    can be streamed through in constant memory.
+    """
+
+    def __init__(self, indexes: Iterable[SourceMapIndex]) -> None:
+        self.by_hash = {h: index for index in indexes for h in index.hashes}
+        self.pc_hits: Counter[tuple[str, int]] = Counter()
+        self.line_costs: Counter[tuple[str, int | None]] = Counter()
+        self.stack_costs: Counter[str] = Counter()
+        self.unknown_programs: Counter[str] = Counter()
+        self.program_runs = 0
+        self.total_cost = 0
+
+    def add_exec_trace(self, trace: dict[str, Any]) -> None:
+        for steps_key, hash_key in _PROGRAM_TRACES:
+            steps = trace.get(steps_key)
+            if not steps:
+                continue
+            index = self.by_hash.get(trace.get(hash_key, ""))
+            if index is None:
+                self.unknown_programs[trace.get(hash_key, "")] += 1
+                continue
+            self._add_steps(index, steps)
+        for inner in trace.get("inner-trace") or ():
+            self.add_exec_trace(inner)
+
+    def _add_steps(self, index: SourceMapIndex, steps: list[dict[str, Any]]) -> None:
+        self.program_runs += 1
+        stack = [index.name]
+        entering = True
+        for step in steps:
+            info = index.lookup(step["pc"])
+            if entering:
+                stack.append(info.subroutine)
+                entering = False
+            self.pc_hits[(index.name, info.pc)] += 1
+            self.line_costs[(index.name, info.line)] += info.cost
+            leaf = f"line {info.line}" if info.line else info.block
+            self.stack_costs[";".join(stack) + ";" + leaf] += info.cost
+            self.total_cost += info.cost
+            if info.op.startswith("callsub "):
+                entering = True
+            elif info.op == "retsub" and len(stack) > 2:
+                stack.pop()
+
+    def add_simulate_response(self, response: dict[str, Any]) -> None:
+        for group in response.get("txn-groups") or ():
+            for result in group.get("txn-results") or ():
+                if "exec-trace" in result:
+                    self.add_exec_trace(result["exec-trace"])
+
+    def add_trace_file(self, path: Path) -> None:
+        self.add_simulate_response(json.loads(path.read_text()))
+
+    def folded(self) -> Iterator[str]:
+        """Collapsed "frame;frame;leaf cost" lines for flamegraph.pl or speedscope."""
+        for stack, cost in sorted(self.stack_costs.items()):
+            yield f"{stack} {cost}"
+
+    def report(self, top: int = 20) -> str:
+        indexes = {index.name: index for index in self.by_hash.values()}
+        out = [
+            f"{self.program_runs} program runs, {self.total_cost} opcode budget used",
+            "",
+            f"{'program':<36}{'line':>6}{'cost':>10}{'share':>8}  source",
+        ]
+        total = self.total_cost or 1
+        for (name, line), cost in self.line_costs.most_common(top):
+            text = indexes[name].source_text(line) if line else "(compiler generated)"
+            where = str(line) if line else "-"
+            out.append(f"{name:<36}{where:>6}{cost:>10}{cost / total:>8.1%}  {text}")
+        out += ["", f"{'program':<36}{'pc':>6}{'hits':>10}  op"]
+        for (name, pc), hits in self.pc_hits.most_common(top):
+            op = indexes[name].lookup(pc).op.split("//", 1)[0].strip()
+            out.append(f"{name:<36}{pc:>6}{hits:>10}  {op[:60]}")
+        if self.unknown_programs:
+            out += [
+                "",
+                f"{sum(self.unknown_programs.values())} program runs skipped: "
+                "no sourcemap matches their program hash (stale artifacts?)",
+            ]
+        return "\n".join(out)
+
+
+def iter_trace_files(
+    directory: Path, follow: bool = False, poll_interval: float = 1.0
+) -> Iterator[Path]:
+    """Yields trace files oldest first; with follow, keeps waiting for new ones.
+
+    When following, a file is only yielded once it has not changed for a poll interval,
+    so half-written traces are picked up on a later pass.
+    """
+    seen: set[Path] = set()
+    while True:
+        settled = time.time() - poll_interval
+        new = [
+            (path.stat().st_mtime, path)
+            for path in directory.glob(f"*{TRACE_SUFFIX}")
+            if path not in seen
+        ]
+        for mtime, path in sorted(new):
+            if follow and mtime > settled:
+                continue
+            seen.add(path)
+            yield path
+        if not follow:
+            return
+        time.sleep(poll_interval)
+
+
+def aggregate_traces(
+    directory: Path, indexes: Iterable[SourceMapIndex], follow: bool = False
+) -> TraceAggregator:
+    """Streams every trace file in a folder through one aggregator.
+
+    With follow the folder is tailed until interrupted, so traces from a running load
+    test are folded in as AlgoKit writes them.
+    """
+    aggregator = TraceAggregator(indexes)
+    try:
+        for path in iter_trace_files(directory, follow):
+            try:
+                aggregator.add_trace_file(path)
+            except (OSError, ValueError) as e:
+                # AlgoKit may still be writing it, or have rotated it out already.
+                logger.debug(f"Skipping trace {path.name}: {e}")
+    except KeyboardInterrupt:
+        pass
+    return aggregator
@@ -0,0 +1,165 @@
+import base64
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+from smart_contracts._helpers.build import build_contracts, package_sources
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.25
+
+# Runs after a successful build of a contract, e.g. a cost baseline check; raising
+# stops that change from being deployed.
+BuildCheck = Callable[[str], None]
+
+
+def program_digest(artifact_path: Path) -> str | None:
+    """Hashes the approval and clear programs a build produced.
+
+    Uses the bytecode recorded in the ARC-56 spec, falling back to the TEAL files when
+    the compiler did not emit any.
+    """
+    specs = sorted(artifact_path.glob("*.arc56.json"))
+    byte_codes = [json.loads(path.read_text()).get("byteCode") for path in specs]
+    digest = hashlib.sha256()
+    if specs and all(byte_codes):
+        for byte_code in byte_codes:
+            for program in ("approval", "clear"):
+                digest.update(base64.b64decode(byte_code[program]))
+        return digest.hexdigest()
+    teal_files = sorted(artifact_path.glob("*.teal"))
+    if not teal_files:
+        return None
+    for teal_path in teal_files:
+        digest.update(teal_path.read_bytes())
+    return digest.hexdigest()
+
+
+@dataclasses.dataclass
+class WatchedContract:
+    name: str
+    path: Path
+    deploy: Callable[[], None] | None
+    mtimes: dict[Path, int] = dataclasses.field(default_factory=dict)
+    source_digest: str = ""
+    deployed_digest: str | None = None
+
+    def stat(self) -> dict[Path, int]:
+        """Modification times of every source the build cache keys this contract on."""
+        mtimes = {}
+        for file in package_sources(self.path):
+            try:
+                mtimes[file] = file.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return mtimes
+
+
+class ContractWatcher:
+    """Rebuilds and redeploys contracts as their sources change.
+
+    A contract's sources are every module in its package, as for the build cache. Only
+    the changed contract is rebuilt, saves that leave the source unchanged are
+    ignored, and a rebuild is only deployed if its program bytecode differs from what
+    was last deployed (so comment or formatting edits never touch the chain). Each
+    redeploy logs how long after the save it went live.
+    """
+
+    def __init__(
+        self,
+        artifacts_root: Path,
+        contracts: Sequence[WatchedContract],
+        check: BuildCheck | None = None,
+        poll_interval: float = POLL_INTERVAL,
+    ) -> None:
+        self.artifacts_root = artifacts_root
+        self.contracts = list(contracts)
+        self.check = check
+        self.poll_interval = poll_interval
+
+    def start(self) -> None:
+        """Builds and deploys everything once, so changes have an app to update."""
+        for contract in self.contracts:
+            contract.mtimes = contract.stat()
+            contract.source_digest = _hash_sources(contract.path)
+            self._rebuild(contract, changed_at=time.time())
+
+    def poll(self) -> list[str]:
+        """Handles every contract whose source changed since the last poll."""
+        handled = []
+        for contract in self.contracts:
+            mtimes = contract.stat()
+            if mtimes == contract.mtimes:
+                continue
+            # Editors often write a file in several steps; wait for it to settle.
+            time.sleep(self.poll_interval)
+            if contract.stat() != mtimes:
+                continue
+            contract.mtimes = mtimes
+            source_digest = _hash_sources(contract.path)
+            if source_digest == contract.source_digest:
+                logger.debug(f"{contract.name} saved without changes")
+                continue
+            contract.source_digest = source_digest
+            self._rebuild(contract, changed_at=max(mtimes.values(), default=0) / 1e9)
+            handled.append(contract.name)
+        return handled
+
+    def _rebuild(self, contract: WatchedContract, changed_at: float) -> None:
+        artifact_path = self.artifacts_root / contract.name
+        try:
+            build_contracts(self.artifacts_root, [(contract.name, contract.path)])
+            if self.check is not None:
+                self.check(contract.name)
+        except Exception as e:
+            logger.error(f"Build of {contract.name} failed, keeping the live app: {e}")
+            return
+        digest = program_digest(artifact_path)
+        if digest is not None and digest == contract.deployed_digest:
+            logger.info(f"{contract.name} bytecode unchanged, not redeploying")
+            return
+        if contract.deploy is None:
+            logger.info(f"{contract.name} rebuilt ({time.time() - changed_at:.2f}s)")
+            contract.deployed_digest = digest
+            return
+        try:
+            contract.deploy()
+        except Exception as e:
+            logger.error(f"Deploy of {contract.name} failed: {e}")
+            return
+        contract.deployed_digest = digest
+        elapsed = time.time() - changed_at
+        logger.info(f"{contract.name} live {elapsed:.2f}s after change")
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Starts, then polls until stop is set or the user interrupts."""
+        stop = stop or threading.Event()
+        self.start()
+        names = ", ".join(contract.name for contract in self.contracts)
+        logger.info(f"Watching {names}, Ctrl+C to stop")
+        try:
+            while not stop.is_set():
+                self.poll()
+                stop.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def _hash_sources(contract_path: Path) -> str:
+    """Hashes the contract's package sources, as the build cache does."""
+    digest = hashlib.sha256()
+    package = contract_path.parent
+    for file in package_sources(contract_path):
+        try:
+            source = file.read_bytes()
+        except FileNotFoundError:
+            continue
+        digest.update(file.relative_to(package).as_posix().encode() + b"\0")
+        digest.update(source)
+    return digest.hexdigest()
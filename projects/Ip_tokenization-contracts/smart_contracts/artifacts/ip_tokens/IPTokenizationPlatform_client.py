@@ -0,0 +1,301 @@
+# Generated by smart_contracts/_helpers/client_generator.py from IPTokenizationPlatform.arc56.json.
+# Do not edit by hand; rebuild the contract to regenerate it.
+from algosdk import transaction
+from algosdk.atomic_transaction_composer import TransactionWithSigner
+
+from smart_contracts._helpers.async_client import (
+    AsyncAppClient,
+    CallOptions,
+    MethodSpec,
+)
+
+APP_NAME = "IPTokenizationPlatform"
+
+# Selectors are precomputed; each signature is parsed once, on import.
+METHODS = {
+    "tokenize_asset": MethodSpec.from_signature(
+        "tokenize_asset(pay)void",
+        selector=bytes.fromhex("87368535"),
+    ),
+    "buy_ip_fraction": MethodSpec.from_signature(
+        "buy_ip_fraction(pay,uint64)void",
+        selector=bytes.fromhex("a3c5d1d5"),
+    ),
+    "buy_ip_fraction_with_proof": MethodSpec.from_signature(
+        "buy_ip_fraction_with_proof(pay,uint64,byte[])void",
+        selector=bytes.fromhex("28d4e5a4"),
+    ),
+    "atomic_swap": MethodSpec.from_signature(
+        "atomic_swap(account,account,uint64)void",
+        selector=bytes.fromhex("6ce094bd"),
+    ),
+    "atomic_swap_with_proof": MethodSpec.from_signature(
+        "atomic_swap_with_proof(account,account,uint64,byte[],byte[])void",
+        selector=bytes.fromhex("24e54b1e"),
+    ),
+    "atomic_swap_netted": MethodSpec.from_signature(
+        "atomic_swap_netted(address[],(uint8,uint8,uint64)[])void",
+        selector=bytes.fromhex("807f93a3"),
+    ),
+    "verify_kyc": MethodSpec.from_signature(
+        "verify_kyc(account,bool)void",
+        selector=bytes.fromhex("0cee9f75"),
+    ),
+    "revoke_kyc": MethodSpec.from_signature(
+        "revoke_kyc(account)void",
+        selector=bytes.fromhex("afe237eb"),
+    ),
+    "verify_kyc_batch": MethodSpec.from_signature(
+        "verify_kyc_batch(address[],bool)void",
+        selector=bytes.fromhex("c4012ed2"),
+    ),
+    "revoke_kyc_batch": MethodSpec.from_signature(
+        "revoke_kyc_batch(address[])void",
+        selector=bytes.fromhex("493cbcef"),
+    ),
+    "set_kyc_merkle_root": MethodSpec.from_signature(
+        "set_kyc_merkle_root(byte[])void",
+        selector=bytes.fromhex("965c8975"),
+    ),
+    "distribute_royalty": MethodSpec.from_signature(
+        "distribute_royalty(pay)void",
+        selector=bytes.fromhex("d0e15146"),
+    ),
+    "set_royalty_mode": MethodSpec.from_signature(
+        "set_royalty_mode(bool)void",
+        selector=bytes.fromhex("5053a95b"),
+    ),
+    "claim_royalties": MethodSpec.from_signature(
+        "claim_royalties()uint64",
+        selector=bytes.fromhex("978a0ba0"),
+    ),
+    "connect_wallet": MethodSpec.from_signature(
+        "connect_wallet()void",
+        selector=bytes.fromhex("7b4825a7"),
+    ),
+    "put_metadata_chunk": MethodSpec.from_signature(
+        "put_metadata_chunk(byte[])void",
+        selector=bytes.fromhex("718263a9"),
+    ),
+    "write_metadata_index": MethodSpec.from_signature(
+        "write_metadata_index(byte[],uint64,uint64,byte[])void",
+        selector=bytes.fromhex("f8662198"),
+    ),
+    "set_metadata_root": MethodSpec.from_signature(
+        "set_metadata_root(byte[],uint64)void",
+        selector=bytes.fromhex("719b54e7"),
+    ),
+    "migrate_to": MethodSpec.from_signature(
+        "migrate_to(application)void",
+        selector=bytes.fromhex("54abd896"),
+    ),
+    "update_application": MethodSpec.from_signature(
+        "update_application()void",
+        selector=bytes.fromhex("b53e2593"),
+        on_complete=transaction.OnComplete.UpdateApplicationOC,
+    ),
+    "delete_application": MethodSpec.from_signature(
+        "delete_application()void",
+        selector=bytes.fromhex("33b3499e"),
+        on_complete=transaction.OnComplete.DeleteApplicationOC,
+    ),
+}
+
+
+class IPTokenizationPlatformClient(AsyncAppClient):
+    """Typed asyncio client for IPTokenizationPlatform; calls are pipelined."""
+
+    async def tokenize_asset(
+        self,
+        mbrpay: TransactionWithSigner,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["tokenize_asset"], [mbrpay], options)
+
+    async def buy_ip_fraction(
+        self,
+        buyer_payment: TransactionWithSigner,
+        fraction_amount: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["buy_ip_fraction"], [buyer_payment, fraction_amount], options
+        )
+
+    async def buy_ip_fraction_with_proof(
+        self,
+        buyer_payment: TransactionWithSigner,
+        fraction_amount: int,
+        proof: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["buy_ip_fraction_with_proof"],
+            [buyer_payment, fraction_amount, proof],
+            options,
+        )
+
+    async def atomic_swap(
+        self,
+        buyer: str,
+        seller: str,
+        amount: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["atomic_swap"], [buyer, seller, amount], options)
+
+    async def atomic_swap_with_proof(
+        self,
+        buyer: str,
+        seller: str,
+        amount: int,
+        buyer_proof: bytes,
+        seller_proof: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["atomic_swap_with_proof"],
+            [buyer, seller, amount, buyer_proof, seller_proof],
+            options,
+        )
+
+    async def atomic_swap_netted(
+        self,
+        accounts: list[str],
+        legs: list[tuple[int, int, int]],
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["atomic_swap_netted"], [accounts, legs], options)
+
+    async def verify_kyc(
+        self,
+        user: str,
+        is_verified: bool,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["verify_kyc"], [user, is_verified], options)
+
+    async def revoke_kyc(
+        self,
+        user: str,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["revoke_kyc"], [user], options)
+
+    async def verify_kyc_batch(
+        self,
+        users: list[str],
+        is_verified: bool,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["verify_kyc_batch"], [users, is_verified], options)
+
+    async def revoke_kyc_batch(
+        self,
+        users: list[str],
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["revoke_kyc_batch"], [users], options)
+
+    async def set_kyc_merkle_root(
+        self,
+        root: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["set_kyc_merkle_root"], [root], options)
+
+    async def distribute_royalty(
+        self,
+        usage_payment: TransactionWithSigner,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["distribute_royalty"], [usage_payment], options)
+
+    async def set_royalty_mode(
+        self,
+        accumulate: bool,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["set_royalty_mode"], [accumulate], options)
+
+    async def claim_royalties(
+        self,
+        *,
+        options: CallOptions | None = None,
+    ) -> int:
+        result: int = await self.call(METHODS["claim_royalties"], [], options)
+        return result
+
+    async def connect_wallet(
+        self,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["connect_wallet"], [], options)
+
+    async def put_metadata_chunk(
+        self,
+        chunk: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["put_metadata_chunk"], [chunk], options)
+
+    async def write_metadata_index(
+        self,
+        root: bytes,
+        chunk_count: int,
+        offset: int,
+        leaves: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["write_metadata_index"],
+            [root, chunk_count, offset, leaves],
+            options,
+        )
+
+    async def set_metadata_root(
+        self,
+        root: bytes,
+        size: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["set_metadata_root"], [root, size], options)
+
+    async def migrate_to(
+        self,
+        target: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["migrate_to"], [target], options)
+
+    async def update_application(
+        self,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["update_application"], [], options)
+
+    async def delete_application(
+        self,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["delete_application"], [], options)
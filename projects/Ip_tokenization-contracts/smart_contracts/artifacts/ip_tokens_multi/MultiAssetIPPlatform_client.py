@@ -0,0 +1,253 @@
+# Generated by smart_contracts/_helpers/client_generator.py from MultiAssetIPPlatform.arc56.json.
+# Do not edit by hand; rebuild the contract to regenerate it.
+from algosdk import transaction
+from algosdk.atomic_transaction_composer import TransactionWithSigner
+
+from smart_contracts._helpers.async_client import (
+    AsyncAppClient,
+    CallOptions,
+    MethodSpec,
+)
+
+APP_NAME = "MultiAssetIPPlatform"
+
+# Selectors are precomputed; each signature is parsed once, on import.
+METHODS = {
+    "tokenize_asset": MethodSpec.from_signature(
+        "tokenize_asset(pay,asset,uint64,bool)void",
+        selector=bytes.fromhex("89ed7479"),
+    ),
+    "retire_asset": MethodSpec.from_signature(
+        "retire_asset(asset)void",
+        selector=bytes.fromhex("5c9e45e5"),
+    ),
+    "buy_ip_fraction": MethodSpec.from_signature(
+        "buy_ip_fraction(asset,pay,uint64)void",
+        selector=bytes.fromhex("13a48f96"),
+    ),
+    "buy_ip_fraction_with_proof": MethodSpec.from_signature(
+        "buy_ip_fraction_with_proof(asset,pay,uint64,byte[])void",
+        selector=bytes.fromhex("1aac5751"),
+    ),
+    "atomic_swap": MethodSpec.from_signature(
+        "atomic_swap(asset,account,account,uint64)void",
+        selector=bytes.fromhex("5e073ad6"),
+    ),
+    "atomic_swap_with_proof": MethodSpec.from_signature(
+        "atomic_swap_with_proof(asset,account,account,uint64,byte[],byte[])void",
+        selector=bytes.fromhex("d6195830"),
+    ),
+    "verify_kyc": MethodSpec.from_signature(
+        "verify_kyc(asset,account,bool)void",
+        selector=bytes.fromhex("9352d918"),
+    ),
+    "revoke_kyc": MethodSpec.from_signature(
+        "revoke_kyc(asset,account)void",
+        selector=bytes.fromhex("569c4ad2"),
+    ),
+    "verify_kyc_batch": MethodSpec.from_signature(
+        "verify_kyc_batch(asset,address[],bool)void",
+        selector=bytes.fromhex("4bbbd460"),
+    ),
+    "revoke_kyc_batch": MethodSpec.from_signature(
+        "revoke_kyc_batch(asset,address[])void",
+        selector=bytes.fromhex("a7bfcfaf"),
+    ),
+    "set_kyc_merkle_root": MethodSpec.from_signature(
+        "set_kyc_merkle_root(asset,byte[])void",
+        selector=bytes.fromhex("8642223e"),
+    ),
+    "distribute_royalty": MethodSpec.from_signature(
+        "distribute_royalty(asset,pay)void",
+        selector=bytes.fromhex("507d0c1a"),
+    ),
+    "set_royalty_mode": MethodSpec.from_signature(
+        "set_royalty_mode(asset,bool)void",
+        selector=bytes.fromhex("653ac8a8"),
+    ),
+    "claim_royalties": MethodSpec.from_signature(
+        "claim_royalties(asset)uint64",
+        selector=bytes.fromhex("b6329ab4"),
+    ),
+    "connect_wallet": MethodSpec.from_signature(
+        "connect_wallet()void",
+        selector=bytes.fromhex("7b4825a7"),
+    ),
+    "delete_application": MethodSpec.from_signature(
+        "delete_application()void",
+        selector=bytes.fromhex("33b3499e"),
+        on_complete=transaction.OnComplete.DeleteApplicationOC,
+    ),
+}
+
+
+class MultiAssetIPPlatformClient(AsyncAppClient):
+    """Typed asyncio client for MultiAssetIPPlatform; calls are pipelined."""
+
+    async def tokenize_asset(
+        self,
+        mbrpay: TransactionWithSigner,
+        asset: int,
+        royalty_percent: int,
+        kyc_scoped: bool,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["tokenize_asset"],
+            [mbrpay, asset, royalty_percent, kyc_scoped],
+            options,
+        )
+
+    async def retire_asset(
+        self,
+        asset: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["retire_asset"], [asset], options)
+
+    async def buy_ip_fraction(
+        self,
+        asset: int,
+        buyer_payment: TransactionWithSigner,
+        fraction_amount: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["buy_ip_fraction"], [asset, buyer_payment, fraction_amount], options
+        )
+
+    async def buy_ip_fraction_with_proof(
+        self,
+        asset: int,
+        buyer_payment: TransactionWithSigner,
+        fraction_amount: int,
+        proof: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["buy_ip_fraction_with_proof"],
+            [asset, buyer_payment, fraction_amount, proof],
+            options,
+        )
+
+    async def atomic_swap(
+        self,
+        asset: int,
+        buyer: str,
+        seller: str,
+        amount: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["atomic_swap"], [asset, buyer, seller, amount], options)
+
+    async def atomic_swap_with_proof(
+        self,
+        asset: int,
+        buyer: str,
+        seller: str,
+        amount: int,
+        buyer_proof: bytes,
+        seller_proof: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["atomic_swap_with_proof"],
+            [asset, buyer, seller, amount, buyer_proof, seller_proof],
+            options,
+        )
+
+    async def verify_kyc(
+        self,
+        asset: int,
+        user: str,
+        is_verified: bool,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["verify_kyc"], [asset, user, is_verified], options)
+
+    async def revoke_kyc(
+        self,
+        asset: int,
+        user: str,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["revoke_kyc"], [asset, user], options)
+
+    async def verify_kyc_batch(
+        self,
+        asset: int,
+        users: list[str],
+        is_verified: bool,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(
+            METHODS["verify_kyc_batch"], [asset, users, is_verified], options
+        )
+
+    async def revoke_kyc_batch(
+        self,
+        asset: int,
+        users: list[str],
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["revoke_kyc_batch"], [asset, users], options)
+
+    async def set_kyc_merkle_root(
+        self,
+        asset: int,
+        root: bytes,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["set_kyc_merkle_root"], [asset, root], options)
+
+    async def distribute_royalty(
+        self,
+        asset: int,
+        usage_payment: TransactionWithSigner,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["distribute_royalty"], [asset, usage_payment], options)
+
+    async def set_royalty_mode(
+        self,
+        asset: int,
+        accumulate: bool,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["set_royalty_mode"], [asset, accumulate], options)
+
+    async def claim_royalties(
+        self,
+        asset: int,
+        *,
+        options: CallOptions | None = None,
+    ) -> int:
+        result: int = await self.call(METHODS["claim_royalties"], [asset], options)
+        return result
+
+    async def connect_wallet(
+        self,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["connect_wallet"], [], options)
+
+    async def delete_application(
+        self,
+        *,
+        options: CallOptions | None = None,
+    ) -> None:
+        await self.call(METHODS["delete_application"], [], options)
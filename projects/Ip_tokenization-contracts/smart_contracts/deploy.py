@@ -1,121 +1,99 @@
-from algosdk.v2client import algod, kmd
-from algosdk import account, mnemonic
-from algosdk import transaction
-from algosdk.atomic_transaction_composer import *
-from algosdk.abi import *
-import json
-import os
-import base64
-
-# Load the compiled contract
-with open("smart_contracts/artifacts/ip_tokens/IPTokenizationPlatform.approval.teal", "r") as f:
-    approval_program = f.read()
-
-with open("smart_contracts/artifacts/ip_tokens/IPTokenizationPlatform.clear.teal", "r") as f:
-    clear_program = f.read()
-
-# Initialize clients
-algod_address = "http://localhost:4001"
-algod_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
-algod_client = algod.AlgodClient(algod_token, algod_address)
-
-kmd_address = "http://localhost:4002"
-kmd_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
-kmd_client = kmd.KMDClient(kmd_token, kmd_address)
-
-# Get the default wallet
-wallets = kmd_client.list_wallets()
-wallet_id = None
-for wallet in wallets:
-    if wallet["name"] == "unencrypted-default-wallet":
-        wallet_id = wallet["id"]
-        break
-
-if not wallet_id:
-    raise Exception("Could not find default wallet")
-
-# Get handle for the default wallet
-wallet_handle = kmd_client.init_wallet_handle(wallet_id, "")
-
-# Get the first account from the wallet
-accounts = kmd_client.list_keys(wallet_handle)
-if not accounts:
-    raise Exception("No accounts in default wallet")
-
-sandbox_address = accounts[0]
-print(f"Using sandbox account: {sandbox_address}")
-
-# Get private key for the sandbox account
-sandbox_private_key = kmd_client.export_key(wallet_handle, "", sandbox_address)
-
-# Get suggested parameters
-params = algod_client.suggested_params()
-
-# Create a new account for deployment
-private_key, address = account.generate_account()
-print(f"Created new account: {address}")
-
-# Fund the account from the sandbox's default account
-fund_txn = transaction.PaymentTxn(
-    sender=sandbox_address,
-    sp=params,
-    receiver=address,
-    amt=1000000,  # 1 ALGO
-)
+"""Spins up a fresh IPTokenizationPlatform instance on LocalNet.
+
+Usage: python -m smart_contracts.deploy <asset_id> [royalty_percent]
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+from algosdk import abi, kmd
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
 
-# Sign and submit funding transaction
-signed_fund_txn = fund_txn.sign(sandbox_private_key)
-fund_txid = algod_client.send_transaction(signed_fund_txn)
-print(f"Submitted funding transaction: {fund_txid}")
-
-# Wait for funding transaction to be confirmed
-try:
-    fund_response = transaction.wait_for_confirmation(algod_client, fund_txid, 4)
-    print(f"Funding transaction confirmed in round {fund_response['confirmed-round']}")
-except Exception as e:
-    print(f"Error funding account: {e}")
-    exit(1)
-
-# Compile the programs
-approval_result = algod_client.compile(approval_program)
-approval_program_bytes = base64.b64decode(approval_result["result"])
-
-clear_result = algod_client.compile(clear_program)
-clear_program_bytes = base64.b64decode(clear_result["result"])
-
-print("Programs compiled successfully")
-
-# Create the application
-app_args = []
-on_complete = transaction.OnComplete.NoOpOC.real
-global_schema = transaction.StateSchema(num_uints=2, num_byte_slices=1)
-local_schema = transaction.StateSchema(num_uints=0, num_byte_slices=0)
-
-# Create the application creation transaction
-create_txn = transaction.ApplicationCreateTxn(
-    address,
-    params,
-    on_complete,
-    approval_program_bytes,
-    clear_program_bytes,
-    global_schema,
-    local_schema,
-    app_args,
+from smart_contracts._helpers.deploy_pipeline import (
+    PROGRAM_CACHE_DIR_NAME,
+    DeployPipeline,
+    PooledAlgodClient,
+    ProgramCache,
+    load_programs,
+    load_state_schema,
 )
 
-# Sign and submit the transaction
-signed_txn = create_txn.sign(private_key)
-tx_id = algod_client.send_transaction(signed_txn)
-print(f"Submitted transaction {tx_id}")
-
-# Wait for confirmation
-try:
-    transaction_response = transaction.wait_for_confirmation(algod_client, tx_id, 4)
-    print(f"Transaction confirmed in round {transaction_response['confirmed-round']}")
-    app_id = transaction_response["application-index"]
-    print(f"Created new app-id: {app_id}")
-except Exception as e:
-    print(f"Error: {e}")
-
-# Release wallet handle
-kmd_client.release_wallet_handle(wallet_handle) 
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_PATH = Path(__file__).parent / "artifacts"
+CONTRACT_NAME = "IPTokenizationPlatform"
+
+ALGOD_ADDRESS = "http://localhost:4001"
+ALGOD_TOKEN = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+KMD_ADDRESS = "http://localhost:4002"
+KMD_TOKEN = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+
+FUNDING_AMOUNT = 1_000_000  # 1 ALGO
+GLOBAL_SCHEMA, LOCAL_SCHEMA = load_state_schema(
+    ARTIFACTS_PATH / "ip_tokens" / f"{CONTRACT_NAME}.arc56.json"
+)
+CREATE_APPLICATION = abi.Method.from_signature("create_application(asset,uint64)void")
+
+
+def sandbox_account(kmd_client: kmd.KMDClient) -> tuple[str, str]:
+    """Returns the address and private key of the first LocalNet default wallet key."""
+    wallet_id = next(
+        (
+            wallet["id"]
+            for wallet in kmd_client.list_wallets()
+            if wallet["name"] == "unencrypted-default-wallet"
+        ),
+        None,
+    )
+    if not wallet_id:
+        raise Exception("Could not find default wallet")
+
+    wallet_handle = kmd_client.init_wallet_handle(wallet_id, "")
+    try:
+        accounts = kmd_client.list_keys(wallet_handle)
+        if not accounts:
+            raise Exception("No accounts in default wallet")
+        return accounts[0], kmd_client.export_key(wallet_handle, "", accounts[0])
+    finally:
+        kmd_client.release_wallet_handle(wallet_handle)
+
+
+def main(asset_id: int, royalty_percent: int) -> None:
+    algod_client = PooledAlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+    kmd_client = kmd.KMDClient(KMD_TOKEN, KMD_ADDRESS)
+
+    sandbox_address, sandbox_private_key = sandbox_account(kmd_client)
+    logger.info(f"Using sandbox account: {sandbox_address}")
+
+    approval_program, clear_program = load_programs(
+        ARTIFACTS_PATH / "ip_tokens", CONTRACT_NAME
+    )
+    pipeline = DeployPipeline(
+        algod_client, ProgramCache(ARTIFACTS_PATH / PROGRAM_CACHE_DIR_NAME)
+    )
+    try:
+        result = pipeline.deploy(
+            funder=sandbox_address,
+            funder_signer=AccountTransactionSigner(sandbox_private_key),
+            approval_teal=approval_program,
+            clear_teal=clear_program,
+            global_schema=GLOBAL_SCHEMA,
+            local_schema=LOCAL_SCHEMA,
+            funding_amount=FUNDING_AMOUNT,
+            create_method=CREATE_APPLICATION,
+            method_args=[asset_id, royalty_percent],
+        )
+    finally:
+        algod_client.close()
+    logger.info(f"Deployer account: {result.deployer_address}")
+    logger.info(f"Created new app-id: {result.app_id} ({result.app_address})")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s"
+    )
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,285 @@
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import sqlite3
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from algosdk import constants, encoding, transaction
+from algosdk.atomic_transaction_composer import (
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.v2client import indexer
+
+from smart_contracts._helpers.async_client import resign, sign_group
+from smart_contracts._helpers.submitter import TransactionSubmitter
+
+logger = logging.getLogger(__name__)
+
+INDEXER_PAGE_SIZE = 1_000
+PAYOUTS_PER_GROUP = constants.TX_GROUP_LIMIT
+# amount * balance stays exact in int64 below this; larger products use Python ints.
+_INT64_LIMIT = 2**63
+
+
+@dataclasses.dataclass(frozen=True)
+class CapTable:
+    """Every positive holding of one asset as of one round, sorted by address.
+
+    holders and balances are parallel arrays, so splits and share views are single
+    vector operations however many holders there are.
+    """
+
+    asset_id: int
+    round: int
+    holders: npt.NDArray[np.str_]
+    balances: npt.NDArray[np.uint64]
+
+    @classmethod
+    def from_balances(
+        cls,
+        asset_id: int,
+        round_: int,
+        balances: Iterable[tuple[str, int]],
+        exclude: Iterable[str] = (),
+    ) -> "CapTable":
+        """Builds a table from (address, amount) pairs, dropping exclude and zeros."""
+        excluded = set(exclude)
+        held: dict[str, int] = {}
+        for address, amount in balances:
+            if amount > 0 and address not in excluded:
+                held[address] = held.get(address, 0) + amount
+        holders = np.array(sorted(held), dtype=np.str_)
+        return cls(
+            asset_id,
+            round_,
+            holders,
+            np.array([held[address] for address in holders], dtype=np.uint64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.holders)
+
+    @property
+    def total(self) -> int:
+        return int(self.balances.sum(dtype=np.uint64))
+
+    def shares(self) -> npt.NDArray[np.float64]:
+        """Each holder's fraction of the outstanding supply, for display only."""
+        total = self.total
+        if total == 0:
+            return np.zeros(len(self), dtype=np.float64)
+        return self.balances.astype(np.float64) / total
+
+    def without(self, addresses: Iterable[str]) -> "CapTable":
+        keep = ~np.isin(self.holders, list(addresses))
+        return dataclasses.replace(
+            self, holders=self.holders[keep], balances=self.balances[keep]
+        )
+
+
+# -------------------------- Snapshots -------------------------- #
+
+
+def snapshot_from_indexer(
+    indexer_client: indexer.IndexerClient,
+    asset_id: int,
+    exclude: Iterable[str] = (),
+    page_size: int = INDEXER_PAGE_SIZE,
+) -> CapTable:
+    """Pages through an Algorand indexer's holder list for the asset.
+
+    The table's round is the indexer's current round when the first page was read.
+    """
+    balances: list[tuple[str, int]] = []
+    round_ = 0
+    next_page: str | None = None
+    while True:
+        response: dict[str, Any] = indexer_client.asset_balances(
+            asset_id, limit=page_size, next_page=next_page, min_balance=0
+        )
+        round_ = round_ or int(response["current-round"])
+        balances += [
+            (holding["address"], int(holding["amount"]))
+            for holding in response.get("balances", [])
+            if not holding.get("deleted")
+        ]
+        next_page = response.get("next-token")
+        if not next_page or not response.get("balances"):
+            break
+    return CapTable.from_balances(asset_id, round_, balances, exclude)
+
+
+def snapshot_from_db(
+    db: sqlite3.Connection | Path | str, asset_id: int, exclude: Iterable[str] = ()
+) -> CapTable:
+    """Reads the holdings table kept by indexer.Indexer, as of its checkpoint.
+
+    Pass the app's address in exclude to leave out the supply it has not sold yet.
+    """
+    connection = db if isinstance(db, sqlite3.Connection) else sqlite3.connect(db)
+    try:
+        row = connection.execute("SELECT round FROM checkpoint WHERE id = 1").fetchone()
+        rows = connection.execute(
+            "SELECT account, balance FROM holdings WHERE asset_id = ? AND balance > 0",
+            (asset_id,),
+        ).fetchall()
+    finally:
+        if connection is not db:
+            connection.close()
+    return CapTable.from_balances(asset_id, int(row[0]) if row else 0, rows, exclude)
+
+
+def snapshot_from_fake(
+    network: Any, asset_id: int, exclude: Iterable[str] = ()
+) -> CapTable:
+    """Reads holdings straight out of a fake_algod.FakeAlgod at its current round."""
+    accounts = list(network.accounts.items())
+    return CapTable.from_balances(
+        asset_id,
+        network.round,
+        (
+            (encoding.encode_address(public_key), account.assets.get(asset_id, 0))
+            for public_key, account in accounts
+        ),
+        exclude,
+    )
+
+
+# -------------------------- Royalty Split -------------------------- #
+
+
+def pro_rata(balances: npt.NDArray[np.uint64], amount: int) -> npt.NDArray[np.int64]:
+    """Splits amount over balances exactly, by the largest remainder method.
+
+    Everyone gets floor(amount * balance / total); the microAlgos left over go one each
+    to the largest remainders, ties going to the earlier holder, so the result always
+    sums to amount and is the same on every run.
+    """
+    total = int(balances.sum(dtype=np.uint64))
+    if amount < 0:
+        raise ValueError("amount must not be negative")
+    if total == 0 or amount == 0:
+        return np.zeros(len(balances), dtype=np.int64)
+    if amount * total < _INT64_LIMIT:
+        products = balances.astype(np.int64) * amount
+        payouts, remainders = np.divmod(products, total)
+    else:
+        products = balances.astype(object) * amount
+        remainders = products % total
+        payouts = (products // total).astype(np.int64)
+    leftover = amount - int(payouts.sum())
+    if leftover:
+        order = np.argsort(-remainders, kind="stable")
+        payouts[order[:leftover]] += 1
+    return payouts.astype(np.int64)
+
+
+@dataclasses.dataclass(frozen=True)
+class RoyaltySplit:
+    """One distribution of amount over a cap table.
+
+    Payouts under min_payout are withheld rather than sent, since each payment costs a
+    fee; their sum is left in unpaid for the next distribution.
+    """
+
+    cap_table: CapTable
+    amount: int
+    payouts: npt.NDArray[np.int64]
+    unpaid: int
+
+    @classmethod
+    def compute(
+        cls, cap_table: CapTable, amount: int, min_payout: int = 1
+    ) -> "RoyaltySplit":
+        payouts = pro_rata(cap_table.balances, amount)
+        withheld = payouts < min_payout
+        unpaid = int(payouts[withheld].sum())
+        payouts[withheld] = 0
+        return cls(cap_table, amount, payouts, unpaid)
+
+    def recipients(self) -> list[tuple[str, int]]:
+        """(address, microAlgos) for every holder actually paid, in holder order."""
+        paid = np.flatnonzero(self.payouts)
+        return list(
+            zip(
+                self.cap_table.holders[paid].tolist(),
+                self.payouts[paid].tolist(),
+                strict=True,
+            )
+        )
+
+
+# -------------------------- Payouts -------------------------- #
+
+
+def payout_lease(asset_id: int, round_: int, address: str) -> bytes:
+    """Leases one holder's payment for one snapshot, so it cannot be sent twice while
+    the first is still valid."""
+    return hashlib.sha256(f"royalty:{asset_id}:{round_}:{address}".encode()).digest()
+
+
+def build_payout_groups(
+    split: RoyaltySplit,
+    payer: str,
+    signer: TransactionSigner,
+    sp: transaction.SuggestedParams,
+) -> list[list[TransactionWithSigner]]:
+    """Packs one payment per recipient into groups of up to PAYOUTS_PER_GROUP."""
+    table = split.cap_table
+    note = f"royalty:{table.asset_id}:{table.round}".encode()
+    payments = [
+        TransactionWithSigner(
+            transaction.PaymentTxn(
+                payer,
+                sp,
+                address,
+                amount,
+                note=note,
+                lease=payout_lease(table.asset_id, table.round, address),
+            ),
+            signer,
+        )
+        for address, amount in split.recipients()
+    ]
+    return [
+        payments[i : i + PAYOUTS_PER_GROUP]
+        for i in range(0, len(payments), PAYOUTS_PER_GROUP)
+    ]
+
+
+@dataclasses.dataclass
+class PayoutResult:
+    paid: int = 0
+    tx_ids: list[str] = dataclasses.field(default_factory=list)
+    failed: list[tuple[list[str], str]] = dataclasses.field(default_factory=list)
+
+
+async def pay_out(
+    submitter: TransactionSubmitter,
+    split: RoyaltySplit,
+    payer: str,
+    signer: TransactionSigner,
+) -> PayoutResult:
+    """Sends every payout group concurrently; a failed group is reported, not raised."""
+    sp = await submitter.algod.suggested_params()
+    groups = build_payout_groups(split, payer, signer, sp)
+    submissions = await asyncio.gather(
+        *(submitter.submit(sign_group(group), resign(group)) for group in groups),
+        return_exceptions=True,
+    )
+    result = PayoutResult()
+    for group, submission in zip(groups, submissions, strict=True):
+        receivers = [t.txn.receiver for t in group]  # type: ignore[attr-defined]
+        if isinstance(submission, BaseException):
+            logger.error(f"Payout to {len(group)} holders failed: {submission}")
+            result.failed.append((receivers, str(submission)))
+            continue
+        result.tx_ids += submission.tx_ids
+        result.paid += sum(t.txn.amt for t in group)  # type: ignore[attr-defined]
+    return result
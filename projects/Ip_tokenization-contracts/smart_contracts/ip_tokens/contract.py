@@ -1,15 +1,76 @@
 from algopy import *
 from algopy.arc4 import abimethod
 
+# Domain separation for the KYC allowlist Merkle tree, mirrored in kyc_merkle.py.
+KYC_LEAF_PREFIX = b"\x00"
+KYC_NODE_PREFIX = b"\x01"
+# Opcode budget per proof level (extract + compare + concat + sha256) with headroom.
+KYC_PROOF_LEVEL_BUDGET = 50
+# IP metadata boxes, mirrored in metadata_store.py: chunks keyed by their sha256, and
+# one index of ordered chunk hashes per Merkle root.
+METADATA_CHUNK_PREFIX = b"mc"
+METADATA_INDEX_PREFIX = b"mi"
+
+
+# === ARC-28 Events (decoded off-chain by events.py) ===
+class AssetTokenized(arc4.Struct):
+    asset_id: arc4.UInt64
+    creator: arc4.Address
+
+
+class FractionPurchased(arc4.Struct):
+    buyer: arc4.Address
+    amount: arc4.UInt64
+    payment: arc4.UInt64
+
+
+class FractionSwapped(arc4.Struct):
+    buyer: arc4.Address
+    seller: arc4.Address
+    amount: arc4.UInt64
+
+
+class KycUpdated(arc4.Struct):
+    account: arc4.Address
+    verified: arc4.Bool
+
+
+class RoyaltyDistributed(arc4.Struct):
+    payer: arc4.Address
+    usage_amount: arc4.UInt64
+    royalty: arc4.UInt64
+    accrued: arc4.Bool
+
+
+class RoyaltiesClaimed(arc4.Struct):
+    creator: arc4.Address
+    amount: arc4.UInt64
+
+
+# === ABI Structs ===
+# One transfer in atomic_swap_netted; buyer and seller index into the call's accounts.
+class SwapLeg(arc4.Struct):
+    buyer: arc4.UInt8
+    seller: arc4.UInt8
+    amount: arc4.UInt64
+
+
 class IPTokenizationPlatform(ARC4Contract):
     # === Global State Variables ===
     assetid: UInt64
     creator_account: Account
     royalty_percent: UInt64
+    accumulate_royalties: bool
+    royalty_accrued: UInt64
+    kyc_merkle_root: Bytes
+    metadata_root: Bytes
+    metadata_size: UInt64
     kyc_verified: BoxMap[Account, bool]
+    metadata_chunks: BoxMap[Bytes, Bytes]
 
     def __init__(self) -> None:
         self.kyc_verified = BoxMap[Account, bool](Account, bool)
+        self.metadata_chunks = BoxMap(Bytes, Bytes, key_prefix=METADATA_CHUNK_PREFIX)
 
     # === Create Application ===
     @abimethod(allow_actions=["NoOp"], create="require")
@@ -17,6 +78,11 @@ class IPTokenizationPlatform(ARC4Contract):
         self.assetid = asset_id.id
         self.creator_account = Txn.sender
         self.royalty_percent = royalty_percent
+        self.accumulate_royalties = False
+        self.royalty_accrued = UInt64(0)
+        self.kyc_merkle_root = Bytes()
+        self.metadata_root = Bytes()
+        self.metadata_size = UInt64(0)
 
     # === Module 1: Tokenize IP Asset ===
     @abimethod()
@@ -32,11 +98,31 @@ class IPTokenizationPlatform(ARC4Contract):
             asset_receiver=Global.current_application_address,
             asset_amount=0,
         ).submit()
+        arc4.emit(AssetTokenized(arc4.UInt64(self.assetid), arc4.Address(Txn.sender)))
 
     # === Module 2: Marketplace: Buy Fraction ===
     @abimethod()
-    def buy_ip_fraction(self, buyer_payment: gtxn.PaymentTransaction, fraction_amount: UInt64) -> None:
+    def buy_ip_fraction(
+        self, buyer_payment: gtxn.PaymentTransaction, fraction_amount: UInt64
+    ) -> None:
         assert self.kyc_verified.get(Txn.sender, default=False)
+        self._sell_fraction(buyer_payment, fraction_amount)
+
+    # === Module 2: Marketplace: Buy Fraction (Merkle allowlist) ===
+    @abimethod()
+    def buy_ip_fraction_with_proof(
+        self,
+        buyer_payment: gtxn.PaymentTransaction,
+        fraction_amount: UInt64,
+        proof: Bytes,
+    ) -> None:
+        assert self._verify_kyc_proof(Txn.sender, proof)
+        self._sell_fraction(buyer_payment, fraction_amount)
+
+    @subroutine
+    def _sell_fraction(
+        self, buyer_payment: gtxn.PaymentTransaction, fraction_amount: UInt64
+    ) -> None:
         assert buyer_payment.receiver == Global.current_application_address
         assert buyer_payment.amount > 0
         assert fraction_amount > 0
@@ -46,14 +132,39 @@ class IPTokenizationPlatform(ARC4Contract):
             asset_receiver=Txn.sender,
             asset_amount=fraction_amount,
         ).submit()
+        arc4.emit(
+            FractionPurchased(
+                arc4.Address(Txn.sender),
+                arc4.UInt64(fraction_amount),
+                arc4.UInt64(buyer_payment.amount),
+            )
+        )
 
     # === Module 2: Marketplace: Atomic Swap ===
     @abimethod()
     def atomic_swap(self, buyer: Account, seller: Account, amount: UInt64) -> None:
-        assert self.assetid != UInt64(0)
-        assert amount > 0
         assert self.kyc_verified.get(buyer, default=False)
         assert self.kyc_verified.get(seller, default=False)
+        self._swap_fraction(buyer, seller, amount)
+
+    # === Module 2: Marketplace: Atomic Swap (Merkle allowlist) ===
+    @abimethod()
+    def atomic_swap_with_proof(
+        self,
+        buyer: Account,
+        seller: Account,
+        amount: UInt64,
+        buyer_proof: Bytes,
+        seller_proof: Bytes,
+    ) -> None:
+        assert self._verify_kyc_proof(buyer, buyer_proof)
+        assert self._verify_kyc_proof(seller, seller_proof)
+        self._swap_fraction(buyer, seller, amount)
+
+    @subroutine
+    def _swap_fraction(self, buyer: Account, seller: Account, amount: UInt64) -> None:
+        assert self.assetid != UInt64(0)
+        assert amount > 0
 
         itxn.AssetTransfer(
             xfer_asset=self.assetid,
@@ -62,18 +173,91 @@ class IPTokenizationPlatform(ARC4Contract):
             sender=seller,
             fee=1_000,
         ).submit()
+        arc4.emit(
+            FractionSwapped(
+                arc4.Address(buyer), arc4.Address(seller), arc4.UInt64(amount)
+            )
+        )
+
+    # === Module 2: Marketplace: Netted Multi-Leg Swap ===
+    # Settles a window of trades netted per account pair (see settlement.py). Each account
+    # is listed once, so its KYC box is read once however many legs it appears in; the
+    # boxes and asset holdings come from group resource sharing.
+    @abimethod()
+    def atomic_swap_netted(
+        self,
+        accounts: arc4.DynamicArray[arc4.Address],
+        legs: arc4.DynamicArray[SwapLeg],
+    ) -> None:
+        assert legs.length > 0
+        for account in accounts:
+            assert self.kyc_verified.get(account.native, default=False)
+        for i in urange(legs.length):
+            leg = legs[i].copy()
+            self._swap_fraction(
+                accounts[leg.buyer.native].native,
+                accounts[leg.seller.native].native,
+                leg.amount.native,
+            )
 
     # === Module 3: Legal Compliance: Verify KYC ===
     @abimethod()
     def verify_kyc(self, user: Account, is_verified: bool) -> None:
         assert Txn.sender == self.creator_account
         self.kyc_verified[user] = is_verified
+        arc4.emit(KycUpdated(arc4.Address(user), arc4.Bool(is_verified)))
 
     # === Module 3: Legal Compliance: Revoke KYC ===
     @abimethod()
     def revoke_kyc(self, user: Account) -> None:
         assert Txn.sender == self.creator_account
         self.kyc_verified[user] = False
+        arc4.emit(KycUpdated(arc4.Address(user), arc4.Bool(False)))
+
+    # === Module 3: Legal Compliance: Batch Verify KYC ===
+    # Every account needs a box reference; callers pack up to 8 per call (see kyc_batcher.py).
+    @abimethod()
+    def verify_kyc_batch(
+        self, users: arc4.DynamicArray[arc4.Address], is_verified: bool
+    ) -> None:
+        assert Txn.sender == self.creator_account
+        for user in users:
+            self.kyc_verified[user.native] = is_verified
+            arc4.emit(KycUpdated(user, arc4.Bool(is_verified)))
+
+    # === Module 3: Legal Compliance: Batch Revoke KYC ===
+    @abimethod()
+    def revoke_kyc_batch(self, users: arc4.DynamicArray[arc4.Address]) -> None:
+        assert Txn.sender == self.creator_account
+        for user in users:
+            self.kyc_verified[user.native] = False
+            arc4.emit(KycUpdated(user, arc4.Bool(False)))
+
+    # === Module 3: Legal Compliance: KYC Merkle Allowlist ===
+    # Stores only the root of the off-chain allowlist tree; an empty root disables proofs.
+    @abimethod()
+    def set_kyc_merkle_root(self, root: Bytes) -> None:
+        assert Txn.sender == self.creator_account
+        assert root.length == 32 or root.length == 0
+        self.kyc_merkle_root = root
+
+    @subroutine
+    def _verify_kyc_proof(self, user: Account, proof: Bytes) -> bool:
+        if self.kyc_merkle_root.length == 0 or proof.length % 32 != 0:
+            return False
+        ensure_budget(
+            (proof.length // 32 + 1) * KYC_PROOF_LEVEL_BUDGET, OpUpFeeSource.GroupCredit
+        )
+
+        # Siblings are hashed in sorted order, so the proof needs no left/right flags.
+        node = op.sha256(Bytes(KYC_LEAF_PREFIX) + user.bytes)
+        for offset in urange(0, proof.length, 32):
+            sibling = op.extract(proof, offset, 32)
+            if BigUInt.from_bytes(node) <= BigUInt.from_bytes(sibling):
+                node = op.sha256(Bytes(KYC_NODE_PREFIX) + node + sibling)
+            else:
+                node = op.sha256(Bytes(KYC_NODE_PREFIX) + sibling + node)
+        return node == self.kyc_merkle_root
 
     # === Module 4: Royalty Distribution ===
     @abimethod()
@@ -83,25 +267,123 @@ class IPTokenizationPlatform(ARC4Contract):
 
         royalty_fee = (usage_payment.amount * self.royalty_percent) // 100
 
+        # In ledger mode royalties are only recorded; claim_royalties pays them out in bulk.
+        if self.accumulate_royalties:
+            self.royalty_accrued += royalty_fee
+        else:
+            itxn.Payment(
+                receiver=self.creator_account,
+                amount=royalty_fee,
+                fee=1_000,
+            ).submit()
+        arc4.emit(
+            RoyaltyDistributed(
+                arc4.Address(usage_payment.sender),
+                arc4.UInt64(usage_payment.amount),
+                arc4.UInt64(royalty_fee),
+                arc4.Bool(self.accumulate_royalties),
+            )
+        )
+
+    # === Module 4: Royalty Distribution: Ledger Mode ===
+    @abimethod()
+    def set_royalty_mode(self, accumulate: bool) -> None:
+        assert Txn.sender == self.creator_account
+        self.accumulate_royalties = accumulate
+
+    # === Module 4: Royalty Distribution: Claim Accrued ===
+    @abimethod()
+    def claim_royalties(self) -> UInt64:
+        assert Txn.sender == self.creator_account
+        amount = self.royalty_accrued
+        assert amount > 0
+        self.royalty_accrued = UInt64(0)
+
+        # fee=0: the caller covers the inner payment through fee pooling.
         itxn.Payment(
             receiver=self.creator_account,
-            amount=royalty_fee,
-            fee=1_000,
+            amount=amount,
+            fee=0,
         ).submit()
+        arc4.emit(
+            RoyaltiesClaimed(arc4.Address(self.creator_account), arc4.UInt64(amount))
+        )
+        return amount
 
     # === Module 5: Wallet Connection (Ping) ===
     @abimethod()
     def connect_wallet(self) -> None:
         assert Txn.sender != Global.zero_address
 
-    # === Admin: Delete Application ===
-    @abimethod(allow_actions=["DeleteApplication"])
-    def delete_application(self) -> None:
+    # === Module 6: IP Metadata: Content-Addressed Chunks ===
+    # A chunk already stored (say, by an earlier version of the document) is kept as is.
+    @abimethod()
+    def put_metadata_chunk(self, chunk: Bytes) -> None:
         assert Txn.sender == self.creator_account
+        key = op.sha256(chunk)
+        if key not in self.metadata_chunks:
+            self.metadata_chunks[key] = chunk
 
+    # === Module 6: IP Metadata: Chunk Index ===
+    # Pages of the ordered chunk hashes for one root, written into a box named by it.
+    @abimethod()
+    def write_metadata_index(
+        self, root: Bytes, chunk_count: UInt64, offset: UInt64, leaves: Bytes
+    ) -> None:
+        assert Txn.sender == self.creator_account
+        assert root.length == 32
+        assert leaves.length % 32 == 0
+        index = BoxRef(key=METADATA_INDEX_PREFIX + root)
+        if not index:
+            assert index.create(size=chunk_count * 32)
+        index.replace(offset, leaves)
+
+    # === Module 6: IP Metadata: Publish ===
+    # Switches readers to a fully written index and frees the previous one.
+    @abimethod()
+    def set_metadata_root(self, root: Bytes, size: UInt64) -> None:
+        assert Txn.sender == self.creator_account
+        assert BoxRef(key=METADATA_INDEX_PREFIX + root)
+        previous = self.metadata_root
+        if previous.length == 32 and previous != root:
+            assert BoxRef(key=METADATA_INDEX_PREFIX + previous).delete()
+        self.metadata_root = root
+        self.metadata_size = size
+
+    # === Admin: Migrate to Multi-Asset Platform ===
+    # Closes this app's whole holding into a MultiAssetIPPlatform that registers the asset
+    # in the same group (see ip_tokens_multi/migrate.py). Accrued royalties must be claimed first.
+    @abimethod()
+    def migrate_to(self, target: Application) -> None:
+        assert Txn.sender == self.creator_account
+        assert self.royalty_accrued == 0
+
+        # fee=0: the caller covers the inner transfer through fee pooling.
         itxn.AssetTransfer(
             xfer_asset=self.assetid,
-            asset_receiver=self.creator_account,
+            asset_receiver=target.address,
             asset_amount=0,
-            fee=1_000,
+            asset_close_to=target.address,
+            fee=0,
         ).submit()
+
+    # === Admin: Update Application ===
+    # Only apps deployed with updatable=True (the LocalNet watch loop) accept updates.
+    @abimethod(allow_actions=["UpdateApplication"])
+    def update_application(self) -> None:
+        assert Txn.sender == self.creator_account
+        assert TemplateVar[bool]("UPDATABLE")
+
+    # === Admin: Delete Application ===
+    @abimethod(allow_actions=["DeleteApplication"])
+    def delete_application(self) -> None:
+        assert Txn.sender == self.creator_account
+
+        # A migrated app has already closed out of the asset.
+        if Global.current_application_address.is_opted_in(Asset(self.assetid)):
+            itxn.AssetTransfer(
+                xfer_asset=self.assetid,
+                asset_receiver=self.creator_account,
+                asset_amount=0,
+                fee=1_000,
+            ).submit()
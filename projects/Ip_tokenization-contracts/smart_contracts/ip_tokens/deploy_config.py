@@ -1,29 +1,116 @@
 import logging
+import os
+from pathlib import Path
 
 import algokit_utils
+from algosdk import encoding
+from algosdk.v2client import algod
+
+from smart_contracts._helpers.app_state import read_global_state
 
 logger = logging.getLogger(__name__)
 
+APP_SPEC_PATH = (
+    Path(__file__).parent.parent
+    / "artifacts"
+    / "ip_tokens"
+    / "IPTokenizationPlatform.arc56.json"
+)
+DEFAULT_ROYALTY_PERCENT = 5
 
-# define deployment behaviour based on supplied app spec
-def deploy() -> None:
-    from smart_contracts.artifacts.ip_tokens.ip_tokens_client import (
-        HelloArgs,
-        IpTokensFactory,
+# Demo assets minted by this process, by deployer, so repeated deploys reuse one.
+_demo_assets: dict[str, int] = {}
+
+
+def rejected_as_not_updatable(
+    error: Exception, updatable: bool | None, creator: str | None, sender: str
+) -> bool:
+    """Whether an update failed only because the app was deployed without UPDATABLE.
+
+    update_application asserts that the sender is the app's creator_account, then the
+    UPDATABLE template variable. When the sender is the creator, a non-updatable app
+    can only fail the second assert; anything else is a real error.
+    """
+    details = algokit_utils.parse_logic_error(str(error))
+    return (
+        updatable is False
+        and creator == sender
+        and details is not None
+        and details["message"].startswith("assert failed")
     )
 
+
+def creator_account(algod_client: algod.AlgodClient, app_id: int) -> str | None:
+    """The creator_account an app recorded at creation, which update_application checks."""
+    value = read_global_state(algod_client, app_id).get("creator_account")
+    return encoding.encode_address(value) if isinstance(value, bytes) else None
+
+
+# define deployment behaviour based on supplied app spec
+def deploy(updatable: bool = False) -> None:
+    """Deploys the platform. With updatable (used by `python -m smart_contracts watch`)
+    a changed program updates the existing app in place instead of appending a new one.
+    """
     algorand = algokit_utils.AlgorandClient.from_environment()
     deployer_ = algorand.account.from_environment("DEPLOYER")
 
-    factory = algorand.client.get_typed_app_factory(
-        IpTokensFactory, default_sender=deployer_.address
+    # The IP asset comes from IP_ASSET_ID; without one a demo asset is minted (LocalNet).
+    asset_id = int(os.environ.get("IP_ASSET_ID", 0)) or _demo_assets.get(
+        deployer_.address, 0
     )
+    if not asset_id:
+        asset_id = algorand.send.asset_create(
+            algokit_utils.AssetCreateParams(
+                sender=deployer_.address,
+                total=1_000_000,
+                decimals=0,
+                asset_name="IP Fraction",
+                unit_name="IPF",
+            )
+        ).asset_id
+        _demo_assets[deployer_.address] = asset_id
+    royalty_percent = int(os.environ.get("ROYALTY_PERCENT", DEFAULT_ROYALTY_PERCENT))
 
-    app_client, result = factory.deploy(
-        on_update=algokit_utils.OnUpdate.AppendApp,
-        on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
+    factory = algorand.client.get_app_factory(
+        app_spec=APP_SPEC_PATH.read_text(), default_sender=deployer_.address
     )
 
+    def deploy_app(
+        on_update: algokit_utils.OnUpdate,
+    ) -> tuple[algokit_utils.AppClient, algokit_utils.AppFactoryDeployResult]:
+        return factory.deploy(
+            on_update=on_update,
+            on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
+            compilation_params={"updatable": updatable},
+            create_params=algokit_utils.AppClientMethodCallCreateParams(
+                method="create_application", args=[asset_id, royalty_percent]
+            ),
+            update_params=algokit_utils.AppClientMethodCallParams(
+                method="update_application"
+            ),
+        )
+
+    if not updatable:
+        app_client, result = deploy_app(algokit_utils.OnUpdate.AppendApp)
+    else:
+        try:
+            app_client, result = deploy_app(algokit_utils.OnUpdate.UpdateApp)
+        except Exception as e:
+            existing = algorand.app_deployer.get_creator_apps_by_name(
+                creator_address=deployer_.address
+            ).apps.get(factory.app_name)
+            if existing is None or not rejected_as_not_updatable(
+                e,
+                existing.updatable,
+                creator_account(algorand.client.algod, existing.app_id),
+                deployer_.address,
+            ):
+                raise
+            # The latest app was deployed without updatable (say, by `deploy`), so
+            # update_application rejects the update; start a fresh, updatable one.
+            logger.warning(f"Could not update the existing app in place: {e}")
+            app_client, result = deploy_app(algokit_utils.OnUpdate.AppendApp)
+
     if result.operation_performed in [
         algokit_utils.OperationPerformed.Create,
         algokit_utils.OperationPerformed.Replace,
@@ -36,9 +123,10 @@ def deploy() -> None:
             )
         )
 
-    name = "world"
-    response = app_client.send.hello(args=HelloArgs(name=name))
+    app_client.send.call(
+        algokit_utils.AppClientMethodCallParams(method="connect_wallet")
+    )
     logger.info(
-        f"Called hello on {app_client.app_name} ({app_client.app_id}) "
-        f"with name={name}, received: {response.abi_return}"
+        f"Deployed {app_client.app_name} ({app_client.app_id}) for asset {asset_id} "
+        f"with {royalty_percent}% royalties; connect_wallet succeeded"
     )
@@ -0,0 +1,105 @@
+import struct
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from algosdk import encoding
+
+# Must match the event structs in contract.py and ip_tokens_multi/contract.py. Every
+# field is static, so each event decodes with one precompiled struct:
+# uint64 -> Q, address -> 32s, bool -> ?.
+EVENTS: dict[str, tuple[str, ...]] = {
+    "AssetTokenized": ("uint64", "address"),
+    "FractionPurchased": ("address", "uint64", "uint64"),
+    "FractionSwapped": ("address", "address", "uint64"),
+    "KycUpdated": ("address", "bool"),
+    "RoyaltyDistributed": ("address", "uint64", "uint64", "bool"),
+    "RoyaltiesClaimed": ("address", "uint64"),
+    # MultiAssetIPPlatform (ip_tokens_multi/contract.py) also emits AssetTokenized.
+    "AssetFractionPurchased": ("uint64", "address", "uint64", "uint64"),
+    "AssetFractionSwapped": ("uint64", "address", "address", "uint64"),
+    "ScopedKycUpdated": ("uint64", "address", "bool"),
+    "AssetRoyaltyDistributed": ("uint64", "address", "uint64", "uint64", "bool"),
+    "AssetRoyaltiesClaimed": ("uint64", "address", "uint64"),
+}
+
+_FORMATS = {"uint64": "Q", "address": "32s", "bool": "?"}
+
+Unpacker = Callable[[bytes, int], tuple[Any, ...]]
+
+
+def event_signature(name: str) -> str:
+    return f"{name}({','.join(EVENTS[name])})"
+
+
+def event_selector(name: str) -> bytes:
+    """The 4-byte ARC-28 prefix: the first bytes of sha512/256 of the signature."""
+    digest: bytes = encoding.checksum(event_signature(name).encode())
+    return digest[:4]
+
+
+def _build_decoders() -> dict[bytes, tuple[str, int, Unpacker]]:
+    decoders: dict[bytes, tuple[str, int, Unpacker]] = {}
+    for name, types in EVENTS.items():
+        layout = struct.Struct(">" + "".join(_FORMATS[t] for t in types))
+        decoders[event_selector(name)] = (name, 4 + layout.size, layout.unpack_from)
+    return decoders
+
+
+# Selector -> (event name, exact log length, unpacker), computed once at import.
+DECODERS = _build_decoders()
+SELECTORS = {name: selector for selector, (name, _, _) in DECODERS.items()}
+
+
+def decode_event(log: bytes) -> tuple[str, tuple[Any, ...]] | None:
+    """Decodes one log entry, or returns None if it is not one of our events.
+
+    Addresses stay as raw 32-byte public keys; see address_of to render them.
+    """
+    decoder = DECODERS.get(log[:4])
+    if decoder is None or len(log) != decoder[1]:
+        return None
+    return decoder[0], decoder[2](log, 4)
+
+
+def iter_events(logs: Iterable[bytes]) -> Iterator[tuple[str, tuple[Any, ...]]]:
+    """Streams (event name, field tuple) pairs from a batch of logs, skipping others.
+
+    Fields come straight out of struct.unpack_from, so no per-record objects are built
+    beyond the tuple itself; callers wanting dicts can zip with field names lazily.
+    """
+    lookup = DECODERS.get
+    for log in logs:
+        decoder = lookup(log[:4])
+        if decoder is not None and len(log) == decoder[1]:
+            yield decoder[0], decoder[2](log, 4)
+
+
+def iter_block_events(
+    block: dict[str, Any], app_id: int
+) -> Iterator[tuple[int, str, tuple[Any, ...]]]:
+    """Yields (txn index, event name, fields) for events logged by app_id in a block.
+
+    Works on the msgpack block layout streamed by indexer.AlgodBlockSource, including
+    logs from inner calls into the app.
+    """
+    header = block.get("block", block)
+    for position, stxn in enumerate(header.get("txns") or []):
+        for logs in _app_logs(stxn, app_id):
+            for name, fields in iter_events(logs):
+                yield position, name, fields
+
+
+def _app_logs(stxn: dict[str, Any], app_id: int) -> Iterator[list[bytes]]:
+    delta = stxn.get("dt") or {}
+    txn = stxn.get("txn", {})
+    # Top-level app calls carry apid; the block only records the id for creates.
+    if txn.get("type") == "appl" and (txn.get("apid") or stxn.get("apid")) == app_id:
+        logs = delta.get("lg")
+        if logs:
+            yield logs
+    for inner in delta.get("itx") or []:
+        yield from _app_logs(inner, app_id)
+
+
+def address_of(public_key: bytes) -> str:
+    return encoding.encode_address(public_key)  # type: ignore[no-any-return]
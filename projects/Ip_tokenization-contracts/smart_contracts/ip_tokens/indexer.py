@@ -0,0 +1,441 @@
+import dataclasses
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import Container, Iterable, Iterator
+from pathlib import Path
+from typing import Any, Protocol
+
+import msgpack  # type: ignore[import-untyped]
+from algosdk import abi, encoding
+from algosdk.v2client import algod
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_APP_SPEC = (
+    Path(__file__).parent.parent
+    / "artifacts"
+    / "ip_tokens"
+    / "IPTokenizationPlatform.arc56.json"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    round INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kyc (
+    account TEXT PRIMARY KEY,
+    verified INTEGER NOT NULL,
+    round INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    account TEXT NOT NULL,
+    asset_id INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    PRIMARY KEY (account, asset_id)
+);
+CREATE INDEX IF NOT EXISTS holdings_by_asset ON holdings (asset_id, balance);
+CREATE TABLE IF NOT EXISTS swaps (
+    round INTEGER NOT NULL,
+    txn_index INTEGER NOT NULL,
+    leg INTEGER NOT NULL,
+    buyer TEXT NOT NULL,
+    seller TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (round, txn_index, leg)
+);
+CREATE INDEX IF NOT EXISTS swaps_by_buyer ON swaps (buyer);
+CREATE INDEX IF NOT EXISTS swaps_by_seller ON swaps (seller);
+CREATE TABLE IF NOT EXISTS royalties (
+    round INTEGER NOT NULL,
+    txn_index INTEGER NOT NULL,
+    payer TEXT NOT NULL,
+    usage_amount INTEGER NOT NULL,
+    royalty_paid INTEGER NOT NULL,
+    accrued_after INTEGER,
+    PRIMARY KEY (round, txn_index)
+);
+"""
+
+
+# -------------------------- Block Sources -------------------------- #
+
+
+class BlockSource(Protocol):
+    """Anything that can hand out decoded blocks in order: algod or a local stand-in."""
+
+    def latest_round(self) -> int:
+        ...
+
+    def block(self, round_: int) -> dict[str, Any]:
+        """Returns the block at round_, waiting for it to be committed if necessary."""
+        ...
+
+
+class AlgodBlockSource:
+    """Streams raw msgpack blocks from algod, decoding them without a JSON round-trip."""
+
+    def __init__(self, algod_client: algod.AlgodClient) -> None:
+        self.algod_client = algod_client
+
+    def latest_round(self) -> int:
+        return int(self.algod_client.status()["last-round"])  # type: ignore[call-overload]
+
+    def block(self, round_: int) -> dict[str, Any]:
+        if self.latest_round() < round_:
+            self.algod_client.status_after_block(round_ - 1)
+        raw = self.algod_client.block_info(round_, response_format="msgpack")
+        assert isinstance(raw, bytes)
+        return decode_block(raw)
+
+
+def decode_block(raw: bytes) -> dict[str, Any]:
+    """Unpacks a msgpack block, returning logs and byte-slice state as bytes.
+
+    go-algorand declares logs and state keys/values as Go strings, so algod packs
+    them as msgpack str holding arbitrary bytes. They are unpacked losslessly with
+    surrogateescape and then turned back into bytes, or str keys for state.
+    """
+    block: dict[str, Any] = msgpack.unpackb(
+        raw, raw=False, strict_map_key=False, unicode_errors="surrogateescape"
+    )
+    header = block.get("block", block)
+    for stxn in header.get("txns") or []:
+        _restore_go_strings(stxn)
+    return block
+
+
+def _go_bytes(value: Any) -> Any:
+    return value.encode("utf-8", "surrogateescape") if isinstance(value, str) else value
+
+
+def _restore_go_strings(stxn: dict[str, Any]) -> None:
+    delta = stxn.get("dt")
+    if not delta:
+        return
+    if "lg" in delta:
+        delta["lg"] = [_go_bytes(log) for log in delta["lg"] or []]
+    if "gd" in delta:
+        global_delta: dict[str, Any] = {}
+        for key, value in (delta["gd"] or {}).items():
+            if "bs" in value:
+                value["bs"] = _go_bytes(value["bs"])
+            global_delta[_go_bytes(key).decode(errors="replace")] = value
+        delta["gd"] = global_delta
+    for inner in delta.get("itx") or []:
+        _restore_go_strings(inner)
+
+
+# -------------------------- Decoding -------------------------- #
+
+
+@dataclasses.dataclass(slots=True)
+class DecodedCall:
+    round: int
+    txn_index: int
+    method: str
+    sender: str
+    args: list[Any]
+    inner: list[dict[str, Any]]
+    global_delta: dict[str, int | bytes]
+
+
+def load_methods(app_spec_path: Path = DEFAULT_APP_SPEC) -> dict[bytes, abi.Method]:
+    """Maps 4-byte selectors to ABI methods from an ARC-56 app spec."""
+    spec = json.loads(app_spec_path.read_text())
+    methods = [abi.Method.undictify(method) for method in spec["methods"]]
+    return {method.get_selector(): method for method in methods}
+
+
+def _address(value: bytes) -> str:
+    return encoding.encode_address(value)  # type: ignore[no-any-return]
+
+
+def _decode_args(
+    method: abi.Method, txn: dict[str, Any], group: list[dict[str, Any]], position: int
+) -> list[Any]:
+    app_args: list[bytes] = txn.get("apaa", [])
+    accounts: list[bytes] = txn.get("apat", [])
+    assets: list[int] = txn.get("apas", [])
+    txn_args = sum(1 for arg in method.args if abi.is_abi_transaction_type(arg.type))
+    txn_offset = txn_args
+    values: list[Any] = []
+    arg_index = 1
+    for arg in method.args:
+        if abi.is_abi_transaction_type(arg.type):
+            values.append(group[position - txn_offset].get("txn", {}))
+            txn_offset -= 1
+            continue
+        raw = app_args[arg_index]
+        arg_index += 1
+        if isinstance(arg.type, abi.ABIType):
+            values.append(arg.type.decode(raw))
+        elif arg.type == abi.ABIReferenceType.ACCOUNT:
+            index = raw[0]
+            values.append(_address(txn["snd"] if index == 0 else accounts[index - 1]))
+        elif arg.type == abi.ABIReferenceType.ASSET:
+            values.append(assets[raw[0]])
+        else:
+            values.append(raw[0])
+    return values
+
+
+def _global_delta(delta: dict[str, Any]) -> dict[str, int | bytes]:
+    decoded: dict[str, int | bytes] = {}
+    for name, value in (delta.get("gd") or {}).items():
+        # action 1 sets bytes, 2 sets a uint, 3 deletes.
+        if value.get("at") == 1:
+            decoded[name] = value.get("bs", b"")
+        elif value.get("at") == 2:
+            decoded[name] = int(value.get("ui", 0))
+    return decoded
+
+
+def iter_app_calls(
+    block: dict[str, Any], app_id: int, methods: dict[bytes, abi.Method]
+) -> Iterator[DecodedCall]:
+    """Yields every decodable ABI call to app_id in a block, in block order."""
+    header = block.get("block", block)
+    round_ = int(header.get("rnd", 0))
+    txns: list[dict[str, Any]] = header.get("txns") or []
+    group_start = 0
+    for position, stxn in enumerate(txns):
+        txn = stxn.get("txn", {})
+        group = txn.get("grp")
+        previous_group = (
+            txns[position - 1].get("txn", {}).get("grp") if position else None
+        )
+        if group is None or group != previous_group:
+            group_start = position
+        if txn.get("type") != "appl" or txn.get("apid") != app_id:
+            continue
+        app_args = txn.get("apaa") or []
+        method = methods.get(app_args[0][:4]) if app_args else None
+        if method is None:
+            continue
+        delta = stxn.get("dt") or {}
+        yield DecodedCall(
+            round=round_,
+            txn_index=position,
+            method=method.name,
+            sender=_address(txn["snd"]),
+            args=_decode_args(
+                method, txn, txns[group_start : position + 1], position - group_start
+            ),
+            inner=[inner.get("txn", {}) for inner in delta.get("itx") or []],
+            global_delta=_global_delta(delta),
+        )
+
+
+def iter_balance_changes(
+    block: dict[str, Any], asset_ids: Container[int] | None = None
+) -> Iterator[tuple[str, int, int]]:
+    """Yields (account, asset_id, delta) for every asset creation and transfer in a block.
+
+    Top-level and inner transactions both count. A creation credits the creator with
+    the total supply, a clawback debits asnd, and a close-out moves the closing amount
+    algod records in the apply data (aca). asset_ids limits the assets reported.
+    """
+    header = block.get("block", block)
+    yield from _balance_changes(header.get("txns") or [], asset_ids)
+
+
+def _balance_changes(
+    stxns: Iterable[dict[str, Any]], asset_ids: Container[int] | None
+) -> Iterator[tuple[str, int, int]]:
+    for stxn in stxns:
+        txn = stxn.get("txn", {})
+        kind = txn.get("type")
+        if kind == "acfg" and not txn.get("caid") and stxn.get("caid"):
+            asset_id = int(stxn["caid"])
+            total = int(txn.get("apar", {}).get("t", 0))
+            if total and (asset_ids is None or asset_id in asset_ids):
+                yield _address(txn["snd"]), asset_id, total
+        elif kind == "axfer":
+            asset_id = int(txn.get("xaid", 0))
+            if asset_ids is None or asset_id in asset_ids:
+                source = _address(txn.get("asnd") or txn["snd"])
+                if amount := int(txn.get("aamt", 0)):
+                    yield source, asset_id, -amount
+                    yield _address(txn.get("arcv", bytes(32))), asset_id, amount
+                if "aclose" in txn and (closed := int(stxn.get("aca", 0))):
+                    yield source, asset_id, -closed
+                    yield _address(txn["aclose"]), asset_id, closed
+        yield from _balance_changes((stxn.get("dt") or {}).get("itx") or [], asset_ids)
+
+
+# -------------------------- Indexer -------------------------- #
+
+
+class Indexer:
+    """Maintains SQLite tables of holdings, KYC status, swaps and royalties for one app.
+
+    KYC, swaps and royalties come from the app's calls. Holdings come from every asset
+    creation and transfer in the chain, app-mediated or not, so they are exact when
+    indexing starts at round 1 (the default for a new database); pass asset_ids to
+    keep only the app's asset. Rows are coalesced in memory and written once per batch
+    of blocks, in the same transaction as the checkpoint, so a restart resumes exactly
+    after the last batch.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str,
+        source: BlockSource,
+        app_id: int,
+        methods: dict[bytes, abi.Method] | None = None,
+        batch_blocks: int = 100,
+        asset_ids: Iterable[int] | None = None,
+    ) -> None:
+        self.source = source
+        self.app_id = app_id
+        self.methods = methods if methods is not None else load_methods()
+        self.batch_blocks = batch_blocks
+        self.asset_ids = None if asset_ids is None else frozenset(asset_ids)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._reset_buffers()
+
+    def _reset_buffers(self) -> None:
+        self._kyc: dict[str, tuple[int, int]] = {}
+        self._holdings: dict[tuple[str, int], int] = {}
+        self._swaps: list[tuple[int, int, int, str, str, int]] = []
+        self._royalties: list[tuple[int, int, str, int, int, int | None]] = []
+        self._pending_blocks = 0
+
+    @property
+    def checkpoint(self) -> int:
+        row = self.db.execute("SELECT round FROM checkpoint WHERE id = 1").fetchone()
+        return int(row[0]) if row else 0
+
+    # Handlers receive a decoded call and stage rows for the next flush.
+
+    def _apply(self, call: DecodedCall) -> None:
+        match call.method:
+            case "verify_kyc":
+                account, is_verified = call.args
+                self._kyc[account] = (int(is_verified), call.round)
+            case "revoke_kyc":
+                self._kyc[call.args[0]] = (0, call.round)
+            case "verify_kyc_batch":
+                accounts, is_verified = call.args
+                for account in accounts:
+                    self._kyc[account] = (int(is_verified), call.round)
+            case "revoke_kyc_batch":
+                for account in call.args[0]:
+                    self._kyc[account] = (0, call.round)
+            case "atomic_swap" | "atomic_swap_with_proof":
+                buyer, seller, amount = call.args[:3]
+                self._swaps.append(
+                    (call.round, call.txn_index, 0, buyer, seller, amount)
+                )
+            case "atomic_swap_netted":
+                accounts, legs = call.args
+                for leg, (buyer, seller, amount) in enumerate(legs):
+                    self._swaps.append(
+                        (
+                            call.round,
+                            call.txn_index,
+                            leg,
+                            accounts[buyer],
+                            accounts[seller],
+                            amount,
+                        )
+                    )
+            case "distribute_royalty":
+                usage_payment = call.args[0]
+                paid = sum(
+                    int(inner.get("amt", 0))
+                    for inner in call.inner
+                    if inner.get("type") == "pay"
+                )
+                accrued = call.global_delta.get("royalty_accrued")
+                self._royalties.append(
+                    (
+                        call.round,
+                        call.txn_index,
+                        _address(usage_payment["snd"]),
+                        int(usage_payment.get("amt", 0)),
+                        paid,
+                        accrued if isinstance(accrued, int) else None,
+                    )
+                )
+
+    def process_block(self, block: dict[str, Any]) -> int:
+        """Stages every call to the app in a block; returns how many were decoded."""
+        count = 0
+        for call in iter_app_calls(block, self.app_id, self.methods):
+            self._apply(call)
+            count += 1
+        for account, asset_id, delta in iter_balance_changes(block, self.asset_ids):
+            key = (account, asset_id)
+            self._holdings[key] = self._holdings.get(key, 0) + delta
+        self._pending_blocks += 1
+        return count
+
+    def flush(self, round_: int) -> None:
+        """Writes staged rows and the checkpoint in one transaction."""
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO kyc (account, verified, round) VALUES (?, ?, ?) "
+                "ON CONFLICT (account) DO UPDATE SET verified = excluded.verified, "
+                "round = excluded.round",
+                [
+                    (account, verified, r)
+                    for account, (verified, r) in self._kyc.items()
+                ],
+            )
+            self.db.executemany(
+                "INSERT INTO holdings (account, asset_id, balance) VALUES (?, ?, ?) "
+                "ON CONFLICT (account, asset_id) DO UPDATE SET "
+                "balance = balance + excluded.balance",
+                [
+                    (account, asset_id, delta)
+                    for (account, asset_id), delta in self._holdings.items()
+                ],
+            )
+            # Drop rows for accounts that sent or closed out their whole balance.
+            self.db.executemany(
+                "DELETE FROM holdings WHERE account = ? AND asset_id = ? AND balance = 0",
+                list(self._holdings),
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO swaps VALUES (?, ?, ?, ?, ?, ?)", self._swaps
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO royalties VALUES (?, ?, ?, ?, ?, ?)",
+                self._royalties,
+            )
+            self.db.execute(
+                "INSERT INTO checkpoint (id, round) VALUES (1, ?) "
+                "ON CONFLICT (id) DO UPDATE SET round = excluded.round",
+                (round_,),
+            )
+        self._reset_buffers()
+
+    def run(
+        self, stop: threading.Event | None = None, until_round: int | None = None
+    ) -> int:
+        """Follows the chain from the checkpoint, returning the last round indexed.
+
+        Writes are flushed every batch_blocks blocks while catching up and after every
+        block once at the tip, so queries lag the chain by at most one block there.
+        """
+        stop = stop or threading.Event()
+        next_round = self.checkpoint + 1
+        latest = self.source.latest_round()
+        while not stop.is_set() and (until_round is None or next_round <= until_round):
+            block = self.source.block(next_round)
+            self.process_block(block)
+            latest = max(latest, next_round)
+            if self._pending_blocks >= self.batch_blocks or next_round >= latest:
+                self.flush(next_round)
+                latest = self.source.latest_round()
+            next_round += 1
+        if self._pending_blocks:
+            self.flush(next_round - 1)
+        return next_round - 1
@@ -0,0 +1,196 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from algosdk import abi, constants, encoding, transaction
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    TransactionSigner,
+)
+from algosdk.v2client import algod
+
+logger = logging.getLogger(__name__)
+
+# Each account written by a batch call needs its own box reference, and a transaction
+# carries at most 8 resource references, so 8 accounts per call is the tightest packing.
+ACCOUNTS_PER_CALL = 8
+MAX_GROUP_SIZE = constants.TX_GROUP_LIMIT
+ACCOUNTS_PER_GROUP = ACCOUNTS_PER_CALL * MAX_GROUP_SIZE
+
+KYC_BOX_PREFIX = b"kyc_verified"
+
+VERIFY_KYC_BATCH = abi.Method.from_signature("verify_kyc_batch(address[],bool)void")
+REVOKE_KYC_BATCH = abi.Method.from_signature("revoke_kyc_batch(address[])void")
+
+
+def kyc_box_name(address: str) -> bytes:
+    """Returns the kyc_verified box name for an account."""
+    public_key: bytes = encoding.decode_address(address)
+    return KYC_BOX_PREFIX + public_key
+
+
+def chunk_accounts(accounts: Sequence[str]) -> list[list[str]]:
+    """Splits accounts into chunks that each fill one atomic group."""
+    return [
+        list(accounts[i : i + ACCOUNTS_PER_GROUP])
+        for i in range(0, len(accounts), ACCOUNTS_PER_GROUP)
+    ]
+
+
+# -------------------------- Checkpointing -------------------------- #
+
+
+@dataclasses.dataclass
+class KycCheckpoint:
+    """Records which chunks of a KYC run have been confirmed, so a failed run can resume."""
+
+    path: Path
+    fingerprint: str
+    completed: set[int] = dataclasses.field(default_factory=set)
+    _lock: threading.Lock = dataclasses.field(
+        default_factory=threading.Lock, repr=False
+    )
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str) -> "KycCheckpoint":
+        """Loads a checkpoint, discarding it if it belongs to a different run."""
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        if data.get("fingerprint") != fingerprint:
+            return cls(path=path, fingerprint=fingerprint)
+        return cls(path=path, fingerprint=fingerprint, completed=set(data["completed"]))
+
+    def mark_completed(self, chunk_index: int) -> None:
+        with self._lock:
+            self.completed.add(chunk_index)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps(
+                    {
+                        "fingerprint": self.fingerprint,
+                        "completed": sorted(self.completed),
+                    }
+                )
+            )
+            os.replace(tmp_path, self.path)
+
+
+def run_fingerprint(
+    app_id: int, method: abi.Method, accounts: Sequence[str], is_verified: bool
+) -> str:
+    """Identifies a run by its target app, method, flag and exact account list."""
+    digest = hashlib.sha256(f"{app_id}:{method.get_signature()}:{is_verified}".encode())
+    for address in accounts:
+        digest.update(encoding.decode_address(address))
+    return digest.hexdigest()
+
+
+# -------------------------- Batching -------------------------- #
+
+
+@dataclasses.dataclass
+class KycBatchResult:
+    submitted: list[int] = dataclasses.field(default_factory=list)
+    skipped: list[int] = dataclasses.field(default_factory=list)
+    failed: dict[int, str] = dataclasses.field(default_factory=dict)
+    tx_ids: dict[int, list[str]] = dataclasses.field(default_factory=dict)
+
+
+def build_kyc_group(
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    sp: transaction.SuggestedParams,
+    accounts: Sequence[str],
+    is_verified: bool = True,
+) -> AtomicTransactionComposer:
+    """Packs up to ACCOUNTS_PER_GROUP accounts into one group of batch KYC calls."""
+    if len(accounts) > ACCOUNTS_PER_GROUP:
+        raise Exception(f"A KYC group holds at most {ACCOUNTS_PER_GROUP} accounts")
+    atc = AtomicTransactionComposer()
+    for i in range(0, len(accounts), ACCOUNTS_PER_CALL):
+        batch = list(accounts[i : i + ACCOUNTS_PER_CALL])
+        boxes = [(app_id, kyc_box_name(address)) for address in batch]
+        if is_verified:
+            method, args = VERIFY_KYC_BATCH, [batch, True]
+        else:
+            method, args = REVOKE_KYC_BATCH, [batch]
+        atc.add_method_call(
+            app_id=app_id,
+            method=method,
+            sender=sender,
+            sp=sp,
+            signer=signer,
+            method_args=args,
+            boxes=boxes,
+        )
+    return atc
+
+
+def set_kyc_bulk(
+    algod_client: algod.AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    accounts: Sequence[str],
+    is_verified: bool = True,
+    checkpoint_path: Path | None = None,
+    max_in_flight: int = 4,
+    wait_rounds: int = 4,
+) -> KycBatchResult:
+    """Verifies (or revokes) KYC for many accounts in maximally packed atomic groups.
+
+    With a checkpoint_path, confirmed chunks are recorded as they land and skipped when
+    the same run is started again, so a failed run resumes where it stopped.
+    """
+    method = VERIFY_KYC_BATCH if is_verified else REVOKE_KYC_BATCH
+    chunks = chunk_accounts(accounts)
+    checkpoint = (
+        KycCheckpoint.load(
+            checkpoint_path, run_fingerprint(app_id, method, accounts, is_verified)
+        )
+        if checkpoint_path
+        else None
+    )
+    result = KycBatchResult()
+    pending = []
+    for index in range(len(chunks)):
+        if checkpoint and index in checkpoint.completed:
+            result.skipped.append(index)
+        else:
+            pending.append(index)
+
+    # One suggested params fetch covers the whole run; the validity window is 1000 rounds.
+    sp = algod_client.suggested_params()
+
+    def submit(index: int) -> None:
+        atc = build_kyc_group(app_id, sender, signer, sp, chunks[index], is_verified)
+        response = atc.execute(algod_client, wait_rounds)
+        result.tx_ids[index] = list(response.tx_ids)
+        if checkpoint:
+            checkpoint.mark_completed(index)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = {index: pool.submit(submit, index) for index in pending}
+        for index, future in futures.items():
+            try:
+                future.result()
+                result.submitted.append(index)
+            except Exception as e:
+                logger.error(f"KYC chunk {index} failed: {e}")
+                result.failed[index] = str(e)
+
+    logger.info(
+        f"KYC {'verify' if is_verified else 'revoke'}: "
+        f"{len(result.submitted)} chunks submitted, {len(result.skipped)} skipped, "
+        f"{len(result.failed)} failed"
+    )
+    return result
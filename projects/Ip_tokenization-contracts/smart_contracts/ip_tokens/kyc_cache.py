@@ -0,0 +1,253 @@
+import asyncio
+import dataclasses
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, Generic, TypeVar
+
+from algosdk import encoding, logic
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts.ip_tokens.events import address_of, iter_block_events
+from smart_contracts.ip_tokens.kyc_batcher import kyc_box_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 100_000
+# KYC status rarely changes and block feeds push updates; holdings move on every trade.
+KYC_TTL = 60.0
+HOLDING_TTL = 5.0
+# A cached answer that would reject a call is re-read if it is older than this, so a
+# just-verified buyer or a fresh top-up is never turned away for long.
+RECHECK_AGE = 1.0
+MAX_CONCURRENT_READS = 32
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class PrecheckFailed(Exception):
+    """A call the chain would reject, refused before anything was signed or sent."""
+
+
+@dataclasses.dataclass(slots=True)
+class CacheEntry(Generic[V]):
+    value: V
+    stored_at: float
+
+
+class TtlLruCache(Generic[K, V]):
+    """An LRU cache whose entries also expire ttl seconds after they were stored."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, CacheEntry[V]] = OrderedDict()
+
+    def get(self, key: K, max_age: float | None = None) -> CacheEntry[V] | None:
+        """The live entry for key, if any; max_age can demand a fresher one."""
+        entry = self._entries.get(key)
+        age = self.clock() - entry.stored_at if entry is not None else 0.0
+        if entry is None or age > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        if max_age is not None and age > max_age:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: K, value: V) -> None:
+        self._entries[key] = CacheEntry(value, self.clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MarketplaceCache:
+    """Read-through cache of one app's kyc_verified boxes and its asset's holdings.
+
+    Reads for the same key share one algod request, and all reads are capped at
+    max_concurrent_reads. Entries expire by TTL, or sooner when apply_block or
+    apply_event sees a change. check_buy and check_swap raise PrecheckFailed for
+    calls that would fail the contract's asserts, but only after re-reading any
+    cached answer older than RECHECK_AGE.
+    """
+
+    def __init__(
+        self,
+        algod: AsyncAlgodClient,
+        app_id: int,
+        asset_id: int,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        kyc_ttl: float = KYC_TTL,
+        holding_ttl: float = HOLDING_TTL,
+        max_concurrent_reads: int = MAX_CONCURRENT_READS,
+    ) -> None:
+        self.algod = algod
+        self.app_id = app_id
+        self.asset_id = asset_id
+        self.app_address: str = logic.get_application_address(app_id)
+        self.kyc: TtlLruCache[str, bool] = TtlLruCache(max_entries, kyc_ttl)
+        # None means the account is not opted in to the asset.
+        self.holdings: TtlLruCache[str, int | None] = TtlLruCache(
+            max_entries, holding_ttl
+        )
+        self.last_round = 0
+        self._reads = asyncio.Semaphore(max_concurrent_reads)
+        self._loading: dict[tuple[str, str], asyncio.Future[Any]] = {}
+
+    # -------------------------- Reads -------------------------- #
+
+    async def is_kyc_verified(self, address: str, max_age: float | None = None) -> bool:
+        return await self._read(  # type: ignore[no-any-return]
+            self.kyc, "kyc", address, max_age, self._fetch_kyc
+        )
+
+    async def holding(self, address: str, max_age: float | None = None) -> int | None:
+        """The account's asset balance, or None if it is not opted in."""
+        return await self._read(  # type: ignore[no-any-return]
+            self.holdings, "holding", address, max_age, self._fetch_holding
+        )
+
+    async def _fetch_kyc(self, address: str) -> bool:
+        value = await self.algod.application_box(self.app_id, kyc_box_name(address))
+        return value is not None and any(value)
+
+    async def _fetch_holding(self, address: str) -> int | None:
+        return await self.algod.asset_holding(address, self.asset_id)
+
+    async def _read(
+        self,
+        cache: TtlLruCache[str, Any],
+        kind: str,
+        address: str,
+        max_age: float | None,
+        fetch: Callable[[str], Awaitable[Any]],
+    ) -> Any:
+        entry = cache.get(address, max_age)
+        if entry is not None:
+            return entry.value
+        key = (kind, address)
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(cache, address, fetch))
+            self._loading[key] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(key, None))
+        return await asyncio.shield(loading)
+
+    async def _load(
+        self,
+        cache: TtlLruCache[str, Any],
+        address: str,
+        fetch: Callable[[str], Awaitable[Any]],
+    ) -> Any:
+        async with self._reads:
+            value = await fetch(address)
+        cache.put(address, value)
+        return value
+
+    async def prefetch(self, addresses: Iterable[str], holdings: bool = False) -> None:
+        """Loads KYC status (and optionally holdings) for many accounts concurrently."""
+        reads: list[Awaitable[Any]] = []
+        for address in dict.fromkeys(addresses):
+            reads.append(self.is_kyc_verified(address))
+            if holdings:
+                reads.append(self.holding(address))
+        await asyncio.gather(*reads)
+
+    # -------------------------- Invalidation -------------------------- #
+
+    def invalidate(self, address: str) -> None:
+        self.kyc.invalidate(address)
+        self.holdings.invalidate(address)
+
+    def apply_event(self, name: str, fields: tuple[Any, ...]) -> None:
+        """Folds one decoded contract event (see events.iter_events) into the cache."""
+        if name == "KycUpdated":
+            account, verified = fields
+            self.kyc.put(address_of(account), verified)
+        elif name == "FractionPurchased":
+            self.holdings.invalidate(address_of(fields[0]))
+            self.holdings.invalidate(self.app_address)
+        elif name == "FractionSwapped":
+            self.holdings.invalidate(address_of(fields[0]))
+            self.holdings.invalidate(address_of(fields[1]))
+
+    def apply_block(self, block: dict[str, Any]) -> None:
+        """Applies a raw msgpack block, as streamed by indexer.AlgodBlockSource.
+
+        KYC updates are taken from the app's events; holdings touched by any top-level
+        transfer of the asset are dropped and re-read on next use.
+        """
+        header = block.get("block", block)
+        for _, name, fields in iter_block_events(block, self.app_id):
+            self.apply_event(name, fields)
+        for stxn in header.get("txns") or []:
+            txn = stxn.get("txn", {})
+            if txn.get("type") != "axfer" or txn.get("xaid") != self.asset_id:
+                continue
+            for field in ("snd", "arcv", "asnd", "aclose"):
+                if field in txn:
+                    self.holdings.invalidate(encoding.encode_address(txn[field]))
+        self.last_round = max(self.last_round, int(header.get("rnd", 0)))
+
+    # -------------------------- Prechecks -------------------------- #
+
+    async def _require_kyc(self, address: str, role: str) -> None:
+        if await self.is_kyc_verified(address):
+            return
+        if not await self.is_kyc_verified(address, max_age=RECHECK_AGE):
+            raise PrecheckFailed(f"{role} {address} is not KYC verified")
+
+    async def _require_holding(self, address: str, amount: int, role: str) -> None:
+        held = await self.holding(address)
+        if held is not None and held >= amount:
+            return
+        held = await self.holding(address, max_age=RECHECK_AGE)
+        if held is None:
+            raise PrecheckFailed(f"{role} {address} is not opted in to {self.asset_id}")
+        if held < amount:
+            raise PrecheckFailed(f"{role} {address} holds {held}, needs {amount}")
+
+    async def check_buy(self, buyer: str, amount: int) -> None:
+        """Raises PrecheckFailed if buy_ip_fraction(amount) from buyer would fail."""
+        if amount <= 0:
+            raise PrecheckFailed("fraction_amount must be positive")
+        await asyncio.gather(
+            self._require_kyc(buyer, "buyer"),
+            self._require_holding(buyer, 0, "buyer"),
+            self._require_holding(self.app_address, amount, "app"),
+        )
+
+    async def check_swap(self, buyer: str, seller: str, amount: int) -> None:
+        """Raises PrecheckFailed if atomic_swap(buyer, seller, amount) would fail."""
+        if amount <= 0:
+            raise PrecheckFailed("amount must be positive")
+        await asyncio.gather(
+            self._require_kyc(buyer, "buyer"),
+            self._require_kyc(seller, "seller"),
+            self._require_holding(buyer, 0, "buyer"),
+            self._require_holding(seller, amount, "seller"),
+        )
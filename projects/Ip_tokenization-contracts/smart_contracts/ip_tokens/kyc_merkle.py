@@ -0,0 +1,224 @@
+import hashlib
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+from algosdk import abi, encoding
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    TransactionSigner,
+)
+from algosdk.v2client import algod
+
+logger = logging.getLogger(__name__)
+
+# Must match KYC_LEAF_PREFIX / KYC_NODE_PREFIX in contract.py.
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+HASH_SIZE = 32
+
+# Revoked accounts keep their slot so other proofs stay valid; no address hashes to this.
+EMPTY_LEAF = bytes(HASH_SIZE)
+
+# save() writes one status byte and a 32-byte public key per leaf.
+RECORD_SIZE = 1 + HASH_SIZE
+
+SET_KYC_MERKLE_ROOT = abi.Method.from_signature("set_kyc_merkle_root(byte[])void")
+
+_sha256 = hashlib.sha256
+
+
+def leaf_hash(public_key: bytes) -> bytes:
+    """Hashes a 32-byte account public key into a tree leaf."""
+    return _sha256(LEAF_PREFIX + public_key).digest()
+
+
+def node_hash(a: bytes, b: bytes) -> bytes:
+    """Hashes two children in sorted order, matching the contract's proof check."""
+    return _sha256(NODE_PREFIX + a + b if a <= b else NODE_PREFIX + b + a).digest()
+
+
+def _public_key(account: str | bytes) -> bytes:
+    if isinstance(account, bytes):
+        return account
+    return encoding.decode_address(account)  # type: ignore[no-any-return]
+
+
+def verify_proof(account: str | bytes, proof: bytes, root: bytes) -> bool:
+    """Checks a proof exactly as the contract does."""
+    if len(proof) % HASH_SIZE:
+        return False
+    node = leaf_hash(_public_key(account))
+    for offset in range(0, len(proof), HASH_SIZE):
+        node = node_hash(node, proof[offset : offset + HASH_SIZE])
+    return node == root
+
+
+class KycMerkleTree:
+    """Append-only Merkle tree over KYC'd accounts with incremental updates.
+
+    Leaves keep their insertion position, so adding or revoking k accounts only rehashes
+    the k paths to the root. A level with an odd node count promotes its last node
+    unchanged, which is why proofs can be shorter than the tree height.
+    """
+
+    def __init__(self) -> None:
+        self._levels: list[list[bytes]] = [[]]
+        self._positions: dict[bytes, int] = {}
+        # Revoked accounts keep their position so re-adding them reuses the slot.
+        self._revoked = 0
+
+    @classmethod
+    def build(cls, accounts: Iterable[str | bytes]) -> "KycMerkleTree":
+        """Builds a tree from scratch, one level at a time."""
+        tree = cls()
+        leaves = tree._levels[0]
+        positions = tree._positions
+        for account in accounts:
+            public_key = _public_key(account)
+            if public_key in positions:
+                continue
+            positions[public_key] = len(leaves)
+            leaves.append(leaf_hash(public_key))
+
+        level = leaves
+        while len(level) > 1:
+            upper = [
+                node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)
+            ]
+            if len(level) % 2:
+                upper.append(level[-1])
+            tree._levels.append(upper)
+            level = upper
+        return tree
+
+    def __len__(self) -> int:
+        """The number of accounts currently in the allowlist, excluding revoked ones."""
+        return len(self._positions) - self._revoked
+
+    def __contains__(self, account: str | bytes) -> bool:
+        position = self._positions.get(_public_key(account))
+        return position is not None and self._levels[0][position] != EMPTY_LEAF
+
+    @property
+    def root(self) -> bytes:
+        """The current root, or empty bytes for an empty tree (which disables proofs)."""
+        top = self._levels[-1]
+        return top[0] if top else b""
+
+    def proof(self, account: str | bytes) -> bytes:
+        """Returns the concatenated sibling hashes from the account's leaf to the root."""
+        position = self._positions.get(_public_key(account))
+        if position is None or self._levels[0][position] == EMPTY_LEAF:
+            raise KeyError(f"{account!r} is not in the KYC allowlist")
+        siblings = []
+        for level in self._levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                siblings.append(level[sibling])
+            position //= 2
+        return b"".join(siblings)
+
+    def update(
+        self,
+        added: Iterable[str | bytes] = (),
+        revoked: Iterable[str | bytes] = (),
+    ) -> bytes:
+        """Applies a batch of additions and revocations and returns the new root."""
+        leaves = self._levels[0]
+        dirty: set[int] = set()
+        for account in added:
+            public_key = _public_key(account)
+            position = self._positions.get(public_key)
+            if position is None:
+                position = len(leaves)
+                self._positions[public_key] = position
+                leaves.append(leaf_hash(public_key))
+            else:
+                if leaves[position] == EMPTY_LEAF:
+                    self._revoked -= 1
+                leaves[position] = leaf_hash(public_key)
+            dirty.add(position)
+        for account in revoked:
+            position = self._positions.get(_public_key(account))
+            if position is not None:
+                if leaves[position] != EMPTY_LEAF:
+                    self._revoked += 1
+                leaves[position] = EMPTY_LEAF
+                dirty.add(position)
+        if dirty:
+            self._rehash(dirty)
+        return self.root
+
+    def _rehash(self, dirty: set[int]) -> None:
+        depth = 0
+        while len(self._levels[depth]) > 1:
+            level = self._levels[depth]
+            if depth + 1 == len(self._levels):
+                self._levels.append([])
+            upper = self._levels[depth + 1]
+            parents = {position // 2 for position in dirty}
+            for parent in sorted(parents):
+                left = 2 * parent
+                node = (
+                    node_hash(level[left], level[left + 1])
+                    if left + 1 < len(level)
+                    else level[left]
+                )
+                if parent < len(upper):
+                    upper[parent] = node
+                else:
+                    upper.append(node)
+            dirty = parents
+            depth += 1
+        del self._levels[depth + 1 :]
+
+    # -------------------------- Persistence -------------------------- #
+
+    def save(self, path: Path) -> None:
+        """Writes each leaf in order as a status byte (1 live, 0 revoked) and its key."""
+        records = [b""] * len(self._levels[0])
+        for public_key, position in self._positions.items():
+            live = self._levels[0][position] != EMPTY_LEAF
+            records[position] = (b"\x01" if live else b"\x00") + public_key
+        path.write_bytes(b"".join(records))
+
+    @classmethod
+    def load(cls, path: Path) -> "KycMerkleTree":
+        """Rebuilds a tree saved with save(), preserving every leaf position."""
+        data = path.read_bytes()
+        records = [data[i : i + RECORD_SIZE] for i in range(0, len(data), RECORD_SIZE)]
+        tree = cls.build(record[1:] for record in records)
+        # Revoked accounts stay in _positions so re-adding them reuses their slot.
+        revoked = {i for i, record in enumerate(records) if record[0] == 0}
+        for i in revoked:
+            tree._levels[0][i] = EMPTY_LEAF
+        tree._revoked = len(revoked)
+        if revoked:
+            tree._rehash(revoked)
+        return tree
+
+
+def rotate_root(
+    algod_client: algod.AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    root: bytes,
+    wait_rounds: int = 4,
+) -> str:
+    """Publishes a new allowlist root with a single creator call and returns its tx id."""
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=app_id,
+        method=SET_KYC_MERKLE_ROOT,
+        sender=sender,
+        sp=algod_client.suggested_params(),
+        signer=signer,
+        method_args=[root],
+    )
+    response = atc.execute(algod_client, wait_rounds)
+    logger.info(
+        f"Rotated KYC Merkle root to {root.hex()} in round {response.confirmed_round}"
+    )
+    return response.tx_ids[0]
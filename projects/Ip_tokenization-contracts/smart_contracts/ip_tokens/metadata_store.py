@@ -0,0 +1,369 @@
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import math
+import os
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+from algosdk import constants, logic, transaction
+from algosdk.atomic_transaction_composer import TransactionWithSigner
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts._helpers.async_client import (
+    AsyncAppClient,
+    CallOptions,
+    MethodSpec,
+    sign_group,
+)
+from smart_contracts.ip_tokens.kyc_cache import TtlLruCache
+
+logger = logging.getLogger(__name__)
+
+# Must match METADATA_CHUNK_PREFIX / METADATA_INDEX_PREFIX in contract.py.
+CHUNK_PREFIX = b"mc"
+INDEX_PREFIX = b"mi"
+NODE_PREFIX = b"\x01"
+HASH_SIZE = 32
+
+# An app call's arguments total at most 2048 bytes: a chunk fills one call, and an
+# index page holds as many hashes as fit beside the root, count and offset.
+CHUNK_SIZE = 2_000
+LEAVES_PER_PAGE = (2048 - 4 - (2 + HASH_SIZE) - 8 - 8 - 2) // HASH_SIZE
+# The index is one box, and a box holds at most 32 KiB.
+MAX_CHUNKS = 32_768 // HASH_SIZE
+# Each box reference buys this many bytes of box access for the whole group.
+BOX_IO_BYTES = 1_024
+MAX_REFERENCES = 8
+BOX_MBR_FLAT = 2_500
+BOX_MBR_PER_BYTE = 400
+
+PAGE_CHUNKS = 8
+DEFAULT_CACHED_CHUNKS = 4_096
+MAX_CONCURRENT_READS = 32
+
+PUT_METADATA_CHUNK = MethodSpec.from_signature("put_metadata_chunk(byte[])void")
+WRITE_METADATA_INDEX = MethodSpec.from_signature(
+    "write_metadata_index(byte[],uint64,uint64,byte[])void"
+)
+SET_METADATA_ROOT = MethodSpec.from_signature("set_metadata_root(byte[],uint64)void")
+CONNECT_WALLET = MethodSpec.from_signature("connect_wallet()void")
+
+Call = tuple[MethodSpec, list[Any], CallOptions]
+
+
+# -------------------------- Packing -------------------------- #
+
+
+def encode_metadata(fields: Mapping[str, Any]) -> bytes:
+    """Canonical JSON, so the same metadata always packs to the same root."""
+    return json.dumps(
+        fields, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def decode_metadata(data: bytes) -> dict[str, Any]:
+    return json.loads(data)  # type: ignore[no-any-return]
+
+
+def chunk_hash(chunk: bytes) -> bytes:
+    return hashlib.sha256(chunk).digest()
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    """Hashes leaves pairwise in order, carrying an odd last node up a level."""
+    if not leaves:
+        raise ValueError("A Merkle tree needs at least one leaf")
+    level = list(leaves)
+    while len(level) > 1:
+        parents = [
+            hashlib.sha256(NODE_PREFIX + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            parents.append(level[-1])
+        level = parents
+    return level[0]
+
+
+@dataclasses.dataclass(frozen=True)
+class MetadataManifest:
+    """What readers need to fetch and verify a document: its root, size and the
+    ordered hashes of its CHUNK_SIZE chunks."""
+
+    root: bytes
+    size: int
+    leaves: tuple[bytes, ...]
+
+    @property
+    def index_size(self) -> int:
+        return HASH_SIZE * len(self.leaves)
+
+    @property
+    def page_count(self) -> int:
+        return math.ceil(len(self.leaves) / PAGE_CHUNKS)
+
+
+def pack_metadata(data: bytes) -> tuple[MetadataManifest, list[bytes]]:
+    """Splits a document into chunks and builds its manifest."""
+    chunks = [data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+    chunks = chunks or [b""]
+    if len(chunks) > MAX_CHUNKS:
+        raise Exception(f"Metadata over {MAX_CHUNKS * CHUNK_SIZE} bytes")
+    leaves = tuple(chunk_hash(chunk) for chunk in chunks)
+    return MetadataManifest(merkle_root(leaves), len(data), leaves), chunks
+
+
+def box_mbr(name_length: int, size: int) -> int:
+    return BOX_MBR_FLAT + BOX_MBR_PER_BYTE * (name_length + size)
+
+
+# -------------------------- Upload -------------------------- #
+
+
+def _fill_io_budget(calls: list[Call], touched: int) -> list[Call]:
+    """Adds empty box references, then connect_wallet calls carrying more, until the
+    group can access touched bytes of boxes."""
+    needed = math.ceil(touched / BOX_IO_BYTES) - sum(len(o.boxes) for _, _, o in calls)
+    padded: list[Call] = []
+    for spec, args, options in calls:
+        spare = min(max(needed, 0), MAX_REFERENCES - len(options.boxes))
+        boxes = [*options.boxes, *[(0, b"")] * spare]
+        padded.append((spec, args, dataclasses.replace(options, boxes=boxes)))
+        needed -= spare
+    while needed > 0:
+        refs = min(needed, MAX_REFERENCES)
+        # A random note keeps identical filler calls from sharing a tx id.
+        filler = CallOptions(boxes=[(0, b"")] * refs, note=os.urandom(8))
+        padded.append((CONNECT_WALLET, [], filler))
+        needed -= refs
+    if len(padded) > constants.TX_GROUP_LIMIT:
+        raise Exception("Box access does not fit in one group")
+    return padded
+
+
+def chunk_groups(chunks: Sequence[bytes]) -> list[list[Call]]:
+    """put_metadata_chunk calls, a full group at a time."""
+    calls = [
+        _fill_io_budget(
+            [
+                (
+                    PUT_METADATA_CHUNK,
+                    [chunk],
+                    CallOptions(boxes=[(0, CHUNK_PREFIX + chunk_hash(chunk))]),
+                )
+            ],
+            len(chunk),
+        )[0]
+        for chunk in chunks
+    ]
+    return [
+        calls[i : i + constants.TX_GROUP_LIMIT]
+        for i in range(0, len(calls), constants.TX_GROUP_LIMIT)
+    ]
+
+
+def index_groups(manifest: MetadataManifest) -> list[list[Call]]:
+    """write_metadata_index calls, a page each, with enough box budget per group."""
+    name = INDEX_PREFIX + manifest.root
+    count = len(manifest.leaves)
+    calls: list[Call] = [
+        (
+            WRITE_METADATA_INDEX,
+            [
+                manifest.root,
+                count,
+                HASH_SIZE * i,
+                b"".join(manifest.leaves[i : i + LEAVES_PER_PAGE]),
+            ],
+            CallOptions(boxes=[(0, name)]),
+        )
+        for i in range(0, count, LEAVES_PER_PAGE)
+    ]
+    # Leave room for fillers if the pages alone cannot cover the box.
+    per_group = constants.TX_GROUP_LIMIT - math.ceil(
+        manifest.index_size / (BOX_IO_BYTES * MAX_REFERENCES)
+    )
+    return [
+        _fill_io_budget(calls[i : i + per_group], manifest.index_size)
+        for i in range(0, len(calls), per_group)
+    ]
+
+
+async def publish_metadata(
+    client: AsyncAppClient,
+    data: bytes,
+    max_concurrent_reads: int = MAX_CONCURRENT_READS,
+) -> MetadataManifest:
+    """Stores a document in the app's boxes and makes it the app's current metadata.
+
+    Chunks already stored are skipped. The app is funded for the boxes this adds,
+    then chunks and index pages are written in concurrent groups, and the root is
+    switched last, so readers never see a half-written document.
+    """
+    manifest, chunks = pack_metadata(data)
+    algod = client.algod
+    reads = asyncio.Semaphore(max_concurrent_reads)
+
+    async def stored(name: bytes) -> bool:
+        async with reads:
+            return await algod.application_box(client.app_id, name) is not None
+
+    unique = list({chunk_hash(chunk): chunk for chunk in chunks}.items())
+    state = await algod.application_global_state(client.app_id)
+    present = await asyncio.gather(
+        *(stored(CHUNK_PREFIX + leaf) for leaf, _ in unique),
+        stored(INDEX_PREFIX + manifest.root),
+    )
+    missing = [chunk for (_, chunk), found in zip(unique, present) if not found]
+    funding = sum(box_mbr(len(CHUNK_PREFIX) + HASH_SIZE, len(c)) for c in missing)
+    if not present[-1]:
+        funding += box_mbr(len(INDEX_PREFIX) + HASH_SIZE, manifest.index_size)
+    logger.info(
+        f"Publishing {manifest.size} bytes of metadata: {len(missing)} of "
+        f"{len(chunks)} chunks to store, root {manifest.root.hex()}"
+    )
+
+    if funding:
+        sp = await algod.suggested_params()
+        payment = transaction.PaymentTxn(
+            client.sender, sp, logic.get_application_address(client.app_id), funding
+        )
+        await client.submitter.submit(
+            sign_group([TransactionWithSigner(payment, client.signer)])
+        )
+    await asyncio.gather(*(client.call_group(g) for g in chunk_groups(missing)))
+    if not present[-1]:
+        await asyncio.gather(*(client.call_group(g) for g in index_groups(manifest)))
+
+    previous = state.get("metadata_root", b"")
+    boxes = [(0, INDEX_PREFIX + manifest.root)]
+    touched = manifest.index_size
+    if isinstance(previous, bytes) and len(previous) == HASH_SIZE:
+        if previous != manifest.root:
+            old_index = await algod.application_box(
+                client.app_id, INDEX_PREFIX + previous
+            )
+            boxes.append((0, INDEX_PREFIX + previous))
+            touched += len(old_index or b"")
+    await client.call_group(
+        _fill_io_budget(
+            [
+                (
+                    SET_METADATA_ROOT,
+                    [manifest.root, manifest.size],
+                    CallOptions(boxes=boxes),
+                )
+            ],
+            touched,
+        )
+    )
+    return manifest
+
+
+# -------------------------- Reads -------------------------- #
+
+
+class MetadataReader:
+    """Fetches an app's metadata in pages, verifying every chunk against its root.
+
+    The index is checked against the root in global state once per root, and every
+    chunk against its hash in the index. Chunks are content-addressed, so they are
+    cached (in memory, and in cache_dir if given) without ever going stale, and
+    fetches run concurrently, at most max_concurrent_reads at a time.
+    """
+
+    def __init__(
+        self,
+        algod: AsyncAlgodClient,
+        app_id: int,
+        max_entries: int = DEFAULT_CACHED_CHUNKS,
+        max_concurrent_reads: int = MAX_CONCURRENT_READS,
+        cache_dir: Path | None = None,
+    ) -> None:
+        self.algod = algod
+        self.app_id = app_id
+        self.cache_dir = cache_dir
+        self.chunks: TtlLruCache[bytes, bytes] = TtlLruCache(max_entries, math.inf)
+        self._manifests: dict[bytes, MetadataManifest] = {}
+        self._reads = asyncio.Semaphore(max_concurrent_reads)
+        self._loading: dict[bytes, asyncio.Future[bytes]] = {}
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+    async def manifest(self) -> MetadataManifest:
+        """The current manifest; its index is fetched and verified once per root."""
+        # The root can switch (deleting the old index) between our two reads; retry.
+        root = b""
+        for _ in range(2):
+            state = await self.algod.application_global_state(self.app_id)
+            value = state.get("metadata_root", b"")
+            size = state.get("metadata_size", 0)
+            if not isinstance(value, bytes) or len(value) != HASH_SIZE:
+                raise Exception(f"App {self.app_id} has no metadata")
+            root = value
+            if root in self._manifests:
+                return self._manifests[root]
+            index = await self.algod.application_box(self.app_id, INDEX_PREFIX + root)
+            if index is not None:
+                break
+        else:
+            raise Exception(f"Metadata index for {root.hex()} is missing")
+        leaves = tuple(
+            index[i : i + HASH_SIZE] for i in range(0, len(index), HASH_SIZE)
+        )
+        if merkle_root(leaves) != root:
+            raise Exception(f"Metadata index does not match root {root.hex()}")
+        manifest = MetadataManifest(root, int(size), leaves)
+        self._manifests[root] = manifest
+        return manifest
+
+    async def chunk(self, leaf: bytes) -> bytes:
+        entry = self.chunks.get(leaf)
+        if entry is not None:
+            return entry.value
+        loading = self._loading.get(leaf)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(leaf))
+            self._loading[leaf] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(leaf, None))
+        return await asyncio.shield(loading)
+
+    async def _load(self, leaf: bytes) -> bytes:
+        path = self.cache_dir / leaf.hex() if self.cache_dir is not None else None
+        chunk = path.read_bytes() if path is not None and path.is_file() else None
+        if chunk is None or chunk_hash(chunk) != leaf:
+            async with self._reads:
+                chunk = await self.algod.application_box(
+                    self.app_id, CHUNK_PREFIX + leaf
+                )
+            if chunk is None or chunk_hash(chunk) != leaf:
+                raise Exception(f"Metadata chunk {leaf.hex()} is missing or corrupt")
+            if path is not None:
+                path.write_bytes(chunk)
+        self.chunks.put(leaf, chunk)
+        return chunk
+
+    async def read(self, offset: int = 0, length: int | None = None) -> bytes:
+        """Reads a byte range of the current document, fetching only its chunks."""
+        manifest = await self.manifest()
+        end = manifest.size if length is None else min(manifest.size, offset + length)
+        if offset >= end:
+            return b""
+        first, last = offset // CHUNK_SIZE, (end - 1) // CHUNK_SIZE
+        chunks = await asyncio.gather(
+            *(self.chunk(leaf) for leaf in manifest.leaves[first : last + 1])
+        )
+        start = offset - first * CHUNK_SIZE
+        return b"".join(chunks)[start : start + end - offset]
+
+    async def read_page(self, page: int, page_chunks: int = PAGE_CHUNKS) -> bytes:
+        """One page of page_chunks chunks; see MetadataManifest.page_count."""
+        page_size = page_chunks * CHUNK_SIZE
+        return await self.read(page * page_size, page_size)
+
+    async def read_metadata(self) -> dict[str, Any]:
+        return decode_metadata(await self.read())
@@ -0,0 +1,580 @@
+"""Onboards a catalog of IP assets onto the platform, one app per asset.
+
+Usage: python -m smart_contracts.ip_tokens.onboarding <catalog.csv|.jsonl> [checkpoint]
+"""
+
+import asyncio
+import base64
+import csv
+import dataclasses
+import hashlib
+import json
+import logging
+import sys
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, TextIO
+
+from algosdk import constants, kmd, logic, transaction
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+
+from smart_contracts._helpers.app_state import decode_global_state
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts._helpers.async_client import (
+    CallOptions,
+    MethodSpec,
+    encode_app_call,
+    resign,
+    sign_group,
+)
+from smart_contracts._helpers.deploy_pipeline import (
+    PROGRAM_CACHE_DIR_NAME,
+    PooledAlgodClient,
+    ProgramCache,
+    extra_pages,
+    load_programs,
+)
+from smart_contracts._helpers.submitter import TransactionSubmitter
+from smart_contracts.deploy import (
+    ALGOD_ADDRESS,
+    ALGOD_TOKEN,
+    ARTIFACTS_PATH,
+    CONTRACT_NAME,
+    GLOBAL_SCHEMA,
+    KMD_ADDRESS,
+    KMD_TOKEN,
+    LOCAL_SCHEMA,
+    sandbox_account,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROYALTY_PERCENT = 5
+DEFAULT_WORKERS = 16
+# Asset and app creates each fill one group per batch; tokenize_asset takes two
+# transactions per asset (three with app_funding), so a batch needs two or three more.
+ASSETS_PER_BATCH = constants.TX_GROUP_LIMIT
+# Global.min_balance + Global.asset_opt_in_min_balance, as tokenize_asset asserts.
+TOKENIZE_MBR = 200_000
+
+# Asset params are capped in bytes by the protocol.
+MAX_ASSET_NAME = 32
+MAX_UNIT_NAME = 8
+MAX_URL = 96
+
+MARKER_PREFIX = "ip-onboarding:"
+ASSET_ID_KEY = "assetid"
+
+CREATE_APPLICATION = MethodSpec.from_signature("create_application(asset,uint64)void")
+TOKENIZE_ASSET = MethodSpec.from_signature("tokenize_asset(pay)void")
+
+
+# -------------------------- Catalog -------------------------- #
+
+
+@dataclasses.dataclass(frozen=True)
+class CatalogEntry:
+    """One IP asset to onboard; key identifies it across runs (a patent number, say)."""
+
+    key: str
+    name: str
+    unit_name: str
+    total: int
+    decimals: int = 0
+    url: str = ""
+    royalty_percent: int = DEFAULT_ROYALTY_PERCENT
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[str, Any]) -> "CatalogEntry":
+        """Parses a CSV row or JSON object; blank optional fields get their defaults."""
+
+        def optional(name: str, default: Any) -> Any:
+            value = fields.get(name)
+            return default if value is None or value == "" else value
+
+        entry = cls(
+            key=str(fields["key"]).strip(),
+            name=str(fields["name"]),
+            unit_name=str(fields["unit_name"]),
+            total=int(fields["total"]),
+            decimals=int(optional("decimals", 0)),
+            url=str(optional("url", "")),
+            royalty_percent=int(optional("royalty_percent", DEFAULT_ROYALTY_PERCENT)),
+        )
+        if not entry.key:
+            raise ValueError("key must not be empty")
+        if len(entry.name.encode()) > MAX_ASSET_NAME:
+            raise ValueError(f"name is over {MAX_ASSET_NAME} bytes")
+        if len(entry.unit_name.encode()) > MAX_UNIT_NAME:
+            raise ValueError(f"unit_name is over {MAX_UNIT_NAME} bytes")
+        if len(entry.url.encode()) > MAX_URL:
+            raise ValueError(f"url is over {MAX_URL} bytes")
+        if entry.total <= 0 or not 0 <= entry.decimals <= 19:
+            raise ValueError("total must be positive and decimals 0 to 19")
+        if not 0 <= entry.royalty_percent <= 100:
+            raise ValueError("royalty_percent must be 0 to 100")
+        return entry
+
+    @property
+    def marker(self) -> bytes:
+        """Set as the asset's metadata hash, so the asset can be found on chain even if
+        the checkpoint never heard it was created."""
+        return hashlib.sha256(f"{MARKER_PREFIX}{self.key}".encode()).digest()
+
+
+def read_catalog(path: Path) -> Iterator[CatalogEntry]:
+    """Streams entries from a CSV with a header row, or from JSONL (.jsonl, .ndjson)."""
+    seen: set[str] = set()
+    with path.open(newline="") as stream:
+        for line, fields in _catalog_rows(path, stream):
+            try:
+                entry = CatalogEntry.from_fields(fields)
+            except (KeyError, TypeError, ValueError) as e:
+                raise Exception(f"{path}:{line}: invalid entry: {e}") from e
+            if entry.key in seen:
+                raise Exception(f"{path}:{line}: duplicate key {entry.key}")
+            seen.add(entry.key)
+            yield entry
+
+
+def _catalog_rows(
+    path: Path, stream: TextIO
+) -> Iterator[tuple[int, Mapping[str, Any]]]:
+    if path.suffix in (".jsonl", ".ndjson"):
+        for line, text in enumerate(stream, start=1):
+            if text.strip():
+                yield line, json.loads(text)
+        return
+    reader = csv.DictReader(stream)
+    for fields in reader:
+        yield reader.line_num, fields
+
+
+# -------------------------- Checkpointing -------------------------- #
+
+
+@dataclasses.dataclass
+class OnboardedAsset:
+    key: str
+    asset_id: int = 0
+    app_id: int = 0
+    tokenized: bool = False
+
+
+class OnboardingCheckpoint:
+    """Records each confirmed step of an onboarding run, so a failed run can resume.
+
+    Unlike KycCheckpoint, which rewrites its file per chunk, this appends one JSON line
+    per step, so writes stay cheap for catalogs of any size; the last line for a key
+    wins, and a line torn by a crash is ignored.
+    """
+
+    def __init__(
+        self, path: Path, fingerprint: str, assets: dict[str, OnboardedAsset]
+    ) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.assets = assets
+        self._file: TextIO | None = None
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str) -> "OnboardingCheckpoint":
+        """Loads a checkpoint; one from another network or creator is an error, since
+        starting over there would create every asset again."""
+        assets: dict[str, OnboardedAsset] = {}
+        try:
+            text = path.read_text()
+        except FileNotFoundError:
+            text = ""
+        lines = text.splitlines()
+        if lines:
+            header = json.loads(lines[0])
+            if header.get("fingerprint") != fingerprint:
+                raise Exception(
+                    f"Checkpoint {path} belongs to a different network or creator"
+                )
+        for line in lines[1:]:
+            try:
+                asset = OnboardedAsset(**json.loads(line))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring a torn line in checkpoint {path}")
+                continue
+            assets[asset.key] = asset
+        checkpoint = cls(path, fingerprint, assets)
+        if text and not text.endswith("\n"):
+            # End the torn line, so the next record starts a line of its own.
+            checkpoint._write("\n")
+        if not lines:
+            checkpoint._append({"fingerprint": fingerprint})
+        return checkpoint
+
+    def get(self, key: str) -> OnboardedAsset:
+        return dataclasses.replace(self.assets.get(key) or OnboardedAsset(key))
+
+    def record(self, asset: OnboardedAsset) -> None:
+        self.assets[asset.key] = dataclasses.replace(asset)
+        self._append(dataclasses.asdict(asset))
+
+    def _append(self, line: Mapping[str, Any]) -> None:
+        self._write(json.dumps(line) + "\n")
+
+    def _write(self, text: str) -> None:
+        if self._file is None:
+            self._file = self.path.open("a")
+        self._file.write(text)
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def run_fingerprint(genesis_hash: str, creator: str) -> str:
+    """Identifies a run by its network and creator account."""
+    return hashlib.sha256(f"{genesis_hash}:{creator}".encode()).hexdigest()
+
+
+# -------------------------- Onboarding -------------------------- #
+
+
+@dataclasses.dataclass
+class OnboardingResult:
+    onboarded: list[OnboardedAsset] = dataclasses.field(default_factory=list)
+    skipped: int = 0
+    failed: dict[str, str] = dataclasses.field(default_factory=dict)
+
+
+Batch = list[tuple[CatalogEntry, OnboardedAsset]]
+
+
+class OnboardingPipeline:
+    """Creates the ASA, the platform app and the tokenize_asset opt-in for each entry.
+
+    Entries are streamed in batches of ASSETS_PER_BATCH, and up to workers batches are
+    in flight at once. Each batch creates its assets in one group, then its apps in
+    another, then tokenizes them two transactions per asset. Every confirmed step is
+    checkpointed. On start, the creator's account is also read for assets (matched by
+    CatalogEntry.marker) and apps (by their asset id) made by earlier runs, so even a
+    crash between a confirmation and its checkpoint line never duplicates anything.
+    """
+
+    def __init__(
+        self,
+        submitter: TransactionSubmitter,
+        creator: str,
+        signer: TransactionSigner,
+        approval_program: bytes,
+        clear_program: bytes,
+        global_schema: transaction.StateSchema,
+        local_schema: transaction.StateSchema,
+        checkpoint_path: Path | None = None,
+        workers: int = DEFAULT_WORKERS,
+        app_funding: int = 0,
+    ) -> None:
+        self.submitter = submitter
+        self.algod: AsyncAlgodClient = submitter.algod
+        self.creator = creator
+        self.signer = signer
+        self.approval_program = approval_program
+        self.clear_program = clear_program
+        self.global_schema = global_schema
+        self.local_schema = local_schema
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers
+        self.app_funding = app_funding
+        self.checkpoint: OnboardingCheckpoint | None = None
+
+    async def run(self, entries: Iterable[CatalogEntry]) -> OnboardingResult:
+        sp = await self.algod.suggested_params()
+        if self.checkpoint_path is not None:
+            self.checkpoint = OnboardingCheckpoint.load(
+                self.checkpoint_path, run_fingerprint(sp.gh, self.creator)
+            )
+        result = OnboardingResult()
+        started = time.monotonic()
+        queue: asyncio.Queue[Batch | None] = asyncio.Queue(maxsize=2 * self.workers)
+        workers = [
+            asyncio.ensure_future(self._work(queue, result))
+            for _ in range(self.workers)
+        ]
+        try:
+            await self._produce(entries, queue, result)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Onboarding: {len(result.onboarded)} assets onboarded in {elapsed:.1f}s, "
+            f"{result.skipped} already done, {len(result.failed)} failed"
+        )
+        return result
+
+    async def _produce(
+        self,
+        entries: Iterable[CatalogEntry],
+        queue: asyncio.Queue[Batch | None],
+        result: OnboardingResult,
+    ) -> None:
+        markers, apps = await self._chain_progress()
+        batch: Batch = []
+        for entry in entries:
+            asset = (
+                self.checkpoint.get(entry.key)
+                if self.checkpoint is not None
+                else OnboardedAsset(entry.key)
+            )
+            asset.asset_id = asset.asset_id or markers.get(entry.marker, 0)
+            asset.app_id = asset.app_id or apps.get(asset.asset_id, 0)
+            if asset.tokenized:
+                result.skipped += 1
+                continue
+            batch.append((entry, asset))
+            if len(batch) == ASSETS_PER_BATCH:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+
+    async def _chain_progress(self) -> tuple[dict[bytes, int], dict[int, int]]:
+        """Assets the creator made, by marker, and the creator's apps, by asset id."""
+        info = await self.algod.account_info(self.creator)
+        markers = {
+            base64.b64decode(asset["params"]["metadata-hash"]): int(asset["index"])
+            for asset in info.get("created-assets") or []
+            if asset["params"].get("metadata-hash")
+        }
+        apps: dict[int, int] = {}
+        for app in sorted(info.get("created-apps") or [], key=lambda a: a["id"]):
+            state = decode_global_state(app["params"].get("global-state") or [])
+            asset_id = state.get(ASSET_ID_KEY)
+            if isinstance(asset_id, int) and asset_id:
+                apps.setdefault(asset_id, int(app["id"]))
+        return markers, apps
+
+    async def _work(
+        self, queue: asyncio.Queue[Batch | None], result: OnboardingResult
+    ) -> None:
+        while (batch := await queue.get()) is not None:
+            try:
+                await self._onboard(batch, result)
+            except Exception as e:
+                logger.error(f"Onboarding batch of {len(batch)} failed: {e}")
+                for entry, _ in batch:
+                    result.failed.setdefault(entry.key, str(e))
+
+    async def _onboard(self, batch: Batch, result: OnboardingResult) -> None:
+        """Runs a batch through each step; a failed group only drops its own assets."""
+        steps = (
+            (lambda a: not a.asset_id, self._create_assets),
+            (lambda a: not a.app_id, self._create_apps),
+            (lambda a: not a.tokenized, self._tokenize),
+        )
+        for pending, step in steps:
+            todo = [(e, a) for e, a in batch if e.key not in result.failed]
+            todo = [(e, a) for e, a in todo if pending(a)]
+            if not todo:
+                continue
+            try:
+                await step(todo)
+            except Exception as e:
+                logger.error(f"{step.__name__} failed for {len(todo)} assets: {e}")
+                # Groups are atomic, so only assets still pending were not done.
+                for entry, asset in todo:
+                    if pending(asset):
+                        result.failed[entry.key] = str(e)
+        result.onboarded += [a for e, a in batch if e.key not in result.failed]
+
+    def _record(self, asset: OnboardedAsset) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.record(asset)
+
+    async def _send(
+        self, txns: Sequence[TransactionWithSigner]
+    ) -> list[dict[str, Any]]:
+        """Submits one group and returns the pending info of each transaction."""
+        submission = await self.submitter.submit(sign_group(txns), resign(txns))
+        return list(
+            await asyncio.gather(
+                *(self.algod.pending_transaction_info(t) for t in submission.tx_ids)
+            )
+        )
+
+    async def _create_assets(self, batch: Batch) -> None:
+        sp = await self.algod.suggested_params()
+        txns = [
+            TransactionWithSigner(
+                transaction.AssetCreateTxn(
+                    self.creator,
+                    sp,
+                    total=entry.total,
+                    decimals=entry.decimals,
+                    default_frozen=False,
+                    manager=self.creator,
+                    reserve=self.creator,
+                    unit_name=entry.unit_name,
+                    asset_name=entry.name,
+                    url=entry.url,
+                    metadata_hash=entry.marker,
+                ),
+                self.signer,
+            )
+            for entry, _ in batch
+        ]
+        infos = await self._send(txns)
+        for (_, asset), info in zip(batch, infos, strict=True):
+            asset.asset_id = int(info["asset-index"])
+            self._record(asset)
+
+    async def _create_apps(self, batch: Batch) -> None:
+        sp = await self.algod.suggested_params()
+        pages = extra_pages(self.approval_program, self.clear_program)
+        txns = []
+        for entry, asset in batch:
+            _, call = encode_app_call(
+                CREATE_APPLICATION,
+                [asset.asset_id, entry.royalty_percent],
+                0,
+                self.creator,
+                sp,
+                CallOptions(),
+            )
+            create = transaction.ApplicationCreateTxn(
+                self.creator,
+                sp,
+                transaction.OnComplete.NoOpOC,
+                self.approval_program,
+                self.clear_program,
+                self.global_schema,
+                self.local_schema,
+                app_args=call.app_args,
+                foreign_assets=call.foreign_assets,
+                extra_pages=pages,
+            )
+            txns.append(TransactionWithSigner(create, self.signer))
+        infos = await self._send(txns)
+        for (_, asset), info in zip(batch, infos, strict=True):
+            asset.app_id = int(info["application-index"])
+            self._record(asset)
+
+    async def _tokenize(self, batch: Batch) -> None:
+        # An app left from a crashed run may already be opted in, which
+        # tokenize_asset would reject.
+        holdings = await asyncio.gather(
+            *(
+                self.algod.asset_holding(
+                    logic.get_application_address(asset.app_id), asset.asset_id
+                )
+                for _, asset in batch
+            )
+        )
+        todo = []
+        for (entry, asset), holding in zip(batch, holdings, strict=True):
+            if holding is None:
+                todo.append((entry, asset))
+                continue
+            asset.tokenized = True
+            self._record(asset)
+
+        per_group = constants.TX_GROUP_LIMIT // (3 if self.app_funding else 2)
+        groups = [todo[i : i + per_group] for i in range(0, len(todo), per_group)]
+        failures = await asyncio.gather(
+            *(self._tokenize_group(group) for group in groups), return_exceptions=True
+        )
+        errors = [str(e) for e in failures if isinstance(e, BaseException)]
+        if errors:
+            raise Exception("; ".join(errors))
+
+    async def _tokenize_group(self, batch: Batch) -> None:
+        sp = await self.algod.suggested_params()
+        txns: list[TransactionWithSigner] = []
+        for _, asset in batch:
+            app_address = logic.get_application_address(asset.app_id)
+            if self.app_funding:
+                txns.append(
+                    TransactionWithSigner(
+                        transaction.PaymentTxn(
+                            self.creator, sp, app_address, self.app_funding
+                        ),
+                        self.signer,
+                    )
+                )
+            payment = TransactionWithSigner(
+                transaction.PaymentTxn(self.creator, sp, app_address, TOKENIZE_MBR),
+                self.signer,
+            )
+            txn_args, call = encode_app_call(
+                TOKENIZE_ASSET,
+                [payment],
+                asset.app_id,
+                self.creator,
+                sp,
+                CallOptions(foreign_assets=[asset.asset_id], inner_txns=1),
+            )
+            txns += [*txn_args, TransactionWithSigner(call, self.signer)]
+        await self._send(txns)
+        for _, asset in batch:
+            asset.tokenized = True
+            self._record(asset)
+
+
+# -------------------------- Command Line -------------------------- #
+
+
+def main(catalog_path: Path, checkpoint_path: Path) -> None:
+    creator, private_key = sandbox_account(kmd.KMDClient(KMD_TOKEN, KMD_ADDRESS))
+    logger.info(f"Onboarding {catalog_path} as {creator}")
+    approval_teal, clear_teal = load_programs(
+        ARTIFACTS_PATH / "ip_tokens", CONTRACT_NAME
+    )
+    algod_client = PooledAlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+    program_cache = ProgramCache(ARTIFACTS_PATH / PROGRAM_CACHE_DIR_NAME)
+    try:
+        approval_program = program_cache.compile(algod_client, approval_teal)
+        clear_program = program_cache.compile(algod_client, clear_teal)
+    finally:
+        algod_client.close()
+
+    async def run() -> OnboardingResult:
+        algod = AsyncAlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+        try:
+            pipeline = OnboardingPipeline(
+                TransactionSubmitter(algod),
+                creator,
+                AccountTransactionSigner(private_key),
+                approval_program,
+                clear_program,
+                GLOBAL_SCHEMA,
+                LOCAL_SCHEMA,
+                checkpoint_path,
+            )
+            return await pipeline.run(read_catalog(catalog_path))
+        finally:
+            await algod.aclose()
+
+    result = asyncio.run(run())
+    for key, error in result.failed.items():
+        logger.error(f"{key}: {error}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s"
+    )
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    catalog = Path(sys.argv[1])
+    main(
+        catalog,
+        Path(sys.argv[2]) if len(sys.argv) > 2 else catalog.with_suffix(".progress"),
+    )
@@ -0,0 +1,217 @@
+import dataclasses
+import heapq
+import itertools
+import logging
+from collections.abc import Iterator
+from typing import Literal
+
+logger = logging.getLogger(__name__)
+
+Side = Literal["buy", "sell"]
+
+
+@dataclasses.dataclass(slots=True)
+class Order:
+    """A limit order for fractions of one IP asset; price is microAlgos per unit."""
+
+    order_id: int
+    asset_id: int
+    account: str
+    side: Side
+    price: int
+    quantity: int
+    remaining: int = -1
+    seq: int = 0
+
+    def __post_init__(self) -> None:
+        if self.price <= 0 or self.quantity <= 0:
+            raise ValueError("Orders need a positive price and quantity")
+        if self.remaining < 0:
+            self.remaining = self.quantity
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Fill:
+    """A matched trade, always executed at the resting order's price."""
+
+    asset_id: int
+    buyer: str
+    seller: str
+    price: int
+    quantity: int
+    buy_order_id: int
+    sell_order_id: int
+
+    @property
+    def notional(self) -> int:
+        return self.price * self.quantity
+
+
+class OrderBook:
+    """Price-time priority book for a single asset.
+
+    Each side is a binary heap of (key, seq, order_id) entries: bids keyed on -price,
+    asks on price, with seq breaking ties by arrival. Cancellation drops the order from
+    the live index and leaves its heap entry to be discarded when it surfaces, so both
+    insert and cancel are O(log n) amortised.
+
+    An account never trades with itself: an incoming order that would cross one of its
+    own resting orders cancels the resting order and keeps matching behind it.
+    """
+
+    def __init__(self, asset_id: int) -> None:
+        self.asset_id = asset_id
+        self._bids: list[tuple[int, int, int]] = []
+        self._asks: list[tuple[int, int, int]] = []
+        self._orders: dict[int, Order] = {}
+        self._seq = itertools.count()
+        self._cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._orders
+
+    def _top(self, heap: list[tuple[int, int, int]]) -> Order | None:
+        orders = self._orders
+        while heap:
+            order = orders.get(heap[0][2])
+            if order is not None and order.remaining > 0:
+                return order
+            heapq.heappop(heap)
+        return None
+
+    def best_bid(self) -> Order | None:
+        return self._top(self._bids)
+
+    def best_ask(self) -> Order | None:
+        return self._top(self._asks)
+
+    def submit(self, order: Order) -> list[Fill]:
+        """Matches an incoming order against the book and rests any remainder."""
+        if order.asset_id != self.asset_id:
+            raise ValueError(
+                f"Order for asset {order.asset_id} sent to book {self.asset_id}"
+            )
+        if order.order_id in self._orders:
+            raise ValueError(f"Duplicate order id {order.order_id}")
+
+        fills: list[Fill] = []
+        is_buy = order.side == "buy"
+        orders = self._orders
+        while order.remaining:
+            # Re-read each time: cancelling a self-trade may compact the heaps.
+            opposite = self._asks if is_buy else self._bids
+            resting = self._top(opposite)
+            if resting is None or (
+                resting.price > order.price if is_buy else resting.price < order.price
+            ):
+                break
+            if resting.account == order.account:
+                logger.info(
+                    f"Cancelled order {resting.order_id} to prevent a self-trade "
+                    f"with order {order.order_id}"
+                )
+                self.cancel(resting.order_id)
+                continue
+            quantity = min(order.remaining, resting.remaining)
+            buy, sell = (order, resting) if is_buy else (resting, order)
+            fills.append(
+                Fill(
+                    asset_id=self.asset_id,
+                    buyer=buy.account,
+                    seller=sell.account,
+                    price=resting.price,
+                    quantity=quantity,
+                    buy_order_id=buy.order_id,
+                    sell_order_id=sell.order_id,
+                )
+            )
+            order.remaining -= quantity
+            resting.remaining -= quantity
+            if not resting.remaining:
+                del orders[resting.order_id]
+                heapq.heappop(opposite)
+
+        if order.remaining:
+            order.seq = next(self._seq)
+            orders[order.order_id] = order
+            heap = self._bids if is_buy else self._asks
+            key = -order.price if is_buy else order.price
+            heapq.heappush(heap, (key, order.seq, order.order_id))
+        return fills
+
+    def cancel(self, order_id: int) -> Order | None:
+        """Removes a resting order; returns it, or None if it was not resting."""
+        order = self._orders.pop(order_id, None)
+        if order is not None:
+            self._cancelled += 1
+            # Rebuild once dead entries outnumber live ones so the heaps stay O(n).
+            if self._cancelled > len(self._orders):
+                self._compact()
+        return order
+
+    def _compact(self) -> None:
+        orders = self._orders
+        self._bids = [entry for entry in self._bids if entry[2] in orders]
+        self._asks = [entry for entry in self._asks if entry[2] in orders]
+        heapq.heapify(self._bids)
+        heapq.heapify(self._asks)
+        self._cancelled = 0
+
+    @staticmethod
+    def _in_order(heap: list[tuple[int, int, int]]) -> Iterator[tuple[int, int, int]]:
+        """Yields heap entries in sorted order without sorting the whole heap.
+
+        A frontier of heap positions starts at the root; popping the smallest entry
+        exposes its two children, so k entries cost O(k log k).
+        """
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, position = heapq.heappop(frontier)
+            yield entry
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def depth(self, side: Side, levels: int = 10) -> list[tuple[int, int]]:
+        """Aggregated (price, quantity) levels from the best price outwards."""
+        heap = self._bids if side == "buy" else self._asks
+        totals: dict[int, int] = {}
+        for _, _, order_id in self._in_order(heap):
+            order = self._orders.get(order_id)
+            if order is None:
+                continue
+            if order.price not in totals and len(totals) == levels:
+                break
+            totals[order.price] = totals.get(order.price, 0) + order.remaining
+        return list(totals.items())
+
+
+class MatchingEngine:
+    """Routes orders to one OrderBook per asset and hands out order ids."""
+
+    def __init__(self) -> None:
+        self.books: dict[int, OrderBook] = {}
+        self._ids = itertools.count(1)
+
+    def book(self, asset_id: int) -> OrderBook:
+        book = self.books.get(asset_id)
+        if book is None:
+            book = self.books[asset_id] = OrderBook(asset_id)
+        return book
+
+    def place(
+        self, asset_id: int, account: str, side: Side, price: int, quantity: int
+    ) -> tuple[int, list[Fill]]:
+        """Places a limit order and returns its id along with any immediate fills."""
+        order_id = next(self._ids)
+        fills = self.book(asset_id).submit(
+            Order(order_id, asset_id, account, side, price, quantity)
+        )
+        return order_id, fills
+
+    def cancel(self, asset_id: int, order_id: int) -> Order | None:
+        book = self.books.get(asset_id)
+        return book.cancel(order_id) if book else None
@@ -0,0 +1,56 @@
+from collections.abc import Mapping
+from typing import Any
+
+from smart_contracts._helpers.resource_planner import (
+    SENDER,
+    ResourcePlanner,
+    ResourceRule,
+)
+
+# What each IPTokenizationPlatform method reads or writes beyond its own arguments.
+# Methods that pay out through an inner transaction also carry its fee.
+PLATFORM_RULES: dict[str, ResourceRule] = {
+    "tokenize_asset": ResourceRule(assets=("global.assetid",), inner_txns=1),
+    "buy_ip_fraction": ResourceRule(
+        boxes=(("kyc_verified", SENDER),), assets=("global.assetid",), inner_txns=1
+    ),
+    "buy_ip_fraction_with_proof": ResourceRule(
+        assets=("global.assetid",), inner_txns=1
+    ),
+    "atomic_swap": ResourceRule(
+        boxes=(("kyc_verified", "buyer"), ("kyc_verified", "seller")),
+        assets=("global.assetid",),
+        inner_txns=1,
+    ),
+    "atomic_swap_with_proof": ResourceRule(assets=("global.assetid",), inner_txns=1),
+    "verify_kyc": ResourceRule(boxes=(("kyc_verified", "user"),)),
+    "revoke_kyc": ResourceRule(boxes=(("kyc_verified", "user"),)),
+    "verify_kyc_batch": ResourceRule(boxes=(("kyc_verified", "users"),)),
+    "revoke_kyc_batch": ResourceRule(boxes=(("kyc_verified", "users"),)),
+    "distribute_royalty": ResourceRule(
+        accounts=("global.creator_account",), inner_txns=1
+    ),
+    "claim_royalties": ResourceRule(inner_txns=1),
+}
+
+# connect_wallet takes no arguments and only checks the sender, so it is the cheapest
+# call to add when a group needs more reference slots.
+FILLER_METHOD = "connect_wallet"
+
+
+def platform_planner(
+    app_spec: Mapping[str, Any],
+    app_id: int,
+    sender: str,
+    asset_id: int,
+    creator: str,
+) -> ResourcePlanner:
+    """A ResourcePlanner for one deployed IPTokenizationPlatform app."""
+    return ResourcePlanner(
+        app_spec,
+        app_id,
+        sender,
+        PLATFORM_RULES,
+        global_values={"assetid": asset_id, "creator_account": creator},
+        filler=FILLER_METHOD,
+    )
@@ -0,0 +1,122 @@
+import dataclasses
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from algosdk import abi, constants
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    TransactionSigner,
+)
+from algosdk.v2client import algod
+
+from smart_contracts._helpers.app_state import read_global_state
+
+logger = logging.getLogger(__name__)
+
+CLAIM_ROYALTIES = abi.Method.from_signature("claim_royalties()uint64")
+SET_ROYALTY_MODE = abi.Method.from_signature("set_royalty_mode(bool)void")
+
+
+@dataclasses.dataclass(frozen=True)
+class ClaimPolicy:
+    """When to claim: once enough has accrued, or once enough time has passed."""
+
+    min_amount: int = 1_000_000  # microAlgos
+    max_interval: float = 3600.0  # seconds
+    # Never claim dust that would not cover the claim's own fees.
+    min_claimable: int = 2_000
+
+
+@dataclasses.dataclass
+class ClaimScheduler:
+    """Triggers claim_royalties on a ledger-mode app by size or time threshold."""
+
+    algod_client: algod.AlgodClient
+    app_id: int
+    sender: str
+    signer: TransactionSigner
+    policy: ClaimPolicy = ClaimPolicy()
+    clock: Callable[[], float] = time.monotonic
+    last_claim_at: float | None = None
+    claimed_total: int = 0
+
+    def accrued(self) -> int:
+        """Reads the app's current royalty_accrued counter."""
+        state = read_global_state(self.algod_client, self.app_id)
+        value = state.get("royalty_accrued", 0)
+        return value if isinstance(value, int) else 0
+
+    def should_claim(self, accrued: int, now: float) -> bool:
+        if accrued < self.policy.min_claimable:
+            return False
+        if accrued >= self.policy.min_amount:
+            return True
+        if self.last_claim_at is None:
+            # The time threshold counts from the first time we saw anything accrued.
+            self.last_claim_at = now
+        return now - self.last_claim_at >= self.policy.max_interval
+
+    def claim(self, wait_rounds: int = 4) -> int:
+        """Sends one claim call and returns the amount paid out."""
+        sp = self.algod_client.suggested_params()
+        # Cover the inner payment's fee from the outer transaction.
+        sp.flat_fee = True
+        sp.fee = (sp.min_fee or constants.MIN_TXN_FEE) * 2
+        atc = AtomicTransactionComposer()
+        atc.add_method_call(
+            app_id=self.app_id,
+            method=CLAIM_ROYALTIES,
+            sender=self.sender,
+            sp=sp,
+            signer=self.signer,
+        )
+        response = atc.execute(self.algod_client, wait_rounds)
+        amount = int(response.abi_results[0].return_value)
+        self.claimed_total += amount
+        return amount
+
+    def poll_once(self) -> int:
+        """Claims if the policy says so; returns the amount claimed (0 if none)."""
+        now = self.clock()
+        accrued = self.accrued()
+        if not self.should_claim(accrued, now):
+            return 0
+        amount = self.claim()
+        self.last_claim_at = now
+        logger.info(f"Claimed {amount} microAlgos of royalties from app {self.app_id}")
+        return amount
+
+    def run(
+        self, poll_interval: float = 30.0, stop: threading.Event | None = None
+    ) -> None:
+        """Polls until stop is set, claiming whenever a threshold is crossed."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Royalty claim failed: {e}")
+            stop.wait(poll_interval)
+
+
+def set_royalty_mode(
+    algod_client: algod.AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    accumulate: bool,
+    wait_rounds: int = 4,
+) -> None:
+    """Switches an app between immediate payouts and the accumulating ledger."""
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=app_id,
+        method=SET_ROYALTY_MODE,
+        sender=sender,
+        sp=algod_client.suggested_params(),
+        signer=signer,
+        method_args=[accumulate],
+    )
+    atc.execute(algod_client, wait_rounds)
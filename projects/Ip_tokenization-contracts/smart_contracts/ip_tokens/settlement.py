@@ -0,0 +1,345 @@
+import dataclasses
+import logging
+import math
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+from algosdk import abi, constants, transaction
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.v2client import algod
+
+from smart_contracts.ip_tokens.kyc_batcher import kyc_box_name
+from smart_contracts.ip_tokens.order_book import Fill
+
+logger = logging.getLogger(__name__)
+
+ATOMIC_SWAP = abi.Method.from_signature("atomic_swap(account,account,uint64)void")
+ATOMIC_SWAP_NETTED = abi.Method.from_signature(
+    "atomic_swap_netted(address[],(uint8,uint8,uint64)[])void"
+)
+CONNECT_WALLET = abi.Method.from_signature("connect_wallet()void")
+
+# Each fill settles as a buyer->seller payment plus an atomic_swap call.
+TXNS_PER_FILL = 2
+FILLS_PER_GROUP = constants.TX_GROUP_LIMIT // TXNS_PER_FILL
+
+# A netted group's inner transfers need each account's holding, so every account sits
+# on an app call next to the asset, with its KYC box on any call: each call carries the
+# asset plus at most 7 accounts and boxes, and at most 4 of those are accounts.
+MAX_ACCOUNTS = 4
+MAX_REFERENCES = 8
+MAX_APP_ARGS_BYTES = 2048
+LEG_BYTES = 10
+
+# atomic_swap_netted runs on the group's pooled opcode budget, which every app call
+# tops up by APP_CALL_BUDGET. Costs come from `profile` of the contract (loop bodies of
+# the account and leg loops); re-profile when atomic_swap_netted changes.
+APP_CALL_BUDGET = 700
+NETTED_CALL_COST = 113
+NETTED_ACCOUNT_COST = 28
+NETTED_LEG_COST = 79
+CONNECT_WALLET_COST = 20
+
+
+@dataclasses.dataclass
+class SettlementResult:
+    settled: list[Fill] = dataclasses.field(default_factory=list)
+    failed: list[tuple[list[Fill], str]] = dataclasses.field(default_factory=list)
+    tx_ids: list[str] = dataclasses.field(default_factory=list)
+
+
+def build_settlement_group(
+    app_id: int,
+    asset_id: int,
+    operator: str,
+    operator_signer: TransactionSigner,
+    signers: Mapping[str, TransactionSigner],
+    fills: Sequence[Fill],
+    sp: transaction.SuggestedParams,
+) -> AtomicTransactionComposer:
+    """Packs up to FILLS_PER_GROUP fills into one atomic group.
+
+    Every fill pays the seller and moves the asset in the same group, so a group either
+    settles all of its fills or none of them. Each fill's transactions carry a note
+    naming its orders and position, so identical fills still get distinct txids.
+    """
+    if len(fills) > FILLS_PER_GROUP:
+        raise Exception(f"A settlement group holds at most {FILLS_PER_GROUP} fills")
+    atc = AtomicTransactionComposer()
+    for i, fill in enumerate(fills):
+        note = f"fill:{fill.buy_order_id}:{fill.sell_order_id}:{i}".encode()
+        payment = transaction.PaymentTxn(
+            sender=fill.buyer,
+            sp=sp,
+            receiver=fill.seller,
+            amt=fill.notional,
+            note=note,
+        )
+        atc.add_transaction(TransactionWithSigner(payment, signers[fill.buyer]))
+        atc.add_method_call(
+            app_id=app_id,
+            method=ATOMIC_SWAP,
+            sender=operator,
+            sp=sp,
+            signer=operator_signer,
+            method_args=[fill.buyer, fill.seller, fill.quantity],
+            note=note,
+            foreign_assets=[asset_id],
+            boxes=[
+                (app_id, kyc_box_name(fill.buyer)),
+                (app_id, kyc_box_name(fill.seller)),
+            ],
+        )
+    return atc
+
+
+def settle_fills(
+    algod_client: algod.AlgodClient,
+    app_id: int,
+    asset_id: int,
+    operator: str,
+    operator_signer: TransactionSigner,
+    signers: Mapping[str, TransactionSigner],
+    fills: Sequence[Fill],
+    max_in_flight: int = 4,
+    wait_rounds: int = 4,
+) -> SettlementResult:
+    """Settles matched fills in packed atomic groups against the existing atomic_swap method."""
+    sp = algod_client.suggested_params()
+    groups = [
+        list(fills[i : i + FILLS_PER_GROUP])
+        for i in range(0, len(fills), FILLS_PER_GROUP)
+    ]
+    result = SettlementResult()
+
+    def submit(group: list[Fill]) -> list[str]:
+        atc = build_settlement_group(
+            app_id, asset_id, operator, operator_signer, signers, group, sp
+        )
+        return list(atc.execute(algod_client, wait_rounds).tx_ids)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = [(group, pool.submit(submit, group)) for group in groups]
+        for group, future in futures:
+            try:
+                result.tx_ids.extend(future.result())
+                result.settled.extend(group)
+            except Exception as e:
+                logger.error(f"Settlement of {len(group)} fills failed: {e}")
+                result.failed.append((group, str(e)))
+    return result
+
+
+# -------------------------- Netting -------------------------- #
+
+
+@dataclasses.dataclass
+class NetPair:
+    """Every fill between two accounts in a window, reduced to at most one asset
+    transfer and one payment. first sorts before second.
+
+    quantity > 0 moves the asset from first to second; payment > 0 pays first.
+    """
+
+    first: str
+    second: str
+    quantity: int = 0
+    payment: int = 0
+    fills: list[Fill] = dataclasses.field(default_factory=list)
+
+    @property
+    def transfer(self) -> tuple[str, str, int] | None:
+        """(seller, buyer, quantity) of the net asset transfer, if any."""
+        if self.quantity > 0:
+            return self.first, self.second, self.quantity
+        if self.quantity < 0:
+            return self.second, self.first, -self.quantity
+        return None
+
+    @property
+    def net_payment(self) -> tuple[str, str, int] | None:
+        """(payer, payee, microAlgos) of the net payment, if any."""
+        if self.payment > 0:
+            return self.second, self.first, self.payment
+        if self.payment < 0:
+            return self.first, self.second, -self.payment
+        return None
+
+
+def net_fills(fills: Sequence[Fill]) -> list[NetPair]:
+    """Nets a window of fills per account pair, in a deterministic order."""
+    pairs: dict[tuple[str, str], NetPair] = {}
+    for fill in fills:
+        first, second = sorted((fill.seller, fill.buyer))
+        pair = pairs.setdefault((first, second), NetPair(first, second))
+        sign = 1 if fill.seller == first else -1
+        pair.quantity += sign * fill.quantity
+        pair.payment += sign * fill.notional
+        pair.fills.append(fill)
+    return [pairs[key] for key in sorted(pairs)]
+
+
+def _app_calls_needed(accounts: int, legs: int = 0) -> int:
+    # Each account takes one slot for itself and one for its box, and no call may
+    # carry more than MAX_ACCOUNTS accounts. Each connect_wallet call also adds what
+    # it leaves of its budget to the pool atomic_swap_netted spends.
+    if not accounts:
+        return 0
+    by_references = math.ceil(2 * accounts / (MAX_REFERENCES - 1))
+    cost = NETTED_CALL_COST + NETTED_ACCOUNT_COST * accounts + NETTED_LEG_COST * legs
+    by_budget = math.ceil(
+        (cost - CONNECT_WALLET_COST) / (APP_CALL_BUDGET - CONNECT_WALLET_COST)
+    )
+    return max(1, by_references, math.ceil(accounts / MAX_ACCOUNTS), by_budget)
+
+
+def _net_group_fits(pairs: Sequence[NetPair]) -> bool:
+    accounts = {a for p in pairs if (t := p.transfer) for a in t[:2]}
+    legs = sum(1 for p in pairs if p.transfer)
+    payments = sum(1 for p in pairs if p.net_payment)
+    arg_bytes = 4 + 2 + 32 * len(accounts) + 2 + LEG_BYTES * legs
+    txns = _app_calls_needed(len(accounts), legs) + payments
+    return txns <= constants.TX_GROUP_LIMIT and arg_bytes <= MAX_APP_ARGS_BYTES
+
+
+def pack_net_pairs(pairs: Sequence[NetPair]) -> list[list[NetPair]]:
+    """Packs net pairs, in order, into as few atomic groups as fit."""
+    groups: list[list[NetPair]] = []
+    current: list[NetPair] = []
+    for pair in pairs:
+        if pair.transfer is None and pair.net_payment is None:
+            continue
+        if current and not _net_group_fits([*current, pair]):
+            groups.append(current)
+            current = []
+        current.append(pair)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_netted_group(
+    app_id: int,
+    asset_id: int,
+    operator: str,
+    operator_signer: TransactionSigner,
+    signers: Mapping[str, TransactionSigner],
+    pairs: Sequence[NetPair],
+    sp: transaction.SuggestedParams,
+) -> AtomicTransactionComposer:
+    """One group settling every pair: the net payments, then one atomic_swap_netted
+    call for all asset transfers, preceded by connect_wallet calls carrying the
+    references it does not have room for and padding its opcode budget."""
+    if not _net_group_fits(pairs):
+        raise Exception("Net pairs do not fit in one group; use pack_net_pairs")
+    atc = AtomicTransactionComposer()
+    for pair in pairs:
+        if payment := pair.net_payment:
+            payer, payee, amount = payment
+            txn = transaction.PaymentTxn(
+                sender=payer, sp=sp, receiver=payee, amt=amount
+            )
+            atc.add_transaction(TransactionWithSigner(txn, signers[payer]))
+
+    transfers = [t for p in pairs if (t := p.transfer)]
+    if not transfers:
+        return atc
+    accounts = list(
+        dict.fromkeys(a for seller, buyer, _ in transfers for a in (buyer, seller))
+    )
+    index = {address: i for i, address in enumerate(accounts)}
+    legs = [
+        [index[buyer], index[seller], quantity] for seller, buyer, quantity in transfers
+    ]
+
+    calls = _app_calls_needed(len(accounts), len(legs))
+    per_call = min(MAX_ACCOUNTS, math.ceil(len(accounts) / calls))
+    call_accounts = [
+        accounts[i : i + per_call] for i in range(0, len(accounts), per_call)
+    ]
+    call_accounts += [[] for _ in range(calls - len(call_accounts))]
+    boxes = [kyc_box_name(address) for address in accounts]
+    call_boxes: list[list[bytes]] = []
+    for chunk in call_accounts:
+        spare = MAX_REFERENCES - 1 - len(chunk)
+        call_boxes.append(boxes[:spare])
+        boxes = boxes[spare:]
+
+    extra_calls = zip(call_accounts[1:], call_boxes[1:], strict=True)
+    for i, (chunk, chunk_boxes) in enumerate(extra_calls):
+        atc.add_method_call(
+            app_id=app_id,
+            method=CONNECT_WALLET,
+            sender=operator,
+            sp=sp,
+            signer=operator_signer,
+            accounts=chunk,
+            foreign_assets=[asset_id],
+            boxes=[(app_id, name) for name in chunk_boxes],
+            # Calls that only pad the budget would otherwise share a txid.
+            note=f"budget {i}".encode(),
+        )
+    atc.add_method_call(
+        app_id=app_id,
+        method=ATOMIC_SWAP_NETTED,
+        sender=operator,
+        sp=sp,
+        signer=operator_signer,
+        method_args=[accounts, legs],
+        accounts=call_accounts[0],
+        foreign_assets=[asset_id],
+        boxes=[(app_id, name) for name in call_boxes[0]],
+    )
+    return atc
+
+
+def settle_netted(
+    algod_client: algod.AlgodClient,
+    app_id: int,
+    asset_id: int,
+    operator: str,
+    operator_signer: TransactionSigner,
+    signers: Mapping[str, TransactionSigner],
+    fills: Sequence[Fill],
+    max_in_flight: int = 4,
+    wait_rounds: int = 4,
+) -> SettlementResult:
+    """Settles a window of fills netted per account pair through atomic_swap_netted.
+
+    A pair's fills settle or fail together, in whichever group carries the pair.
+    """
+    pairs = net_fills(fills)
+    groups = pack_net_pairs(pairs)
+    logger.info(
+        f"Netted {len(fills)} fills into {len(pairs)} pairs across {len(groups)} groups"
+    )
+    sp = algod_client.suggested_params()
+    result = SettlementResult()
+    # Pairs that net to nothing settle without a transaction.
+    for pair in pairs:
+        if pair.transfer is None and pair.net_payment is None:
+            result.settled.extend(pair.fills)
+
+    def submit(group: list[NetPair]) -> list[str]:
+        atc = build_netted_group(
+            app_id, asset_id, operator, operator_signer, signers, group, sp
+        )
+        return list(atc.execute(algod_client, wait_rounds).tx_ids)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = [(group, pool.submit(submit, group)) for group in groups]
+        for group, future in futures:
+            group_fills = [fill for pair in group for fill in pair.fills]
+            try:
+                result.tx_ids.extend(future.result())
+                result.settled.extend(group_fills)
+            except Exception as e:
+                logger.error(
+                    f"Netted settlement of {len(group_fills)} fills failed: {e}"
+                )
+                result.failed.append((group_fills, str(e)))
+    return result
@@ -0,0 +1,409 @@
+from algopy import *
+from algopy.arc4 import abimethod
+
+# Domain separation for the KYC allowlist Merkle tree, shared with ip_tokens/kyc_merkle.py.
+KYC_LEAF_PREFIX = b"\x00"
+KYC_NODE_PREFIX = b"\x01"
+KYC_PROOF_LEVEL_BUDGET = 50
+
+# KYC entries in scope 0 apply to every asset that is not KYC-scoped.
+PLATFORM_KYC_SCOPE = 0
+
+# Box MBR is 2500 + 400 * (name + value) microAlgos; config boxes are b"a" + itob(asset)
+# holding a 49-byte AssetConfig (address, two uint64s and two packed bools).
+ASSET_CONFIG_BOX_MBR = 2_500 + 400 * (9 + 49)
+
+
+class AssetConfig(arc4.Struct):
+    creator: arc4.Address
+    royalty_percent: arc4.UInt64
+    royalty_accrued: arc4.UInt64
+    kyc_scoped: arc4.Bool
+    accumulate_royalties: arc4.Bool
+
+
+# === ARC-28 Events (decoded off-chain by ip_tokens/events.py) ===
+class AssetTokenized(arc4.Struct):
+    asset_id: arc4.UInt64
+    creator: arc4.Address
+
+
+class AssetFractionPurchased(arc4.Struct):
+    asset_id: arc4.UInt64
+    buyer: arc4.Address
+    amount: arc4.UInt64
+    payment: arc4.UInt64
+
+
+class AssetFractionSwapped(arc4.Struct):
+    asset_id: arc4.UInt64
+    buyer: arc4.Address
+    seller: arc4.Address
+    amount: arc4.UInt64
+
+
+class ScopedKycUpdated(arc4.Struct):
+    scope: arc4.UInt64
+    account: arc4.Address
+    verified: arc4.Bool
+
+
+class AssetRoyaltyDistributed(arc4.Struct):
+    asset_id: arc4.UInt64
+    payer: arc4.Address
+    usage_amount: arc4.UInt64
+    royalty: arc4.UInt64
+    accrued: arc4.Bool
+
+
+class AssetRoyaltiesClaimed(arc4.Struct):
+    asset_id: arc4.UInt64
+    creator: arc4.Address
+    amount: arc4.UInt64
+
+
+@subroutine
+def verify_kyc_proof(user: Account, proof: Bytes, root: Bytes) -> bool:
+    if root.length == 0 or proof.length % 32 != 0:
+        return False
+    ensure_budget(
+        (proof.length // 32 + 1) * KYC_PROOF_LEVEL_BUDGET, OpUpFeeSource.GroupCredit
+    )
+
+    # Siblings are hashed in sorted order, so the proof needs no left/right flags.
+    node = op.sha256(Bytes(KYC_LEAF_PREFIX) + user.bytes)
+    for offset in urange(0, proof.length, 32):
+        sibling = op.extract(proof, offset, 32)
+        if BigUInt.from_bytes(node) <= BigUInt.from_bytes(sibling):
+            node = op.sha256(Bytes(KYC_NODE_PREFIX) + node + sibling)
+        else:
+            node = op.sha256(Bytes(KYC_NODE_PREFIX) + sibling + node)
+    return node == root
+
+
+class MultiAssetIPPlatform(ARC4Contract):
+    """One app serving many IP assets; per-asset config and KYC live in boxes."""
+
+    # === Global State Variables ===
+    admin: Account
+    asset_count: UInt64
+
+    def __init__(self) -> None:
+        # Box names: b"a" + itob(asset), b"k" + itob(scope) + pubkey, b"r" + itob(scope).
+        self.asset_config = BoxMap(UInt64, AssetConfig, key_prefix=b"a")
+        self.kyc_verified = BoxMap(Bytes, bool, key_prefix=b"k")
+        self.kyc_merkle_root = BoxMap(UInt64, Bytes, key_prefix=b"r")
+
+    # === Create Application ===
+    @abimethod(allow_actions=["NoOp"], create="require")
+    def create_application(self) -> None:
+        self.admin = Txn.sender
+        self.asset_count = UInt64(0)
+
+    # === Module 1: Tokenize IP Asset ===
+    # The asset creator or the platform admin registers an asset; the sender becomes its
+    # royalty recipient. mbrpay covers the asset opt-in and the config box, plus whatever
+    # the app account still lacks of its own base minimum balance.
+    @abimethod()
+    def tokenize_asset(
+        self,
+        mbrpay: gtxn.PaymentTransaction,
+        asset: Asset,
+        royalty_percent: UInt64,
+        kyc_scoped: bool,
+    ) -> None:
+        assert Txn.sender == self.admin or Txn.sender == asset.creator
+        assert asset.id not in self.asset_config
+        assert royalty_percent <= 100
+
+        assert mbrpay.receiver == Global.current_application_address
+        required = Global.asset_opt_in_min_balance + ASSET_CONFIG_BOX_MBR
+        # mbrpay has already landed, so the balance before it is what funds the base.
+        funded = Global.current_application_address.balance - mbrpay.amount
+        if funded < Global.min_balance:
+            required += Global.min_balance - funded
+        assert mbrpay.amount == required
+
+        self.asset_config[asset.id] = AssetConfig(
+            arc4.Address(Txn.sender),
+            arc4.UInt64(royalty_percent),
+            arc4.UInt64(0),
+            arc4.Bool(kyc_scoped),
+            arc4.Bool(False),
+        )
+        self.asset_count += 1
+
+        itxn.AssetTransfer(
+            xfer_asset=asset,
+            asset_receiver=Global.current_application_address,
+            asset_amount=0,
+        ).submit()
+        arc4.emit(AssetTokenized(arc4.UInt64(asset.id), arc4.Address(Txn.sender)))
+
+    # === Module 1: Retire IP Asset ===
+    # Returns the remaining inventory and both MBR deposits to the asset's creator.
+    @abimethod()
+    def retire_asset(self, asset: Asset) -> None:
+        config = self.asset_config[asset.id].copy()
+        assert Txn.sender == config.creator.native
+        assert config.royalty_accrued.native == 0
+
+        del self.asset_config[asset.id]
+        self.asset_count -= 1
+
+        # fee=0: the caller covers both inner transactions through fee pooling.
+        itxn.AssetTransfer(
+            xfer_asset=asset,
+            asset_receiver=config.creator.native,
+            asset_amount=0,
+            asset_close_to=config.creator.native,
+            fee=0,
+        ).submit()
+        itxn.Payment(
+            receiver=config.creator.native,
+            amount=Global.asset_opt_in_min_balance + ASSET_CONFIG_BOX_MBR,
+            fee=0,
+        ).submit()
+
+    # === Module 2: Marketplace: Buy Fraction ===
+    @abimethod()
+    def buy_ip_fraction(
+        self,
+        asset: Asset,
+        buyer_payment: gtxn.PaymentTransaction,
+        fraction_amount: UInt64,
+    ) -> None:
+        assert self.kyc_verified.get(
+            self._kyc_key(self._kyc_scope(asset), Txn.sender), default=False
+        )
+        self._sell_fraction(asset, buyer_payment, fraction_amount)
+
+    # === Module 2: Marketplace: Buy Fraction (Merkle allowlist) ===
+    @abimethod()
+    def buy_ip_fraction_with_proof(
+        self,
+        asset: Asset,
+        buyer_payment: gtxn.PaymentTransaction,
+        fraction_amount: UInt64,
+        proof: Bytes,
+    ) -> None:
+        root = self.kyc_merkle_root.get(self._kyc_scope(asset), default=Bytes())
+        assert verify_kyc_proof(Txn.sender, proof, root)
+        self._sell_fraction(asset, buyer_payment, fraction_amount)
+
+    @subroutine
+    def _sell_fraction(
+        self,
+        asset: Asset,
+        buyer_payment: gtxn.PaymentTransaction,
+        fraction_amount: UInt64,
+    ) -> None:
+        assert asset.id in self.asset_config
+        assert buyer_payment.receiver == Global.current_application_address
+        assert buyer_payment.amount > 0
+        assert fraction_amount > 0
+
+        itxn.AssetTransfer(
+            xfer_asset=asset,
+            asset_receiver=Txn.sender,
+            asset_amount=fraction_amount,
+        ).submit()
+        arc4.emit(
+            AssetFractionPurchased(
+                arc4.UInt64(asset.id),
+                arc4.Address(Txn.sender),
+                arc4.UInt64(fraction_amount),
+                arc4.UInt64(buyer_payment.amount),
+            )
+        )
+
+    # === Module 2: Marketplace: Atomic Swap ===
+    @abimethod()
+    def atomic_swap(
+        self, asset: Asset, buyer: Account, seller: Account, amount: UInt64
+    ) -> None:
+        scope = self._kyc_scope(asset)
+        assert self.kyc_verified.get(self._kyc_key(scope, buyer), default=False)
+        assert self.kyc_verified.get(self._kyc_key(scope, seller), default=False)
+        self._swap_fraction(asset, buyer, seller, amount)
+
+    # === Module 2: Marketplace: Atomic Swap (Merkle allowlist) ===
+    @abimethod()
+    def atomic_swap_with_proof(
+        self,
+        asset: Asset,
+        buyer: Account,
+        seller: Account,
+        amount: UInt64,
+        buyer_proof: Bytes,
+        seller_proof: Bytes,
+    ) -> None:
+        root = self.kyc_merkle_root.get(self._kyc_scope(asset), default=Bytes())
+        assert verify_kyc_proof(buyer, buyer_proof, root)
+        assert verify_kyc_proof(seller, seller_proof, root)
+        self._swap_fraction(asset, buyer, seller, amount)
+
+    @subroutine
+    def _swap_fraction(
+        self, asset: Asset, buyer: Account, seller: Account, amount: UInt64
+    ) -> None:
+        assert amount > 0
+
+        itxn.AssetTransfer(
+            xfer_asset=asset,
+            asset_receiver=buyer,
+            asset_amount=amount,
+            sender=seller,
+            fee=1_000,
+        ).submit()
+        arc4.emit(
+            AssetFractionSwapped(
+                arc4.UInt64(asset.id),
+                arc4.Address(buyer),
+                arc4.Address(seller),
+                arc4.UInt64(amount),
+            )
+        )
+
+    # === Module 3: Legal Compliance: KYC Scope ===
+    # KYC-scoped assets keep their own allowlist, managed by the asset creator; all other
+    # assets share the platform allowlist, managed by the admin.
+    @subroutine
+    def _kyc_scope(self, asset: Asset) -> UInt64:
+        if self.asset_config[asset.id].kyc_scoped.native:
+            return asset.id
+        return UInt64(PLATFORM_KYC_SCOPE)
+
+    @subroutine
+    def _kyc_key(self, scope: UInt64, user: Account) -> Bytes:
+        return op.itob(scope) + user.bytes
+
+    @subroutine
+    def _authorize_kyc(self, asset: Asset) -> UInt64:
+        scope = self._kyc_scope(asset)
+        if scope == PLATFORM_KYC_SCOPE:
+            assert Txn.sender == self.admin
+        else:
+            assert Txn.sender == self.asset_config[asset.id].creator.native
+        return scope
+
+    @subroutine
+    def _set_kyc(self, scope: UInt64, user: Account, is_verified: bool) -> None:
+        self.kyc_verified[self._kyc_key(scope, user)] = is_verified
+        arc4.emit(
+            ScopedKycUpdated(
+                arc4.UInt64(scope), arc4.Address(user), arc4.Bool(is_verified)
+            )
+        )
+
+    # === Module 3: Legal Compliance: Verify KYC ===
+    @abimethod()
+    def verify_kyc(self, asset: Asset, user: Account, is_verified: bool) -> None:
+        self._set_kyc(self._authorize_kyc(asset), user, is_verified)
+
+    # === Module 3: Legal Compliance: Revoke KYC ===
+    @abimethod()
+    def revoke_kyc(self, asset: Asset, user: Account) -> None:
+        self._set_kyc(self._authorize_kyc(asset), user, False)
+
+    # === Module 3: Legal Compliance: Batch Verify KYC ===
+    # Every account needs a box reference; the asset reference uses one more slot.
+    @abimethod()
+    def verify_kyc_batch(
+        self, asset: Asset, users: arc4.DynamicArray[arc4.Address], is_verified: bool
+    ) -> None:
+        scope = self._authorize_kyc(asset)
+        for user in users:
+            self._set_kyc(scope, user.native, is_verified)
+
+    # === Module 3: Legal Compliance: Batch Revoke KYC ===
+    @abimethod()
+    def revoke_kyc_batch(
+        self, asset: Asset, users: arc4.DynamicArray[arc4.Address]
+    ) -> None:
+        scope = self._authorize_kyc(asset)
+        for user in users:
+            self._set_kyc(scope, user.native, False)
+
+    # === Module 3: Legal Compliance: KYC Merkle Allowlist ===
+    @abimethod()
+    def set_kyc_merkle_root(self, asset: Asset, root: Bytes) -> None:
+        scope = self._authorize_kyc(asset)
+        assert root.length == 32 or root.length == 0
+        self.kyc_merkle_root[scope] = root
+
+    # === Module 4: Royalty Distribution ===
+    @abimethod()
+    def distribute_royalty(
+        self, asset: Asset, usage_payment: gtxn.PaymentTransaction
+    ) -> None:
+        assert usage_payment.receiver == Global.current_application_address
+        assert usage_payment.amount > 0
+
+        config = self.asset_config[asset.id].copy()
+        royalty_fee = (usage_payment.amount * config.royalty_percent.native) // 100
+
+        # In ledger mode royalties are only recorded; claim_royalties pays them out in bulk.
+        if config.accumulate_royalties.native:
+            config.royalty_accrued = arc4.UInt64(
+                config.royalty_accrued.native + royalty_fee
+            )
+            self.asset_config[asset.id] = config.copy()
+        else:
+            itxn.Payment(
+                receiver=config.creator.native,
+                amount=royalty_fee,
+                fee=1_000,
+            ).submit()
+        arc4.emit(
+            AssetRoyaltyDistributed(
+                arc4.UInt64(asset.id),
+                arc4.Address(usage_payment.sender),
+                arc4.UInt64(usage_payment.amount),
+                arc4.UInt64(royalty_fee),
+                config.accumulate_royalties,
+            )
+        )
+
+    # === Module 4: Royalty Distribution: Ledger Mode ===
+    @abimethod()
+    def set_royalty_mode(self, asset: Asset, accumulate: bool) -> None:
+        config = self.asset_config[asset.id].copy()
+        assert Txn.sender == config.creator.native
+        config.accumulate_royalties = arc4.Bool(accumulate)
+        self.asset_config[asset.id] = config.copy()
+
+    # === Module 4: Royalty Distribution: Claim Accrued ===
+    @abimethod()
+    def claim_royalties(self, asset: Asset) -> UInt64:
+        config = self.asset_config[asset.id].copy()
+        assert Txn.sender == config.creator.native
+        amount = config.royalty_accrued.native
+        assert amount > 0
+        config.royalty_accrued = arc4.UInt64(0)
+        self.asset_config[asset.id] = config.copy()
+
+        # fee=0: the caller covers the inner payment through fee pooling.
+        itxn.Payment(
+            receiver=config.creator.native,
+            amount=amount,
+            fee=0,
+        ).submit()
+        arc4.emit(
+            AssetRoyaltiesClaimed(
+                arc4.UInt64(asset.id), config.creator, arc4.UInt64(amount)
+            )
+        )
+        return amount
+
+    # === Module 5: Wallet Connection (Ping) ===
+    @abimethod()
+    def connect_wallet(self) -> None:
+        assert Txn.sender != Global.zero_address
+
+    # === Admin: Delete Application ===
+    # Every asset has to be retired first so no inventory or royalties are stranded.
+    @abimethod(allow_actions=["DeleteApplication"])
+    def delete_application(self) -> None:
+        assert Txn.sender == self.admin
+        assert self.asset_count == 0
@@ -0,0 +1,88 @@
+import logging
+import os
+from pathlib import Path
+
+import algokit_utils
+
+from smart_contracts.ip_tokens_multi.migrate import migrate_single_asset_app
+
+logger = logging.getLogger(__name__)
+
+APP_SPEC_PATH = (
+    Path(__file__).parent.parent
+    / "artifacts"
+    / "ip_tokens_multi"
+    / "MultiAssetIPPlatform.arc56.json"
+)
+
+
+def _deploy_platform(
+    algorand: algokit_utils.AlgorandClient, deployer: str
+) -> algokit_utils.AppClient:
+    # The platform has no update method, so a changed program always appends a new app.
+    # No funding is sent: the first tokenize_asset tops the app up to its base minimum.
+    factory = algorand.client.get_app_factory(
+        app_spec=APP_SPEC_PATH.read_text(), default_sender=deployer
+    )
+    app_client, result = factory.deploy(
+        on_update=algokit_utils.OnUpdate.AppendApp,
+        on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
+        create_params=algokit_utils.AppClientMethodCallCreateParams(
+            method="create_application"
+        ),
+    )
+    logger.info(
+        f"{app_client.app_name} ({app_client.app_id}): "
+        f"{result.operation_performed.name}"
+    )
+    return app_client
+
+
+# define deployment behaviour based on supplied app spec
+def deploy() -> None:
+    algorand = algokit_utils.AlgorandClient.from_environment()
+    deployer_ = algorand.account.from_environment("DEPLOYER")
+
+    app_client = _deploy_platform(algorand, deployer_.address)
+    app_client.send.call(
+        algokit_utils.AppClientMethodCallParams(method="connect_wallet")
+    )
+    logger.info(
+        f"Deployed {app_client.app_name} ({app_client.app_id}); "
+        "connect_wallet succeeded"
+    )
+
+
+def migrate() -> None:
+    """Moves the single-asset apps listed in MIGRATE_APP_IDS (comma separated) into the
+    deployed platform, deploying it first if needed.
+
+    The deployer must have created those apps. Each keeps its own KYC scope unless
+    MIGRATE_KYC_SCOPED=0 merges its allowlist into the platform scope. Rerunning after
+    a failure skips whatever already made it across.
+    """
+    app_ids = [
+        int(app_id)
+        for app_id in os.environ.get("MIGRATE_APP_IDS", "").split(",")
+        if app_id.strip()
+    ]
+    if not app_ids:
+        raise Exception("Set MIGRATE_APP_IDS to the single-asset apps to migrate")
+    kyc_scoped = os.environ.get("MIGRATE_KYC_SCOPED", "1") not in ("", "0")
+
+    algorand = algokit_utils.AlgorandClient.from_environment()
+    deployer_ = algorand.account.from_environment("DEPLOYER")
+    app_client = _deploy_platform(algorand, deployer_.address)
+    for old_app_id in app_ids:
+        result = migrate_single_asset_app(
+            algorand.client.algod,
+            old_app_id,
+            app_client.app_id,
+            deployer_.address,
+            deployer_.signer,
+            kyc_scoped,
+        )
+        logger.info(
+            f"Migrated app {old_app_id} (asset {result.asset_id}) into "
+            f"{app_client.app_id} with {len(result.tx_ids)} transactions"
+        )
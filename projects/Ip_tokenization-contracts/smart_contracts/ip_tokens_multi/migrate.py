@@ -0,0 +1,342 @@
+import base64
+import copy
+import dataclasses
+import logging
+from collections.abc import Sequence
+
+from algosdk import abi, encoding, transaction
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.logic import get_application_address
+from algosdk.v2client import algod
+
+from smart_contracts._helpers.app_state import read_global_state
+from smart_contracts.ip_tokens.kyc_batcher import (
+    ACCOUNTS_PER_CALL,
+    KYC_BOX_PREFIX,
+    MAX_GROUP_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Must match PLATFORM_KYC_SCOPE and ASSET_CONFIG_BOX_MBR in contract.py.
+PLATFORM_KYC_SCOPE = 0
+ASSET_CONFIG_BOX_MBR = 2_500 + 400 * (9 + 49)
+ASSET_OPT_IN_MIN_BALANCE = 100_000
+# tokenize_asset also tops the app account up to its base minimum balance.
+MIN_BALANCE = 100_000
+# KYC boxes are b"k" + itob(scope) + pubkey holding an 8-byte bool; roots hold 32 bytes.
+KYC_BOX_MBR = 2_500 + 400 * (41 + 8)
+ROOT_BOX_MBR = 2_500 + 400 * (9 + 32)
+
+# The asset and its config box take two of the eight reference slots on each call.
+KYC_ACCOUNTS_PER_CALL = ACCOUNTS_PER_CALL - 2
+
+# Single-asset IPTokenizationPlatform methods.
+CLAIM_ROYALTIES = abi.Method.from_signature("claim_royalties()uint64")
+MIGRATE_TO = abi.Method.from_signature("migrate_to(application)void")
+
+# MultiAssetIPPlatform methods.
+TOKENIZE_ASSET = abi.Method.from_signature("tokenize_asset(pay,asset,uint64,bool)void")
+SET_ROYALTY_MODE = abi.Method.from_signature("set_royalty_mode(asset,bool)void")
+VERIFY_KYC_BATCH = abi.Method.from_signature(
+    "verify_kyc_batch(asset,address[],bool)void"
+)
+SET_KYC_MERKLE_ROOT = abi.Method.from_signature("set_kyc_merkle_root(asset,byte[])void")
+
+
+def tokenize_payment(app_balance: int) -> int:
+    """The mbrpay amount tokenize_asset expects from an app holding app_balance."""
+    return (
+        ASSET_OPT_IN_MIN_BALANCE
+        + ASSET_CONFIG_BOX_MBR
+        + max(0, MIN_BALANCE - app_balance)
+    )
+
+
+def config_box_name(asset_id: int) -> bytes:
+    return b"a" + asset_id.to_bytes(8, "big")
+
+
+def scoped_kyc_box_name(scope: int, address: str) -> bytes:
+    public_key: bytes = encoding.decode_address(address)
+    return b"k" + scope.to_bytes(8, "big") + public_key
+
+
+def root_box_name(scope: int) -> bytes:
+    return b"r" + scope.to_bytes(8, "big")
+
+
+# -------------------------- Reading the Old App -------------------------- #
+
+
+@dataclasses.dataclass
+class SingleAssetApp:
+    app_id: int
+    asset_id: int
+    creator: str
+    royalty_percent: int
+    accumulate_royalties: bool
+    royalty_accrued: int
+    kyc_merkle_root: bytes
+    kyc_verified: list[str]
+
+
+def box_names(algod_client: algod.AlgodClient, app_id: int) -> set[bytes]:
+    response: dict = algod_client.application_boxes(app_id)  # type: ignore[assignment]
+    return {base64.b64decode(box["name"]) for box in response.get("boxes", [])}
+
+
+def verified_accounts(algod_client: algod.AlgodClient, app_id: int) -> list[str]:
+    """Lists every account whose kyc_verified box in a single-asset app is true."""
+    accounts = []
+    for name in sorted(box_names(algod_client, app_id)):
+        if not name.startswith(KYC_BOX_PREFIX):
+            continue
+        box_value: dict = algod_client.application_box_by_name(  # type: ignore[assignment]
+            app_id, name
+        )
+        if any(base64.b64decode(box_value["value"])):
+            accounts.append(encoding.encode_address(name[len(KYC_BOX_PREFIX) :]))
+    return accounts
+
+
+def read_single_asset_app(
+    algod_client: algod.AlgodClient, app_id: int
+) -> SingleAssetApp:
+    state = read_global_state(algod_client, app_id)
+    creator = state["creator_account"]
+    root = state.get("kyc_merkle_root", b"")
+    assert isinstance(creator, bytes) and isinstance(root, bytes)
+    return SingleAssetApp(
+        app_id=app_id,
+        asset_id=int(state["assetid"]),
+        creator=encoding.encode_address(creator),
+        royalty_percent=int(state["royalty_percent"]),
+        accumulate_royalties=bool(state.get("accumulate_royalties", 0)),
+        royalty_accrued=int(state.get("royalty_accrued", 0)),
+        kyc_merkle_root=root,
+        kyc_verified=verified_accounts(algod_client, app_id),
+    )
+
+
+# -------------------------- Migration -------------------------- #
+
+
+@dataclasses.dataclass
+class MigrationResult:
+    asset_id: int
+    scope: int
+    kyc_copied: int
+    tx_ids: list[str] = dataclasses.field(default_factory=list)
+
+
+def build_handover_group(
+    old: SingleAssetApp,
+    new_app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    sp: transaction.SuggestedParams,
+    kyc_scoped: bool,
+    new_app_balance: int,
+) -> AtomicTransactionComposer:
+    """Registers the asset in the new app and moves the inventory there, atomically.
+
+    Accrued royalties are claimed from the old app first, since migrate_to refuses to
+    strand them, and ledger mode carries over. new_app_balance is the new app account's
+    balance, which sets how much of its base minimum balance the MBR payment covers.
+    """
+    new_address = get_application_address(new_app_id)
+    config_box = [(new_app_id, config_box_name(old.asset_id))]
+    atc = AtomicTransactionComposer()
+
+    def flat_fee(inner_txns: int) -> transaction.SuggestedParams:
+        params = copy.copy(sp)
+        params.flat_fee = True
+        params.fee = max(sp.min_fee or 1_000, 1_000) * (1 + inner_txns)
+        return params
+
+    if old.royalty_accrued:
+        atc.add_method_call(
+            app_id=old.app_id,
+            method=CLAIM_ROYALTIES,
+            sender=sender,
+            sp=flat_fee(1),
+            signer=signer,
+        )
+    mbr_payment = TransactionWithSigner(
+        transaction.PaymentTxn(
+            sender,
+            flat_fee(0),
+            new_address,
+            tokenize_payment(new_app_balance),
+        ),
+        signer,
+    )
+    atc.add_method_call(
+        app_id=new_app_id,
+        method=TOKENIZE_ASSET,
+        sender=sender,
+        sp=flat_fee(1),
+        signer=signer,
+        method_args=[mbr_payment, old.asset_id, old.royalty_percent, kyc_scoped],
+        boxes=config_box,
+    )
+    atc.add_method_call(
+        app_id=old.app_id,
+        method=MIGRATE_TO,
+        sender=sender,
+        sp=flat_fee(1),
+        signer=signer,
+        method_args=[new_app_id],
+        foreign_assets=[old.asset_id],
+    )
+    if old.accumulate_royalties:
+        atc.add_method_call(
+            app_id=new_app_id,
+            method=SET_ROYALTY_MODE,
+            sender=sender,
+            sp=flat_fee(0),
+            signer=signer,
+            method_args=[old.asset_id, True],
+            boxes=config_box,
+        )
+    return atc
+
+
+def build_kyc_copy_groups(
+    asset_id: int,
+    scope: int,
+    new_app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    sp: transaction.SuggestedParams,
+    accounts: Sequence[str],
+) -> list[AtomicTransactionComposer]:
+    """Packs verify_kyc_batch calls into groups, each led by a payment for box MBR."""
+    calls_per_group = MAX_GROUP_SIZE - 1
+    per_group = KYC_ACCOUNTS_PER_CALL * calls_per_group
+    new_address = get_application_address(new_app_id)
+    groups = []
+    for start in range(0, len(accounts), per_group):
+        chunk = accounts[start : start + per_group]
+        atc = AtomicTransactionComposer()
+        atc.add_transaction(
+            TransactionWithSigner(
+                transaction.PaymentTxn(
+                    sender, sp, new_address, KYC_BOX_MBR * len(chunk)
+                ),
+                signer,
+            )
+        )
+        for i in range(0, len(chunk), KYC_ACCOUNTS_PER_CALL):
+            batch = list(chunk[i : i + KYC_ACCOUNTS_PER_CALL])
+            atc.add_method_call(
+                app_id=new_app_id,
+                method=VERIFY_KYC_BATCH,
+                sender=sender,
+                sp=sp,
+                signer=signer,
+                method_args=[asset_id, batch, True],
+                boxes=[(new_app_id, config_box_name(asset_id))]
+                + [(new_app_id, scoped_kyc_box_name(scope, a)) for a in batch],
+            )
+        groups.append(atc)
+    return groups
+
+
+def migrate_single_asset_app(
+    algod_client: algod.AlgodClient,
+    old_app_id: int,
+    new_app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    kyc_scoped: bool = True,
+    wait_rounds: int = 4,
+) -> MigrationResult:
+    """Moves a single-asset IPTokenizationPlatform app into a MultiAssetIPPlatform.
+
+    sender must be the old app's creator and either the asset's creator or the new
+    app's admin. With kyc_scoped (the default) the old allowlist becomes the asset's own
+    KYC scope; otherwise it is merged into the platform scope, which needs the admin.
+
+    Reruns pick up where a failed run stopped: boxes that already exist in the new app
+    are neither funded nor written again, so an asset that is already registered skips
+    the handover and KYC entries or a root already present are left as they are.
+    """
+    old = read_single_asset_app(algod_client, old_app_id)
+    if sender != old.creator:
+        raise Exception(
+            f"Only the app creator {old.creator} can migrate app {old_app_id}"
+        )
+    scope = old.asset_id if kyc_scoped else PLATFORM_KYC_SCOPE
+    sp = algod_client.suggested_params()
+    result = MigrationResult(asset_id=old.asset_id, scope=scope, kyc_copied=0)
+    existing = box_names(algod_client, new_app_id)
+
+    if config_box_name(old.asset_id) in existing:
+        logger.info(
+            f"Asset {old.asset_id} is already registered in app {new_app_id}, "
+            "skipping the handover"
+        )
+    else:
+        info: dict = algod_client.account_info(  # type: ignore[assignment]
+            get_application_address(new_app_id)
+        )
+        handover = build_handover_group(
+            old, new_app_id, sender, signer, sp, kyc_scoped, int(info["amount"])
+        )
+        response = handover.execute(algod_client, wait_rounds)
+        result.tx_ids.extend(response.tx_ids)
+        logger.info(
+            f"Moved asset {old.asset_id} from app {old_app_id} to app {new_app_id} "
+            f"in round {response.confirmed_round}"
+        )
+
+    missing = [
+        account
+        for account in old.kyc_verified
+        if scoped_kyc_box_name(scope, account) not in existing
+    ]
+    for atc in build_kyc_copy_groups(
+        old.asset_id, scope, new_app_id, sender, signer, sp, missing
+    ):
+        response = atc.execute(algod_client, wait_rounds)
+        result.tx_ids.extend(response.tx_ids)
+    result.kyc_copied = len(missing)
+
+    # Trees cannot be merged on-chain, so a root only carries over into its own scope.
+    if old.kyc_merkle_root and not kyc_scoped:
+        logger.warning(
+            f"App {old_app_id} has a KYC Merkle root; "
+            "rebuild the platform tree to include its accounts"
+        )
+    elif old.kyc_merkle_root and root_box_name(scope) not in existing:
+        atc = AtomicTransactionComposer()
+        atc.add_transaction(
+            TransactionWithSigner(
+                transaction.PaymentTxn(
+                    sender, sp, get_application_address(new_app_id), ROOT_BOX_MBR
+                ),
+                signer,
+            )
+        )
+        atc.add_method_call(
+            app_id=new_app_id,
+            method=SET_KYC_MERKLE_ROOT,
+            sender=sender,
+            sp=sp,
+            signer=signer,
+            method_args=[old.asset_id, old.kyc_merkle_root],
+            boxes=[
+                (new_app_id, config_box_name(old.asset_id)),
+                (new_app_id, root_box_name(scope)),
+            ],
+        )
+        result.tx_ids.extend(atc.execute(algod_client, wait_rounds).tx_ids)
+
+    logger.info(f"Copied {result.kyc_copied} KYC entries into scope {scope}")
+    return result
@@ -0,0 +1,43 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import httpx
+import pytest
+from algosdk import encoding
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp
+from smart_contracts.ip_tokens.indexer import DEFAULT_APP_SPEC
+
+APP_ID = 1_500
+
+
+@pytest.fixture
+def network() -> Iterator[FakeAlgod]:
+    network = FakeAlgod()
+    yield network
+    network.close()
+
+
+@pytest.fixture
+def app(network: FakeAlgod) -> FakeApp:
+    """An IPTokenizationPlatform stand-in owned by the network's first account."""
+    app = FakeApp(
+        APP_ID, encoding.decode_address(network.addresses[0]), b"", b"", {}, {}
+    )
+    network.apps[APP_ID] = app
+    return app
+
+
+@pytest.fixture
+def app_spec() -> dict[str, Any]:
+    return json.loads(DEFAULT_APP_SPEC.read_text())  # type: ignore[no-any-return]
+
+
+def async_algod(network: FakeAlgod) -> AsyncAlgodClient:
+    """An AsyncAlgodClient talking to network in-process; create it inside the loop."""
+    session = httpx.AsyncClient(
+        base_url="http://fake-algod/v2", transport=network.async_algod_transport()
+    )
+    return AsyncAlgodClient("", "http://fake-algod", session=session)
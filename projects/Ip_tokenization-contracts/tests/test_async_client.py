@@ -0,0 +1,134 @@
+import asyncio
+import json
+from collections import Counter
+from typing import Any
+
+import httpx
+import pytest
+from algosdk import account, encoding, error
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts._helpers.async_client import RETURN_PREFIX
+from smart_contracts._helpers.client_generator import client_path, render_client
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp, TxnRejected
+from smart_contracts.artifacts.ip_tokens.IPTokenizationPlatform_client import (
+    IPTokenizationPlatformClient,
+)
+from smart_contracts.deploy import ARTIFACTS_PATH
+from tests.conftest import async_algod
+
+USERS = [account.generate_account()[1] for _ in range(20)]
+
+
+def platform_client(
+    network: FakeAlgod, app: FakeApp, algod: AsyncAlgodClient | None = None
+) -> IPTokenizationPlatformClient:
+    return IPTokenizationPlatformClient(
+        algod or async_algod(network),
+        app.id,
+        network.addresses[0],
+        AccountTransactionSigner(network.keys[0]),
+    )
+
+
+def test_calls_in_one_tick_are_packed_into_groups(
+    network: FakeAlgod, app: FakeApp
+) -> None:
+    groups: Counter[bytes] = Counter()
+    network.app_call_handler = lambda _, txn: groups.update([txn.get("grp", b"")])
+
+    async def run() -> None:
+        client = platform_client(network, app)
+        await asyncio.gather(*(client.verify_kyc(user, True) for user in USERS))
+
+    asyncio.run(run())
+    assert sorted(groups.values()) == [4, 16]
+
+
+def test_a_rejected_call_fails_alone(network: FakeAlgod, app: FakeApp) -> None:
+    refused = encoding.decode_address(USERS[3])
+
+    def handler(_: FakeApp, txn: dict[str, Any]) -> None:
+        if refused in txn.get("apat", []):
+            raise TxnRejected("assert failed")
+
+    network.app_call_handler = handler
+
+    async def run() -> list[Any]:
+        client = platform_client(network, app)
+        return await asyncio.gather(
+            *(client.verify_kyc(user, True) for user in USERS[:6]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert isinstance(results[3], error.AlgodHTTPError)
+    assert results[:3] + results[4:] == [None] * 5
+    # The packed group was rejected whole, then each call was retried on its own.
+    committed = [
+        stxn["txn"].get("grp")
+        for block in network.blocks.values()
+        for stxn in block.txns
+        if stxn["txn"].get("apid") == app.id
+    ]
+    assert committed == [None] * 5
+
+
+def test_return_values_are_decoded_from_logs(network: FakeAlgod, app: FakeApp) -> None:
+    network.app_call_handler = lambda *_: [RETURN_PREFIX + (1_234).to_bytes(8, "big")]
+
+    async def run() -> int:
+        return await platform_client(network, app).claim_royalties()
+
+    assert asyncio.run(run()) == 1_234
+
+
+def test_params_are_refetched_before_the_chain_outruns_them(
+    network: FakeAlgod, app: FakeApp
+) -> None:
+    # block_time=0 commits a block per group, like LocalNet dev mode.
+    params_requests = 0
+    transport = network.async_algod_transport()
+
+    class Counting(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            nonlocal params_requests
+            params_requests += request.url.path.endswith("/transactions/params")
+            return await transport.handle_async_request(request)
+
+    async def run() -> None:
+        session = httpx.AsyncClient(
+            base_url="http://fake-algod/v2", transport=Counting()
+        )
+        algod = AsyncAlgodClient("", "", session=session, validity_rounds=20)
+        client = platform_client(network, app, algod)
+        for user in USERS * 3:
+            await client.verify_kyc(user, True)
+
+    asyncio.run(run())
+    assert network.round > 60
+    assert 3 <= params_requests <= 10
+
+
+@pytest.mark.parametrize("refresh", [False, True])
+def test_refresh_bypasses_the_params_cache(network: FakeAlgod, refresh: bool) -> None:
+    async def run() -> int:
+        algod = async_algod(network)
+        await algod.suggested_params()
+        network.produce_block()
+        return int((await algod.suggested_params(refresh=refresh)).first)
+
+    assert asyncio.run(run()) == (network.round if refresh else network.round - 1)
+
+
+def test_generated_clients_are_current_and_black_formatted() -> None:
+    black = pytest.importorskip("black")
+    app_spec_paths = sorted(ARTIFACTS_PATH.rglob("*.arc56.json"))
+    assert app_spec_paths
+    for app_spec_path in app_spec_paths:
+        source = render_client(
+            json.loads(app_spec_path.read_text()), app_spec_path.name
+        )
+        assert source == client_path(app_spec_path).read_text()
+        assert black.format_str(source, mode=black.Mode()) == source
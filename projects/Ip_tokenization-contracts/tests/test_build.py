@@ -0,0 +1,107 @@
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers import build as build_module
+from smart_contracts._helpers import compiler_worker
+from smart_contracts._helpers.build import CACHE_FILE_NAME, build_contracts
+
+
+@pytest.fixture
+def compiled(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Replaces the compiler with one writing a TEAL file per contract; lists builds."""
+    builds: list[str] = []
+
+    def fake_build(artifact_path: Path, contract_path: Path) -> None:
+        if b"syntax error" in contract_path.read_bytes():
+            raise Exception("Could not build contract")
+        builds.append(artifact_path.name)
+        artifact_path.mkdir(parents=True, exist_ok=True)
+        teal = contract_path.read_text()
+        (artifact_path / f"{artifact_path.name}.approval.teal").write_text(teal)
+
+    monkeypatch.setattr(build_module, "build", fake_build)
+    monkeypatch.setattr(build_module, "compiler_version", lambda: "puyapy==1.0")
+    # Misses build in this process rather than a pool the fake cannot reach.
+    monkeypatch.setattr(compiler_worker, "worker_available", lambda: True)
+    return builds
+
+
+@pytest.fixture
+def contracts(tmp_path: Path) -> list[tuple[str, Path]]:
+    result = []
+    for name in ("alpha", "beta"):
+        path = tmp_path / name / "contract.py"
+        path.parent.mkdir()
+        path.write_text(f"# {name}\n")
+        result.append((name, path))
+    return result
+
+
+def test_unchanged_contracts_hit_the_cache(
+    compiled: list[str], contracts: list[tuple[str, Path]], tmp_path: Path
+) -> None:
+    artifacts = tmp_path / "artifacts"
+    assert build_contracts(artifacts, contracts) == ["alpha", "beta"]
+    assert build_contracts(artifacts, contracts) == []
+    assert compiled == ["alpha", "beta"]
+
+
+def test_source_change_rebuilds_only_that_contract(
+    compiled: list[str], contracts: list[tuple[str, Path]], tmp_path: Path
+) -> None:
+    artifacts = tmp_path / "artifacts"
+    build_contracts(artifacts, contracts)
+    contracts[1][1].write_text("# beta, edited\n")
+    assert build_contracts(artifacts, contracts) == ["beta"]
+
+
+def test_imported_module_change_rebuilds_its_contract(
+    compiled: list[str], contracts: list[tuple[str, Path]], tmp_path: Path
+) -> None:
+    artifacts = tmp_path / "artifacts"
+    build_contracts(artifacts, contracts)
+    (contracts[0][1].parent / "helpers.py").write_text("FEE = 1000\n")
+    assert build_contracts(artifacts, contracts) == ["alpha"]
+
+
+def test_compiler_upgrade_invalidates_every_entry(
+    compiled: list[str],
+    contracts: list[tuple[str, Path]],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    artifacts = tmp_path / "artifacts"
+    build_contracts(artifacts, contracts)
+    monkeypatch.setattr(build_module, "compiler_version", lambda: "puyapy==2.0")
+    assert build_contracts(artifacts, contracts) == ["alpha", "beta"]
+
+
+def test_edited_or_missing_artifacts_are_rebuilt(
+    compiled: list[str], contracts: list[tuple[str, Path]], tmp_path: Path
+) -> None:
+    artifacts = tmp_path / "artifacts"
+    build_contracts(artifacts, contracts)
+    (artifacts / "alpha" / "alpha.approval.teal").write_text("tampered")
+    (artifacts / "beta" / "beta.approval.teal").unlink()
+    assert build_contracts(artifacts, contracts) == ["alpha", "beta"]
+
+
+def test_corrupt_cache_is_a_miss(
+    compiled: list[str], contracts: list[tuple[str, Path]], tmp_path: Path
+) -> None:
+    artifacts = tmp_path / "artifacts"
+    build_contracts(artifacts, contracts)
+    (artifacts / CACHE_FILE_NAME).write_text("{not json")
+    assert build_contracts(artifacts, contracts) == ["alpha", "beta"]
+
+
+def test_failed_builds_are_not_cached(
+    compiled: list[str], contracts: list[tuple[str, Path]], tmp_path: Path
+) -> None:
+    artifacts = tmp_path / "artifacts"
+    contracts[0][1].write_text("syntax error\n")
+    with pytest.raises(Exception, match="alpha"):
+        build_contracts(artifacts, contracts)
+    contracts[0][1].write_text("# alpha, fixed\n")
+    assert build_contracts(artifacts, contracts) == ["alpha"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from algosdk import account, encoding
+
+from smart_contracts._helpers.fake_algod import FakeAccount, FakeAlgod
+from smart_contracts.ip_tokens.cap_table import (
+    CapTable,
+    RoyaltySplit,
+    pro_rata,
+    snapshot_from_fake,
+)
+
+
+def test_pro_rata_sums_exactly_and_ties_go_to_earlier_holders() -> None:
+    payouts = pro_rata(np.array([1, 1, 1], dtype=np.uint64), 100)
+    assert payouts.tolist() == [34, 33, 33]
+    assert payouts.dtype == np.int64
+
+
+def test_pro_rata_gives_leftovers_to_largest_remainders() -> None:
+    balances = np.array([5, 3, 2], dtype=np.uint64)
+    assert pro_rata(balances, 7).tolist() == [4, 2, 1]
+
+
+def test_pro_rata_handles_products_past_int64() -> None:
+    balances = np.array([2**62, 2**62 - 1, 3], dtype=np.uint64)
+    payouts = pro_rata(balances, 10**12)
+    assert int(payouts.sum()) == 10**12
+    assert payouts[0] >= payouts[1] > payouts[2]
+
+
+def test_pro_rata_edge_cases() -> None:
+    assert pro_rata(np.zeros(3, dtype=np.uint64), 10).tolist() == [0, 0, 0]
+    assert pro_rata(np.array([4], dtype=np.uint64), 0).tolist() == [0]
+    with pytest.raises(ValueError):
+        pro_rata(np.array([1], dtype=np.uint64), -1)
+
+
+def test_royalty_split_withholds_small_payouts() -> None:
+    table = CapTable.from_balances(1, 1, [("A", 98), ("B", 1), ("C", 1), ("D", 0)])
+    split = RoyaltySplit.compute(table, 100, min_payout=2)
+    assert split.recipients() == [("A", 98)]
+    assert split.unpaid == 2
+
+
+def test_snapshot_from_fake_reads_holdings(network: FakeAlgod) -> None:
+    holders = sorted(account.generate_account()[1] for _ in range(3))
+    for amount, address in enumerate(holders):
+        network.accounts[encoding.decode_address(address)] = FakeAccount(
+            0, {77: amount}
+        )
+    table = snapshot_from_fake(network, 77, exclude=[holders[2]])
+    assert table.round == network.round
+    assert table.holders.tolist() == [holders[1]]
+    assert table.total == 1
@@ -0,0 +1,160 @@
+import importlib.util
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers import compiler_worker
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="the worker listens on a named pipe on Windows"
+)
+
+# Echoes its arguments, one per line, and exits with the code after --exit.
+FAKE_COMPILER = """
+import sys
+
+args = sys.argv[1:]
+for arg in args:
+    print(arg)
+print("warning: fake", file=sys.stderr)
+if "--exit" in args:
+    sys.exit(int(args[args.index("--exit") + 1]))
+"""
+
+
+PROJECT_PATH = Path(__file__).parent.parent
+
+
+def start_worker(address: str, module: str, python_path: str) -> subprocess.Popen:
+    """Runs serve() in its own process, as `python -m smart_contracts worker` does."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from smart_contracts._helpers import compiler_worker\n"
+            "compiler_worker.serve(sys.argv[1], sys.argv[2])",
+            address,
+            module,
+        ],
+        cwd=PROJECT_PATH,
+        env={**os.environ, "PYTHONPATH": python_path},
+    )
+    deadline = time.monotonic() + 30
+    while not compiler_worker.worker_available(address):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            pytest.fail("worker did not start")
+        time.sleep(0.05)
+    return process
+
+
+def stop_worker(address: str, process: subprocess.Popen) -> None:
+    compiler_worker.shutdown(address)
+    try:
+        process.wait(5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+@pytest.fixture
+def worker(tmp_path: Path) -> Iterator[str]:
+    (tmp_path / "fake_compiler.py").write_text(FAKE_COMPILER)
+    address = str(tmp_path / "worker.sock")
+    process = start_worker(
+        address, "fake_compiler", os.pathsep.join([str(tmp_path), str(PROJECT_PATH)])
+    )
+    yield address
+    stop_worker(address, process)
+
+
+def test_ping_answers_only_while_running(worker: str) -> None:
+    assert compiler_worker.worker_available(worker)
+    assert compiler_worker.shutdown(worker)
+    assert not compiler_worker.worker_available(worker)
+    assert not compiler_worker.shutdown(worker)
+
+
+def test_compile_streams_diagnostics_and_exit_code(worker: str) -> None:
+    lines: list[tuple[str, str]] = []
+    returncode = compiler_worker.submit_build(
+        ["contract.py", "--out-dir", "out"], lambda *line: lines.append(line), worker
+    )
+    assert returncode == 0
+    assert lines == [
+        ("stdout", "contract.py"),
+        ("stdout", "--out-dir"),
+        ("stdout", "out"),
+        ("stderr", "warning: fake"),
+    ]
+
+    # The worker keeps serving after a failed job.
+    assert compiler_worker.submit_build(["--exit", "2"], lambda *_: None, worker) == 2
+    assert compiler_worker.submit_build([], lambda *_: None, worker) == 0
+
+
+def test_connections_need_the_workers_secret(worker: str) -> None:
+    key_path = compiler_worker.authkey_path(worker)
+    assert stat.S_IMODE(key_path.stat().st_mode) == 0o600
+
+    key_path.write_bytes(b"not the secret")
+    assert compiler_worker.submit_build([], lambda *_: None, worker) is None
+
+
+def test_secret_is_removed_on_shutdown(worker: str) -> None:
+    assert compiler_worker.shutdown(worker)
+    deadline = time.monotonic() + 5
+    while compiler_worker.authkey_path(worker).exists():
+        assert time.monotonic() < deadline, "secret left behind"
+        time.sleep(0.01)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("puyapy") is None, reason="puyapy is not installed"
+)
+def test_compiles_a_real_contract_twice(tmp_path: Path) -> None:
+    from smart_contracts._helpers.build import BUILD_OPTIONS, COMPILER_MODULE
+
+    address = str(tmp_path / "worker.sock")
+    process = start_worker(address, COMPILER_MODULE, str(PROJECT_PATH))
+    try:
+        contract = PROJECT_PATH / "smart_contracts" / "ip_tokens_multi" / "contract.py"
+        committed = PROJECT_PATH / "smart_contracts" / "artifacts" / "ip_tokens_multi"
+        # The second job checks the compiler's global state does not leak between jobs.
+        for out_dir in (tmp_path / "first", tmp_path / "second"):
+            lines: list[tuple[str, str]] = []
+            argv = [*BUILD_OPTIONS, str(contract), "--out-dir", str(out_dir)]
+            returncode = compiler_worker.submit_build(
+                argv, lambda *line: lines.append(line), address
+            )
+            assert returncode == 0, lines
+            for name in ("approval.teal", "clear.teal"):
+                teal = f"MultiAssetIPPlatform.{name}"
+                assert (out_dir / teal).read_text() == (committed / teal).read_text()
+    finally:
+        stop_worker(address, process)
+
+
+def test_no_worker_falls_back(tmp_path: Path) -> None:
+    address = str(tmp_path / "missing.sock")
+    assert compiler_worker.submit_build([], lambda *_: None, address) is None
+    assert not compiler_worker.worker_available(address)
+
+
+def test_stale_socket_is_removed(tmp_path: Path) -> None:
+    address = tmp_path / "stale.sock"
+    key_path = compiler_worker.authkey_path(str(address))
+    # A socket file nothing listens on and its secret, as a killed worker leaves behind.
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(str(address))
+    key_path.write_bytes(b"secret")
+    assert not compiler_worker.worker_available(str(address))
+    assert not address.exists()
+    assert not key_path.exists()
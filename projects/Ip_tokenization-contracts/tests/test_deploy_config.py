@@ -0,0 +1,55 @@
+import httpx
+import pytest
+from algosdk import account
+
+from smart_contracts._helpers.deploy_pipeline import PooledAlgodClient
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp
+from smart_contracts.ip_tokens.deploy_config import (
+    creator_account,
+    rejected_as_not_updatable,
+)
+
+DEPLOYER, OTHER = (account.generate_account()[1] for _ in range(2))
+
+ASSERT_FAILED = Exception(
+    "TransactionPool.Remember: transaction ABCD234: logic eval error: assert failed "
+    "pc=1234. Details: app=1001, pc=1234, opcodes=intc 5; assert"
+)
+
+
+@pytest.mark.parametrize(
+    ("error", "updatable", "creator", "expected"),
+    [
+        (ASSERT_FAILED, False, DEPLOYER, True),
+        # An updatable app failing its assert is a real bug in the new program.
+        (ASSERT_FAILED, True, DEPLOYER, False),
+        (ASSERT_FAILED, None, DEPLOYER, False),
+        # Someone else's app fails the creator assert, whatever UPDATABLE says.
+        (ASSERT_FAILED, False, OTHER, False),
+        (ASSERT_FAILED, False, None, False),
+        (Exception("connection refused"), False, DEPLOYER, False),
+        (
+            Exception(
+                "transaction ABCD234: logic eval error: err opcode executed. "
+                "Details: app=1001, pc=12"
+            ),
+            False,
+            DEPLOYER,
+            False,
+        ),
+    ],
+)
+def test_only_the_updatable_assert_falls_back(
+    error: Exception, updatable: bool | None, creator: str | None, expected: bool
+) -> None:
+    assert rejected_as_not_updatable(error, updatable, creator, DEPLOYER) is expected
+
+
+def test_creator_account_reads_the_apps_global_state(
+    network: FakeAlgod, app: FakeApp
+) -> None:
+    session = httpx.Client(transport=network.algod_transport())
+    client = PooledAlgodClient("a" * 64, "http://fake-algod", session=session)
+    assert creator_account(client, app.id) is None
+    app.global_state[b"creator_account"] = app.creator
+    assert creator_account(client, app.id) == network.addresses[0]
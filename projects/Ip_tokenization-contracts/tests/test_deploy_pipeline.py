@@ -0,0 +1,136 @@
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import pytest
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers import deploy_pipeline
+from smart_contracts._helpers.deploy_pipeline import (
+    PROGRAM_PAGE_SIZE,
+    DeployPipeline,
+    PooledAlgodClient,
+    ProgramCache,
+    load_programs,
+    load_state_schema,
+    substitute_template_vars,
+)
+from smart_contracts._helpers.fake_algod import FakeAlgod
+from smart_contracts.deploy import (
+    ARTIFACTS_PATH,
+    CONTRACT_NAME,
+    CREATE_APPLICATION,
+    GLOBAL_SCHEMA,
+    LOCAL_SCHEMA,
+)
+
+TEAL = "#pragma version 10\npushint TMPL_UPDATABLE\nreturn\n"
+
+
+@pytest.fixture
+def compiles(network: FakeAlgod) -> tuple[PooledAlgodClient, Counter[str]]:
+    """A pooled client on the fake network, with a count of the requests it sends."""
+    transport = network.algod_transport()
+    requests: Counter[str] = Counter()
+
+    def count(request: httpx.Request) -> httpx.Response:
+        requests[request.url.path] += 1
+        return transport.handle_request(request)
+
+    session = httpx.Client(transport=httpx.MockTransport(count))
+    return PooledAlgodClient("a" * 64, "http://fake-algod", session=session), requests
+
+
+def test_program_cache_compiles_each_source_once(
+    compiles: tuple[PooledAlgodClient, Counter[str]], tmp_path: Path
+) -> None:
+    client, requests = compiles
+    cache = ProgramCache(tmp_path)
+    teal = substitute_template_vars(TEAL, {"UPDATABLE": 0})
+
+    program = cache.compile(client, teal)
+    assert cache.compile(client, teal) == program
+    assert requests["/v2/teal/compile"] == 1
+    assert (tmp_path / f"{ProgramCache.key(teal)}.bin").read_bytes() == program
+
+    # A new cache over the same folder reads the program back from disk.
+    assert ProgramCache(tmp_path).compile(client, teal) == program
+    assert requests["/v2/teal/compile"] == 1
+
+
+def test_template_values_are_part_of_the_cache_key(
+    compiles: tuple[PooledAlgodClient, Counter[str]], tmp_path: Path
+) -> None:
+    client, requests = compiles
+    cache = ProgramCache(tmp_path)
+    fixed = cache.compile(client, substitute_template_vars(TEAL, {"UPDATABLE": 0}))
+    updatable = cache.compile(client, substitute_template_vars(TEAL, {"UPDATABLE": 1}))
+    assert fixed != updatable
+    assert requests["/v2/teal/compile"] == 2
+
+
+def test_substitute_template_vars() -> None:
+    teal = "pushint TMPL_UPDATABLE\npushbytes TMPL_NAME\nbyte TMPL_UPDATABLE_X\n"
+    assert (
+        substitute_template_vars(
+            teal, {"UPDATABLE": 1, "NAME": b"\x01\xff", "UPDATABLE_X": 7}
+        )
+        == "pushint 1\npushbytes 0x01ff\nbyte 7\n"
+    )
+    with pytest.raises(Exception, match="NAME"):
+        substitute_template_vars(teal, {"UPDATABLE": 1, "UPDATABLE_X": 7})
+
+
+def test_built_programs_load_without_template_vars() -> None:
+    approval, clear = load_programs(ARTIFACTS_PATH / "ip_tokens", CONTRACT_NAME)
+    assert "TMPL_" not in approval and "TMPL_" not in clear
+
+
+def test_state_schema_comes_from_the_app_spec() -> None:
+    global_schema, local_schema = load_state_schema(
+        ARTIFACTS_PATH / "ip_tokens" / f"{CONTRACT_NAME}.arc56.json"
+    )
+    assert (global_schema.num_uints, global_schema.num_byte_slices) == (5, 3)
+    assert (local_schema.num_uints, local_schema.num_byte_slices) == (0, 0)
+
+
+def deploy_platform(
+    network: FakeAlgod, client: PooledAlgodClient, cache_path: Path
+) -> deploy_pipeline.DeployResult:
+    network.register_programs(ARTIFACTS_PATH)
+    approval, clear = load_programs(ARTIFACTS_PATH / "ip_tokens", CONTRACT_NAME)
+    return DeployPipeline(client, ProgramCache(cache_path)).deploy(
+        funder=network.addresses[0],
+        funder_signer=AccountTransactionSigner(network.keys[0]),
+        approval_teal=approval,
+        clear_teal=clear,
+        global_schema=GLOBAL_SCHEMA,
+        local_schema=LOCAL_SCHEMA,
+        funding_amount=1_000_000,
+        create_method=CREATE_APPLICATION,
+        method_args=[1_001, 5],
+    )
+
+
+def test_deploy_requests_pages_for_the_built_programs(
+    network: FakeAlgod,
+    compiles: tuple[PooledAlgodClient, Counter[str]],
+    tmp_path: Path,
+) -> None:
+    client, _ = compiles
+    result = deploy_platform(network, client, tmp_path)
+    app = network.apps[result.app_id]
+    assert len(app.approval) + len(app.clear) > PROGRAM_PAGE_SIZE
+    assert app.extra_pages == 1
+
+
+def test_create_without_extra_pages_is_rejected(
+    network: FakeAlgod,
+    compiles: tuple[PooledAlgodClient, Counter[str]],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client, _ = compiles
+    monkeypatch.setattr(deploy_pipeline, "extra_pages", lambda *_: 0)
+    with pytest.raises(Exception, match="app programs too long"):
+        deploy_platform(network, client, tmp_path)
@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers import discovery
+from smart_contracts._helpers.discovery import discover_contract_names
+
+
+def changed(path: Path) -> None:
+    """Moves a folder's mtime on, as the edit just made would on a coarse clock."""
+    mtime = path.stat().st_mtime_ns + 10**9
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    root = tmp_path / "smart_contracts"
+    for folder in ("ip_tokens", "_helpers", ".hidden", "artifacts", "notes"):
+        (root / folder).mkdir(parents=True)
+        if folder != "notes":
+            (root / folder / "contract.py").write_text("")
+    return root
+
+
+@pytest.fixture
+def scans(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    calls: list[Path] = []
+    scan = discovery._scan
+
+    def counting_scan(root_path: Path) -> dict:
+        calls.append(root_path)
+        return scan(root_path)
+
+    monkeypatch.setattr(discovery, "_scan", counting_scan)
+    return calls
+
+
+def test_fresh_manifest_skips_the_scan(root: Path, scans: list[Path]) -> None:
+    manifest = root / "artifacts" / ".manifest.json"
+    assert discover_contract_names(root, manifest) == ["ip_tokens"]
+    assert discover_contract_names(root, manifest) == ["ip_tokens"]
+    assert len(scans) == 1
+
+
+def test_new_folder_invalidates_the_manifest(root: Path, scans: list[Path]) -> None:
+    manifest = root / "artifacts" / ".manifest.json"
+    discover_contract_names(root, manifest)
+    (root / "ip_tokens_multi").mkdir()
+    (root / "ip_tokens_multi" / "contract.py").write_text("")
+    changed(root)
+    assert discover_contract_names(root, manifest) == ["ip_tokens", "ip_tokens_multi"]
+    assert len(scans) == 2
+
+
+def test_contract_added_to_a_folder_invalidates_the_manifest(
+    root: Path, scans: list[Path]
+) -> None:
+    manifest = root / "artifacts" / ".manifest.json"
+    discover_contract_names(root, manifest)
+    (root / "notes" / "contract.py").write_text("")
+    changed(root / "notes")
+    assert discover_contract_names(root, manifest) == ["ip_tokens", "notes"]
+
+    (root / "ip_tokens" / "contract.py").unlink()
+    changed(root / "ip_tokens")
+    assert discover_contract_names(root, manifest) == ["notes"]
+    assert len(scans) == 3
+
+
+def test_corrupt_or_unwritable_manifest_still_discovers(
+    root: Path, scans: list[Path]
+) -> None:
+    manifest = root / "artifacts" / ".manifest.json"
+    manifest.write_text("{not json")
+    assert discover_contract_names(root, manifest) == ["ip_tokens"]
+
+    blocked = root / "artifacts" / "file" / ".manifest.json"
+    (root / "artifacts" / "file").write_text("")
+    assert discover_contract_names(root, blocked) == ["ip_tokens"]
+    assert len(scans) == 2
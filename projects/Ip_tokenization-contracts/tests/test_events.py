@@ -0,0 +1,103 @@
+import base64
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from algosdk import abi, account, encoding
+
+from smart_contracts.ip_tokens.events import (
+    EVENTS,
+    SELECTORS,
+    decode_event,
+    iter_block_events,
+    iter_events,
+)
+
+ARTIFACTS = Path(__file__).parent.parent / "smart_contracts" / "artifacts"
+SPECS = [
+    json.loads(path.read_text())
+    for path in (
+        ARTIFACTS / "ip_tokens" / "IPTokenizationPlatform.arc56.json",
+        ARTIFACTS / "ip_tokens_multi" / "MultiAssetIPPlatform.arc56.json",
+    )
+]
+EMITTED = [(spec, event) for spec in SPECS for event in spec["events"]]
+ADDRESS = account.generate_account()[1]
+
+
+def sample(types: list[str]) -> list[Any]:
+    values = {"uint64": 2**64 - 7, "address": ADDRESS, "bool": True}
+    return [values[t] for t in types]
+
+
+def emit(name: str, types: list[str], values: list[Any]) -> bytes:
+    """An ARC-28 log as the contract writes it: selector, then the ARC-4 tuple."""
+    signature = f"{name}({','.join(types)})"
+    selector = encoding.checksum(signature.encode())[:4]
+    return bytes(selector) + abi.TupleType.from_string(f"({','.join(types)})").encode(
+        values
+    )
+
+
+def test_every_emitted_event_is_decoded() -> None:
+    emitted = {event["name"] for _, event in EMITTED}
+    assert emitted == set(EVENTS)
+
+
+@pytest.mark.parametrize(
+    ("spec", "event"), EMITTED, ids=lambda value: value.get("name", "")
+)
+def test_event_matches_the_contract_struct(
+    spec: dict[str, Any], event: dict[str, Any]
+) -> None:
+    types = [arg["type"] for arg in event["args"]]
+    assert list(EVENTS[event["name"]]) == types
+    # The compiled program logs this selector.
+    program = base64.b64decode(spec["byteCode"]["approval"])
+    assert SELECTORS[event["name"]] in program
+
+    values = sample(types)
+    decoded = decode_event(emit(event["name"], types, values))
+    assert decoded is not None
+    name, fields = decoded
+    assert name == event["name"]
+    expected = [
+        encoding.decode_address(v) if t == "address" else v
+        for t, v in zip(types, values, strict=True)
+    ]
+    assert list(fields) == expected
+
+
+def test_foreign_and_truncated_logs_are_skipped() -> None:
+    log = emit("KycUpdated", ["address", "bool"], [ADDRESS, False])
+    assert decode_event(log[:-1]) is None
+    assert decode_event(b"\x00\x01\x02\x03" + log[4:]) is None
+    assert list(iter_events([b"", log, log + b"\x00"])) == [
+        ("KycUpdated", (encoding.decode_address(ADDRESS), False))
+    ]
+
+
+def test_block_events_include_inner_calls() -> None:
+    log = emit("RoyaltiesClaimed", ["address", "uint64"], [ADDRESS, 5])
+    block = {
+        "block": {
+            "txns": [
+                {"txn": {"type": "pay"}},
+                {"txn": {"type": "appl", "apid": 7}, "dt": {"lg": [log]}},
+                {
+                    "txn": {"type": "appl", "apid": 8},
+                    "dt": {
+                        "itx": [
+                            {"txn": {"type": "appl", "apid": 7}, "dt": {"lg": [log]}}
+                        ]
+                    },
+                },
+            ]
+        }
+    }
+    events = list(iter_block_events(block, 7))
+    assert [(position, name) for position, name, _ in events] == [
+        (1, "RoyaltiesClaimed"),
+        (2, "RoyaltiesClaimed"),
+    ]
@@ -0,0 +1,189 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import httpx
+from algosdk import account, encoding, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+from algosdk.v2client import algod
+
+from smart_contracts._helpers.async_client import AsyncAppClient, MethodSpec
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeAlgodServer, FakeApp
+from smart_contracts.ip_tokens.indexer import (
+    AlgodBlockSource,
+    Indexer,
+    decode_block,
+    iter_app_calls,
+    iter_balance_changes,
+    load_methods,
+)
+from tests.conftest import async_algod
+
+USERS = [account.generate_account()[1] for _ in range(6)]
+VERIFY_KYC = MethodSpec.from_signature("verify_kyc(account,bool)void")
+REVOKE_KYC = MethodSpec.from_signature("revoke_kyc(account)void")
+ATOMIC_SWAP = MethodSpec.from_signature("atomic_swap(account,account,uint64)void")
+VERIFY_KYC_BATCH = MethodSpec.from_signature("verify_kyc_batch(address[],bool)void")
+DISTRIBUTE_ROYALTY = MethodSpec.from_signature("distribute_royalty(pay)void")
+
+# Not valid UTF-8, as ARC-28 event logs usually are not.
+EVENT_LOG = b"\x15\x1f\x7c\x75\xff\xfe\x00raw"
+
+
+def send(network: FakeAlgod, app: FakeApp, calls: list[tuple[Any, ...]]) -> None:
+    async def run() -> None:
+        client = AsyncAppClient(
+            async_algod(network),
+            app.id,
+            network.addresses[0],
+            AccountTransactionSigner(network.keys[0]),
+        )
+        for spec, *args in calls:
+            await client.call(spec, args)
+
+    asyncio.run(run())
+
+
+def block_source(server: FakeAlgodServer) -> AlgodBlockSource:
+    return AlgodBlockSource(algod.AlgodClient("a" * 64, server.algod_address))
+
+
+def test_decode_block_keeps_raw_log_bytes(network: FakeAlgod, app: FakeApp) -> None:
+    network.app_call_handler = lambda *_: [EVENT_LOG]
+    send(network, app, [(VERIFY_KYC, USERS[0], True)])
+    with httpx.Client(
+        base_url="http://fake-algod/v2", transport=network.algod_transport()
+    ) as client:
+        raw = client.get(f"/blocks/{network.round}", params={"format": "msgpack"})
+    block = decode_block(raw.content)
+    (stxn,) = block["block"]["txns"]
+    assert stxn["dt"]["lg"] == [EVENT_LOG]
+    (call,) = iter_app_calls(block, app.id, load_methods())
+    assert (call.method, call.args) == ("verify_kyc", [USERS[0], True])
+
+
+def test_indexes_calls_and_resumes_from_checkpoint(
+    network: FakeAlgod, app: FakeApp, tmp_path: Path
+) -> None:
+    network.app_call_handler = lambda *_: [EVENT_LOG]
+    db_path = tmp_path / "index.sqlite"
+    send(
+        network,
+        app,
+        [
+            (VERIFY_KYC, USERS[0], True),
+            (VERIFY_KYC_BATCH, USERS[1:4], True),
+            (REVOKE_KYC, USERS[2]),
+            (ATOMIC_SWAP, USERS[0], USERS[1], 5),
+        ],
+    )
+    with FakeAlgodServer(network, algod_port=0, kmd_port=0) as server:
+        indexer = Indexer(db_path, block_source(server), app.id, batch_blocks=2)
+        assert indexer.run(until_round=network.round) == network.round
+        kyc = dict(indexer.db.execute("SELECT account, verified FROM kyc"))
+        assert kyc == {USERS[0]: 1, USERS[1]: 1, USERS[2]: 0, USERS[3]: 1}
+        swaps = indexer.db.execute("SELECT buyer, seller, amount FROM swaps").fetchall()
+        assert swaps == [(USERS[0], USERS[1], 5)]
+        indexed = indexer.checkpoint
+        indexer.db.close()
+
+        send(
+            network, app, [(REVOKE_KYC, USERS[0]), (ATOMIC_SWAP, USERS[4], USERS[5], 1)]
+        )
+        resumed = Indexer(db_path, block_source(server), app.id)
+        assert resumed.checkpoint == indexed
+        resumed.run(until_round=network.round)
+    assert resumed.db.execute(
+        "SELECT verified FROM kyc WHERE account = ?", (USERS[0],)
+    ).fetchone() == (0,)
+    assert resumed.db.execute("SELECT COUNT(*) FROM swaps").fetchone() == (2,)
+
+
+def test_holdings_follow_every_transfer_of_the_asset(
+    network: FakeAlgod, app: FakeApp, tmp_path: Path
+) -> None:
+    creator, holder, leaver = network.addresses
+    keys = dict(zip(network.addresses, network.keys, strict=True))
+    with FakeAlgodServer(network, algod_port=0, kmd_port=0) as server:
+        client = algod.AlgodClient("a" * 64, server.algod_address)
+
+        def send_txn(txn: transaction.Transaction) -> dict[str, Any]:
+            tx_id = client.send_transaction(txn.sign(keys[txn.sender]))
+            info: dict[str, Any] = transaction.wait_for_confirmation(client, tx_id, 4)
+            return info
+
+        sp = client.suggested_params()
+        created = send_txn(
+            transaction.AssetCreateTxn(creator, sp, 1_000, 0, False, clawback=creator)
+        )
+        asset_id = created["asset-index"]
+        for address in (holder, leaver):
+            send_txn(transaction.AssetOptInTxn(address, sp, asset_id))
+        # Direct transfers, a clawback and an opt-out, none of them through the app.
+        send_txn(transaction.AssetTransferTxn(creator, sp, holder, 300, asset_id))
+        send_txn(transaction.AssetTransferTxn(creator, sp, leaver, 50, asset_id))
+        send_txn(
+            transaction.AssetTransferTxn(
+                creator, sp, holder, 20, asset_id, revocation_target=leaver
+            )
+        )
+        send_txn(transaction.AssetCloseOutTxn(leaver, sp, creator, asset_id))
+
+        indexer = Indexer(
+            tmp_path / "index.sqlite",
+            block_source(server),
+            app.id,
+            asset_ids=[asset_id],
+        )
+        indexer.run(until_round=network.round)
+    holdings = dict(indexer.db.execute("SELECT account, balance FROM holdings"))
+    assert holdings == {creator: 680, holder: 320}
+
+
+def test_royalties_and_holdings_come_from_apply_data(tmp_path: Path) -> None:
+    app_id = 1_500
+    payer, creator, buyer, seller = (encoding.decode_address(u) for u in USERS[:4])
+    payment = {"txn": {"type": "pay", "snd": payer, "amt": 1_000, "grp": b"g"}}
+    royalty = {
+        "txn": {
+            "type": "appl",
+            "snd": payer,
+            "apid": app_id,
+            "apaa": [DISTRIBUTE_ROYALTY.selector],
+            "grp": b"g",
+        },
+        "dt": {
+            "gd": {"royalty_accrued": {"at": 2, "ui": 900}},
+            "itx": [
+                {"txn": {"type": "pay", "snd": payer, "rcv": creator, "amt": 100}},
+                {
+                    "txn": {
+                        "type": "axfer",
+                        "snd": seller,
+                        "arcv": buyer,
+                        "xaid": 77,
+                        "aamt": 4,
+                    }
+                },
+            ],
+        },
+    }
+    block: dict[str, Any] = {"block": {"rnd": 9, "txns": [payment, royalty]}}
+
+    class NoBlocks:
+        def latest_round(self) -> int:
+            return 0
+
+        def block(self, round_: int) -> dict[str, Any]:
+            raise AssertionError("nothing should be fetched")
+
+    indexer = Indexer(tmp_path / "index.sqlite", NoBlocks(), app_id)
+    assert indexer.process_block(block) == 1
+    indexer.flush(9)
+    assert indexer.db.execute("SELECT * FROM royalties").fetchall() == [
+        (9, 1, USERS[0], 1_000, 100, 900)
+    ]
+    holdings = dict(indexer.db.execute("SELECT account, balance FROM holdings"))
+    assert holdings == {USERS[2]: 4, USERS[3]: -4}
+    assert indexer.checkpoint == 9
+    assert list(iter_balance_changes(block, asset_ids={78})) == []
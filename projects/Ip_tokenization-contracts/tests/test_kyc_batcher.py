@@ -0,0 +1,82 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from algosdk import account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers.deploy_pipeline import PooledAlgodClient
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp
+from smart_contracts.ip_tokens.kyc_batcher import (
+    ACCOUNTS_PER_GROUP,
+    KycBatchResult,
+    kyc_box_name,
+    set_kyc_bulk,
+)
+
+USERS = [account.generate_account()[1] for _ in range(2 * ACCOUNTS_PER_GROUP + 10)]
+# An account in the middle chunk, whose group the app rejects while it is blocked.
+BLOCKED = kyc_box_name(USERS[ACCOUNTS_PER_GROUP + 3])
+
+
+@pytest.fixture
+def client(network: FakeAlgod) -> Iterator[PooledAlgodClient]:
+    session = httpx.Client(transport=network.algod_transport())
+    client = PooledAlgodClient("a" * 64, "http://fake-algod", session=session)
+    yield client
+    client.close()
+
+
+def run(
+    network: FakeAlgod,
+    client: PooledAlgodClient,
+    app: FakeApp,
+    checkpoint: Path,
+    accounts: list[str] = USERS,
+) -> KycBatchResult:
+    return set_kyc_bulk(
+        client,
+        app.id,
+        network.addresses[0],
+        AccountTransactionSigner(network.keys[0]),
+        accounts,
+        checkpoint_path=checkpoint,
+    )
+
+
+def test_failed_run_resumes_from_checkpoint(
+    network: FakeAlgod, app: FakeApp, client: PooledAlgodClient, tmp_path: Path
+) -> None:
+    blocked = True
+
+    def handler(_: FakeApp, txn: dict[str, Any]) -> None:
+        if blocked and any(box["n"] == BLOCKED for box in txn.get("apbx", ())):
+            raise Exception("assert failed")
+
+    network.app_call_handler = handler
+    checkpoint = tmp_path / "kyc.checkpoint"
+
+    first = run(network, client, app, checkpoint)
+    assert sorted(first.submitted) == [0, 2]
+    assert list(first.failed) == [1]
+    assert json.loads(checkpoint.read_text())["completed"] == [0, 2]
+
+    blocked = False
+    second = run(network, client, app, checkpoint)
+    assert second.skipped == [0, 2]
+    assert second.submitted == [1]
+    assert not second.failed
+    assert json.loads(checkpoint.read_text())["completed"] == [0, 1, 2]
+
+
+def test_checkpoint_of_a_different_run_is_ignored(
+    network: FakeAlgod, app: FakeApp, client: PooledAlgodClient, tmp_path: Path
+) -> None:
+    checkpoint = tmp_path / "kyc.checkpoint"
+    run(network, client, app, checkpoint)
+    other = run(network, client, app, checkpoint, USERS[:-1])
+    assert not other.skipped
+    assert sorted(other.submitted) == [0, 1, 2]
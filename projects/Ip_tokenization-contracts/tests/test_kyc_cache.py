@@ -0,0 +1,173 @@
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+from algosdk import account, encoding
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts._helpers.fake_algod import FakeAccount, FakeAlgod, FakeApp
+from smart_contracts.ip_tokens.events import SELECTORS
+from smart_contracts.ip_tokens.kyc_batcher import kyc_box_name
+from smart_contracts.ip_tokens.kyc_cache import (
+    RECHECK_AGE,
+    MarketplaceCache,
+    PrecheckFailed,
+    TtlLruCache,
+)
+
+ASSET_ID = 77
+BUYER, SELLER = (account.generate_account()[1] for _ in range(2))
+
+
+def counting_client(network: FakeAlgod, requests: Counter[str]) -> AsyncAlgodClient:
+    transport = network.async_algod_transport()
+
+    async def count(request: httpx.Request) -> httpx.Response:
+        requests[request.url.path] += 1
+        return await transport.handle_async_request(request)
+
+    session = httpx.AsyncClient(
+        base_url="http://fake-algod/v2", transport=httpx.MockTransport(count)
+    )
+    return AsyncAlgodClient("", "http://fake-algod", session=session)
+
+
+def hold(network: FakeAlgod, address: str, amount: int) -> None:
+    key = encoding.decode_address(address)
+    network.accounts.setdefault(key, FakeAccount()).assets[ASSET_ID] = amount
+
+
+def test_ttl_lru_cache_expires_and_evicts() -> None:
+    now = [0.0]
+    cache: TtlLruCache[str, int] = TtlLruCache(2, ttl=10.0, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") is not None
+    cache.put("c", 3)
+    # "b" was least recently used.
+    assert cache.get("b") is None
+    now[0] = 5.0
+    assert cache.get("a", max_age=4.0) is None
+    assert cache.get("a") is not None
+    now[0] = 10.5
+    assert cache.get("a") is None and cache.get("c") is None
+    assert len(cache) == 0
+
+
+def test_reads_are_cached_and_shared(network: FakeAlgod, app: FakeApp) -> None:
+    app.boxes[kyc_box_name(BUYER)] = b"\x01"
+    requests: Counter[str] = Counter()
+
+    async def run() -> None:
+        cache = MarketplaceCache(counting_client(network, requests), app.id, ASSET_ID)
+        results = await asyncio.gather(
+            *(cache.is_kyc_verified(BUYER) for _ in range(5))
+        )
+        assert results == [True] * 5
+        assert await cache.is_kyc_verified(BUYER)
+        await cache.prefetch([BUYER, SELLER, SELLER], holdings=True)
+        await cache.algod.aclose()
+
+    asyncio.run(run())
+    assert requests["/v2/applications/1500/box"] == 2
+    assert sum(requests.values()) == 4
+
+
+def test_events_and_blocks_invalidate_entries(network: FakeAlgod, app: FakeApp) -> None:
+    hold(network, BUYER, 0)
+    hold(network, SELLER, 10)
+    requests: Counter[str] = Counter()
+
+    async def run() -> None:
+        cache = MarketplaceCache(counting_client(network, requests), app.id, ASSET_ID)
+        await cache.prefetch([BUYER, SELLER], holdings=True)
+        reads = sum(requests.values())
+
+        # A KycUpdated event is applied without a read.
+        cache.apply_event("KycUpdated", (encoding.decode_address(BUYER), True))
+        assert await cache.is_kyc_verified(BUYER)
+        assert sum(requests.values()) == reads
+
+        hold(network, SELLER, 4)
+        hold(network, BUYER, 6)
+        swapped = (
+            encoding.decode_address(BUYER),
+            encoding.decode_address(SELLER),
+            6,
+        )
+        cache.apply_event("FractionSwapped", swapped)
+        assert await cache.holding(SELLER) == 4
+        assert await cache.holding(BUYER) == 6
+
+        # Transfers of other assets leave holdings alone.
+        axfer = {
+            "type": "axfer",
+            "xaid": ASSET_ID,
+            "snd": encoding.decode_address(SELLER),
+            "arcv": encoding.decode_address(BUYER),
+        }
+        block = {
+            "block": {
+                "rnd": 9,
+                "txns": [{"txn": {**axfer, "xaid": ASSET_ID + 1}}],
+            }
+        }
+        hold(network, SELLER, 1)
+        cache.apply_block(block)
+        assert await cache.holding(SELLER) == 4
+        cache.apply_block({"block": {"rnd": 10, "txns": [{"txn": axfer}]}})
+        assert await cache.holding(SELLER) == 1
+        assert cache.last_round == 10
+        await cache.algod.aclose()
+
+    asyncio.run(run())
+
+
+def test_block_kyc_events_update_the_cache(network: FakeAlgod, app: FakeApp) -> None:
+    log = (
+        SELECTORS["KycUpdated"]
+        + encoding.decode_address(SELLER)
+        + b"\x00"  # ARC-4 false
+    )
+    block = {
+        "block": {
+            "rnd": 3,
+            "txns": [{"txn": {"type": "appl", "apid": app.id}, "dt": {"lg": [log]}}],
+        }
+    }
+
+    async def run() -> None:
+        cache = MarketplaceCache(counting_client(network, Counter()), app.id, ASSET_ID)
+        cache.kyc.put(SELLER, True)
+        cache.apply_block(block)
+        assert cache.kyc.get(SELLER) is not None
+        assert not await cache.is_kyc_verified(SELLER)
+        await cache.algod.aclose()
+
+    asyncio.run(run())
+
+
+def test_stale_rejection_is_rechecked(network: FakeAlgod, app: FakeApp) -> None:
+    hold(network, BUYER, 0)
+    hold(network, app.address, 100)
+    now = [0.0]
+
+    async def run() -> None:
+        cache = MarketplaceCache(counting_client(network, Counter()), app.id, ASSET_ID)
+        cache.kyc.clock = cache.holdings.clock = lambda: now[0]
+        with pytest.raises(PrecheckFailed, match="not KYC verified"):
+            await cache.check_buy(BUYER, 5)
+
+        # Verified on chain since: a fresh rejection stands, a stale one is re-read.
+        app.boxes[kyc_box_name(BUYER)] = b"\x01"
+        with pytest.raises(PrecheckFailed):
+            await cache.check_buy(BUYER, 5)
+        now[0] = RECHECK_AGE + 0.1
+        await cache.check_buy(BUYER, 5)
+
+        with pytest.raises(PrecheckFailed, match="holds 100, needs 500"):
+            await cache.check_buy(BUYER, 500)
+        await cache.algod.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+from algosdk import account
+
+from smart_contracts.ip_tokens.kyc_merkle import KycMerkleTree, verify_proof
+
+ACCOUNTS = [account.generate_account()[1] for _ in range(13)]
+
+
+def test_every_member_proves_against_the_root() -> None:
+    tree = KycMerkleTree.build(ACCOUNTS)
+    assert len(tree) == len(ACCOUNTS)
+    for address in ACCOUNTS:
+        assert address in tree
+        assert verify_proof(address, tree.proof(address), tree.root)
+
+
+def test_proof_fails_for_other_accounts_and_roots() -> None:
+    tree = KycMerkleTree.build(ACCOUNTS[:-1])
+    outsider = ACCOUNTS[-1]
+    assert outsider not in tree
+    with pytest.raises(KeyError):
+        tree.proof(outsider)
+    proof = tree.proof(ACCOUNTS[0])
+    assert not verify_proof(outsider, proof, tree.root)
+    assert not verify_proof(ACCOUNTS[0], proof, bytes(32))
+
+
+def test_update_matches_a_fresh_build() -> None:
+    tree = KycMerkleTree.build(ACCOUNTS[:8])
+    root = tree.update(added=ACCOUNTS[8:], revoked=ACCOUNTS[:3])
+    assert root == tree.root
+    assert len(tree) == len(ACCOUNTS) - 3
+    for address in ACCOUNTS[:3]:
+        assert address not in tree
+    for address in ACCOUNTS[3:]:
+        assert verify_proof(address, tree.proof(address), root)
+
+
+def test_len_counts_readded_accounts_once() -> None:
+    tree = KycMerkleTree.build(ACCOUNTS[:4])
+    tree.update(added=[], revoked=ACCOUNTS[:2])
+    tree.update(added=ACCOUNTS[:1], revoked=[])
+    assert len(tree) == 3
+    assert ACCOUNTS[0] in tree and ACCOUNTS[1] not in tree
+
+
+def test_save_and_load_round_trip(tmp_path: Path) -> None:
+    tree = KycMerkleTree.build(ACCOUNTS)
+    tree.update(added=[], revoked=ACCOUNTS[:2])
+    tree.save(tmp_path / "kyc.tree")
+    loaded = KycMerkleTree.load(tmp_path / "kyc.tree")
+    assert loaded.root == tree.root
+    assert len(loaded) == len(tree)
+    assert verify_proof(ACCOUNTS[5], loaded.proof(ACCOUNTS[5]), tree.root)
+
+
+def test_readding_after_load_reuses_the_revoked_slot(tmp_path: Path) -> None:
+    tree = KycMerkleTree.build(ACCOUNTS)
+    tree.update(added=[], revoked=ACCOUNTS[:2])
+    tree.save(tmp_path / "kyc.tree")
+    loaded = KycMerkleTree.load(tmp_path / "kyc.tree")
+    assert loaded.update(added=ACCOUNTS[:1]) == tree.update(added=ACCOUNTS[:1])
+    assert len(loaded) == len(tree)
@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp
+from smart_contracts.ip_tokens.metadata_store import (
+    CHUNK_PREFIX,
+    CHUNK_SIZE,
+    INDEX_PREFIX,
+    MAX_CHUNKS,
+    NODE_PREFIX,
+    MetadataReader,
+    chunk_hash,
+    encode_metadata,
+    merkle_root,
+    pack_metadata,
+)
+from tests.conftest import async_algod
+
+
+def node(a: bytes, b: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + a + b).digest()
+
+
+def test_merkle_root_carries_odd_nodes_up() -> None:
+    a, b, c = (chunk_hash(bytes([i])) for i in range(3))
+    assert merkle_root([a]) == a
+    assert merkle_root([a, b]) == node(a, b)
+    assert merkle_root([a, b, c]) == node(node(a, b), c)
+    with pytest.raises(ValueError):
+        merkle_root([])
+
+
+def test_pack_metadata_splits_into_chunks() -> None:
+    data = bytes(range(256)) * 20
+    manifest, chunks = pack_metadata(data)
+    assert b"".join(chunks) == data
+    assert [len(chunk) for chunk in chunks] == [
+        CHUNK_SIZE,
+        CHUNK_SIZE,
+        len(data) - 4000,
+    ]
+    assert manifest.size == len(data)
+    assert manifest.leaves == tuple(chunk_hash(chunk) for chunk in chunks)
+    assert manifest.root == merkle_root(manifest.leaves)
+
+
+def test_pack_metadata_edge_cases() -> None:
+    manifest, chunks = pack_metadata(b"")
+    assert chunks == [b""] and manifest.size == 0
+    assert pack_metadata(encode_metadata({"b": 1, "a": "é"}))[0].root == (
+        pack_metadata(encode_metadata({"a": "é", "b": 1}))[0].root
+    )
+    with pytest.raises(Exception):
+        pack_metadata(bytes(MAX_CHUNKS * CHUNK_SIZE + 1))
+
+
+def test_reader_verifies_against_app_boxes(network: FakeAlgod, app: FakeApp) -> None:
+    data = bytes(i % 251 for i in range(5 * CHUNK_SIZE + 17))
+    manifest, chunks = pack_metadata(data)
+    for leaf, chunk in zip(manifest.leaves, chunks, strict=True):
+        app.boxes[CHUNK_PREFIX + leaf] = chunk
+    app.boxes[INDEX_PREFIX + manifest.root] = b"".join(manifest.leaves)
+    app.global_state[b"metadata_root"] = manifest.root
+    app.global_state[b"metadata_size"] = manifest.size
+
+    async def read() -> tuple[bytes, bytes]:
+        reader = MetadataReader(async_algod(network), app.id)
+        return await reader.read(), await reader.read(CHUNK_SIZE - 3, 10)
+
+    whole, middle = asyncio.run(read())
+    assert whole == data
+    assert middle == data[CHUNK_SIZE - 3 : CHUNK_SIZE + 7]
+
+    app.boxes[CHUNK_PREFIX + manifest.leaves[1]] = b"tampered"
+    with pytest.raises(Exception, match="missing or corrupt"):
+        asyncio.run(MetadataReader(async_algod(network), app.id).read())
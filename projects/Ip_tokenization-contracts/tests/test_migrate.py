@@ -0,0 +1,115 @@
+from collections import Counter
+from typing import Any
+
+import httpx
+import pytest
+from algosdk import account, encoding, logic
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers.deploy_pipeline import PooledAlgodClient
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp
+from smart_contracts.ip_tokens.kyc_batcher import kyc_box_name
+from smart_contracts.ip_tokens_multi.migrate import (
+    ASSET_CONFIG_BOX_MBR,
+    ASSET_OPT_IN_MIN_BALANCE,
+    MIN_BALANCE,
+    TOKENIZE_ASSET,
+    VERIFY_KYC_BATCH,
+    config_box_name,
+    migrate_single_asset_app,
+    scoped_kyc_box_name,
+    tokenize_payment,
+)
+
+ASSET_ID = 77
+NEW_APP_ID = 1_600
+USERS = [account.generate_account()[1] for _ in range(8)]
+
+
+class Platform:
+    """Stands in for MultiAssetIPPlatform, writing the boxes its methods would."""
+
+    def __init__(self) -> None:
+        self.calls: Counter[bytes] = Counter()
+        self.fail_kyc = False
+
+    def __call__(self, app: FakeApp, txn: dict[str, Any]) -> None:
+        if app.id != NEW_APP_ID:
+            return
+        selector = txn["apaa"][0]
+        self.calls[selector] += 1
+        if selector == TOKENIZE_ASSET.get_selector():
+            asset_id = txn["apas"][txn["apaa"][1][0]]
+            app.boxes[config_box_name(asset_id)] = bytes(49)
+        elif selector == VERIFY_KYC_BATCH.get_selector():
+            if self.fail_kyc:
+                raise Exception("assert failed")
+            for box in txn["apbx"]:
+                if box["n"].startswith(b"k"):
+                    app.boxes[box["n"]] = (1).to_bytes(8, "big")
+
+
+@pytest.fixture
+def platform(network: FakeAlgod, app: FakeApp) -> Platform:
+    app.global_state.update(
+        {
+            b"assetid": ASSET_ID,
+            b"creator_account": app.creator,
+            b"royalty_percent": 5,
+            b"kyc_merkle_root": b"",
+        }
+    )
+    for user in USERS:
+        app.boxes[kyc_box_name(user)] = (1).to_bytes(8, "big")
+    network.apps[NEW_APP_ID] = FakeApp(NEW_APP_ID, app.creator, b"", b"", {}, {})
+    platform = Platform()
+    network.app_call_handler = platform
+    return platform
+
+
+def migrate(network: FakeAlgod, old_app_id: int) -> list[str]:
+    session = httpx.Client(transport=network.algod_transport())
+    client = PooledAlgodClient("a" * 64, "http://fake-algod", session=session)
+    try:
+        result = migrate_single_asset_app(
+            client,
+            old_app_id,
+            NEW_APP_ID,
+            network.addresses[0],
+            AccountTransactionSigner(network.keys[0]),
+        )
+    finally:
+        client.close()
+    return result.tx_ids
+
+
+def test_rerun_skips_what_already_migrated(
+    network: FakeAlgod, app: FakeApp, platform: Platform
+) -> None:
+    platform.fail_kyc = True
+    with pytest.raises(Exception, match="assert failed"):
+        migrate(network, app.id)
+    new_app = network.apps[NEW_APP_ID]
+    assert config_box_name(ASSET_ID) in new_app.boxes
+    assert platform.calls[TOKENIZE_ASSET.get_selector()] == 1
+
+    platform.fail_kyc = False
+    assert migrate(network, app.id)
+    assert platform.calls[TOKENIZE_ASSET.get_selector()] == 1
+    assert all(scoped_kyc_box_name(ASSET_ID, u) in new_app.boxes for u in USERS)
+
+    assert migrate(network, app.id) == []
+
+
+def test_handover_funds_the_new_apps_base_minimum(
+    network: FakeAlgod, app: FakeApp, platform: Platform
+) -> None:
+    app.boxes.clear()
+    new_address = encoding.decode_address(logic.get_application_address(NEW_APP_ID))
+    migrate(network, app.id)
+    assert network.accounts[new_address].amount == (
+        MIN_BALANCE + ASSET_OPT_IN_MIN_BALANCE + ASSET_CONFIG_BOX_MBR
+    )
+    assert tokenize_payment(network.accounts[new_address].amount) == (
+        ASSET_OPT_IN_MIN_BALANCE + ASSET_CONFIG_BOX_MBR
+    )
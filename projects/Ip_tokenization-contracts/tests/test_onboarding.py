@@ -0,0 +1,137 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+from algosdk import encoding, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers.fake_algod import FakeAccount, FakeAlgod, FakeApp
+from smart_contracts._helpers.submitter import TransactionSubmitter
+from smart_contracts.ip_tokens.onboarding import (
+    ASSET_ID_KEY,
+    TOKENIZE_ASSET,
+    OnboardingPipeline,
+    OnboardingResult,
+    read_catalog,
+)
+from tests.conftest import async_algod
+
+CATALOG = "key,name,unit_name,total,royalty_percent\n" + "".join(
+    f"US-{n},Patent {n},PAT{n},100,\n" for n in range(3)
+)
+
+
+class PlatformApp:
+    """Stands in for the platform: create stores the asset id, tokenize opts in."""
+
+    def __init__(self, network: FakeAlgod) -> None:
+        self.network = network
+        self.rejecting = False
+        self.tokenize_calls = 0
+
+    def __call__(self, app: FakeApp, txn: dict[str, Any]) -> None:
+        (asset_id,) = txn["apas"]
+        if "apid" not in txn:
+            app.global_state[ASSET_ID_KEY.encode()] = asset_id
+            return
+        assert txn["apaa"][0] == TOKENIZE_ASSET.selector
+        self.tokenize_calls += 1
+        if self.rejecting:
+            raise Exception("assert failed")
+        app_account = encoding.decode_address(app.address)
+        self.network.accounts.setdefault(app_account, FakeAccount()).assets[
+            asset_id
+        ] = 0
+
+
+@pytest.fixture
+def platform(network: FakeAlgod) -> PlatformApp:
+    platform = PlatformApp(network)
+    network.app_call_handler = platform
+    return platform
+
+
+@pytest.fixture
+def catalog(tmp_path: Path) -> Path:
+    path = tmp_path / "catalog.csv"
+    path.write_text(CATALOG)
+    return path
+
+
+def onboard(
+    network: FakeAlgod, catalog: Path, checkpoint: Path | None
+) -> OnboardingResult:
+    async def run() -> OnboardingResult:
+        algod = async_algod(network)
+        try:
+            pipeline = OnboardingPipeline(
+                TransactionSubmitter(algod),
+                network.addresses[0],
+                AccountTransactionSigner(network.keys[0]),
+                b"approval",
+                b"clear",
+                transaction.StateSchema(3, 1),
+                transaction.StateSchema(0, 0),
+                checkpoint,
+            )
+            return await pipeline.run(read_catalog(catalog))
+        finally:
+            await algod.aclose()
+
+    return asyncio.run(run())
+
+
+def test_failed_run_resumes_from_checkpoint(
+    network: FakeAlgod, platform: PlatformApp, catalog: Path, tmp_path: Path
+) -> None:
+    checkpoint = tmp_path / "catalog.progress"
+    platform.rejecting = True
+    first = onboard(network, catalog, checkpoint)
+    assert sorted(first.failed) == ["US-0", "US-1", "US-2"]
+    assets, apps = dict(network.assets), dict(network.apps)
+    assert len(assets) == len(apps) == 3
+
+    platform.rejecting = False
+    second = onboard(network, catalog, checkpoint)
+    assert not second.failed
+    assert [asset.tokenized for asset in second.onboarded] == [True] * 3
+    # Created assets and apps were taken from the checkpoint, not made again.
+    assert network.assets.keys() == assets.keys()
+    assert network.apps.keys() == apps.keys()
+
+    third = onboard(network, catalog, checkpoint)
+    assert third.skipped == 3
+    assert not third.onboarded
+
+
+def test_lost_checkpoint_resumes_from_chain(
+    network: FakeAlgod, platform: PlatformApp, catalog: Path, tmp_path: Path
+) -> None:
+    platform.rejecting = True
+    onboard(network, catalog, tmp_path / "lost.progress")
+    assets, apps = dict(network.assets), dict(network.apps)
+
+    platform.rejecting = False
+    result = onboard(network, catalog, None)
+    assert not result.failed
+    assert network.assets.keys() == assets.keys()
+    assert network.apps.keys() == apps.keys()
+    assert {asset.asset_id for asset in result.onboarded} == set(assets)
+
+    # Apps opted in by a crashed run are marked tokenized without another call.
+    calls = platform.tokenize_calls
+    again = onboard(network, catalog, tmp_path / "new.progress")
+    assert [asset.tokenized for asset in again.onboarded] == [True] * 3
+    assert platform.tokenize_calls == calls
+    assert network.apps.keys() == apps.keys()
+
+
+def test_checkpoint_of_another_creator_is_refused(
+    network: FakeAlgod, platform: PlatformApp, catalog: Path, tmp_path: Path
+) -> None:
+    checkpoint = tmp_path / "catalog.progress"
+    checkpoint.write_text('{"fingerprint": "elsewhere"}\n')
+    with pytest.raises(Exception, match="different network or creator"):
+        onboard(network, catalog, checkpoint)
+    assert not network.assets
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from smart_contracts.ip_tokens.order_book import MatchingEngine, Order, OrderBook, Side
+
+ASSET_ID = 77
+
+
+def test_orders_match_in_price_time_priority_at_the_resting_price() -> None:
+    engine = MatchingEngine()
+    first, _ = engine.place(ASSET_ID, "S1", "sell", 10, 5)
+    second, _ = engine.place(ASSET_ID, "S2", "sell", 10, 5)
+    engine.place(ASSET_ID, "S3", "sell", 9, 2)
+    buy, fills = engine.place(ASSET_ID, "B", "buy", 11, 8)
+    assert [(f.seller, f.price, f.quantity) for f in fills] == [
+        ("S3", 9, 2),
+        ("S1", 10, 5),
+        ("S2", 10, 1),
+    ]
+    assert all(f.buy_order_id == buy for f in fills)
+    book = engine.book(ASSET_ID)
+    assert first not in book and second in book
+    best_ask = book.best_ask()
+    assert best_ask is not None and best_ask.remaining == 4
+    assert book.best_bid() is None
+
+
+def test_remainder_rests_and_cancel_removes_it() -> None:
+    engine = MatchingEngine()
+    order_id, fills = engine.place(ASSET_ID, "B", "buy", 10, 3)
+    assert fills == []
+    assert engine.book(ASSET_ID).depth("buy") == [(10, 3)]
+    cancelled = engine.cancel(ASSET_ID, order_id)
+    assert cancelled is not None and cancelled.order_id == order_id
+    assert engine.cancel(ASSET_ID, order_id) is None
+    assert engine.book(ASSET_ID).depth("buy") == []
+
+
+def test_depth_matches_a_sorted_reference() -> None:
+    rng = random.Random(7)
+    book = OrderBook(ASSET_ID)
+    live: dict[int, Order] = {}
+    for order_id in range(1, 400):
+        side: Side = "buy" if order_id % 2 else "sell"
+        price = rng.randint(1, 40) if side == "buy" else rng.randint(41, 80)
+        order = Order(
+            order_id, ASSET_ID, f"A{order_id}", side, price, rng.randint(1, 9)
+        )
+        book.submit(order)
+        live[order_id] = order
+        if rng.random() < 0.4:
+            victim = rng.choice(list(live))
+            book.cancel(victim)
+            del live[victim]
+    sides: tuple[tuple[Side, bool], ...] = (("buy", True), ("sell", False))
+    for side, best_first in sides:
+        totals: dict[int, int] = {}
+        for order in live.values():
+            if order.side == side:
+                totals[order.price] = totals.get(order.price, 0) + order.remaining
+        expected = sorted(totals.items(), reverse=best_first)[:5]
+        assert book.depth(side, levels=5) == expected
+
+
+def test_self_trade_cancels_the_resting_order_and_keeps_matching() -> None:
+    book = OrderBook(ASSET_ID)
+    book.submit(Order(1, ASSET_ID, "A", "sell", 10, 5))
+    book.submit(Order(2, ASSET_ID, "B", "sell", 11, 5))
+    fills = book.submit(Order(3, ASSET_ID, "A", "buy", 11, 3))
+    assert [(f.seller, f.buyer, f.price, f.quantity) for f in fills] == [
+        ("B", "A", 11, 3)
+    ]
+    assert 1 not in book
+    assert book.depth("sell") == [(11, 2)]
+
+
+def test_invalid_orders_are_refused() -> None:
+    book = OrderBook(ASSET_ID)
+    with pytest.raises(ValueError):
+        Order(1, ASSET_ID, "A", "buy", 0, 1)
+    with pytest.raises(ValueError):
+        book.submit(Order(1, ASSET_ID + 1, "A", "buy", 1, 1))
+    book.submit(Order(1, ASSET_ID, "A", "buy", 1, 1))
+    with pytest.raises(ValueError):
+        book.submit(Order(1, ASSET_ID, "A", "buy", 1, 1))
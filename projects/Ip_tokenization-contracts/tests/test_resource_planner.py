@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any
+
+import pytest
+from algosdk import account, transaction
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    TransactionWithSigner,
+)
+
+from smart_contracts._helpers.async_client import AsyncAppClient, CallOptions
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp
+from smart_contracts._helpers.resource_planner import (
+    MAX_ACCOUNTS,
+    MAX_GROUP_SIZE,
+    MAX_REFERENCES,
+    PlannedCall,
+    ResourcePlanner,
+    ResourceRule,
+    send_planned,
+)
+from smart_contracts.ip_tokens.resources import platform_planner
+from tests.conftest import async_algod
+
+ASSET_ID = 77
+USERS = [account.generate_account()[1] for _ in range(40)]
+
+
+def test_planned_groups_carry_every_resource(
+    network: FakeAlgod, app: FakeApp, app_spec: dict[str, Any]
+) -> None:
+    sender = network.addresses[0]
+    creator = account.generate_account()[1]
+    planner = platform_planner(app_spec, app.id, sender, ASSET_ID, creator)
+    sent: dict[bytes, list[dict[str, Any]]] = defaultdict(list)
+
+    def record(_: FakeApp, txn: dict[str, Any]) -> None:
+        sent[txn.get("grp", b"")].append(txn)
+
+    network.app_call_handler = record
+    signer = AccountTransactionSigner(network.keys[0])
+
+    async def run() -> list[list[PlannedCall]]:
+        algod = async_algod(network)
+        sp = await algod.suggested_params()
+        calls: list[tuple[str, list[Any], CallOptions | None]] = []
+        for i in range(0, len(USERS), 2):
+            calls.append(("verify_kyc", [USERS[i], True], None))
+            calls.append(("atomic_swap", [USERS[i], USERS[i + 1], 3], None))
+        pay = transaction.PaymentTxn(sender, sp, app.address, 1_000)
+        calls.append(("distribute_royalty", [TransactionWithSigner(pay, signer)], None))
+        groups = planner.plan(calls)
+        await send_planned(AsyncAppClient(algod, app.id, sender, signer), groups)
+        return groups
+
+    groups = asyncio.run(run())
+    assert len(groups) == len(sent) > 1
+    sent_boxes = [
+        {box["n"] for txn in group for box in txn.get("apbx", [])}
+        for group in sent.values()
+    ]
+    for group in groups:
+        assert sum(1 + c.spec.txn_arg_count for c in group) <= MAX_GROUP_SIZE
+        boxes = {name for call in group for _, name in call.options.boxes}
+        accounts = {a for call in group for a in call.options.accounts}
+        assert boxes in sent_boxes
+        for call in group:
+            options = call.options
+            assert len(options.accounts) <= MAX_ACCOUNTS
+            assert (
+                len(options.accounts)
+                + len(options.foreign_assets)
+                + len(options.foreign_apps)
+                + len(options.boxes)
+            ) <= MAX_REFERENCES
+            if call.spec.name in ("verify_kyc", "atomic_swap"):
+                users = (
+                    call.args[:1] if call.spec.name == "verify_kyc" else call.args[:2]
+                )
+                for user in users:
+                    assert planner.box_name("kyc_verified", user) in boxes
+            if call.spec.name == "atomic_swap":
+                assert ASSET_ID in options.foreign_assets
+            if call.spec.name == "distribute_royalty":
+                assert creator in accounts
+
+
+def test_boxes_overflow_into_filler_calls(app_spec: dict[str, Any]) -> None:
+    sender = USERS[0]
+    planner = platform_planner(app_spec, 1, sender, ASSET_ID, sender)
+    boxes = [(0, bytes([i])) for i in range(20)]
+    (group,) = planner.plan([("connect_wallet", [], CallOptions(boxes=boxes))])
+    assert len(group) == 3
+    placed = [name for call in group for _, name in call.options.boxes]
+    assert sorted(placed) == sorted(name for _, name in boxes)
+
+
+def test_unknown_rule_methods_warn(
+    app_spec: dict[str, Any], caplog: pytest.LogCaptureFixture
+) -> None:
+    with caplog.at_level(logging.WARNING):
+        ResourcePlanner(app_spec, 1, USERS[0], {"not_a_method": ResourceRule()})
+    assert "not_a_method" in caplog.text
+    with pytest.raises(Exception, match="no argument named"):
+        ResourcePlanner(
+            app_spec, 1, USERS[0], {"verify_kyc": ResourceRule(accounts=("nobody",))}
+        )
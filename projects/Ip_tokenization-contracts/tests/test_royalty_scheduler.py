@@ -0,0 +1,131 @@
+from collections.abc import Iterator
+from typing import Any
+
+import httpx
+import pytest
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers.deploy_pipeline import PooledAlgodClient
+from smart_contracts._helpers.fake_algod import FakeAlgod, FakeApp
+from smart_contracts.ip_tokens.royalty_scheduler import (
+    CLAIM_ROYALTIES,
+    SET_ROYALTY_MODE,
+    ClaimPolicy,
+    ClaimScheduler,
+    set_royalty_mode,
+)
+
+RETURN_PREFIX = bytes.fromhex("151f7c75")
+
+
+class LedgerApp:
+    """Stands in for the contract's royalty ledger: claims pay out royalty_accrued."""
+
+    def __init__(self, app: FakeApp) -> None:
+        self.app = app
+        self.modes: list[bool] = []
+        app.global_state[b"royalty_accrued"] = 0
+
+    def accrue(self, amount: int) -> None:
+        self.app.global_state[b"royalty_accrued"] = self.accrued + amount
+
+    @property
+    def accrued(self) -> int:
+        return int(self.app.global_state[b"royalty_accrued"])
+
+    def __call__(self, _: FakeApp, txn: dict[str, Any]) -> list[bytes]:
+        selector = txn["apaa"][0]
+        if selector == SET_ROYALTY_MODE.get_selector():
+            self.modes.append(txn["apaa"][1] != b"\x00")
+            return []
+        assert selector == CLAIM_ROYALTIES.get_selector()
+        amount, self.app.global_state[b"royalty_accrued"] = self.accrued, 0
+        return [RETURN_PREFIX + amount.to_bytes(8, "big")]
+
+
+@pytest.fixture
+def ledger(network: FakeAlgod, app: FakeApp) -> LedgerApp:
+    ledger = LedgerApp(app)
+    network.app_call_handler = ledger
+    return ledger
+
+
+@pytest.fixture
+def client(network: FakeAlgod) -> Iterator[PooledAlgodClient]:
+    session = httpx.Client(transport=network.algod_transport())
+    client = PooledAlgodClient("a" * 64, "http://fake-algod", session=session)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def now() -> list[float]:
+    return [0.0]
+
+
+@pytest.fixture
+def scheduler(
+    network: FakeAlgod, app: FakeApp, client: PooledAlgodClient, now: list[float]
+) -> ClaimScheduler:
+    return ClaimScheduler(
+        client,
+        app.id,
+        network.addresses[0],
+        AccountTransactionSigner(network.keys[0]),
+        ClaimPolicy(min_amount=1_000_000, max_interval=60.0, min_claimable=2_000),
+        clock=lambda: now[0],
+    )
+
+
+def test_claims_once_the_amount_threshold_is_reached(
+    ledger: LedgerApp, scheduler: ClaimScheduler
+) -> None:
+    ledger.accrue(999_999)
+    assert scheduler.poll_once() == 0
+    ledger.accrue(1)
+    assert scheduler.poll_once() == 1_000_000
+    assert ledger.accrued == 0
+    assert scheduler.claimed_total == 1_000_000
+
+
+def test_claims_smaller_amounts_after_the_interval(
+    ledger: LedgerApp, scheduler: ClaimScheduler, now: list[float]
+) -> None:
+    ledger.accrue(1_000)
+    now[0] = 500.0
+    # Dust is never claimed, and does not start the clock.
+    assert scheduler.poll_once() == 0
+    assert scheduler.last_claim_at is None
+
+    ledger.accrue(4_000)
+    assert scheduler.poll_once() == 0
+    now[0] = 559.0
+    assert scheduler.poll_once() == 0
+    now[0] = 560.0
+    assert scheduler.poll_once() == 5_000
+
+    # The next interval counts from the claim.
+    ledger.accrue(5_000)
+    now[0] = 619.0
+    assert scheduler.poll_once() == 0
+    now[0] = 620.0
+    assert scheduler.poll_once() == 5_000
+    assert scheduler.claimed_total == 10_000
+
+
+def test_claim_pays_the_inner_payment_fee(
+    network: FakeAlgod, ledger: LedgerApp, scheduler: ClaimScheduler
+) -> None:
+    ledger.accrue(1_000_000)
+    scheduler.poll_once()
+    (txn,) = network.blocks[network.round].txns
+    assert txn["txn"]["fee"] >= 2_000
+
+
+def test_set_royalty_mode(
+    network: FakeAlgod, app: FakeApp, ledger: LedgerApp, client: PooledAlgodClient
+) -> None:
+    signer = AccountTransactionSigner(network.keys[0])
+    set_royalty_mode(client, app.id, network.addresses[0], signer, True)
+    set_royalty_mode(client, app.id, network.addresses[0], signer, False)
+    assert ledger.modes == [True, False]
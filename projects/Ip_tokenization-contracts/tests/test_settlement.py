@@ -0,0 +1,150 @@
+from pathlib import Path
+
+from algosdk import account, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers.teal_profiler import (
+    CostModel,
+    parse_teal,
+    profile_artifacts,
+)
+from smart_contracts.ip_tokens.order_book import Fill
+from smart_contracts.ip_tokens.settlement import (
+    APP_CALL_BUDGET,
+    CONNECT_WALLET_COST,
+    NETTED_ACCOUNT_COST,
+    NETTED_CALL_COST,
+    NETTED_LEG_COST,
+    _app_calls_needed,
+    _net_group_fits,
+    build_netted_group,
+    build_settlement_group,
+    net_fills,
+    pack_net_pairs,
+)
+
+ARTIFACTS = Path(__file__).parent.parent / "smart_contracts" / "artifacts" / "ip_tokens"
+APP_NAME = "IPTokenizationPlatform"
+NETTED = "atomic_swap_netted(address[],(uint8,uint8,uint64)[])void"
+ASSET_ID = 77
+A, B, C = sorted(account.generate_account()[1] for _ in range(3))
+
+
+def fill(buyer: str, seller: str, price: int, quantity: int) -> Fill:
+    return Fill(ASSET_ID, buyer, seller, price, quantity, 0, 0)
+
+
+def test_fills_between_a_pair_net_to_one_transfer_and_payment() -> None:
+    (pair,) = net_fills([fill(B, A, 10, 5), fill(A, B, 12, 2), fill(B, A, 11, 1)])
+    assert (pair.first, pair.second) == (A, B)
+    assert pair.transfer == (A, B, 4)
+    assert pair.net_payment == (B, A, 50 - 24 + 11)
+    assert len(pair.fills) == 3
+
+
+def test_offsetting_fills_leave_nothing_to_send() -> None:
+    (pair,) = net_fills([fill(B, A, 10, 3), fill(A, B, 10, 3)])
+    assert pair.transfer is None and pair.net_payment is None
+    assert pack_net_pairs([pair]) == []
+
+
+def test_quantity_and_payment_can_net_in_opposite_directions() -> None:
+    (pair,) = net_fills([fill(B, A, 1, 5), fill(A, B, 100, 1)])
+    assert pair.transfer == (A, B, 4)
+    assert pair.net_payment == (A, B, 95)
+
+
+def test_pairs_come_out_in_a_deterministic_order() -> None:
+    fills = [fill(C, A, 1, 1), fill(B, C, 1, 1), fill(A, B, 1, 1)]
+    assert net_fills(fills) == net_fills(list(reversed(fills)))
+    assert [(p.first, p.second) for p in net_fills(fills)] == [(A, B), (A, C), (B, C)]
+
+
+def test_packed_groups_stay_within_limits() -> None:
+    traders = [account.generate_account()[1] for _ in range(40)]
+    fills = [
+        fill(traders[i], traders[(i * 7 + 1) % 40], 10 + i, 1 + i % 3)
+        for i in range(40)
+    ]
+    pairs = net_fills(fills)
+    groups = pack_net_pairs(pairs)
+    assert sum(len(group) for group in groups) == len(pairs)
+    assert all(_net_group_fits(group) for group in groups)
+
+
+def test_app_calls_cover_account_and_reference_limits() -> None:
+    assert _app_calls_needed(0) == 0
+    for accounts in range(1, 40):
+        calls = _app_calls_needed(accounts)
+        per_call = -(-accounts // calls)
+        assert per_call <= 4 and 2 * per_call <= 8
+
+
+def test_budget_costs_match_the_profiled_contract() -> None:
+    report = profile_artifacts(ARTIFACTS, APP_NAME, loop_bound=0)
+    assert report.routes[NETTED].cost == NETTED_CALL_COST
+    assert report.routes["connect_wallet()void"].cost == CONNECT_WALLET_COST
+    model = CostModel(parse_teal((ARTIFACTS / f"{APP_NAME}.approval.teal").read_text()))
+    bodies = model.path_cost("atomic_swap_netted", "atomic_swap_netted").loop_bodies
+    assert bodies == [NETTED_ACCOUNT_COST, NETTED_LEG_COST]
+
+
+def test_identical_fills_get_distinct_txids() -> None:
+    operator_key, operator = account.generate_account()
+    keys = dict(account.generate_account()[::-1] for _ in range(2))
+    buyer, seller = sorted(keys)
+    sp = transaction.SuggestedParams(1000, 1, 1001, "A" * 44, flat_fee=True)
+    signers = {a: AccountTransactionSigner(k) for a, k in keys.items()}
+
+    atc = build_settlement_group(
+        1500,
+        ASSET_ID,
+        operator,
+        AccountTransactionSigner(operator_key),
+        signers,
+        [fill(buyer, seller, 10, 3), fill(buyer, seller, 10, 3)],
+        sp,
+    )
+    txns = [t.txn for t in atc.build_group()]
+    assert len(txns) == 4
+    assert len({t.get_txid() for t in txns}) == len(txns)
+
+
+def test_netted_groups_pool_enough_budget() -> None:
+    operator_key, operator = account.generate_account()
+    keys = dict(account.generate_account()[::-1] for _ in range(6))
+    traders = sorted(keys)
+    # Every pair of six traders: few accounts to reference, but fifteen legs.
+    fills = [fill(b, s, 10, 1) for i, s in enumerate(traders) for b in traders[i + 1 :]]
+    sp = transaction.SuggestedParams(1000, 1, 1001, "A" * 44, flat_fee=True)
+    signers = {a: AccountTransactionSigner(k) for a, k in keys.items()}
+
+    for group in pack_net_pairs(net_fills(fills)):
+        atc = build_netted_group(
+            1500,
+            ASSET_ID,
+            operator,
+            AccountTransactionSigner(operator_key),
+            signers,
+            group,
+            sp,
+        )
+        txns = [t.txn for t in atc.build_group()]
+        calls = [t for t in txns if isinstance(t, transaction.ApplicationCallTxn)]
+        accounts = {a for p in group if (t := p.transfer) for a in t[:2]}
+        legs = sum(1 for p in group if p.transfer)
+        cost = (
+            NETTED_CALL_COST
+            + NETTED_ACCOUNT_COST * len(accounts)
+            + NETTED_LEG_COST * legs
+            + CONNECT_WALLET_COST * (len(calls) - 1)
+        )
+        assert cost <= APP_CALL_BUDGET * len(calls)
+        assert len({t.get_txid() for t in txns}) == len(txns)
+
+
+def test_legs_past_one_call_budget_get_padding_calls() -> None:
+    assert _app_calls_needed(2, 1) == 1
+    # Two accounts fit one call's references, but eight legs cost 801 opcodes.
+    assert _app_calls_needed(2, 8) == 2
+    assert _app_calls_needed(2, 20) == 3
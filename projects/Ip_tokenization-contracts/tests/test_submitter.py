@@ -0,0 +1,110 @@
+import asyncio
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from algosdk import account, encoding, error, transaction
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    TransactionWithSigner,
+)
+
+from smart_contracts._helpers.async_algod import AsyncAlgodClient
+from smart_contracts._helpers.async_client import resign, sign_group
+from smart_contracts._helpers.fake_algod import FakeAlgod
+from smart_contracts._helpers.submitter import Submission, TransactionSubmitter
+from tests.conftest import async_algod
+
+
+@pytest.fixture
+def ticking() -> Iterator[FakeAlgod]:
+    """A network committing a block every 10ms, so validity windows run out."""
+    network = FakeAlgod(block_time=0.01)
+    yield network
+    network.close()
+
+
+class DropFirstSend(httpx.AsyncBaseTransport):
+    """Accepts the first POST of a group without passing it on, like a lost send."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.transport = transport
+        self.dropped = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST" and not self.dropped:
+            self.dropped += 1
+            return httpx.Response(200, json={"txId": "DROPPED"})
+        return await self.transport.handle_async_request(request)
+
+
+def payment(
+    network: FakeAlgod, sp: transaction.SuggestedParams, amount: int
+) -> TransactionWithSigner:
+    sender = network.addresses[0]
+    receiver = account.generate_account()[1]
+    return TransactionWithSigner(
+        transaction.PaymentTxn(sender, sp, receiver, amount),
+        AccountTransactionSigner(network.keys[0]),
+    )
+
+
+def test_submit_many_confirms_every_group(network: FakeAlgod) -> None:
+    async def run() -> tuple[
+        list[TransactionWithSigner], list[Submission | BaseException]
+    ]:
+        algod = async_algod(network)
+        sp = await algod.suggested_params()
+        payments = [payment(network, sp, 100_000 + i) for i in range(20)]
+        overspend = payment(network, sp, 10**15)
+        groups = [sign_group([p]) for p in payments] + [sign_group([overspend])]
+        return payments, await TransactionSubmitter(algod).submit_many(groups)
+
+    payments, results = asyncio.run(run())
+    *confirmed, rejected = results
+    assert isinstance(rejected, error.AlgodHTTPError)
+    for sent, submission in zip(payments, confirmed, strict=True):
+        assert isinstance(submission, Submission)
+        assert submission.confirmed_round is not None
+        assert submission.latency is not None and submission.latency >= 0
+        pay = sent.txn
+        assert isinstance(pay, transaction.PaymentTxn)
+        assert network.accounts[encoding.decode_address(pay.receiver)].amount == pay.amt
+
+
+def dropping_client(network: FakeAlgod) -> tuple[AsyncAlgodClient, DropFirstSend]:
+    """A client whose params are valid for 5 rounds, so a lost group soon expires."""
+    transport = DropFirstSend(network.async_algod_transport())
+    session = httpx.AsyncClient(base_url="http://fake-algod/v2", transport=transport)
+    client = AsyncAlgodClient(
+        "", "http://fake-algod", session=session, validity_rounds=5
+    )
+    return client, transport
+
+
+def test_lost_group_expires_without_rebuild(ticking: FakeAlgod) -> None:
+    async def run() -> None:
+        algod, _ = dropping_client(ticking)
+        sp = await algod.suggested_params()
+        await TransactionSubmitter(algod).submit(sign_group([payment(ticking, sp, 1)]))
+
+    with pytest.raises(error.ConfirmationTimeoutError):
+        asyncio.run(run())
+
+
+def test_lost_group_is_resubmitted_with_rebuild(ticking: FakeAlgod) -> None:
+    async def run() -> tuple[int, Submission, int]:
+        algod, transport = dropping_client(ticking)
+        sp = await algod.suggested_params()
+        txns = [payment(ticking, sp, 1)]
+        submission = await TransactionSubmitter(algod).submit(
+            sign_group(txns), rebuild=resign(txns)
+        )
+        return sp.last, submission, transport.dropped
+
+    expired_at, submission, dropped = asyncio.run(run())
+    assert (submission.attempts, dropped) == (2, 1)
+    # The resubmitted group was signed with a new window, not the expired one.
+    assert submission.last_valid > expired_at
+    assert submission.confirmed_round is not None
+    assert expired_at < submission.confirmed_round <= submission.last_valid
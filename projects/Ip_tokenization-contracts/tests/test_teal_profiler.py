@@ -0,0 +1,151 @@
+import base64
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers.teal_profiler import (
+    BASELINE_SUFFIX,
+    CostModel,
+    attach_source_map,
+    decode_source_lines,
+    parse_teal,
+    profile_artifacts,
+    profile_contract,
+)
+
+ARTIFACTS = Path(__file__).parent.parent / "smart_contracts" / "artifacts"
+CONTRACTS = [
+    ("ip_tokens", "IPTokenizationPlatform"),
+    ("ip_tokens_multi", "MultiAssetIPPlatform"),
+]
+
+# A route calling a subroutine with a counted loop, then one that tops up its budget
+# the way puya's ensure_budget does.
+CALLS_TEAL = """#pragma version 10
+main:
+    callsub count
+    callsub top_up
+    return
+count:
+    pushint 0
+count_top:
+    dup
+    pushint 3
+    <
+    bz count_done
+    pushint 1
+    +
+    b count_top
+count_done:
+    retsub
+top_up:
+    pushint 1
+    pop
+top_up_while:
+    pushint 800
+    global OpcodeBudget
+    >
+    bz top_up_done
+    itxn_begin
+    itxn_submit
+    b top_up_while
+top_up_done:
+    retsub
+"""
+
+# Each opcode must land on a source line that spells out what emits it.
+EXPECTED_SOURCE = {
+    "sha256": "sha256",
+    "itxn_submit": "itxn",
+    "box_put": "] = ",
+}
+
+
+def test_decode_applies_pc_shift() -> None:
+    mappings = json.loads(
+        (
+            ARTIFACTS / "ip_tokens" / "IPTokenizationPlatform.approval.puya.map"
+        ).read_text()
+    )["mappings"]
+    unshifted = decode_source_lines(mappings)
+    shifted = decode_source_lines(mappings, 160)
+    assert shifted == {pc + 160: line for pc, line in unshifted.items()}
+
+
+@pytest.mark.parametrize(("folder", "app_name"), CONTRACTS)
+def test_committed_artifacts_attribute_ops_to_their_source(
+    folder: str, app_name: str
+) -> None:
+    path = ARTIFACTS / folder
+    source_map = json.loads((path / f"{app_name}.approval.puya.map").read_text())
+    spec = json.loads((path / f"{app_name}.arc56.json").read_text())
+    source = (path / source_map["sources"][0]).resolve().read_text().splitlines()
+    blocks = parse_teal((path / f"{app_name}.approval.teal").read_text())
+    attach_source_map(
+        blocks, source_map, len(base64.b64decode(spec["byteCode"]["approval"]))
+    )
+
+    checked = 0
+    for block in blocks:
+        for instruction in block.instructions:
+            expected = EXPECTED_SOURCE.get(instruction.op)
+            if expected is None or instruction.source_line is None:
+                continue
+            text = source[instruction.source_line - 1]
+            assert expected in text, (instruction.op, instruction.source_line, text)
+            checked += 1
+    assert checked > 10
+
+
+@pytest.mark.parametrize(("folder", "app_name"), CONTRACTS)
+def test_profile_charges_most_cost_to_mapped_lines(folder: str, app_name: str) -> None:
+    report = profile_artifacts(ARTIFACTS / folder, app_name)
+    unmapped = next(line for line in report.lines if line.line == 0)
+    assert unmapped.size < report.program_size / 4
+    assert all(line.text for line in report.lines if line.line)
+
+
+def test_loops_in_called_subroutines_count_toward_the_route() -> None:
+    model = CostModel(parse_teal(CALLS_TEAL))
+    route = model.path_cost("main", "main")
+    assert route.loop_bodies == model.subroutine_path("count").loop_bodies
+    assert len(route.loop_bodies) == 1
+
+
+def test_op_up_loops_raise_the_budget_and_are_charged_once() -> None:
+    blocks = parse_teal(CALLS_TEAL)
+    unbounded, unrolled = CostModel(blocks, loop_bound=0), CostModel(blocks)
+    assert unrolled.path_cost("main", "main").ensures_budget
+    assert not unrolled.subroutine_path("count").ensures_budget
+    assert unrolled.subroutine_cost("top_up") == unbounded.subroutine_cost("top_up")
+
+
+@pytest.mark.parametrize(("folder", "app_name"), CONTRACTS)
+def test_with_proof_routes_ensure_their_budget(folder: str, app_name: str) -> None:
+    report = profile_artifacts(ARTIFACTS / folder, app_name)
+    assert report.compiler.startswith("puya ")
+    for name, route in report.routes.items():
+        assert route.ensures_budget == ("_with_proof(" in name), name
+
+
+def test_baseline_from_another_compiler_is_skipped(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    app_name = "IPTokenizationPlatform"
+    report = profile_artifacts(ARTIFACTS / "ip_tokens", app_name)
+    baseline = report.to_baseline()
+    baseline["program_size"] -= 1
+    baseline_path = tmp_path / f"{app_name}{BASELINE_SUFFIX}"
+
+    baseline_path.write_text(json.dumps(baseline))
+    [(_, regressions)] = profile_contract(ARTIFACTS / "ip_tokens", tmp_path)
+    assert regressions
+
+    baseline["compiler"] = "puya 0.1.0"
+    baseline_path.write_text(json.dumps(baseline))
+    with caplog.at_level(logging.WARNING):
+        [(_, regressions)] = profile_contract(ARTIFACTS / "ip_tokens", tmp_path)
+    assert regressions == []
+    assert "puya 0.1.0" in caplog.text
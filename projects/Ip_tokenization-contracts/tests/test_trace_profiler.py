@@ -0,0 +1,66 @@
+import base64
+import json
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers.teal_profiler import attach_source_map, parse_teal
+from smart_contracts._helpers.trace_profiler import SourceMapIndex, TraceAggregator
+
+ARTIFACTS = Path(__file__).parent.parent / "smart_contracts" / "artifacts"
+APP_NAME = "IPTokenizationPlatform"
+
+
+@pytest.fixture(scope="module")
+def approval() -> SourceMapIndex:
+    indexes = SourceMapIndex.from_artifacts(ARTIFACTS / "ip_tokens")
+    return next(index for index in indexes if index.name == f"{APP_NAME}.approval")
+
+
+def test_index_pcs_are_program_pcs(approval: SourceMapIndex) -> None:
+    # The map skips the constant blocks, so its first op is well past the header.
+    assert approval.pcs[0] > 1
+    path = ARTIFACTS / "ip_tokens"
+    source_map = json.loads((path / f"{APP_NAME}.approval.puya.map").read_text())
+    spec = json.loads((path / f"{APP_NAME}.arc56.json").read_text())
+    blocks = parse_teal((path / f"{APP_NAME}.approval.teal").read_text())
+    attach_source_map(
+        blocks, source_map, len(base64.b64decode(spec["byteCode"]["approval"]))
+    )
+    mapped = [
+        i for block in blocks for i in block.instructions if i.pc >= approval.pcs[0]
+    ]
+    assert len(mapped) == len(approval.pcs)
+    for instruction in mapped:
+        info = approval.lookup(instruction.pc)
+        assert info.pc == instruction.pc
+        assert info.op.split()[0] == instruction.op
+        assert info.line == instruction.source_line
+
+
+def test_lookup_inside_an_op_returns_that_op(approval: SourceMapIndex) -> None:
+    wide = next(
+        pc for pc, after in zip(approval.pcs, approval.pcs[1:]) if after - pc > 1
+    )
+    assert approval.lookup(wide + 1).pc == wide
+
+
+def test_trace_steps_are_charged_to_source_lines(approval: SourceMapIndex) -> None:
+    aggregator = TraceAggregator([approval])
+    steps = [{"pc": pc} for pc in approval.pcs[:5]]
+    aggregator.add_exec_trace(
+        {
+            "approval-program-hash": next(iter(approval.hashes)),
+            "approval-program-trace": steps,
+        }
+    )
+    aggregator.add_exec_trace(
+        {"approval-program-hash": "unknown", "approval-program-trace": steps}
+    )
+
+    expected = sum(info.cost for info in approval.infos[:5])
+    assert aggregator.total_cost == expected
+    assert aggregator.program_runs == 1
+    assert aggregator.unknown_programs["unknown"] == 1
+    assert aggregator.line_costs[(approval.name, approval.infos[0].line)] > 0
+    assert approval.source_text(approval.infos[0].line).startswith("class ")
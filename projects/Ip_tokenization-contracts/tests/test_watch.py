@@ -0,0 +1,146 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers import watch
+from smart_contracts._helpers.watch import ContractWatcher, WatchedContract
+
+
+def save(path: Path, source: str) -> None:
+    """Writes a source and moves its mtime on, as a save would on a coarse clock."""
+    mtime = path.stat().st_mtime_ns + 10**9 if path.exists() else 10**9
+    path.write_text(source)
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def builds(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Fakes the compiler: the program is the package's sources without comments."""
+    built: list[str] = []
+
+    def build_contracts(
+        artifacts_root: Path, contracts: list[tuple[str, Path]]
+    ) -> None:
+        ((name, path),) = contracts
+        source = "".join(file.read_text() for file in sorted(path.parent.glob("*.py")))
+        if "syntax error" in source:
+            raise RuntimeError("compile failed")
+        program = "\n".join(line.split("#")[0].rstrip() for line in source.splitlines())
+        (artifacts_root / name).mkdir(parents=True, exist_ok=True)
+        (artifacts_root / name / "Contract.approval.teal").write_text(program)
+        built.append(name)
+
+    monkeypatch.setattr(watch, "build_contracts", build_contracts)
+    return built
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "contract.py"
+    save(path, "x = 1\n")
+    return path
+
+
+def watcher(
+    tmp_path: Path,
+    source: Path,
+    deploys: list[str],
+    check: watch.BuildCheck | None = None,
+) -> ContractWatcher:
+    contract = WatchedContract("ip_tokens", source, lambda: deploys.append("deploy"))
+    return ContractWatcher(tmp_path / "artifacts", [contract], check, poll_interval=0)
+
+
+def test_only_program_changes_are_redeployed(
+    tmp_path: Path, source: Path, builds: list[str]
+) -> None:
+    deploys: list[str] = []
+    contracts = watcher(tmp_path, source, deploys)
+    contracts.start()
+    assert deploys == ["deploy"]
+
+    # Nothing saved, or saved unchanged: no rebuild.
+    assert contracts.poll() == []
+    save(source, "x = 1\n")
+    assert contracts.poll() == []
+    assert len(builds) == 1
+
+    # A comment rebuilds, but the bytecode is the same.
+    save(source, "x = 1  # one\n")
+    assert contracts.poll() == ["ip_tokens"]
+    assert len(builds) == 2
+    assert deploys == ["deploy"]
+
+    save(source, "x = 2  # two\n")
+    assert contracts.poll() == ["ip_tokens"]
+    assert deploys == ["deploy", "deploy"]
+
+
+def test_sibling_module_changes_are_rebuilt(
+    tmp_path: Path, source: Path, builds: list[str]
+) -> None:
+    deploys: list[str] = []
+    helper = tmp_path / "helpers.py"
+    save(helper, "y = 1\n")
+    contracts = watcher(tmp_path, source, deploys)
+    contracts.start()
+
+    save(helper, "y = 2\n")
+    assert contracts.poll() == ["ip_tokens"]
+    assert len(builds) == 2
+    assert deploys == ["deploy", "deploy"]
+
+    # A new module is picked up too.
+    save(tmp_path / "constants.py", "z = 3\n")
+    assert contracts.poll() == ["ip_tokens"]
+    assert deploys == ["deploy", "deploy", "deploy"]
+
+
+def test_failed_build_or_check_keeps_the_live_app(
+    tmp_path: Path, source: Path, builds: list[str]
+) -> None:
+    deploys: list[str] = []
+    checked: list[str] = []
+
+    def check(name: str) -> None:
+        checked.append(name)
+        if "x = 3" in source.read_text():
+            raise AssertionError("opcode cost regressed")
+
+    contracts = watcher(tmp_path, source, deploys, check=check)
+    contracts.start()
+    save(source, "syntax error\n")
+    contracts.poll()
+    save(source, "x = 3\n")
+    contracts.poll()
+    assert deploys == ["deploy"]
+    assert checked == ["ip_tokens", "ip_tokens"]
+
+    # The live app still runs x = 1, so going back to it needs no deploy.
+    save(source, "x = 1  # back\n")
+    contracts.poll()
+    assert deploys == ["deploy"]
+    save(source, "x = 4\n")
+    contracts.poll()
+    assert deploys == ["deploy", "deploy"]
+
+
+def test_failed_deploy_is_retried_on_the_next_change(
+    tmp_path: Path, source: Path, builds: list[str]
+) -> None:
+    attempts: list[str] = []
+
+    def deploy() -> None:
+        attempts.append(source.read_text())
+        if len(attempts) == 2:
+            raise ConnectionError("algod unreachable")
+
+    contract = WatchedContract("ip_tokens", source, deploy)
+    contracts = ContractWatcher(tmp_path / "artifacts", [contract], poll_interval=0)
+    contracts.start()
+    save(source, "x = 2\n")
+    contracts.poll()
+    save(source, "x = 2  # retry\n")
+    contracts.poll()
+    assert attempts == ["x = 1\n", "x = 2\n", "x = 2  # retry\n"]